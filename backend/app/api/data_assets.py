@@ -2,21 +2,30 @@
 import os
 import uuid
 import shutil
-from datetime import datetime
 from typing import Optional, List
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from pydantic import BaseModel
 import openpyxl
 import xlrd
 
-router = APIRouter(prefix="/api/data-assets", tags=["data-assets"])
+from app.services.data_asset_index import DataAssetIndex, read_sheet_names
+from app.services.worker_pool import run_in_worker
 
 # 存储上传的文件信息
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'uploads', 'excel')
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# 内存中存储文件元数据
-data_assets: dict[str, dict] = {}
+# 文件元数据索引（第一次访问时才加载，不在导入时打开工作簿）
+asset_index = DataAssetIndex(UPLOAD_DIR, os.path.join(os.path.dirname(UPLOAD_DIR), 'data_assets.db'))
+
+
+async def _ensure_index_loaded():
+    """第一次请求时在工作线程中加载索引（遍历上传目录），不阻塞事件循环"""
+    if not asset_index.loaded:
+        await run_in_worker(asset_index.ensure_loaded)
+
+
+router = APIRouter(prefix="/api/data-assets", tags=["data-assets"], dependencies=[Depends(_ensure_index_loaded)])
 
 
 class CreateFolderRequest(BaseModel):
@@ -64,66 +73,18 @@ def _get_relative_path(full_path: str) -> str:
     return rel.replace(os.sep, '/')
 
 
-def _load_existing_files():
-    """启动时扫描excel文件夹,加载已存在的Excel文件"""
-    if not os.path.exists(UPLOAD_DIR):
-        return
-    
-    for root, dirs, files in os.walk(UPLOAD_DIR):
-        for filename in files:
-            if not filename.lower().endswith(('.xlsx', '.xls')):
-                continue
-            
-            file_path = os.path.join(root, filename)
-            
-            try:
-                # 从文件名提取ID (格式: uuid.xlsx 或任意名称.xlsx)
-                name_without_ext = os.path.splitext(filename)[0]
-                ext = os.path.splitext(filename)[1]
-                
-                # 如果文件名是UUID格式,使用它作为ID;否则生成新的UUID
-                if len(name_without_ext) == 36 and name_without_ext.count('-') == 4:
-                    file_id = name_without_ext
-                else:
-                    # 为非UUID格式的文件生成新ID,但保留原始文件名
-                    file_id = str(uuid.uuid4())
-                
-                # 读取工作表名称
-                is_xls = ext.lower() == '.xls'
-                if is_xls:
-                    wb = xlrd.open_workbook(file_path)
-                    sheet_names = wb.sheet_names()
-                else:
-                    wb = openpyxl.load_workbook(file_path, read_only=True)
-                    sheet_names = wb.sheetnames
-                    wb.close()
-                
-                # 获取文件信息
-                file_stat = os.stat(file_path)
-                
-                # 获取相对于UPLOAD_DIR的文件夹路径
-                folder_path = _get_relative_path(root)
-                
-                # 存储元数据
-                asset = {
-                    'id': file_id,
-                    'name': filename,  # 保存实际文件名
-                    'originalName': filename,  # 原始文件名
-                    'size': file_stat.st_size,
-                    'uploadedAt': datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
-                    'sheetNames': sheet_names,
-                    'path': file_path,
-                    'folder': folder_path,
-                }
-                data_assets[file_id] = asset
-                print(f"[DataAssets] 已加载Excel文件: {filename} (文件夹: {folder_path or '根目录'})")
-            except Exception as e:
-                print(f"[DataAssets] 加载Excel文件失败 {filename}: {str(e)}")
-                continue
-
-
-# 启动时加载已存在的文件
-_load_existing_files()
+def _to_response(asset) -> dict:
+    """接口返回的资源信息（不包含服务器上的文件路径）"""
+    info = asset_index.to_dict(asset)
+    del info['path']
+    return info
+
+
+def _get_asset_or_404(file_id: str):
+    asset = asset_index.get(file_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="文件不存在")
+    return asset
 
 
 @router.post("/upload")
@@ -148,44 +109,16 @@ async def upload_excel(file: UploadFile = File(...), folder: Optional[str] = Non
     with open(file_path, 'wb') as f:
         f.write(content)
     
-    # 读取工作表名称（根据文件格式选择不同的库）
+    # 读取工作表名称（同时检查文件是否是有效的Excel文件）
     try:
-        is_xls = ext.lower() == '.xls'
-        if is_xls:
-            # 使用xlrd读取旧版.xls文件
-            wb = xlrd.open_workbook(file_path)
-            sheet_names = wb.sheet_names()
-        else:
-            # 使用openpyxl读取.xlsx文件
-            wb = openpyxl.load_workbook(file_path, read_only=True)
-            sheet_names = wb.sheetnames
-            wb.close()
+        sheet_names = await run_in_worker(read_sheet_names, file_path)
     except Exception as e:
         os.remove(file_path)
         raise HTTPException(status_code=400, detail=f"无法读取Excel文件: {str(e)}")
     
-    # 存储元数据
-    asset = {
-        'id': file_id,
-        'name': saved_name,
-        'originalName': file.filename,
-        'size': len(content),
-        'uploadedAt': datetime.now().isoformat(),
-        'sheetNames': sheet_names,
-        'path': file_path,
-        'folder': folder or '',
-    }
-    data_assets[file_id] = asset
-    
-    return {
-        'id': asset['id'],
-        'name': asset['name'],
-        'originalName': asset['originalName'],
-        'size': asset['size'],
-        'uploadedAt': asset['uploadedAt'],
-        'sheetNames': asset['sheetNames'],
-        'folder': asset['folder'],
-    }
+    # 登记到索引
+    asset = asset_index.add(file_path, file.filename, sheet_names)
+    return _to_response(asset)
 
 
 @router.post("/upload-batch")
@@ -212,58 +145,16 @@ async def upload_excel_batch(files: List[UploadFile] = File(...), folder: Option
 
 @router.get("")
 async def list_assets(folder: Optional[str] = None):
-    """获取所有Excel文件资源"""
-    # 如果指定了文件夹,只返回该文件夹下的文件
-    if folder is not None:
-        filtered = [
-            {
-                'id': a['id'],
-                'name': a['name'],
-                'originalName': a['originalName'],
-                'size': a['size'],
-                'uploadedAt': a['uploadedAt'],
-                'sheetNames': a['sheetNames'],
-                'folder': a['folder'],
-            }
-            for a in data_assets.values()
-            if a['folder'] == folder
-        ]
-    else:
-        # 返回所有文件
-        filtered = [
-            {
-                'id': a['id'],
-                'name': a['name'],
-                'originalName': a['originalName'],
-                'size': a['size'],
-                'uploadedAt': a['uploadedAt'],
-                'sheetNames': a['sheetNames'],
-                'folder': a['folder'],
-            }
-            for a in data_assets.values()
-        ]
-    
-    return filtered
+    """获取所有Excel文件资源（指定文件夹时只返回该文件夹下的文件）"""
+    # 尚未读取工作表名称的文件在这里读取一次，结果保存到索引
+    assets = await run_in_worker(asset_index.list_assets, folder)
+    return [_to_response(asset) for asset in assets]
 
 
 @router.get("/folders")
 async def list_folders():
     """获取所有文件夹列表"""
-    folders = set()
-    
-    # 从已加载的文件中提取文件夹
-    for asset in data_assets.values():
-        if asset['folder']:
-            folders.add(asset['folder'])
-    
-    # 扫描文件系统中的文件夹
-    for root, dirs, files in os.walk(UPLOAD_DIR):
-        for dir_name in dirs:
-            folder_path = os.path.join(root, dir_name)
-            rel_path = _get_relative_path(folder_path)
-            folders.add(rel_path)
-    
-    return sorted(list(folders))
+    return asset_index.list_folders()
 
 
 @router.post("/folders")
@@ -290,6 +181,7 @@ async def create_folder(request: CreateFolderRequest):
         os.makedirs(full_path, exist_ok=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"创建文件夹失败: {str(e)}")
+    asset_index.add_folder(_get_relative_path(full_path))
     
     return {'success': True, 'path': folder_path}
 
@@ -315,12 +207,7 @@ async def rename_folder(request: RenameFolderRequest):
         
         # 更新所有该文件夹下的文件元数据
         new_rel_path = _get_relative_path(new_full_path)
-        for asset in data_assets.values():
-            if asset['folder'].startswith(request.oldPath):
-                # 更新文件夹路径
-                asset['folder'] = asset['folder'].replace(request.oldPath, new_rel_path, 1)
-                # 更新文件路径
-                asset['path'] = asset['path'].replace(old_full_path, new_full_path, 1)
+        asset_index.rename_folder(_get_relative_path(old_full_path), new_rel_path)
         
         return {'success': True, 'newPath': new_rel_path}
     except Exception as e:
@@ -340,14 +227,9 @@ async def delete_folder(request: DeleteFolderRequest):
         shutil.rmtree(full_path)
         
         # 删除该文件夹下的所有文件元数据
-        to_delete = [
-            asset_id for asset_id, asset in data_assets.items()
-            if asset['folder'].startswith(request.folderPath)
-        ]
-        for asset_id in to_delete:
-            del data_assets[asset_id]
+        deleted_count = asset_index.remove_folder(_get_relative_path(full_path))
         
-        return {'success': True, 'deletedCount': len(to_delete)}
+        return {'success': True, 'deletedCount': deleted_count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"删除失败: {str(e)}")
 
@@ -355,26 +237,22 @@ async def delete_folder(request: DeleteFolderRequest):
 @router.put("/move")
 async def move_asset(request: MoveAssetRequest):
     """移动Excel文件到指定文件夹"""
-    if request.assetId not in data_assets:
-        raise HTTPException(status_code=404, detail="文件不存在")
-    
-    asset = data_assets[request.assetId]
-    old_path = asset['path']
+    asset = _get_asset_or_404(request.assetId)
+    old_path = asset_index.full_path(asset.rel_path)
     
     # 构建新路径
     target_dir = _get_full_path(request.targetFolder)
     os.makedirs(target_dir, exist_ok=True)
-    new_path = os.path.join(target_dir, asset['name'])
+    new_path = os.path.join(target_dir, asset.name)
     
     try:
         # 移动文件
         shutil.move(old_path, new_path)
         
         # 更新元数据
-        asset['path'] = new_path
-        asset['folder'] = request.targetFolder or ''
+        asset = asset_index.update_path(asset.id, new_path)
         
-        return {'success': True, 'newFolder': asset['folder']}
+        return {'success': True, 'newFolder': asset.folder}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"移动失败: {str(e)}")
 
@@ -382,17 +260,15 @@ async def move_asset(request: MoveAssetRequest):
 @router.delete("/{file_id}")
 async def delete_asset(file_id: str):
     """删除Excel文件资源"""
-    if file_id not in data_assets:
-        raise HTTPException(status_code=404, detail="文件不存在")
-    
-    asset = data_assets[file_id]
+    asset = _get_asset_or_404(file_id)
+    file_path = asset_index.full_path(asset.rel_path)
     
     # 删除文件
-    if os.path.exists(asset['path']):
-        os.remove(asset['path'])
+    if os.path.exists(file_path):
+        os.remove(file_path)
     
     # 删除元数据
-    del data_assets[file_id]
+    asset_index.remove(file_id)
     
     return {'message': '删除成功'}
 
@@ -400,11 +276,8 @@ async def delete_asset(file_id: str):
 @router.put("/{file_id}/rename")
 async def rename_asset(file_id: str, newName: str):
     """重命名Excel文件"""
-    if file_id not in data_assets:
-        raise HTTPException(status_code=404, detail="文件不存在")
-    
-    asset = data_assets[file_id]
-    old_path = asset['path']
+    asset = _get_asset_or_404(file_id)
+    old_path = asset_index.full_path(asset.rel_path)
     
     # 验证新文件名
     if not newName or '/' in newName or '\\' in newName:
@@ -423,19 +296,9 @@ async def rename_asset(file_id: str, newName: str):
         os.rename(old_path, new_path)
         
         # 更新元数据
-        asset['path'] = new_path
-        asset['name'] = newName
-        asset['originalName'] = newName
+        asset = asset_index.update_path(file_id, new_path, original_name=newName)
         
-        return {'success': True, 'asset': {
-            'id': asset['id'],
-            'name': asset['name'],
-            'originalName': asset['originalName'],
-            'size': asset['size'],
-            'uploadedAt': asset['uploadedAt'],
-            'folder': asset['folder'],
-            'sheetNames': asset['sheetNames'],
-        }}
+        return {'success': True, 'asset': _to_response(asset)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"重命名失败: {str(e)}")
 
@@ -443,11 +306,8 @@ async def rename_asset(file_id: str, newName: str):
 @router.post("/read")
 async def read_excel(request: ReadExcelRequest):
     """读取Excel数据"""
-    if request.fileId not in data_assets:
-        raise HTTPException(status_code=404, detail="文件不存在")
-    
-    asset = data_assets[request.fileId]
-    file_path = asset['path']
+    asset = _get_asset_or_404(request.fileId)
+    file_path = asset_index.full_path(asset.rel_path)
     is_xls = file_path.lower().endswith('.xls')
     
     try:
@@ -617,27 +477,21 @@ def _parse_cell_address(address: str) -> tuple[int, int]:
 # 提供给执行器使用的函数
 def get_asset_path(file_id: str) -> Optional[str]:
     """获取文件路径"""
-    if file_id in data_assets:
-        return data_assets[file_id]['path']
-    return None
+    asset = asset_index.get(file_id)
+    return asset_index.full_path(asset.rel_path) if asset else None
 
 
 def get_asset_by_name(name: str) -> Optional[dict]:
     """通过原始文件名获取资产"""
-    for asset in data_assets.values():
-        if asset['originalName'] == name:
-            return asset
-    return None
+    asset = asset_index.get_by_name(name)
+    return asset_index.to_dict(asset) if asset else None
 
 
 @router.get("/{file_id}/preview")
 async def preview_excel(file_id: str, sheet: Optional[str] = None, max_rows: int = 100, max_cols: int = 50):
     """预览Excel文件数据"""
-    if file_id not in data_assets:
-        raise HTTPException(status_code=404, detail="文件不存在")
-    
-    asset = data_assets[file_id]
-    file_path = asset['path']
+    asset = _get_asset_or_404(file_id)
+    file_path = asset_index.full_path(asset.rel_path)
     is_xls = file_path.lower().endswith('.xls')
     
     try:
@@ -5,9 +5,11 @@ import shutil
 from pathlib import Path
 from fastapi import APIRouter
 from pydantic import BaseModel
-from typing import Optional, List
 from datetime import datetime
 
+from app.services.workflow_catalog import get_workflow_catalog
+from app.services.worker_pool import run_in_worker
+
 router = APIRouter(prefix="/api/local-workflows", tags=["local-workflows"])
 
 # 默认工作流文件夹（项目根目录下的 workflows 文件夹）
@@ -28,11 +30,13 @@ class MigrateRequest(BaseModel):
     newFolder: str
 
 
-class LocalWorkflowInfo(BaseModel):
-    filename: str
-    name: str
-    modifiedTime: str
-    size: int
+class WorkflowCatalogRequest(BaseModel):
+    folder: str = ''
+    offset: int = 0
+    limit: int = 100
+    sortBy: str = 'modifiedTime'  # modifiedTime / name / filename / size
+    order: str = 'desc'  # asc / desc
+    search: str = ''
 
 
 def ensure_folder_exists(folder: str) -> bool:
@@ -75,7 +79,7 @@ async def check_workflow_exists(request: SaveWorkflowRequest):
 
 @router.post("/list")
 async def list_workflows(config: WorkflowFolderConfig):
-    """列出指定文件夹中的所有工作流文件"""
+    """列出指定文件夹中的所有工作流文件（按修改时间倒序）"""
     # 如果 folder 为空字符串或 None，使用默认文件夹
     folder = config.folder if config.folder else DEFAULT_WORKFLOW_FOLDER
     
@@ -83,45 +87,41 @@ async def list_workflows(config: WorkflowFolderConfig):
         ensure_folder_exists(folder)
         return {"workflows": []}
     
-    workflows: List[LocalWorkflowInfo] = []
-    
     try:
-        for filename in os.listdir(folder):
-            if filename.endswith('.json'):
-                filepath = os.path.join(folder, filename)
-                try:
-                    stat = os.stat(filepath)
-                    modified_time = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    # 尝试读取工作流名称
-                    workflow_name = filename[:-5]  # 默认使用文件名
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            if 'name' in data:
-                                workflow_name = data['name']
-                    except:
-                        pass
-                    
-                    workflows.append(LocalWorkflowInfo(
-                        filename=filename,
-                        name=workflow_name,
-                        modifiedTime=modified_time,
-                        size=stat.st_size
-                    ))
-                except Exception as e:
-                    print(f"Error reading file {filename}: {e}")
-                    continue
-        
-        # 按修改时间倒序排列
-        workflows.sort(key=lambda x: x.modifiedTime, reverse=True)
-        
-        return {"workflows": [w.model_dump() for w in workflows]}
+        catalog = get_workflow_catalog()
+        catalog.ensure_watch(folder)
+        workflows, _ = await run_in_worker(catalog.list, folder)
+        return {"workflows": workflows}
     
     except Exception as e:
         return {"error": str(e), "workflows": []}
 
 
+@router.post("/catalog")
+async def list_workflow_catalog(request: WorkflowCatalogRequest):
+    """分页列出工作流文件，支持排序和按名称/文件名搜索（适合工作流很多的文件夹）"""
+    folder = request.folder if request.folder else DEFAULT_WORKFLOW_FOLDER
+    
+    if not os.path.exists(folder):
+        ensure_folder_exists(folder)
+        return {"workflows": [], "total": 0, "offset": request.offset, "limit": request.limit}
+    
+    try:
+        catalog = get_workflow_catalog()
+        catalog.ensure_watch(folder)
+        workflows, total = await run_in_worker(
+            catalog.list, folder,
+            sort_by=request.sortBy,
+            descending=request.order != 'asc',
+            search=request.search,
+            offset=request.offset,
+            limit=request.limit,
+        )
+        return {"workflows": workflows, "total": total, "offset": request.offset, "limit": request.limit}
+    
+    except Exception as e:
+        return {"error": str(e), "workflows": [], "total": 0, "offset": request.offset, "limit": request.limit}
+
 
 @router.post("/save")
 async def save_workflow(request: SaveWorkflowRequest, config: WorkflowFolderConfig = None):
@@ -144,6 +144,7 @@ async def save_workflow(request: SaveWorkflowRequest, config: WorkflowFolderConf
     try:
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(request.content, f, ensure_ascii=False, indent=2)
+        get_workflow_catalog().mark_dirty(folder)
         
         return {"success": True, "filepath": filepath, "filename": filename}
     
@@ -175,6 +176,7 @@ async def save_workflow_to_folder(request: SaveWorkflowRequest):
     try:
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(content, f, ensure_ascii=False, indent=2)
+        get_workflow_catalog().mark_dirty(folder)
         
         return {"success": True, "filepath": filepath, "filename": filename}
     
@@ -214,6 +216,7 @@ async def delete_workflow(filename: str, folder: str = None):
     
     try:
         os.remove(filepath)
+        get_workflow_catalog().mark_dirty(folder)
         return {"success": True}
     
     except Exception as e:
@@ -253,6 +256,10 @@ async def migrate_workflows(request: MigrateRequest):
                 except Exception as e:
                     errors.append(f"{filename}: {str(e)}")
         
+        catalog = get_workflow_catalog()
+        catalog.mark_dirty(old_folder)
+        catalog.mark_dirty(new_folder)
+        
         return {
             "success": True,
             "migrated": migrated,
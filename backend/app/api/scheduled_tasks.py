@@ -94,15 +94,15 @@ async def stop_scheduled_task(task_id: str):
 
 
 @router.get("/{task_id}/logs", response_model=List[ScheduledTaskExecutionLog])
-async def get_task_logs(task_id: str, limit: int = 100):
-    """获取任务执行日志"""
-    return scheduled_task_manager.get_task_logs(task_id, limit)
+async def get_task_logs(task_id: str, limit: int = 100, offset: int = 0):
+    """获取任务执行日志（按时间倒序分页）"""
+    return scheduled_task_manager.get_task_logs(task_id, limit, offset)
 
 
 @router.get("/logs/all", response_model=List[ScheduledTaskExecutionLog])
-async def get_all_logs(limit: int = 100):
-    """获取所有执行日志"""
-    return scheduled_task_manager.get_all_logs(limit)
+async def get_all_logs(limit: int = 100, offset: int = 0, status: Optional[str] = None):
+    """获取所有执行日志（按时间倒序分页，可按状态筛选）"""
+    return scheduled_task_manager.get_all_logs(limit, offset, status)
 
 
 @router.delete("/{task_id}/logs")
@@ -1,7 +1,7 @@
 """工作流API路由"""
 import asyncio
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 from uuid import uuid4
 from pathlib import Path
 
@@ -12,6 +12,9 @@ from pydantic import BaseModel
 from app.models.workflow import Workflow, ExecutionResult, ExecutionStatus, LogEntry
 from app.services.workflow_executor import WorkflowExecutor
 from app.services.data_collector import DataExporter
+from app.services.data_row_store import DataRowStore
+from app.services.worker_pool import run_in_worker
+from app.services.telemetry_bus import TelemetryBus, create_telemetry_bus
 from app.main import sio
 
 
@@ -21,7 +24,8 @@ router = APIRouter(prefix="/api/workflows", tags=["workflows"])
 workflows_store: dict[str, Workflow] = {}
 executions_store: dict[str, WorkflowExecutor] = {}
 execution_results: dict[str, ExecutionResult] = {}
-execution_data: dict[str, list[dict]] = {}
+execution_data: dict[str, Union[list[dict], DataRowStore]] = {}
+telemetry_store: dict[str, TelemetryBus] = {}
 
 # 全局变量存储（在工作流执行之间持久化）
 global_variables: dict[str, any] = {}
@@ -231,8 +235,12 @@ async def execute_workflow(workflow_id: str, background_tasks: BackgroundTasks,
         if executor.is_running:
             raise HTTPException(status_code=400, detail="工作流正在执行中")
     
+    # 执行遥测事件通过事件总线批量发送，节点执行不等待websocket（延迟导入避免循环依赖）
+    from app.main import has_connected_clients
+    telemetry = create_telemetry_bus(sio.emit, has_clients=has_connected_clients)
+    
     # 创建执行器
-    async def on_log(log: LogEntry):
+    def on_log(log: LogEntry):
         # 检查是否有客户端启用了日志接收（延迟导入避免循环依赖）
         from app.main import is_log_enabled
         if not is_log_enabled():
@@ -245,7 +253,7 @@ async def execute_workflow(workflow_id: str, background_tasks: BackgroundTasks,
         # 调试：打印日志详情
         print(f"[LOG] message={log.message}, is_user_log={is_user_log}, is_system_log={is_system_log}, details={log.details}")
         
-        await sio.emit('execution:log', {
+        telemetry.publish('execution:log', {
             'workflowId': workflow_id,
             'log': {
                 'id': log.id,
@@ -257,26 +265,31 @@ async def execute_workflow(workflow_id: str, background_tasks: BackgroundTasks,
                 'isUserLog': is_user_log,
                 'isSystemLog': is_system_log,
             }
-        })
+        }, droppable=not (is_user_log or is_system_log or log.level.value == 'error'))
     
-    async def on_node_start(node_id: str):
-        await sio.emit('execution:node_start', {
+    # 同一节点的开始/完成状态在发送前合并为最新状态
+    def on_node_start(node_id: str):
+        telemetry.publish('execution:node_start', {
             'workflowId': workflow_id,
             'nodeId': node_id,
-        })
+        }, key=('node', node_id), droppable=True)
     
-    async def on_node_complete(node_id: str, result):
-        await sio.emit('execution:node_complete', {
+    def on_node_complete(node_id: str, result):
+        telemetry.publish('execution:node_complete', {
             'workflowId': workflow_id,
             'nodeId': node_id,
             'success': result.success,
             'duration': result.duration,
             'error': result.error,
             # 注意：不发送 input 和 output，因为数据量可能很大
-        })
+        }, key=('node', node_id))
     
-    async def on_variable_update(name: str, value):
+    def on_variable_update(name: str, value):
         # 发送变量更新事件到前端
+        # 数据行存储（如流式查询结果）只发送前100行预览
+        if isinstance(value, DataRowStore):
+            value = value[:100]
+        
         # 获取变量类型
         var_type = 'null'
         if value is not None:
@@ -293,15 +306,16 @@ async def execute_workflow(workflow_id: str, background_tasks: BackgroundTasks,
             else:
                 var_type = 'unknown'
         
-        await sio.emit('execution:variable_update', {
+        # 同一变量的多次更新只发送最新值
+        telemetry.publish('execution:variable_update', {
             'workflowId': workflow_id,
             'name': name,
             'value': value,
             'type': var_type,
-        })
+        }, key=('variable', name))
     
-    async def on_data_row(row: dict):
-        await sio.emit('execution:data_row', {
+    def on_data_row(row: dict):
+        telemetry.publish('execution:data_row', {
             'workflowId': workflow_id,
             'row': row,
         })
@@ -327,6 +341,7 @@ async def execute_workflow(workflow_id: str, background_tasks: BackgroundTasks,
     executor.context.variables.update(global_variables)
     
     executions_store[workflow_id] = executor
+    telemetry_store[workflow_id] = telemetry
     
     # 在后台执行
     async def run_execution():
@@ -336,13 +351,19 @@ async def execute_workflow(workflow_id: str, background_tasks: BackgroundTasks,
         result = await executor.execute()
         print(f"[run_execution] 执行完成，结果: {result.status.value}")
         
+        # 先发送缓冲中的遥测事件，保证它们在 execution:completed 之前到达
+        await telemetry.close()
+        if telemetry_store.get(workflow_id) is telemetry:
+            del telemetry_store[workflow_id]
+        
         execution_results[workflow_id] = result
-        execution_data[workflow_id] = executor.get_collected_data()
+        # 直接保留数据行存储，避免把大量数据复制为 list[dict]
+        execution_data[workflow_id] = executor.get_collected_rows()
         
         # 导出数据
         if execution_data[workflow_id]:
             exporter = DataExporter()
-            data_file = exporter.export_to_excel(execution_data[workflow_id])
+            data_file = await run_in_worker(exporter.export_to_excel, execution_data[workflow_id])
             result.data_file = data_file
         
         # 如果配置了自动关闭浏览器，则关闭
@@ -361,9 +382,7 @@ async def execute_workflow(workflow_id: str, background_tasks: BackgroundTasks,
         
         print(f"[run_execution] 发送 execution:completed 事件")
         # 限制发送的数据量，避免消息过大导致传输失败
-        collected_data_to_send = execution_data.get(workflow_id, [])
-        if len(collected_data_to_send) > 20:
-            collected_data_to_send = collected_data_to_send[:20]  # 只发送前20条
+        collected_data_to_send = execution_data.get(workflow_id, [])[:20]  # 只发送前20条
         
         await sio.emit('execution:completed', {
             'workflowId': workflow_id,
@@ -413,6 +432,10 @@ async def stop_workflow(workflow_id: str):
     
     await executor.stop()
     
+    telemetry = telemetry_store.get(workflow_id)
+    if telemetry:
+        await telemetry.flush()
+    
     await sio.emit('execution:stopped', {'workflowId': workflow_id})
     
     return {"message": "工作流已停止"}
@@ -12,55 +12,27 @@ from .base import (
     get_ffprobe_path,
 )
 
-# 导入所有执行器以触发注册
-from . import basic
-from . import basic_variable  # 变量操作执行器
-from . import advanced
-from . import advanced_file_ops  # 文件操作执行器
-from . import advanced_browser
-from . import advanced_image
-from . import advanced_keyboard
-from . import advanced_pillow
-from . import control
-from . import captcha
-from . import data_structure
-from . import ai
-from . import ai_scraper
-from . import ai_firecrawl
-from . import table
-from . import subflow
-from . import database
-from . import media
-from . import media_record
-from . import media_m3u8
-from . import qq
-from . import wechat
-from . import pdf_ops
-from . import pdf_convert
-from . import document_convert
-from . import screen_share
-from . import trigger
-from . import utility_tools
-from . import format_factory
-from . import python_script
-from . import table_extract
-from . import switch_tab
-# 手机自动化模块
-from . import phone_device
-from . import phone_touch
-from . import phone_input
-from . import phone_screen
-from . import phone_app
-from . import phone_file
-from . import phone_advanced
-from . import phone_vision
-from . import phone_settings
-from . import phone_clipboard
-# 测试报告模块
-from . import test_allure
+from .manifest import EXECUTOR_MANIFEST
+
+# 执行器模块按需导入：第一次获取某个模块类型时才导入对应模块（见 manifest.py）
+registry.set_manifest(__name__, EXECUTOR_MANIFEST)
+
+
+def start_prewarm():
+    """按配置在后台线程中预先导入执行器
+
+    配置项（WebRPAConfig.json 的 backend.executors）：
+        prewarm: true 预热全部执行器；模块类型列表则只预热这些类型；默认不预热
+    """
+    from app.utils.config import get_backend_config
+
+    prewarm = (get_backend_config().get('executors', {}) or {}).get('prewarm', False)
+    if prewarm is True:
+        return registry.prewarm()
+    if isinstance(prewarm, list) and prewarm:
+        return registry.prewarm(prewarm)
+    return None
 
-# 调试：打印已注册的执行器
-print(f"[DEBUG] 已注册的执行器类型: {registry.get_all_types()}")
 
 __all__ = [
     "ModuleExecutor",
@@ -74,4 +46,5 @@ __all__ = [
     "get_ffmpeg_path",
     "get_ffprobe_path",
     "escape_css_selector",
+    "start_prewarm",
 ]
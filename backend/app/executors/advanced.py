@@ -3,8 +3,10 @@ import asyncio
 import base64
 import json
 import random
+import re
 import time
 from pathlib import Path
+from typing import Any
 
 from .base import (
     ModuleExecutor,
@@ -12,13 +14,21 @@ from .base import (
     ModuleResult,
     register_executor,
 )
-from .type_utils import to_int, to_float, parse_search_region
+from .type_utils import to_bool, to_int, to_float, parse_search_region
 from ..utils.jsonpath_parser import parse_jsonpath
+from app.services.worker_pool import run_in_worker
+
+
+_SINGLE_VARIABLE_PATTERN = re.compile(r'^\s*\{([^{}]+)\}\s*$')
 
 
 @register_executor
 class ApiRequestExecutor(ModuleExecutor):
-    """API请求模块执行器"""
+    """API请求模块执行器
+    
+    请求通过共享的HTTP客户端池发送（keep-alive连接复用）；
+    批量模式下按有限并发发送一组请求，结果按输入顺序存入变量。
+    """
     
     @property
     def module_type(self) -> str:
@@ -26,65 +36,128 @@ class ApiRequestExecutor(ModuleExecutor):
     
     async def execute(self, config: dict, context: ExecutionContext) -> ModuleResult:
         import httpx
+        from app.services.http_client_pool import RequestSpec, get_http_client_pool, parse_response
         
+        request_mode = config.get('requestMode', 'single') or 'single'
         request_url = context.resolve_value(config.get('requestUrl', ''))
-        request_method = context.resolve_value(config.get('requestMethod', 'GET')).upper()  # 支持变量引用
+        request_method = context.resolve_value(config.get('requestMethod', 'GET')).upper()
         request_headers_str = context.resolve_value(config.get('requestHeaders', ''))
         request_body_str = context.resolve_value(config.get('requestBody', ''))
         variable_name = config.get('variableName', '')
         request_timeout = to_int(config.get('requestTimeout', 30), 30, context)
+        proxy = context.resolve_value(config.get('requestProxy', '')) or None
+        verify = to_bool(config.get('verifySsl', True), context)
+        http2 = to_bool(config['useHttp2'], context) if 'useHttp2' in config else None
+        follow_redirects = to_bool(config.get('followRedirects', False), context)
         
-        if not request_url:
+        if request_mode != 'batch' and not request_url:
             return ModuleResult(success=False, error="请求地址不能为空")
         
-        try:
-            headers = {}
-            if request_headers_str:
-                try:
-                    headers = json.loads(request_headers_str)
-                except json.JSONDecodeError as e:
-                    return ModuleResult(success=False, error=f"请求头JSON格式错误: {str(e)}")
-            
-            body = None
-            if request_body_str:
-                try:
-                    body = json.loads(request_body_str)
-                except json.JSONDecodeError:
-                    body = request_body_str
-            
-            async with httpx.AsyncClient(timeout=request_timeout) as client:
-                response = await client.request(
-                    method=request_method,
-                    url=request_url,
-                    headers=headers,
-                    json=body if isinstance(body, dict) else None,
-                    data=body if isinstance(body, str) else None,
-                )
-            
+        headers = {}
+        if request_headers_str:
             try:
-                response_data = response.json()
-            except:
-                response_data = response.text
+                headers = json.loads(request_headers_str)
+            except json.JSONDecodeError as e:
+                return ModuleResult(success=False, error=f"请求头JSON格式错误: {str(e)}")
+        
+        body = None
+        if request_body_str:
+            try:
+                body = json.loads(request_body_str)
+            except json.JSONDecodeError:
+                body = request_body_str
+        
+        pool = get_http_client_pool()
+        request = RequestSpec(url=request_url, method=request_method, headers=headers,
+                              body=body, timeout=request_timeout, follow_redirects=follow_redirects)
+        
+        if request_mode == 'batch':
+            return await self._execute_batch(config, context, pool, request, proxy, verify, http2)
+        
+        try:
+            response = await pool.request(request, proxy=proxy, verify=verify, http2=http2)
+            response_data = parse_response(response)
             
             if variable_name:
                 context.set_variable(variable_name, response_data)
             
-            display_content = str(response_data)
-            if len(display_content) > 100:
-                display_content = display_content[:100] + '...'
-            
-            return ModuleResult(
-                success=True,
-                message=f"请求成功 ({response.status_code}): {display_content}",
-                data={'status_code': response.status_code, 'response': response_data}
-            )
+            display_content = str(response_data)[:100] + '...' if len(str(response_data)) > 100 else str(response_data)
+            return ModuleResult(success=True, message=f"请求成功 ({response.status_code}): {display_content}",
+                              data={'status_code': response.status_code, 'response': response_data})
         
-        except httpx.TimeoutException:
-            return ModuleResult(success=False, error=f"请求超时 ({request_timeout}秒)")
-        except httpx.ConnectError:
-            return ModuleResult(success=False, error="无法连接到服务器，请检查网络和URL")
         except Exception as e:
-            return ModuleResult(success=False, error=f"API请求失败: {str(e)}")
+            error_msg = "请求超时" if isinstance(e, httpx.TimeoutException) or "timeout" in str(e).lower() else f"API请求失败: {str(e)}"
+            return ModuleResult(success=False, error=error_msg)
+    
+    async def _execute_batch(self, config: dict, context: ExecutionContext, pool, defaults,
+                             proxy, verify: bool, http2) -> ModuleResult:
+        """批量请求：batchItems 为URL列表或请求对象列表（{url, method, headers, body}），
+        未指定的字段使用模块上配置的请求方法/请求头/请求体"""
+        from app.services.http_client_pool import RequestSpec
+        
+        variable_name = config.get('variableName', '')
+        try:
+            items = self._resolve_items(config.get('batchItems', ''), context)
+        except (json.JSONDecodeError, ValueError) as e:
+            return ModuleResult(success=False, error=f"批量请求列表格式错误: {str(e)}")
+        if not items:
+            return ModuleResult(success=False, error="批量请求列表不能为空")
+        
+        specs = []
+        for index, item in enumerate(items):
+            if isinstance(item, dict):
+                url = context.resolve_value(str(item.get('url') or defaults.url or ''))
+                method = str(item.get('method') or defaults.method).upper()
+                headers = {**(defaults.headers or {}), **(item.get('headers') or {})}
+                body = context.resolve_value(item['body']) if 'body' in item else defaults.body
+            else:
+                url = context.resolve_value(str(item))
+                method, headers, body = defaults.method, defaults.headers, defaults.body
+            if not url:
+                return ModuleResult(success=False, error=f"第 {index + 1} 个请求的地址为空")
+            specs.append(RequestSpec(url=url, method=method, headers=headers, body=body,
+                                     timeout=defaults.timeout, follow_redirects=defaults.follow_redirects))
+        
+        results = await pool.request_batch(
+            specs,
+            concurrency=to_int(config.get('batchConcurrency', 5), 5, context),
+            retries=to_int(config.get('batchRetries', 2), 2, context),
+            retry_delay=to_float(config.get('batchRetryDelay', 1), 1.0, context),
+            rate_limit=to_float(config.get('batchRateLimit', 0), 0.0, context),
+            proxy=proxy, verify=verify, http2=http2,
+        )
+        
+        if variable_name:
+            context.set_variable(variable_name, results)
+        
+        succeeded = sum(1 for r in results if r['success'])
+        message = f"批量请求完成: 成功 {succeeded}/{len(results)}"
+        if succeeded == 0:
+            return ModuleResult(success=False, error=f"{message}，首个错误: {results[0]['error']}")
+        return ModuleResult(success=True, message=message,
+                          data={'total': len(results), 'succeeded': succeeded, 'results': results})
+    
+    def _resolve_items(self, raw: Any, context: ExecutionContext) -> list:
+        """解析批量请求列表：单个变量引用直接取变量值，否则按JSON数组或逐行URL解析"""
+        if isinstance(raw, list):
+            return raw
+        raw = str(raw or '')
+        match = _SINGLE_VARIABLE_PATTERN.match(raw)
+        if match:
+            value = context.lookup_variable(match.group(1).strip(), None)
+            if isinstance(value, list):
+                return value
+            if value is not None and not isinstance(value, (str, dict)):
+                return list(value)
+        text = context.resolve_value(raw).strip()
+        if not text:
+            return []
+        if text.startswith('['):
+            value = json.loads(text)
+            if not isinstance(value, list):
+                raise ValueError("需要JSON数组")
+            return value
+        return [line.strip() for line in text.splitlines() if line.strip()]
 
 
 @register_executor
@@ -742,7 +815,8 @@ class ReadExcelExecutor(ModuleExecutor):
         if not variable_name:
             return ModuleResult(success=False, error="请指定存储变量名")
         
-        asset = get_asset_by_name(file_name)
+        # 第一次查找会加载资源索引（遍历上传目录），放到线程池中执行
+        asset = await run_in_worker(get_asset_by_name, file_name)
         if not asset:
             return ModuleResult(success=False, error=f"文件 '{file_name}' 不存在")
         
@@ -3928,194 +4002,6 @@ class ExportLogExecutor(ModuleExecutor):
         }
 
 
-
-@register_executor
-class ClickTextExecutor(ModuleExecutor):
-    """点击文本模块执行器 - 通过屏幕OCR识别实现鼠标点击指定文本"""
-    
-    @property
-    def module_type(self) -> str:
-        return "click_text"
-    
-    async def execute(self, config: dict, context: ExecutionContext) -> ModuleResult:
-        target_text = context.resolve_value(config.get('targetText', ''))
-        match_mode = config.get('matchMode', 'contains')  # exact, contains, regex
-        click_button = config.get('clickButton', 'left')  # left, right, middle
-        click_type = config.get('clickType', 'single')  # single, double
-        occurrence = int(config.get('occurrence', 1))  # 第几个匹配项
-        search_region = config.get('searchRegion', None)  # 搜索区域 {x, y, width, height}
-        wait_timeout = int(config.get('waitTimeout', 10))  # 等待超时（秒）
-        result_variable = config.get('resultVariable', '')
-        
-        if not target_text:
-            return ModuleResult(success=False, error="目标文本不能为空")
-        
-        try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, self._click_text, target_text, match_mode, click_button, 
-                click_type, occurrence, search_region, wait_timeout
-            )
-            
-            if result_variable:
-                context.set_variable(result_variable, result)
-            
-            if result.get('found'):
-                return ModuleResult(
-                    success=True,
-                    message=f"已点击文本 \"{target_text}\" 位置: ({result['x']}, {result['y']})",
-                    data=result
-                )
-            else:
-                return ModuleResult(success=False, error=f"未找到文本: {target_text}")
-        except Exception as e:
-            return ModuleResult(success=False, error=f"点击文本失败: {str(e)}")
-    
-    def _click_text(self, target_text: str, match_mode: str, click_button: str,
-                    click_type: str, occurrence: int, search_region: dict, 
-                    wait_timeout: int) -> dict:
-        """执行OCR识别并点击文本 - 使用 RapidOCR，速度快"""
-        import ctypes
-        import re
-        import numpy as np
-        
-        try:
-            from PIL import ImageGrab
-        except ImportError:
-            raise ImportError("请安装 Pillow: pip install Pillow")
-        
-        # 使用 RapidOCR - 比 EasyOCR 快很多
-        try:
-            from rapidocr_onnxruntime import RapidOCR
-            ocr = RapidOCR()
-        except ImportError:
-            raise ImportError("请安装 rapidocr-onnxruntime: pip install rapidocr-onnxruntime")
-        
-        start_time = time.time()
-        
-        while time.time() - start_time < wait_timeout:
-            # 截取屏幕
-            # 解析搜索区域（支持两点模式和起点+宽高模式）
-            region_x, region_y, region_w, region_h = parse_search_region(search_region)
-            if region_w > 0 and region_h > 0:
-                screenshot = ImageGrab.grab(bbox=(region_x, region_y, region_x + region_w, region_y + region_h))
-                offset_x, offset_y = region_x, region_y
-            else:
-                screenshot = ImageGrab.grab()
-                offset_x, offset_y = 0, 0
-            
-            # 转换为 numpy 数组
-            img_array = np.array(screenshot)
-            
-            # OCR识别
-            try:
-                result, _ = ocr(img_array)
-            except Exception as e:
-                print(f"[点击文本] OCR识别失败: {e}")
-                time.sleep(0.3)
-                continue
-            
-            if not result:
-                time.sleep(0.3)
-                continue
-            
-            # 查找匹配的文本
-            matches = []
-            for item in result:
-                # item 格式: [box, text, confidence]
-                # box 格式: [[x1,y1], [x2,y1], [x2,y2], [x1,y2]]
-                box, recognized_text, confidence = item
-                
-                if not recognized_text:
-                    continue
-                
-                # 匹配检查
-                is_match = False
-                if match_mode == 'exact':
-                    is_match = recognized_text == target_text
-                elif match_mode == 'contains':
-                    is_match = target_text in recognized_text
-                elif match_mode == 'regex':
-                    try:
-                        is_match = bool(re.search(target_text, recognized_text))
-                    except:
-                        is_match = False
-                
-                if is_match:
-                    x1 = int(min(p[0] for p in box))
-                    y1 = int(min(p[1] for p in box))
-                    x2 = int(max(p[0] for p in box))
-                    y2 = int(max(p[1] for p in box))
-                    
-                    center_x = (x1 + x2) // 2 + offset_x
-                    center_y = (y1 + y2) // 2 + offset_y
-                    matches.append({
-                        'text': recognized_text,
-                        'x': center_x,
-                        'y': center_y,
-                        'box': [x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y],
-                        'confidence': confidence
-                    })
-            
-            # 检查是否找到足够的匹配
-            if len(matches) >= occurrence:
-                match = matches[occurrence - 1]
-                
-                # 执行点击
-                self._perform_click(match['x'], match['y'], click_button, click_type)
-                
-                return {
-                    'found': True,
-                    'text': match['text'],
-                    'x': match['x'],
-                    'y': match['y'],
-                    'box': match['box'],
-                    'total_matches': len(matches)
-                }
-            
-            # 等待后重试
-            time.sleep(0.3)
-        
-        return {'found': False, 'text': target_text}
-    
-    def _perform_click(self, x: int, y: int, button: str, click_type: str):
-        """执行鼠标点击"""
-        import ctypes
-        
-        user32 = ctypes.windll.user32
-        
-        # 移动鼠标
-        user32.SetCursorPos(x, y)
-        time.sleep(0.05)
-        
-        # 鼠标事件常量
-        MOUSEEVENTF_LEFTDOWN = 0x0002
-        MOUSEEVENTF_LEFTUP = 0x0004
-        MOUSEEVENTF_RIGHTDOWN = 0x0008
-        MOUSEEVENTF_RIGHTUP = 0x0010
-        MOUSEEVENTF_MIDDLEDOWN = 0x0020
-        MOUSEEVENTF_MIDDLEUP = 0x0040
-        
-        if button == 'left':
-            down_event = MOUSEEVENTF_LEFTDOWN
-            up_event = MOUSEEVENTF_LEFTUP
-        elif button == 'right':
-            down_event = MOUSEEVENTF_RIGHTDOWN
-            up_event = MOUSEEVENTF_RIGHTUP
-        else:
-            down_event = MOUSEEVENTF_MIDDLEDOWN
-            up_event = MOUSEEVENTF_MIDDLEUP
-        
-        # 执行点击
-        clicks = 2 if click_type == 'double' else 1
-        for _ in range(clicks):
-            user32.mouse_event(down_event, 0, 0, 0, 0)
-            time.sleep(0.02)
-            user32.mouse_event(up_event, 0, 0, 0, 0)
-            if click_type == 'double':
-                time.sleep(0.05)
-
-
 @register_executor
 class HoverImageExecutor(ModuleExecutor):
     """鼠标悬停在图像上模块执行器 - 在屏幕上查找指定图像并将鼠标悬停在上面"""
@@ -4318,179 +4204,6 @@ class HoverImageExecutor(ModuleExecutor):
         return names.get(position, "中心")
 
 
-@register_executor
-class HoverTextExecutor(ModuleExecutor):
-    """鼠标悬停在文本上模块执行器 - 通过屏幕OCR识别实现鼠标悬停在指定文本上"""
-    
-    @property
-    def module_type(self) -> str:
-        return "hover_text"
-    
-    async def execute(self, config: dict, context: ExecutionContext) -> ModuleResult:
-        target_text = context.resolve_value(config.get('targetText', ''))
-        match_mode = config.get('matchMode', 'contains')  # exact, contains, regex
-        hover_duration = to_int(config.get('hoverDuration', 500), 500, context)  # 悬停时长（毫秒）
-        occurrence = int(config.get('occurrence', 1))  # 第几个匹配项
-        search_region = config.get('searchRegion', None)  # 搜索区域
-        wait_timeout = int(config.get('waitTimeout', 10))  # 等待超时（秒）
-        result_variable = config.get('resultVariable', '')
-        
-        if not target_text:
-            return ModuleResult(success=False, error="目标文本不能为空")
-        
-        try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, self._hover_text, target_text, match_mode, hover_duration,
-                occurrence, search_region, wait_timeout
-            )
-            
-            if result_variable:
-                context.set_variable(result_variable, result)
-            
-            if result.get('found'):
-                return ModuleResult(
-                    success=True,
-                    message=f"已在文本 \"{target_text}\" 位置 ({result['x']}, {result['y']}) 悬停 {hover_duration}ms",
-                    data=result
-                )
-            else:
-                return ModuleResult(success=False, error=f"未找到文本: {target_text}")
-        except Exception as e:
-            return ModuleResult(success=False, error=f"悬停文本失败: {str(e)}")
-    
-    def _hover_text(self, target_text: str, match_mode: str, hover_duration: int,
-                    occurrence: int, search_region: dict, wait_timeout: int) -> dict:
-        """执行OCR识别并悬停在文本上 - 使用 RapidOCR，速度快"""
-        import ctypes
-        import re
-        import numpy as np
-        
-        # 调试日志
-        print(f"[悬停文本] 目标文本: '{target_text}', 匹配模式: {match_mode}")
-        print(f"[悬停文本] search_region 原始值: {search_region}")
-        
-        try:
-            from PIL import ImageGrab
-        except ImportError:
-            raise ImportError("请安装 Pillow: pip install Pillow")
-        
-        # 使用 RapidOCR - 比 EasyOCR 快很多
-        try:
-            from rapidocr_onnxruntime import RapidOCR
-            ocr = RapidOCR()
-        except ImportError:
-            raise ImportError("请安装 rapidocr-onnxruntime: pip install rapidocr-onnxruntime")
-        
-        start_time = time.time()
-        first_loop = True
-        
-        while time.time() - start_time < wait_timeout:
-            # 截取屏幕
-            # 解析搜索区域（支持两点模式和起点+宽高模式）
-            region_x, region_y, region_w, region_h = parse_search_region(search_region)
-            
-            if first_loop:
-                print(f"[悬停文本] 解析后区域: x={region_x}, y={region_y}, w={region_w}, h={region_h}")
-                first_loop = False
-            
-            if region_w > 0 and region_h > 0:
-                bbox = (region_x, region_y, region_x + region_w, region_y + region_h)
-                print(f"[悬停文本] 截图区域 bbox: {bbox}")
-                screenshot = ImageGrab.grab(bbox=bbox)
-                offset_x, offset_y = region_x, region_y
-            else:
-                screenshot = ImageGrab.grab()
-                offset_x, offset_y = 0, 0
-            
-            # 转换为 numpy 数组
-            img_array = np.array(screenshot)
-            print(f"[悬停文本] 截图尺寸: {img_array.shape}")
-            
-            # OCR识别
-            try:
-                result, _ = ocr(img_array)
-            except Exception as e:
-                print(f"[悬停文本] OCR识别失败: {e}")
-                time.sleep(0.3)
-                continue
-            
-            if not result:
-                print(f"[悬停文本] OCR未识别到任何文本")
-                time.sleep(0.3)
-                continue
-            
-            # 打印识别到的所有文本
-            print(f"[悬停文本] OCR识别到 {len(result)} 个文本区域:")
-            for idx, item in enumerate(result):
-                _, text, conf = item
-                try:
-                    conf_val = float(conf) if conf is not None else 0
-                    print(f"  [{idx}] '{text}' (置信度: {conf_val:.2f})")
-                except (ValueError, TypeError):
-                    print(f"  [{idx}] '{text}' (置信度: {conf})")
-            
-            # 查找匹配的文本
-            matches = []
-            for item in result:
-                # item 格式: [box, text, confidence]
-                # box 格式: [[x1,y1], [x2,y1], [x2,y2], [x1,y2]]
-                box, recognized_text, confidence = item
-                
-                if not recognized_text:
-                    continue
-                
-                is_match = False
-                if match_mode == 'exact':
-                    is_match = recognized_text == target_text
-                elif match_mode == 'contains':
-                    is_match = target_text in recognized_text
-                elif match_mode == 'regex':
-                    try:
-                        is_match = bool(re.search(target_text, recognized_text))
-                    except:
-                        is_match = False
-                
-                if is_match:
-                    x1 = int(min(p[0] for p in box))
-                    y1 = int(min(p[1] for p in box))
-                    x2 = int(max(p[0] for p in box))
-                    y2 = int(max(p[1] for p in box))
-                    
-                    center_x = (x1 + x2) // 2 + offset_x
-                    center_y = (y1 + y2) // 2 + offset_y
-                    matches.append({
-                        'text': recognized_text,
-                        'x': center_x,
-                        'y': center_y,
-                        'box': [x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y],
-                        'confidence': confidence
-                    })
-            
-            if len(matches) >= occurrence:
-                match = matches[occurrence - 1]
-                
-                # 移动鼠标到目标位置并悬停
-                user32 = ctypes.windll.user32
-                user32.SetCursorPos(match['x'], match['y'])
-                time.sleep(hover_duration / 1000)
-                
-                return {
-                    'found': True,
-                    'text': match['text'],
-                    'x': match['x'],
-                    'y': match['y'],
-                    'box': match['box'],
-                    'total_matches': len(matches)
-                }
-            
-            time.sleep(0.3)
-        
-        return {'found': False, 'text': target_text}
-
-
-
-
 @register_executor
 class ShareFolderExecutor(ModuleExecutor):
     """文件夹网络共享模块执行器 - 将指定文件夹通过HTTP共享到局域网"""
@@ -1,6 +1,7 @@
 """高级模块执行器 - advanced_excel"""
 from .base import ModuleExecutor, ExecutionContext, ModuleResult, register_executor
 from .type_utils import to_int, to_float, parse_search_region
+from app.services.worker_pool import run_in_worker
 import asyncio
 import os
 import re
@@ -36,7 +37,8 @@ class ReadExcelExecutor(ModuleExecutor):
         if not variable_name:
             return ModuleResult(success=False, error="请指定存储变量名")
         
-        asset = get_asset_by_name(file_name)
+        # 第一次查找会加载资源索引（遍历上传目录），放到线程池中执行
+        asset = await run_in_worker(get_asset_by_name, file_name)
         if not asset:
             return ModuleResult(success=False, error=f"文件 '{file_name}' 不存在")
         
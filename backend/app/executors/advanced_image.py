@@ -4,7 +4,6 @@ from .type_utils import to_int, to_float, parse_search_region
 from datetime import datetime
 from pathlib import Path
 import asyncio
-import ctypes
 import os
 import random
 import re
@@ -38,25 +37,16 @@ class ClickImageExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=f"图像文件不存在: {image_path}")
 
         try:
-            import cv2
-            import numpy as np
+            from app.services.vision_service import get_vision_service
+            from app.services.worker_pool import run_in_worker
             
-            # 设置 DPI 感知，确保坐标准确
-            try:
-                ctypes.windll.shcore.SetProcessDpiAwareness(2)
-            except:
-                try:
-                    ctypes.windll.user32.SetProcessDPIAware()
-                except:
-                    pass
+            vision = get_vision_service()
             
-            # 读取模板图像（支持中文路径）
-            template = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            # 读取模板图像（支持中文路径，解码结果按文件修改时间缓存）
+            template = vision.load_template(image_path)
             if template is None:
                 return ModuleResult(success=False, error="无法读取图像文件，请检查图像格式")
-
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-            h, w = template_gray.shape
+            w, h = template.width, template.height
 
             start_time = time.time()
             found = False
@@ -65,81 +55,19 @@ class ClickImageExecutor(ModuleExecutor):
 
             # 解析搜索区域（支持两点模式和起点+宽高模式）
             region_x, region_y, region_w, region_h = parse_search_region(search_region)
-            use_region = region_w > 0 and region_h > 0
-
-            # 获取完整的虚拟屏幕尺寸（支持多显示器）
-            SM_XVIRTUALSCREEN = 76
-            SM_YVIRTUALSCREEN = 77
-            SM_CXVIRTUALSCREEN = 78
-            SM_CYVIRTUALSCREEN = 79
-            
-            virtual_left = ctypes.windll.user32.GetSystemMetrics(SM_XVIRTUALSCREEN)
-            virtual_top = ctypes.windll.user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
-            virtual_width = ctypes.windll.user32.GetSystemMetrics(SM_CXVIRTUALSCREEN)
-            virtual_height = ctypes.windll.user32.GetSystemMetrics(SM_CYVIRTUALSCREEN)
+            region = (region_x, region_y, region_w, region_h) if region_w > 0 and region_h > 0 else None
 
             while time.time() - start_time < wait_timeout:
-                # 截取屏幕
-                if use_region:
-                    # 使用指定区域截图
-                    from PIL import ImageGrab
-                    screenshot_pil = ImageGrab.grab(bbox=(region_x, region_y, region_x + region_w, region_y + region_h))
-                    screen = cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2BGR)
-                    offset_x, offset_y = region_x, region_y
-                else:
-                    # 使用 Windows API 截取完整屏幕（支持多显示器）
-                    try:
-                        import win32gui
-                        import win32ui
-                        import win32con
-                        
-                        hdesktop = win32gui.GetDesktopWindow()
-                        desktop_dc = win32gui.GetWindowDC(hdesktop)
-                        img_dc = win32ui.CreateDCFromHandle(desktop_dc)
-                        mem_dc = img_dc.CreateCompatibleDC()
-                        
-                        screenshot = win32ui.CreateBitmap()
-                        screenshot.CreateCompatibleBitmap(img_dc, virtual_width, virtual_height)
-                        mem_dc.SelectObject(screenshot)
-                        mem_dc.BitBlt((0, 0), (virtual_width, virtual_height), img_dc, 
-                                      (virtual_left, virtual_top), win32con.SRCCOPY)
-                        
-                        bmpinfo = screenshot.GetInfo()
-                        bmpstr = screenshot.GetBitmapBits(True)
-                        screen = np.frombuffer(bmpstr, dtype=np.uint8).reshape(
-                            (bmpinfo['bmHeight'], bmpinfo['bmWidth'], 4))
-                        screen = cv2.cvtColor(screen, cv2.COLOR_BGRA2BGR)
-                        
-                        mem_dc.DeleteDC()
-                        win32gui.DeleteObject(screenshot.GetHandle())
-                        win32gui.ReleaseDC(hdesktop, desktop_dc)
-                        offset_x, offset_y = virtual_left, virtual_top
-                        
-                    except ImportError:
-                        from PIL import ImageGrab
-                        screenshot_pil = ImageGrab.grab(all_screens=True)
-                        screen = cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2BGR)
-                        offset_x, offset_y = 0, 0
-
-                screen_gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
-
-                # 模板匹配
-                result = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-                if max_val >= confidence:
+                # 截取屏幕（未指定区域时截取完整虚拟屏幕，支持多显示器）并匹配
+                match = await run_in_worker(vision.capture_and_find, region, template, confidence)
+                best_confidence = max(best_confidence, match.confidence)
+
+                if match.found:
                     # 找到匹配，根据点击位置计算实际坐标
-                    img_left = offset_x + max_loc[0]
-                    img_top = offset_y + max_loc[1]
-                    img_right = img_left + w
-                    img_bottom = img_top + h
-                    
-                    # 根据点击位置计算坐标
                     click_x, click_y = self._calculate_click_position(
-                        click_position, img_left, img_top, img_right, img_bottom, w, h
+                        click_position, match.left, match.top, match.right, match.bottom, w, h
                     )
-                    
-                    best_confidence = max_val
+                    best_confidence = match.confidence
                     found = True
                     break
 
@@ -181,10 +109,6 @@ class ClickImageExecutor(ModuleExecutor):
                     ("mi", MOUSEINPUT)
                 ]
 
-            # 使用虚拟桌面坐标系统
-            abs_x = int((click_x - virtual_left) * 65535 / virtual_width)
-            abs_y = int((click_y - virtual_top) * 65535 / virtual_height)
-
             # 选择按键事件
             if button == "left":
                 down_event = MOUSEEVENTF_LEFTDOWN
@@ -330,40 +254,20 @@ class HoverImageExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=f"图像文件不存在: {image_path}")
 
         try:
-            import cv2
-            import numpy as np
+            from app.services.vision_service import get_vision_service
+            from app.services.worker_pool import run_in_worker
             
-            # 设置 DPI 感知
-            try:
-                ctypes.windll.shcore.SetProcessDpiAwareness(2)
-            except:
-                try:
-                    ctypes.windll.user32.SetProcessDPIAware()
-                except:
-                    pass
+            vision = get_vision_service()
             
             # 读取模板图像
-            template = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            template = vision.load_template(image_path)
             if template is None:
                 return ModuleResult(success=False, error="无法读取图像文件")
-
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-            h, w = template_gray.shape
+            w, h = template.width, template.height
 
             # 解析搜索区域（支持两点模式和起点+宽高模式）
             region_x, region_y, region_w, region_h = parse_search_region(search_region)
-            use_region = region_w > 0 and region_h > 0
-
-            # 获取虚拟屏幕尺寸
-            SM_XVIRTUALSCREEN = 76
-            SM_YVIRTUALSCREEN = 77
-            SM_CXVIRTUALSCREEN = 78
-            SM_CYVIRTUALSCREEN = 79
-            
-            virtual_left = ctypes.windll.user32.GetSystemMetrics(SM_XVIRTUALSCREEN)
-            virtual_top = ctypes.windll.user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
-            virtual_width = ctypes.windll.user32.GetSystemMetrics(SM_CXVIRTUALSCREEN)
-            virtual_height = ctypes.windll.user32.GetSystemMetrics(SM_CYVIRTUALSCREEN)
+            region = (region_x, region_y, region_w, region_h) if region_w > 0 and region_h > 0 else None
 
             start_time = time.time()
             found = False
@@ -371,61 +275,15 @@ class HoverImageExecutor(ModuleExecutor):
             best_confidence = 0
 
             while time.time() - start_time < wait_timeout:
-                # 截取屏幕
-                if use_region:
-                    # 使用指定区域截图
-                    from PIL import ImageGrab
-                    screenshot_pil = ImageGrab.grab(bbox=(region_x, region_y, region_x + region_w, region_y + region_h))
-                    screen = cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2BGR)
-                    offset_x, offset_y = region_x, region_y
-                else:
-                    try:
-                        import win32gui
-                        import win32ui
-                        import win32con
-                        
-                        hdesktop = win32gui.GetDesktopWindow()
-                        desktop_dc = win32gui.GetWindowDC(hdesktop)
-                        img_dc = win32ui.CreateDCFromHandle(desktop_dc)
-                        mem_dc = img_dc.CreateCompatibleDC()
-                        
-                        screenshot = win32ui.CreateBitmap()
-                        screenshot.CreateCompatibleBitmap(img_dc, virtual_width, virtual_height)
-                        mem_dc.SelectObject(screenshot)
-                        mem_dc.BitBlt((0, 0), (virtual_width, virtual_height), img_dc, 
-                                      (virtual_left, virtual_top), win32con.SRCCOPY)
-                        
-                        bmpinfo = screenshot.GetInfo()
-                        bmpstr = screenshot.GetBitmapBits(True)
-                        screen = np.frombuffer(bmpstr, dtype=np.uint8).reshape(
-                            (bmpinfo['bmHeight'], bmpinfo['bmWidth'], 4))
-                        screen = cv2.cvtColor(screen, cv2.COLOR_BGRA2BGR)
-                        
-                        mem_dc.DeleteDC()
-                        win32gui.DeleteObject(screenshot.GetHandle())
-                        win32gui.ReleaseDC(hdesktop, desktop_dc)
-                        offset_x, offset_y = virtual_left, virtual_top
-                        
-                    except ImportError:
-                        from PIL import ImageGrab
-                        screenshot_pil = ImageGrab.grab(all_screens=True)
-                        screen = cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2BGR)
-                        offset_x, offset_y = 0, 0
-
-                screen_gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
-                result = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-                if max_val >= confidence:
-                    img_left = offset_x + max_loc[0]
-                    img_top = offset_y + max_loc[1]
-                    img_right = img_left + w
-                    img_bottom = img_top + h
-                    
+                # 截取屏幕并匹配
+                match = await run_in_worker(vision.capture_and_find, region, template, confidence)
+                best_confidence = max(best_confidence, match.confidence)
+
+                if match.found:
                     hover_x, hover_y = self._calculate_hover_position(
-                        hover_position, img_left, img_top, img_right, img_bottom, w, h
+                        hover_position, match.left, match.top, match.right, match.bottom, w, h
                     )
-                    best_confidence = max_val
+                    best_confidence = match.confidence
                     found = True
                     break
 
@@ -552,133 +410,65 @@ class DragImageExecutor(ModuleExecutor):
                 return ModuleResult(success=False, error=f"目标图像文件不存在: {target_image_path}")
 
         try:
-            import cv2
-            import numpy as np
+            from app.services.vision_service import get_vision_service
+            from app.services.worker_pool import run_in_worker
             
-            # 设置 DPI 感知
-            try:
-                ctypes.windll.shcore.SetProcessDpiAwareness(2)
-            except:
-                try:
-                    ctypes.windll.user32.SetProcessDPIAware()
-                except:
-                    pass
+            vision = get_vision_service()
             
             # 读取源图像
-            source_template = cv2.imdecode(np.fromfile(source_image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            source_template = vision.load_template(source_image_path)
             if source_template is None:
                 return ModuleResult(success=False, error="无法读取源图像文件")
-            source_gray = cv2.cvtColor(source_template, cv2.COLOR_BGR2GRAY)
-            source_h, source_w = source_gray.shape
+            source_w, source_h = source_template.width, source_template.height
 
             # 如果目标是图像，读取目标图像
             target_template = None
-            target_gray = None
-            target_h, target_w = 0, 0
+            target_w, target_h = 0, 0
             if target_type == "image":
-                target_template = cv2.imdecode(np.fromfile(target_image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+                target_template = vision.load_template(target_image_path)
                 if target_template is None:
                     return ModuleResult(success=False, error="无法读取目标图像文件")
-                target_gray = cv2.cvtColor(target_template, cv2.COLOR_BGR2GRAY)
-                target_h, target_w = target_gray.shape
+                target_w, target_h = target_template.width, target_template.height
 
             # 解析搜索区域
             region_x, region_y, region_w, region_h = parse_search_region(search_region)
-            use_region = region_w > 0 and region_h > 0
-
-            # 获取虚拟屏幕尺寸
-            SM_XVIRTUALSCREEN = 76
-            SM_YVIRTUALSCREEN = 77
-            SM_CXVIRTUALSCREEN = 78
-            SM_CYVIRTUALSCREEN = 79
-            
-            virtual_left = ctypes.windll.user32.GetSystemMetrics(SM_XVIRTUALSCREEN)
-            virtual_top = ctypes.windll.user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
-            virtual_width = ctypes.windll.user32.GetSystemMetrics(SM_CXVIRTUALSCREEN)
-            virtual_height = ctypes.windll.user32.GetSystemMetrics(SM_CYVIRTUALSCREEN)
+            region = (region_x, region_y, region_w, region_h) if region_w > 0 and region_h > 0 else None
 
             start_time = time.time()
             source_found = False
-            target_found = False
+            target_found = target_type == "coordinate"  # 坐标模式不需要查找
             source_x, source_y = 0, 0
             dest_x, dest_y = target_x, target_y
             source_confidence = 0
             target_confidence = 0
 
             while time.time() - start_time < wait_timeout:
-                # 截取屏幕
-                if use_region:
-                    from PIL import ImageGrab
-                    screenshot_pil = ImageGrab.grab(bbox=(region_x, region_y, region_x + region_w, region_y + region_h))
-                    screen = cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2BGR)
-                    offset_x, offset_y = region_x, region_y
-                else:
-                    try:
-                        import win32gui
-                        import win32ui
-                        import win32con
-                        
-                        hdesktop = win32gui.GetDesktopWindow()
-                        desktop_dc = win32gui.GetWindowDC(hdesktop)
-                        img_dc = win32ui.CreateDCFromHandle(desktop_dc)
-                        mem_dc = img_dc.CreateCompatibleDC()
-                        
-                        screenshot = win32ui.CreateBitmap()
-                        screenshot.CreateCompatibleBitmap(img_dc, virtual_width, virtual_height)
-                        mem_dc.SelectObject(screenshot)
-                        mem_dc.BitBlt((0, 0), (virtual_width, virtual_height), img_dc, 
-                                      (virtual_left, virtual_top), win32con.SRCCOPY)
-                        
-                        bmpinfo = screenshot.GetInfo()
-                        bmpstr = screenshot.GetBitmapBits(True)
-                        screen = np.frombuffer(bmpstr, dtype=np.uint8).reshape(
-                            (bmpinfo['bmHeight'], bmpinfo['bmWidth'], 4))
-                        screen = cv2.cvtColor(screen, cv2.COLOR_BGRA2BGR)
-                        
-                        mem_dc.DeleteDC()
-                        win32gui.DeleteObject(screenshot.GetHandle())
-                        win32gui.ReleaseDC(hdesktop, desktop_dc)
-                        offset_x, offset_y = virtual_left, virtual_top
-                        
-                    except ImportError:
-                        from PIL import ImageGrab
-                        screenshot_pil = ImageGrab.grab(all_screens=True)
-                        screen = cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2BGR)
-                        offset_x, offset_y = 0, 0
-
-                screen_gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
-
-                # 查找源图像
+                # 同一次截图中同时查找源图像和目标图像
+                pending = []
                 if not source_found:
-                    result = cv2.matchTemplate(screen_gray, source_gray, cv2.TM_CCOEFF_NORMED)
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                    if max_val >= confidence:
-                        img_left = offset_x + max_loc[0]
-                        img_top = offset_y + max_loc[1]
-                        img_right = img_left + source_w
-                        img_bottom = img_top + source_h
-                        source_x, source_y = self._calculate_position(
-                            source_position, img_left, img_top, img_right, img_bottom, source_w, source_h
-                        )
-                        source_confidence = max_val
-                        source_found = True
-
-                # 查找目标图像（如果目标类型是图像）
-                if target_type == "image" and not target_found:
-                    result = cv2.matchTemplate(screen_gray, target_gray, cv2.TM_CCOEFF_NORMED)
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                    if max_val >= confidence:
-                        img_left = offset_x + max_loc[0]
-                        img_top = offset_y + max_loc[1]
-                        img_right = img_left + target_w
-                        img_bottom = img_top + target_h
-                        dest_x, dest_y = self._calculate_position(
-                            target_position, img_left, img_top, img_right, img_bottom, target_w, target_h
-                        )
-                        target_confidence = max_val
-                        target_found = True
-                elif target_type == "coordinate":
-                    target_found = True  # 坐标模式不需要查找
+                    pending.append('source')
+                if not target_found:
+                    pending.append('target')
+                templates = [source_template if name == 'source' else target_template for name in pending]
+                matches = await run_in_worker(vision.capture_and_find_many, region, templates, confidence)
+                
+                for name, match in zip(pending, matches):
+                    if name == 'source':
+                        source_confidence = max(source_confidence, match.confidence)
+                        if match.found:
+                            source_x, source_y = self._calculate_position(
+                                source_position, match.left, match.top, match.right, match.bottom, source_w, source_h
+                            )
+                            source_confidence = match.confidence
+                            source_found = True
+                    else:
+                        target_confidence = max(target_confidence, match.confidence)
+                        if match.found:
+                            dest_x, dest_y = self._calculate_position(
+                                target_position, match.left, match.top, match.right, match.bottom, target_w, target_h
+                            )
+                            target_confidence = match.confidence
+                            target_found = True
 
                 if source_found and target_found:
                     break
@@ -791,8 +581,6 @@ class ImageExistsExecutor(ModuleExecutor):
         return "image_exists"
 
     async def execute(self, config: dict, context: ExecutionContext) -> ModuleResult:
-        import ctypes
-
         image_path = context.resolve_value(config.get("imagePath", ""))
         confidence = to_float(config.get("confidence", 0.8), 0.8, context)
         wait_timeout = to_int(config.get("waitTimeout", 5), 5, context)
@@ -806,40 +594,20 @@ class ImageExistsExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=f"图像文件不存在: {image_path}")
 
         try:
-            import cv2
-            import numpy as np
+            from app.services.vision_service import get_vision_service
+            from app.services.worker_pool import run_in_worker
             
-            # 设置 DPI 感知
-            try:
-                ctypes.windll.shcore.SetProcessDpiAwareness(2)
-            except:
-                try:
-                    ctypes.windll.user32.SetProcessDPIAware()
-                except:
-                    pass
+            vision = get_vision_service()
             
-            # 读取模板图像
-            template = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            # 读取模板图像（解码结果按文件修改时间缓存）
+            template = vision.load_template(image_path)
             if template is None:
                 return ModuleResult(success=False, error="无法读取图像文件，请检查图像格式")
 
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-            h, w = template_gray.shape
-
             # 解析搜索区域
             region_x, region_y, region_w, region_h = parse_search_region(search_region)
             use_region = (not use_full_screen) and region_w > 0 and region_h > 0
-
-            # 获取虚拟屏幕尺寸
-            SM_XVIRTUALSCREEN = 76
-            SM_YVIRTUALSCREEN = 77
-            SM_CXVIRTUALSCREEN = 78
-            SM_CYVIRTUALSCREEN = 79
-            
-            virtual_left = ctypes.windll.user32.GetSystemMetrics(SM_XVIRTUALSCREEN)
-            virtual_top = ctypes.windll.user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
-            virtual_width = ctypes.windll.user32.GetSystemMetrics(SM_CXVIRTUALSCREEN)
-            virtual_height = ctypes.windll.user32.GetSystemMetrics(SM_CYVIRTUALSCREEN)
+            region = (region_x, region_y, region_w, region_h) if use_region else None
 
             start_time = time.time()
             found = False
@@ -847,61 +615,15 @@ class ImageExistsExecutor(ModuleExecutor):
             match_x, match_y = 0, 0
 
             while time.time() - start_time < wait_timeout:
-                # 截取屏幕
-                if use_region:
-                    # 使用指定区域截图
-                    from PIL import ImageGrab
-                    screenshot_pil = ImageGrab.grab(bbox=(region_x, region_y, region_x + region_w, region_y + region_h))
-                    screen = cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2BGR)
-                    offset_x, offset_y = region_x, region_y
-                else:
-                    # 全屏截图
-                    try:
-                        import win32gui
-                        import win32ui
-                        import win32con
-                        
-                        hdesktop = win32gui.GetDesktopWindow()
-                        desktop_dc = win32gui.GetWindowDC(hdesktop)
-                        img_dc = win32ui.CreateDCFromHandle(desktop_dc)
-                        mem_dc = img_dc.CreateCompatibleDC()
-                        
-                        screenshot = win32ui.CreateBitmap()
-                        screenshot.CreateCompatibleBitmap(img_dc, virtual_width, virtual_height)
-                        mem_dc.SelectObject(screenshot)
-                        mem_dc.BitBlt((0, 0), (virtual_width, virtual_height), img_dc, 
-                                      (virtual_left, virtual_top), win32con.SRCCOPY)
-                        
-                        bmpinfo = screenshot.GetInfo()
-                        bmpstr = screenshot.GetBitmapBits(True)
-                        screen = np.frombuffer(bmpstr, dtype=np.uint8).reshape(
-                            (bmpinfo['bmHeight'], bmpinfo['bmWidth'], 4))
-                        screen = cv2.cvtColor(screen, cv2.COLOR_BGRA2BGR)
-                        
-                        mem_dc.DeleteDC()
-                        win32gui.DeleteObject(screenshot.GetHandle())
-                        win32gui.ReleaseDC(hdesktop, desktop_dc)
-                        offset_x, offset_y = virtual_left, virtual_top
-                        
-                    except ImportError:
-                        from PIL import ImageGrab
-                        screenshot_pil = ImageGrab.grab(all_screens=True)
-                        screen = cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2BGR)
-                        offset_x, offset_y = 0, 0
-
-                screen_gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
-
-                # 模板匹配
-                result = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-                if max_val > best_confidence:
-                    best_confidence = max_val
-
-                if max_val >= confidence:
+                # 截取屏幕（全屏时截取完整虚拟屏幕）并匹配
+                match = await run_in_worker(vision.capture_and_find, region, template, confidence)
+
+                if match.confidence > best_confidence:
+                    best_confidence = match.confidence
+
+                if match.found:
                     # 找到匹配
-                    match_x = offset_x + max_loc[0] + w // 2
-                    match_y = offset_y + max_loc[1] + h // 2
+                    match_x, match_y = match.center
                     found = True
                     break
 
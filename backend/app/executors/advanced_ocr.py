@@ -1,13 +1,39 @@
 """高级模块执行器 - advanced_ocr"""
 from .base import ModuleExecutor, ExecutionContext, ModuleResult, register_executor
 from .type_utils import to_int, to_float, parse_search_region
+from app.services.ocr_service import get_ocr_service, match_text
+from app.services.worker_pool import run_in_worker
 import asyncio
 import ctypes
-import os
-import re
 import time
 
 
+def _grab_screen(region_x: int, region_y: int, region_w: int, region_h: int):
+    """截取屏幕（或搜索区域），返回 (RGB 数组, 偏移x, 偏移y)"""
+    import numpy as np
+    try:
+        from PIL import ImageGrab
+    except ImportError:
+        raise ImportError("请安装 Pillow: pip install Pillow")
+    
+    if region_w > 0 and region_h > 0:
+        screenshot = ImageGrab.grab(bbox=(region_x, region_y, region_x + region_w, region_y + region_h))
+        return np.array(screenshot), region_x, region_y
+    return np.array(ImageGrab.grab()), 0, 0
+
+
+def _match_result(box, offset_x: int, offset_y: int) -> dict:
+    """文本框转换为屏幕坐标的结果"""
+    center_x, center_y = box.center
+    return {
+        'found': True,
+        'text': box.text,
+        'x': center_x + offset_x,
+        'y': center_y + offset_y,
+        'box': [box.left + offset_x, box.top + offset_y, box.right + offset_x, box.bottom + offset_y],
+    }
+
+
 @register_executor
 class ClickTextExecutor(ModuleExecutor):
     """点击文本模块执行器 - 通过屏幕OCR识别实现鼠标点击指定文本"""
@@ -30,11 +56,8 @@ class ClickTextExecutor(ModuleExecutor):
             return ModuleResult(success=False, error="目标文本不能为空")
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, self._click_text, target_text, match_mode, click_button, 
-                click_type, occurrence, search_region, wait_timeout
-            )
+            result = await self._click_text(target_text, match_mode, click_button,
+                                            click_type, occurrence, search_region, wait_timeout)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -50,110 +73,42 @@ class ClickTextExecutor(ModuleExecutor):
         except Exception as e:
             return ModuleResult(success=False, error=f"点击文本失败: {str(e)}")
     
-    def _click_text(self, target_text: str, match_mode: str, click_button: str,
-                    click_type: str, occurrence: int, search_region: dict, 
-                    wait_timeout: int) -> dict:
-        """执行OCR识别并点击文本 - 使用 RapidOCR，速度快"""
-        import ctypes
-        import re
-        import numpy as np
-        
-        try:
-            from PIL import ImageGrab
-        except ImportError:
-            raise ImportError("请安装 Pillow: pip install Pillow")
-        
-        # 使用 RapidOCR - 比 EasyOCR 快很多
-        try:
-            from rapidocr_onnxruntime import RapidOCR
-            ocr = RapidOCR()
-        except ImportError:
-            raise ImportError("请安装 rapidocr-onnxruntime: pip install rapidocr-onnxruntime")
-        
+    async def _click_text(self, target_text: str, match_mode: str, click_button: str,
+                          click_type: str, occurrence: int, search_region: dict, 
+                          wait_timeout: int) -> dict:
+        """执行OCR识别并点击文本 - 使用共享的 RapidOCR 服务，只重新识别变化的屏幕区域"""
+        ocr = get_ocr_service()
+        # 首次使用时加载模型（未安装时抛出 ImportError）
+        await ocr.run(ocr.get_engine)
+        
+        region_x, region_y, region_w, region_h = parse_search_region(search_region)
         start_time = time.time()
         
         while time.time() - start_time < wait_timeout:
-            # 截取屏幕
-            # 解析搜索区域（支持两点模式和起点+宽高模式）
-            region_x, region_y, region_w, region_h = parse_search_region(search_region)
-            if region_w > 0 and region_h > 0:
-                screenshot = ImageGrab.grab(bbox=(region_x, region_y, region_x + region_w, region_y + region_h))
-                offset_x, offset_y = region_x, region_y
-            else:
-                screenshot = ImageGrab.grab()
-                offset_x, offset_y = 0, 0
-            
-            # 转换为 numpy 数组
-            img_array = np.array(screenshot)
+            img_array, offset_x, offset_y = await run_in_worker(
+                _grab_screen, region_x, region_y, region_w, region_h)
             
             # OCR识别
             try:
-                result, _ = ocr(img_array)
+                boxes = await ocr.run(ocr.recognize_screen, img_array, ('screen', offset_x, offset_y))
             except Exception as e:
                 print(f"[点击文本] OCR识别失败: {e}")
-                time.sleep(0.3)
-                continue
-            
-            if not result:
-                time.sleep(0.3)
+                await asyncio.sleep(0.3)
                 continue
             
-            # 查找匹配的文本
-            matches = []
-            for item in result:
-                # item 格式: [box, text, confidence]
-                # box 格式: [[x1,y1], [x2,y1], [x2,y2], [x1,y2]]
-                box, recognized_text, confidence = item
-                
-                if not recognized_text:
-                    continue
-                
-                # 匹配检查
-                is_match = False
-                if match_mode == 'exact':
-                    is_match = recognized_text == target_text
-                elif match_mode == 'contains':
-                    is_match = target_text in recognized_text
-                elif match_mode == 'regex':
-                    try:
-                        is_match = bool(re.search(target_text, recognized_text))
-                    except:
-                        is_match = False
-                
-                if is_match:
-                    x1 = int(min(p[0] for p in box))
-                    y1 = int(min(p[1] for p in box))
-                    x2 = int(max(p[0] for p in box))
-                    y2 = int(max(p[1] for p in box))
-                    
-                    center_x = (x1 + x2) // 2 + offset_x
-                    center_y = (y1 + y2) // 2 + offset_y
-                    matches.append({
-                        'text': recognized_text,
-                        'x': center_x,
-                        'y': center_y,
-                        'box': [x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y],
-                        'confidence': confidence
-                    })
-            
             # 检查是否找到足够的匹配
+            matches = match_text(boxes, target_text, match_mode)
             if len(matches) >= occurrence:
-                match = matches[occurrence - 1]
+                match = _match_result(matches[occurrence - 1], offset_x, offset_y)
                 
                 # 执行点击
-                self._perform_click(match['x'], match['y'], click_button, click_type)
+                await run_in_worker(self._perform_click, match['x'], match['y'], click_button, click_type)
                 
-                return {
-                    'found': True,
-                    'text': match['text'],
-                    'x': match['x'],
-                    'y': match['y'],
-                    'box': match['box'],
-                    'total_matches': len(matches)
-                }
+                match['total_matches'] = len(matches)
+                return match
             
             # 等待后重试
-            time.sleep(0.3)
+            await asyncio.sleep(0.3)
         
         return {'found': False, 'text': target_text}
     
@@ -215,11 +170,8 @@ class HoverTextExecutor(ModuleExecutor):
             return ModuleResult(success=False, error="目标文本不能为空")
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, self._hover_text, target_text, match_mode, hover_duration,
-                occurrence, search_region, wait_timeout
-            )
+            result = await self._hover_text(target_text, match_mode, hover_duration,
+                                            occurrence, search_region, wait_timeout)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -235,131 +187,39 @@ class HoverTextExecutor(ModuleExecutor):
         except Exception as e:
             return ModuleResult(success=False, error=f"悬停文本失败: {str(e)}")
     
-    def _hover_text(self, target_text: str, match_mode: str, hover_duration: int,
-                    occurrence: int, search_region: dict, wait_timeout: int) -> dict:
-        """执行OCR识别并悬停在文本上 - 使用 RapidOCR，速度快"""
-        import ctypes
-        import re
-        import numpy as np
-        
-        # 调试日志
-        print(f"[悬停文本] 目标文本: '{target_text}', 匹配模式: {match_mode}")
-        print(f"[悬停文本] search_region 原始值: {search_region}")
-        
-        try:
-            from PIL import ImageGrab
-        except ImportError:
-            raise ImportError("请安装 Pillow: pip install Pillow")
-        
-        # 使用 RapidOCR - 比 EasyOCR 快很多
-        try:
-            from rapidocr_onnxruntime import RapidOCR
-            ocr = RapidOCR()
-        except ImportError:
-            raise ImportError("请安装 rapidocr-onnxruntime: pip install rapidocr-onnxruntime")
+    async def _hover_text(self, target_text: str, match_mode: str, hover_duration: int,
+                          occurrence: int, search_region: dict, wait_timeout: int) -> dict:
+        """执行OCR识别并悬停在文本上 - 使用共享的 RapidOCR 服务，只重新识别变化的屏幕区域"""
+        ocr = get_ocr_service()
+        await ocr.run(ocr.get_engine)
         
+        region_x, region_y, region_w, region_h = parse_search_region(search_region)
         start_time = time.time()
-        first_loop = True
         
         while time.time() - start_time < wait_timeout:
-            # 截取屏幕
-            # 解析搜索区域（支持两点模式和起点+宽高模式）
-            region_x, region_y, region_w, region_h = parse_search_region(search_region)
-            
-            if first_loop:
-                print(f"[悬停文本] 解析后区域: x={region_x}, y={region_y}, w={region_w}, h={region_h}")
-                first_loop = False
-            
-            if region_w > 0 and region_h > 0:
-                bbox = (region_x, region_y, region_x + region_w, region_y + region_h)
-                print(f"[悬停文本] 截图区域 bbox: {bbox}")
-                screenshot = ImageGrab.grab(bbox=bbox)
-                offset_x, offset_y = region_x, region_y
-            else:
-                screenshot = ImageGrab.grab()
-                offset_x, offset_y = 0, 0
-            
-            # 转换为 numpy 数组
-            img_array = np.array(screenshot)
-            print(f"[悬停文本] 截图尺寸: {img_array.shape}")
+            img_array, offset_x, offset_y = await run_in_worker(
+                _grab_screen, region_x, region_y, region_w, region_h)
             
             # OCR识别
             try:
-                result, _ = ocr(img_array)
+                boxes = await ocr.run(ocr.recognize_screen, img_array, ('screen', offset_x, offset_y))
             except Exception as e:
                 print(f"[悬停文本] OCR识别失败: {e}")
-                time.sleep(0.3)
-                continue
-            
-            if not result:
-                print(f"[悬停文本] OCR未识别到任何文本")
-                time.sleep(0.3)
+                await asyncio.sleep(0.3)
                 continue
             
-            # 打印识别到的所有文本
-            print(f"[悬停文本] OCR识别到 {len(result)} 个文本区域:")
-            for idx, item in enumerate(result):
-                _, text, conf = item
-                try:
-                    conf_val = float(conf) if conf is not None else 0
-                    print(f"  [{idx}] '{text}' (置信度: {conf_val:.2f})")
-                except (ValueError, TypeError):
-                    print(f"  [{idx}] '{text}' (置信度: {conf})")
-            
-            # 查找匹配的文本
-            matches = []
-            for item in result:
-                # item 格式: [box, text, confidence]
-                # box 格式: [[x1,y1], [x2,y1], [x2,y2], [x1,y2]]
-                box, recognized_text, confidence = item
-                
-                if not recognized_text:
-                    continue
-                
-                is_match = False
-                if match_mode == 'exact':
-                    is_match = recognized_text == target_text
-                elif match_mode == 'contains':
-                    is_match = target_text in recognized_text
-                elif match_mode == 'regex':
-                    try:
-                        is_match = bool(re.search(target_text, recognized_text))
-                    except:
-                        is_match = False
-                
-                if is_match:
-                    x1 = int(min(p[0] for p in box))
-                    y1 = int(min(p[1] for p in box))
-                    x2 = int(max(p[0] for p in box))
-                    y2 = int(max(p[1] for p in box))
-                    
-                    center_x = (x1 + x2) // 2 + offset_x
-                    center_y = (y1 + y2) // 2 + offset_y
-                    matches.append({
-                        'text': recognized_text,
-                        'x': center_x,
-                        'y': center_y,
-                        'box': [x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y],
-                        'confidence': confidence
-                    })
-            
+            matches = match_text(boxes, target_text, match_mode)
             if len(matches) >= occurrence:
-                match = matches[occurrence - 1]
+                match = _match_result(matches[occurrence - 1], offset_x, offset_y)
                 
                 # 移动鼠标到目标位置并悬停
                 user32 = ctypes.windll.user32
                 user32.SetCursorPos(match['x'], match['y'])
-                time.sleep(hover_duration / 1000)
+                await asyncio.sleep(hover_duration / 1000)
                 
-                return {
-                    'found': True,
-                    'text': match['text'],
-                    'x': match['x'],
-                    'y': match['y'],
-                    'box': match['box'],
-                    'total_matches': len(matches)
-                }
+                match['total_matches'] = len(matches)
+                return match
             
-            time.sleep(0.3)
+            await asyncio.sleep(0.3)
         
-        return {'found': False, 'text': target_text}
\ No newline at end of file
+        return {'found': False, 'text': target_text}
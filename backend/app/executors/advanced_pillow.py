@@ -9,6 +9,8 @@ import asyncio
 class ImageResizeExecutor(ModuleExecutor):
     """图像缩放模块执行器"""
 
+    offload = 'thread'  # 图像处理为同步CPU密集型操作，在工作线程中执行
+
     @property
     def module_type(self) -> str:
         return "image_resize"
@@ -94,6 +96,8 @@ class ImageResizeExecutor(ModuleExecutor):
 class ImageCropExecutor(ModuleExecutor):
     """图像裁剪模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_crop"
@@ -156,6 +160,8 @@ class ImageCropExecutor(ModuleExecutor):
 class ImageRotateExecutor(ModuleExecutor):
     """图像旋转模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_rotate"
@@ -210,6 +216,8 @@ class ImageRotateExecutor(ModuleExecutor):
 class ImageFlipExecutor(ModuleExecutor):
     """图像翻转模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_flip"
@@ -264,6 +272,8 @@ class ImageFlipExecutor(ModuleExecutor):
 class ImageBlurExecutor(ModuleExecutor):
     """图像模糊模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_blur"
@@ -311,6 +321,8 @@ class ImageBlurExecutor(ModuleExecutor):
 class ImageSharpenExecutor(ModuleExecutor):
     """图像锐化模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_sharpen"
@@ -359,6 +371,8 @@ class ImageSharpenExecutor(ModuleExecutor):
 class ImageBrightnessExecutor(ModuleExecutor):
     """图像亮度调整模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_brightness"
@@ -408,6 +422,8 @@ class ImageBrightnessExecutor(ModuleExecutor):
 class ImageContrastExecutor(ModuleExecutor):
     """图像对比度调整模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_contrast"
@@ -456,6 +472,8 @@ class ImageContrastExecutor(ModuleExecutor):
 class ImageColorBalanceExecutor(ModuleExecutor):
     """图像色彩平衡调整模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_color_balance"
@@ -504,6 +522,8 @@ class ImageColorBalanceExecutor(ModuleExecutor):
 class ImageConvertFormatExecutor(ModuleExecutor):
     """图像格式转换模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_convert_format"
@@ -569,6 +589,8 @@ class ImageConvertFormatExecutor(ModuleExecutor):
 class ImageAddTextExecutor(ModuleExecutor):
     """图像添加文字模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_add_text"
@@ -635,6 +657,8 @@ class ImageAddTextExecutor(ModuleExecutor):
 class ImageMergeExecutor(ModuleExecutor):
     """图像拼接模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_merge"
@@ -715,6 +739,8 @@ class ImageMergeExecutor(ModuleExecutor):
 class ImageThumbnailExecutor(ModuleExecutor):
     """生成缩略图模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_thumbnail"
@@ -765,6 +791,8 @@ class ImageThumbnailExecutor(ModuleExecutor):
 class ImageFilterExecutor(ModuleExecutor):
     """图像滤镜模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_filter"
@@ -830,6 +858,8 @@ class ImageFilterExecutor(ModuleExecutor):
 class ImageGetInfoExecutor(ModuleExecutor):
     """获取图像信息模块执行器"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_get_info"
@@ -891,6 +921,8 @@ class ImageGetInfoExecutor(ModuleExecutor):
 class ImageRemoveBackgroundExecutor(ModuleExecutor):
     """图像去背景模块执行器（简单色彩去除）"""
 
+    offload = 'thread'
+
     @property
     def module_type(self) -> str:
         return "image_remove_bg"
@@ -1,5 +1,8 @@
 """Firecrawl AI 爬虫模块执行器 - 纯 Python 实现，无需外部服务"""
 from .base import ModuleExecutor, ExecutionContext, ModuleResult, register_executor
+from .type_utils import to_int, to_bool
+from app.services.crawl_engine import CrawlEngine, CrawlOptions
+import functools
 import json
 from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
@@ -267,68 +270,62 @@ class FirecrawlMapExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=f"链接抓取失败: {str(e)}")
 
 
+def _parse_page(url: str, html_content: str, formats: List[str], only_main_content: bool) -> Dict:
+    """解析爬取到的页面 HTML（在工作线程中执行）"""
+    # 使用 BeautifulSoup 解析
+    soup = BeautifulSoup(html_content, 'html.parser')
+    
+    # 移除脚本和样式
+    for script in soup(['script', 'style', 'noscript']):
+        script.decompose()
+    
+    # 如果只提取主内容
+    if only_main_content:
+        main_content = (
+            soup.find('main') or 
+            soup.find('article') or 
+            soup.find('div', {'id': re.compile(r'content|main', re.I)}) or
+            soup.find('div', {'class': re.compile(r'content|main', re.I)}) or
+            soup.body
+        )
+        if main_content:
+            soup = BeautifulSoup(str(main_content), 'html.parser')
+    
+    # 构建结果
+    result = {
+        'url': url,
+        'title': soup.title.string if soup.title else '',
+    }
+    
+    # 根据格式生成内容
+    if 'markdown' in formats:
+        h = html2text.HTML2Text()
+        h.ignore_links = False
+        h.ignore_images = False
+        h.body_width = 0
+        result['markdown'] = h.handle(str(soup))
+    
+    if 'html' in formats:
+        result['html'] = str(soup)
+    
+    if 'text' in formats:
+        result['text'] = soup.get_text(separator='\n', strip=True)
+    
+    return result
+
+
 @register_executor
 class FirecrawlCrawlExecutor(ModuleExecutor):
     """Firecrawl AI 全站数据抓取
     
     使用 Playwright 智能爬取整个网站的数据。
-    支持深度爬取、智能过滤、并发控制等高级功能。
+    多个页面共用一个浏览器上下文并发爬取，每个页面只加载一次。
     """
     
     @property
     def module_type(self) -> str:
         return "firecrawl_crawl"
     
-    async def _scrape_page(self, url: str, formats: List[str], only_main_content: bool, browser) -> Dict:
-        """抓取单个页面"""
-        page = await browser.new_page()
-        try:
-            await page.goto(url, timeout=30000, wait_until='networkidle')
-            html_content = await page.content()
-            
-            # 使用 BeautifulSoup 解析
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # 移除脚本和样式
-            for script in soup(['script', 'style', 'noscript']):
-                script.decompose()
-            
-            # 如果只提取主内容
-            if only_main_content:
-                main_content = (
-                    soup.find('main') or 
-                    soup.find('article') or 
-                    soup.find('div', {'id': re.compile(r'content|main', re.I)}) or
-                    soup.find('div', {'class': re.compile(r'content|main', re.I)}) or
-                    soup.body
-                )
-                if main_content:
-                    soup = BeautifulSoup(str(main_content), 'html.parser')
-            
-            # 构建结果
-            result = {
-                'url': url,
-                'title': soup.title.string if soup.title else '',
-            }
-            
-            # 根据格式生成内容
-            if 'markdown' in formats:
-                h = html2text.HTML2Text()
-                h.ignore_links = False
-                h.ignore_images = False
-                h.body_width = 0
-                result['markdown'] = h.handle(str(soup))
-            
-            if 'html' in formats:
-                result['html'] = str(soup)
-            
-            if 'text' in formats:
-                result['text'] = soup.get_text(separator='\n', strip=True)
-            
-            return result
-        finally:
-            await page.close()
-    
     async def execute(self, config: dict, context: ExecutionContext) -> ModuleResult:
         try:
             # 获取配置
@@ -336,8 +333,8 @@ class FirecrawlCrawlExecutor(ModuleExecutor):
             variable_name = config.get('variableName', 'crawl_result')
             
             # Crawl 选项
-            max_depth = config.get('maxDepth', 2)
-            limit = config.get('limit', 100)
+            max_depth = to_int(config.get('maxDepth', 2), 2, context)
+            limit = to_int(config.get('limit', 100), 100, context)
             include_paths = context.resolve_value(config.get('includePaths', ''))
             exclude_paths = context.resolve_value(config.get('excludePaths', ''))
             allow_external_links = config.get('allowExternalLinks', False)
@@ -354,10 +351,6 @@ class FirecrawlCrawlExecutor(ModuleExecutor):
             await context.send_progress(f"🕷️ 正在爬取整个网站: {url}", "info")
             await context.send_progress(f"最大深度: {max_depth}, 页面限制: {limit}", "info")
             
-            # 解析基础 URL
-            base_domain = urlparse(url).netloc
-            base_url = f"{urlparse(url).scheme}://{base_domain}"
-            
             # 准备过滤规则
             include_patterns = []
             if include_paths:
@@ -367,86 +360,48 @@ class FirecrawlCrawlExecutor(ModuleExecutor):
             if exclude_paths:
                 exclude_patterns = [p.strip() for p in exclude_paths.split(',') if p.strip()]
             
-            # 爬取状态
-            visited: Set[str] = set()
-            to_visit: List[tuple] = [(url, 0)]  # (url, depth)
+            options = CrawlOptions(
+                max_depth=max_depth,
+                limit=limit,
+                concurrency=to_int(config.get('concurrency', 4), 4, context),
+                per_host_limit=to_int(config.get('perHostLimit', 4), 4, context),
+                per_host_delay=to_int(config.get('perHostDelay', 0), 0, context) / 1000,
+                include_patterns=include_patterns,
+                exclude_patterns=exclude_patterns,
+                allow_external_links=allow_external_links,
+                block_resources=to_bool(config.get('blockResources', False), context),
+            )
+            save_to_table = to_bool(config.get('saveToTable', False), context)
+            
+            # 结果增量写入变量（和数据表）
             results: List[Dict] = []
+            context.set_variable(variable_name, results)
+            
+            async def on_result(page_data: Dict):
+                results.append(page_data)
+                context.set_variable(variable_name, results)
+                if save_to_table:
+                    context.data_rows.append({k: v for k, v in page_data.items() if k != 'html'})
+            
+            engine = CrawlEngine(
+                options,
+                functools.partial(_parse_page, formats=formats, only_main_content=only_main_content),
+                on_result=on_result,
+                on_progress=context.send_progress,
+            )
             
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=True)
-                
                 try:
-                    while to_visit and len(results) < limit:
-                        current_url, depth = to_visit.pop(0)
-                        
-                        # 跳过已访问的
-                        if current_url in visited:
-                            continue
-                        
-                        visited.add(current_url)
-                        
-                        # 检查深度
-                        if depth > max_depth:
-                            continue
-                        
-                        # 检查包含/排除规则
-                        if include_patterns:
-                            if not any(pattern in current_url for pattern in include_patterns):
-                                continue
-                        
-                        if exclude_patterns:
-                            if any(pattern in current_url for pattern in exclude_patterns):
-                                continue
-                        
-                        await context.send_progress(f"⏳ 正在爬取 ({len(results)+1}/{limit}): {current_url}", "info")
-                        
-                        try:
-                            # 抓取页面
-                            page_data = await self._scrape_page(current_url, formats, only_main_content, browser)
-                            results.append(page_data)
-                            
-                            # 如果还没达到最大深度，提取链接
-                            if depth < max_depth and len(results) < limit:
-                                page = await browser.new_page()
-                                try:
-                                    await page.goto(current_url, timeout=30000)
-                                    links = await page.eval_on_selector_all(
-                                        'a[href]',
-                                        '(elements) => elements.map(e => e.href)'
-                                    )
-                                    
-                                    for link in links:
-                                        absolute_url = urljoin(current_url, link)
-                                        parsed = urlparse(absolute_url)
-                                        
-                                        # 检查是否是 HTTP/HTTPS
-                                        if parsed.scheme not in ['http', 'https']:
-                                            continue
-                                        
-                                        # 检查域名
-                                        if not allow_external_links:
-                                            if parsed.netloc != base_domain:
-                                                continue
-                                        
-                                        # 添加到待访问列表
-                                        if absolute_url not in visited:
-                                            to_visit.append((absolute_url, depth + 1))
-                                
-                                finally:
-                                    await page.close()
-                        
-                        except Exception as e:
-                            await context.send_progress(f"⚠️ 跳过页面 {current_url}: {str(e)}", "warning")
-                            continue
-                
+                    browser_context = await browser.new_context()
+                    await engine.run(url, browser_context)
                 finally:
                     await browser.close()
             
-            # 保存结果到变量
-            context.set_variable(variable_name, results)
-            
             # 格式化结果用于显示
             result_summary = f"成功爬取 {len(results)} 个页面"
+            if engine.failed:
+                result_summary += f"（跳过 {engine.failed} 个失败页面）"
             
             if len(results) > 0:
                 first_page = results[0]
@@ -5,8 +5,14 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from playwright.async_api import Page, Browser, BrowserContext
 import asyncio
+import importlib
+import inspect
+import threading
 
 from app.models.workflow import LogLevel
+from .variable_template import render_template, lookup_variable
+from .resources import get_default_resource_class
+from app.services.data_row_store import DataRowStore
 
 
 def get_backend_root() -> Path:
@@ -57,7 +63,7 @@ class ExecutionContext:
     browser_context: Optional[BrowserContext] = None
     page: Optional[Page] = None
     variables: dict[str, Any] = field(default_factory=dict)
-    data_rows: list[dict[str, Any]] = field(default_factory=list)
+    data_rows: DataRowStore = field(default_factory=DataRowStore)  # 列式数据行存储（兼容 list 接口）
     current_row: dict[str, Any] = field(default_factory=dict)
     loop_stack: list[dict] = field(default_factory=list)  # 循环状态栈
     should_break: bool = False
@@ -78,6 +84,7 @@ class ExecutionContext:
     # Playwright 实例引用
     _playwright: Any = None
     _user_data_dir: Optional[str] = None
+    _browser_lease: Any = None  # 浏览器池租约（BrowserLease），执行结束时归还
     
     # 进度日志回调（用于媒体处理等长时间操作）
     _progress_callback: Optional[Any] = None  # Callable[[str, str], Awaitable[None]]
@@ -86,7 +93,20 @@ class ExecutionContext:
     _logs: list[dict[str, Any]] = field(default_factory=list)
     
     # 变量更新回调
-    _variable_update_callback: Optional[Any] = None  # Callable[[str, Any], Awaitable[None]]
+    _variable_update_callback: Optional[Any] = None  # Callable[[str, Any], Optional[Awaitable[None]]]
+    
+    # 主事件循环（offload 到工作线程的执行器通过它把回调转发回主循环）
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _get_foreign_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """如果当前不在主事件循环中（例如在工作线程里），返回主事件循环"""
+        if self._loop is None:
+            return None
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        return self._loop if current is not self._loop else None
     
     async def get_current_frame(self) -> Optional[Page]:
         """获取当前的frame（如果在iframe中）或page
@@ -165,6 +185,11 @@ class ExecutionContext:
         """发送进度日志到前端"""
         if self._progress_callback:
             try:
+                main_loop = self._get_foreign_loop()
+                if main_loop is not None:
+                    future = asyncio.run_coroutine_threadsafe(self._progress_callback(message, level), main_loop)
+                    await asyncio.wrap_future(future)
+                    return
                 await self._progress_callback(message, level)
             except Exception as e:
                 print(f"发送进度日志失败: {e}")
@@ -242,19 +267,52 @@ class ExecutionContext:
             name = name[2:-1]
         return self.variables.get(name, default)
     
+    def _forward_to_loop(self, func, *args) -> bool:
+        """在工作线程中调用时，把对共享状态的修改转发到主事件循环执行，返回是否已转发
+
+        变量和数据行只在主事件循环线程中修改，并行分支和工作线程之间不需要额外加锁；
+        转发的回调先于工作线程任务的完成回调执行，节点结束后修改已经生效。
+        """
+        main_loop = self._get_foreign_loop()
+        if main_loop is None:
+            return False
+        main_loop.call_soon_threadsafe(func, *args)
+        return True
+
     def set_variable(self, name: str, value: Any):
         """设置变量值"""
+        if self._forward_to_loop(self.set_variable, name, value):
+            return
         self.variables[name] = value
         # 通知变量更新
         if self._variable_update_callback:
-            import asyncio
-            try:
-                # 在异步上下文中调用回调
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    asyncio.create_task(self._variable_update_callback(name, value))
-            except Exception as e:
-                print(f"通知变量更新失败: {e}")
+            self._notify_variable_update(name, value)
+    
+    def _notify_variable_update(self, name: str, value: Any):
+        """调用变量更新回调
+
+        同步回调（遥测事件总线）直接调用，不再为每次赋值创建任务；
+        返回协程的异步回调仍在事件循环中调度执行。
+        """
+        try:
+            result = self._variable_update_callback(name, value)
+            if inspect.isawaitable(result):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    if inspect.iscoroutine(result):
+                        result.close()
+                    return
+                asyncio.ensure_future(result)
+        except Exception as e:
+            print(f"通知变量更新失败: {e}")
+    
+    def lookup_variable(self, expr: str, default: Any = None) -> Any:
+        """按访问路径读取变量值，支持 ${var}、{var}、{list[0]}、{data[0][name]}
+        
+        返回的是变量中的原始对象（不拷贝），只读使用；需要修改时请自行拷贝
+        """
+        return lookup_variable(expr, self.variables, default)
     
     def resolve_value(self, value: Any) -> Any:
         """解析值中的变量引用
@@ -266,137 +324,11 @@ class ExecutionContext:
         - {dictName[key]} 或 {dictName["key"]} - 字典键访问
         - {data[0][name]} - 嵌套访问
         - {listName[{indexVar}]} - 嵌套变量引用（索引本身是变量）
+        
+        模板字符串会被编译并缓存（见 variable_template），变量值只读不拷贝
         """
         if isinstance(value, str):
-            import re
-            
-            def resolve_nested_variables(text: str, max_depth: int = 5) -> str:
-                """递归解析嵌套的变量引用，最多解析max_depth层"""
-                if max_depth <= 0:
-                    return text
-                
-                # 查找所有 {xxx} 格式的变量引用
-                pattern = r'(?<!\$)\{([^{}]+)\}'
-                matches = list(re.finditer(pattern, text))
-                
-                if not matches:
-                    return text
-                
-                # 从后向前替换，避免索引偏移问题
-                for match in reversed(matches):
-                    var_expr = match.group(1).strip()
-                    resolved = resolve_access_path(var_expr)
-                    if resolved is not None:
-                        # 如果是复杂类型，转为JSON字符串
-                        if isinstance(resolved, (list, dict)):
-                            import json
-                            replacement = json.dumps(resolved, ensure_ascii=False)
-                        else:
-                            replacement = str(resolved)
-                        text = text[:match.start()] + replacement + text[match.end():]
-                
-                # 递归处理，以支持多层嵌套
-                if re.search(pattern, text):
-                    return resolve_nested_variables(text, max_depth - 1)
-                
-                return text
-            
-            def resolve_access_path(var_name: str) -> Any:
-                """解析变量访问路径，支持索引和键访问
-                
-                支持嵌套变量引用，例如：
-                - test[{loop_index}] - 先解析 loop_index，再用其值作为索引
-                - data[{i}][{j}] - 多层嵌套变量引用
-                """
-                var_name = var_name.strip()
-                
-                # 先解析变量名中的嵌套变量引用
-                # 例如：test[{loop_index}] -> 先将 {loop_index} 替换为其值
-                var_name = resolve_nested_variables(var_name, max_depth=3)
-                
-                # 解析基础变量名和访问路径
-                # 匹配: varName 或 varName[...][...]...
-                base_match = re.match(r'^([a-zA-Z_\u4e00-\u9fa5][a-zA-Z0-9_\u4e00-\u9fa5]*)((?:\[[^\]]+\])*)', var_name)
-                if not base_match:
-                    return None
-                
-                base_name = base_match.group(1)
-                access_path = base_match.group(2)
-                
-                # 获取基础变量
-                if base_name not in self.variables:
-                    return None
-                result = self.variables[base_name]
-                # 深拷贝以避免并发修改问题
-                if isinstance(result, (list, dict)):
-                    import copy
-                    result = copy.deepcopy(result)
-                
-                # 如果没有访问路径，直接返回
-                if not access_path:
-                    return result
-                
-                # 解析所有的 [xxx] 访问
-                bracket_pattern = r'\[([^\]]+)\]'
-                accessors = re.findall(bracket_pattern, access_path)
-                
-                for accessor in accessors:
-                    accessor = accessor.strip()
-                    
-                    # 移除引号（如果有）
-                    if (accessor.startswith('"') and accessor.endswith('"')) or \
-                       (accessor.startswith("'") and accessor.endswith("'")):
-                        accessor = accessor[1:-1]
-                    
-                    try:
-                        if isinstance(result, list):
-                            # 列表索引访问（支持负数索引，如 -1 表示最后一个元素）
-                            index = int(accessor)
-                            if -len(result) <= index < len(result):
-                                result = result[index]
-                            else:
-                                return None
-                        elif isinstance(result, dict):
-                            # 字典键访问 - 先尝试原始键，再尝试数字键
-                            if accessor in result:
-                                result = result[accessor]
-                            else:
-                                # 尝试将键转为数字
-                                try:
-                                    num_key = int(accessor)
-                                    if num_key in result:
-                                        result = result[num_key]
-                                    else:
-                                        return None
-                                except ValueError:
-                                    return None
-                        else:
-                            # 不支持的类型
-                            return None
-                    except (ValueError, IndexError, KeyError, TypeError):
-                        return None
-                
-                return result
-            
-            # 先替换 ${varName} 格式
-            pattern1 = r'\$\{([^}]+)\}'
-            result = value
-            for match in reversed(list(re.finditer(pattern1, result))):
-                var_expr = match.group(1).strip()
-                resolved = resolve_access_path(var_expr)
-                if resolved is not None:
-                    if isinstance(resolved, (list, dict)):
-                        import json
-                        replacement = json.dumps(resolved, ensure_ascii=False)
-                    else:
-                        replacement = str(resolved)
-                    result = result[:match.start()] + replacement + result[match.end():]
-            
-            # 再替换 {varName} 格式（但不匹配已经有$的）
-            # 使用递归解析支持嵌套变量引用
-            result = resolve_nested_variables(result, max_depth=5)
-            
-            return result
+            return render_template(value, self.variables)
         return value
     
     def add_data_value(self, column: str, value: Any):
@@ -404,6 +336,8 @@ class ExecutionContext:
         
         如果当前行已经有该列的数据，则自动提交当前行并开始新行
         """
+        if self._forward_to_loop(self.add_data_value, column, value):
+            return
         # 如果当前行已经有这个列的数据，先提交当前行
         if column in self.current_row:
             self._commit_row_internal()
@@ -417,6 +351,8 @@ class ExecutionContext:
     
     def commit_row(self):
         """提交当前行到数据集"""
+        if self._forward_to_loop(self.commit_row):
+            return
         self._commit_row_internal()
 
 
@@ -445,6 +381,12 @@ class LogMessage:
 class ModuleExecutor(ABC):
     """模块执行器基类 - 纯异步版本"""
     
+    # 资源类别（browser/phone/media/network），None 表示使用 resources 中的默认声明
+    resource_class: Optional[str] = None
+    
+    # 设为 'thread' 时整个 execute 在工作线程池中运行，适用于不访问浏览器的CPU密集型模块
+    offload: Optional[str] = None
+    
     @property
     @abstractmethod
     def module_type(self) -> str:
@@ -462,26 +404,101 @@ class ModuleExecutor(ABC):
 
 
 class ExecutorRegistry:
-    """执行器注册表"""
+    """执行器注册表
+
+    设置清单（set_manifest）后按需导入执行器模块：get() 第一次获取某个模块类型时
+    才导入清单中对应的模块。模块导入时注册的执行器只有与清单一致的才会生效，
+    因此导入顺序不影响“后注册的覆盖先注册的”这一结果。
+    """
     
     def __init__(self):
         self._executors: dict[str, ModuleExecutor] = {}
+        self._manifest: dict[str, tuple[str, str]] = {}
+        self._package: Optional[str] = None
+        self._load_errors: dict[str, str] = {}
+        # 同一时间只有一个线程导入执行器模块（后台预热与按需导入可能同时发生）
+        self._load_lock = threading.RLock()
+    
+    def set_manifest(self, package: str, manifest: dict[str, tuple[str, str]]):
+        """设置执行器清单 {模块类型: (模块名, 类名)}，模块名相对于 package"""
+        self._package = package
+        self._manifest = dict(manifest)
     
     def register(self, executor_class: Type[ModuleExecutor]):
         """注册执行器类 - 每次都创建新实例"""
         executor = executor_class()
+        entry = self._manifest.get(executor.module_type)
+        if entry is not None and entry != (executor_class.__module__.rsplit('.', 1)[-1], executor_class.__name__):
+            # 清单中该类型由其他实现提供（被覆盖的旧实现）
+            return
         self._executors[executor.module_type] = executor
     
     def get(self, module_type: str) -> Optional[ModuleExecutor]:
-        """获取指定类型的执行器"""
-        return self._executors.get(module_type)
+        """获取指定类型的执行器（未导入时按清单导入）"""
+        executor = self._executors.get(module_type)
+        if executor is None and module_type in self._manifest:
+            self._load(module_type)
+            executor = self._executors.get(module_type)
+        return executor
+    
+    def _load(self, module_type: str):
+        module_name = self._manifest[module_type][0]
+        with self._load_lock:
+            if module_type in self._executors:
+                return
+            try:
+                importlib.import_module(f"{self._package}.{module_name}")
+                self._load_errors.pop(module_type, None)
+            except Exception as e:
+                self._load_errors[module_type] = f"{type(e).__name__}: {e}"
+                print(f"[ExecutorRegistry] 导入执行器模块 {module_name} 失败: {e}")
+    
+    def get_load_error(self, module_type: str) -> Optional[str]:
+        """获取模块类型导入失败的原因"""
+        return self._load_errors.get(module_type)
+    
+    def is_loaded(self, module_type: str) -> bool:
+        return module_type in self._executors
+    
+    def preload(self, module_types=None) -> list[str]:
+        """导入指定模块类型（默认全部）的执行器，返回导入失败的类型"""
+        types = list(self._manifest) if module_types is None else list(module_types)
+        failed = []
+        for module_type in types:
+            if module_type in self._manifest and self.get(module_type) is None:
+                failed.append(module_type)
+        return failed
+    
+    async def preload_async(self, module_types) -> list[str]:
+        """在工作线程中导入执行器，避免导入重量级依赖时阻塞事件循环"""
+        pending = [t for t in set(module_types) if t in self._manifest and t not in self._executors]
+        if not pending:
+            return []
+        return await asyncio.to_thread(self.preload, pending)
+    
+    def prewarm(self, module_types=None) -> threading.Thread:
+        """在后台线程中预先导入执行器（默认全部）"""
+        thread = threading.Thread(target=self.preload, args=(module_types,), name="executor-prewarm", daemon=True)
+        thread.start()
+        return thread
+    
+    def get_resource_class(self, module_type: str) -> Optional[str]:
+        """获取模块的资源类别，优先使用执行器自身声明的 resource_class"""
+        executor = self.get(module_type)
+        if executor is not None and executor.resource_class:
+            return executor.resource_class
+        return get_default_resource_class(module_type)
     
     def get_all_types(self) -> list[str]:
-        """获取所有已注册的模块类型"""
+        """获取所有模块类型（包括尚未导入的）"""
+        return list(dict.fromkeys([*self._manifest, *self._executors]))
+    
+    def get_loaded_types(self) -> list[str]:
+        """获取已导入的模块类型"""
         return list(self._executors.keys())
     
     def clear(self):
-        """清空注册表"""
+        """清空注册表（已导入的执行器）"""
         self._executors.clear()
 
 
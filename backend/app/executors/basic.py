@@ -10,6 +10,7 @@ from .base import (
     register_executor,
 )
 from .type_utils import to_int, to_float
+from app.services.browser_pool import BrowserKey, get_browser_pool
 
 
 # 读取篡改猴脚本
@@ -63,6 +64,39 @@ async def inject_on_navigation(page):
             print(f"[OpenPage] 页面导航后注入失败: {e}")
 
 
+def _inject_on_new_pages(browser_context):
+    """监听上下文中的新页面并自动注入篡改猴脚本"""
+    def on_page(new_page):
+        asyncio.create_task(inject_userscript_to_page(new_page))
+        new_page.on("load", lambda: asyncio.create_task(inject_on_navigation(new_page)))
+    browser_context.on("page", on_page)
+
+
+async def _new_custom_path_context(browser):
+    """浏览器池重置时为自定义浏览器路径模式新建上下文（与首次启动时的设置一致）"""
+    browser_context = await browser.new_context(
+        no_viewport=True,
+        ignore_https_errors=True,
+        permissions=['geolocation', 'notifications', 'camera', 'microphone'],
+    )
+    try:
+        await browser_context.grant_permissions(
+            ['geolocation', 'notifications', 'camera', 'microphone', 'clipboard-read', 'clipboard-write'],
+            origin='*'
+        )
+    except Exception as e:
+        print(f"[OpenPage] 授予权限时出现警告: {e}")
+    _inject_on_new_pages(browser_context)
+    return browser_context
+
+
+async def _new_default_context(browser):
+    """浏览器池重置时为普通模式新建上下文"""
+    browser_context = await browser.new_context()
+    _inject_on_new_pages(browser_context)
+    return browser_context
+
+
 @register_executor
 class GroupExecutor(ModuleExecutor):
     """备注分组模块执行器"""
@@ -145,8 +179,26 @@ class OpenPageExecutor(ModuleExecutor):
                 
                 print(f"[OpenPage] 浏览器配置: type={browser_type}, channel={channel}, executablePath={executable_path or '默认'}, fullscreen={fullscreen}")
                 
+                # 优先从浏览器池租用之前的执行留下的同配置浏览器，不再重新启动
+                browser_pool = get_browser_pool()
+                pool_key = BrowserKey(
+                    browser_type=browser_type,
+                    channel=channel,
+                    executable_path=executable_path or None,
+                    user_data_dir=user_data_dir or None,
+                    headless=bool(context.headless),
+                    args=tuple(launch_args_list),
+                )
+                lease = await browser_pool.checkout(pool_key)
+                
+                if lease is not None:
+                    context._browser_lease = lease
+                    context.browser = lease.browser
+                    context.browser_context = lease.context
+                    context.page = lease.page
+                    print(f"[OpenPage] 复用浏览器池中的浏览器（第 {lease.entry.lease_count} 次使用）")
                 # 当指定了自定义浏览器路径时，通过启动参数传递user_data_dir实现持久化
-                if executable_path:
+                elif executable_path:
                     print(f"[OpenPage] 使用自定义浏览器路径: {executable_path}")
                     print(f"[OpenPage] 使用user_data_dir实现持久化: {user_data_dir}")
                     
@@ -424,6 +476,16 @@ class OpenPageExecutor(ModuleExecutor):
                         # 为新页面也监听导航事件
                         new_page.on("load", lambda: asyncio.create_task(inject_on_navigation(new_page)))
                     context.browser_context.on("page", on_page)
+                
+                # 新启动的浏览器放入浏览器池，执行结束后归还供下一次执行复用
+                if context._browser_lease is None:
+                    # 非持久化上下文在下一次租出前换成新建的上下文，不把 Cookie、本地存储和权限带到下一次执行
+                    new_context = None
+                    if context.browser is not None:
+                        new_context = _new_custom_path_context if executable_path else _new_default_context
+                    context._browser_lease = browser_pool.adopt(
+                        pool_key, context.browser, context.browser_context, new_context
+                    )
             
             # 如果浏览器已经启动，根据打开模式决定是新建标签页还是复用当前标签页
             else:
@@ -889,8 +951,6 @@ class WaitImageExecutor(ModuleExecutor):
         return "wait_image"
     
     async def execute(self, config: dict, context: ExecutionContext) -> ModuleResult:
-        import ctypes
-        
         image_path = context.resolve_value(config.get('imagePath', ''))
         confidence = to_float(config.get('confidence', 0.8), 0.8, context)
         wait_timeout = to_int(config.get('waitTimeout', 30), 30, context)  # 秒
@@ -906,41 +966,20 @@ class WaitImageExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=f"图像文件不存在: {image_path}")
         
         try:
-            import cv2
-            import numpy as np
+            from app.services.vision_service import get_vision_service
+            from app.services.worker_pool import run_in_worker
             from .type_utils import parse_search_region
             
-            # 设置 DPI 感知
-            try:
-                ctypes.windll.shcore.SetProcessDpiAwareness(2)
-            except:
-                try:
-                    ctypes.windll.user32.SetProcessDPIAware()
-                except:
-                    pass
+            vision = get_vision_service()
             
-            # 读取模板图像
-            template = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            # 读取模板图像（解码结果按文件修改时间缓存）
+            template = vision.load_template(image_path)
             if template is None:
                 return ModuleResult(success=False, error="无法读取图像文件，请检查图像格式")
             
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-            h, w = template_gray.shape
-            
             # 解析搜索区域
             region_x, region_y, region_w, region_h = parse_search_region(search_region)
-            use_region = region_w > 0 and region_h > 0
-            
-            # 获取虚拟屏幕尺寸
-            SM_XVIRTUALSCREEN = 76
-            SM_YVIRTUALSCREEN = 77
-            SM_CXVIRTUALSCREEN = 78
-            SM_CYVIRTUALSCREEN = 79
-            
-            virtual_left = ctypes.windll.user32.GetSystemMetrics(SM_XVIRTUALSCREEN)
-            virtual_top = ctypes.windll.user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
-            virtual_width = ctypes.windll.user32.GetSystemMetrics(SM_CXVIRTUALSCREEN)
-            virtual_height = ctypes.windll.user32.GetSystemMetrics(SM_CYVIRTUALSCREEN)
+            region = (region_x, region_y, region_w, region_h) if region_w > 0 and region_h > 0 else None
             
             start_time = time.time()
             found = False
@@ -948,65 +987,19 @@ class WaitImageExecutor(ModuleExecutor):
             best_confidence = 0
             
             while time.time() - start_time < wait_timeout:
-                # 截取屏幕
-                if use_region:
-                    from PIL import ImageGrab
-                    screenshot_pil = ImageGrab.grab(bbox=(region_x, region_y, region_x + region_w, region_y + region_h))
-                    screen = cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2BGR)
-                    offset_x, offset_y = region_x, region_y
-                else:
-                    try:
-                        import win32gui
-                        import win32ui
-                        import win32con
-                        
-                        hdesktop = win32gui.GetDesktopWindow()
-                        desktop_dc = win32gui.GetWindowDC(hdesktop)
-                        img_dc = win32ui.CreateDCFromHandle(desktop_dc)
-                        mem_dc = img_dc.CreateCompatibleDC()
-                        
-                        screenshot = win32ui.CreateBitmap()
-                        screenshot.CreateCompatibleBitmap(img_dc, virtual_width, virtual_height)
-                        mem_dc.SelectObject(screenshot)
-                        mem_dc.BitBlt((0, 0), (virtual_width, virtual_height), img_dc, 
-                                      (virtual_left, virtual_top), win32con.SRCCOPY)
-                        
-                        bmpinfo = screenshot.GetInfo()
-                        bmpstr = screenshot.GetBitmapBits(True)
-                        screen = np.frombuffer(bmpstr, dtype=np.uint8).reshape(
-                            (bmpinfo['bmHeight'], bmpinfo['bmWidth'], 4))
-                        screen = cv2.cvtColor(screen, cv2.COLOR_BGRA2BGR)
-                        
-                        mem_dc.DeleteDC()
-                        win32gui.DeleteObject(screenshot.GetHandle())
-                        win32gui.ReleaseDC(hdesktop, desktop_dc)
-                        offset_x, offset_y = virtual_left, virtual_top
-                        
-                    except ImportError:
-                        from PIL import ImageGrab
-                        screenshot_pil = ImageGrab.grab(all_screens=True)
-                        screen = cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2BGR)
-                        offset_x, offset_y = 0, 0
-                
-                screen_gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
-                
-                # 模板匹配
-                result = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+                # 截取屏幕并匹配（优先在上次出现的位置附近查找）
+                match = await run_in_worker(vision.capture_and_find, region, template, confidence)
                 
-                if max_val >= confidence:
+                if match.found:
                     # 找到匹配
-                    img_left = offset_x + max_loc[0]
-                    img_top = offset_y + max_loc[1]
-                    center_x = img_left + w // 2
-                    center_y = img_top + h // 2
-                    best_confidence = max_val
+                    center_x, center_y = match.center
+                    best_confidence = match.confidence
                     found = True
                     break
                 
                 # 更新最高匹配度
-                if max_val > best_confidence:
-                    best_confidence = max_val
+                if match.confidence > best_confidence:
+                    best_confidence = match.confidence
                 
                 await asyncio.sleep(check_interval)
             
@@ -9,6 +9,7 @@ from .base import (
     ModuleResult,
     register_executor,
 )
+from ..services.ocr_service import ENGINE_CAPTCHA, get_ocr_service
 
 
 def _patch_pil_antialias():
@@ -50,9 +51,9 @@ class OCRCaptchaExecutor(ModuleExecutor):
             return ModuleResult(success=False, error="没有打开的页面")
         
         try:
-            import ddddocr
-            # ddddocr 1.0.6+ (Python 3.13) 不支持 show_ad 等参数
-            ocr = ddddocr.DdddOcr()
+            # 共享的 ddddocr 引擎，模型只加载一次
+            ocr = get_ocr_service()
+            await ocr.run(ocr.get_engine, ENGINE_CAPTCHA)
             
             element = context.page.locator(image_selector)
             src = await element.get_attribute('src')
@@ -63,9 +64,8 @@ class OCRCaptchaExecutor(ModuleExecutor):
             else:
                 image_bytes = await element.screenshot()
             
-            # 使用线程池执行同步OCR操作
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(None, ocr.classification, image_bytes)
+            # 在 OCR 线程中执行同步识别
+            result = await ocr.run(ocr.classify_captcha, image_bytes)
             
             if variable_name:
                 context.set_variable(variable_name, result)
@@ -9,6 +9,7 @@ from .base import (
     register_executor,
 )
 from .type_utils import to_int
+from app.services.data_row_store import DataRowStore
 
 
 @register_executor
@@ -249,12 +250,13 @@ class ForeachExecutor(ModuleExecutor):
         index_variable = config.get('indexVariable', 'index')
         data = context.get_variable(data_source, [])
 
-        if not isinstance(data, (list, tuple)):
+        if not isinstance(data, (list, tuple, DataRowStore)):
             return ModuleResult(success=False, error=f"数据源不是数组: {data_source}")
 
         loop_state = {
             'type': 'foreach',
-            'data': list(data),
+            # 数据行存储（如流式查询结果）按下标逐行读取，不复制为列表
+            'data': data if isinstance(data, DataRowStore) else list(data),
             'item_variable': item_variable,
             'index_variable': index_variable,
             'current_index': 0,
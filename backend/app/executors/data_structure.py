@@ -155,7 +155,7 @@ class ListLengthExecutor(ModuleExecutor):
 
 @register_executor
 class ListExportExecutor(ModuleExecutor):
-    """列表数据导出模块执行器 - 将列表导出为TXT文件"""
+    """列表数据导出模块执行器 - 将列表导出为TXT文件，或导出为 Excel/CSV/Parquet/Arrow 表格"""
     
     @property
     def module_type(self) -> str:
@@ -173,6 +173,8 @@ class ListExportExecutor(ModuleExecutor):
         if isinstance(append_mode_raw, str):
             append_mode_raw = context.resolve_value(append_mode_raw)
         append_mode = append_mode_raw in [True, 'true', 'True', '1', 1]
+        export_format = context.resolve_value(config.get('exportFormat', 'txt')) or 'txt'
+        sheet_name = context.resolve_value(config.get('sheetName', '数据')) or '数据'
         
         if not list_variable:
             return ModuleResult(success=False, error="列表变量名不能为空")
@@ -191,6 +193,9 @@ class ListExportExecutor(ModuleExecutor):
             if output_dir:
                 os.makedirs(output_dir, exist_ok=True)
             
+            if export_format != 'txt':
+                return await self._export_table(list_data, output_path, export_format, sheet_name, append_mode)
+            
             # 处理分隔符（支持转义字符）
             if separator == '\\n':
                 separator = '\n'
@@ -230,6 +235,32 @@ class ListExportExecutor(ModuleExecutor):
         
         except Exception as e:
             return ModuleResult(success=False, error=f"导出失败: {str(e)}")
+    
+    async def _export_table(self, list_data: list, output_path: str, export_format: str,
+                            sheet_name: str, append_mode: bool) -> ModuleResult:
+        """导出为表格文件：字典元素按键作为列，其他元素放在“值”列中"""
+        from app.services.data_export import FORMAT_CSV, FORMAT_EXTENSIONS, export_data
+        from app.services.data_row_store import DataRowStore
+        from app.services.worker_pool import run_in_worker
+        
+        if export_format not in FORMAT_EXTENSIONS:
+            return ModuleResult(success=False, error=f"不支持的导出格式: {export_format}")
+        
+        rows = DataRowStore()
+        for item in list_data:
+            rows.append(dict(item) if isinstance(item, dict) else {'值': item})
+        
+        # 追加写入只对CSV有效，Excel 会替换同名Sheet，其他格式直接覆盖
+        await run_in_worker(
+            export_data, rows, output_path, export_format,
+            sheet_name=sheet_name, append=append_mode and export_format == FORMAT_CSV
+        )
+        
+        return ModuleResult(
+            success=True,
+            message=f"已导出 {len(list_data)} 条数据到: {output_path}",
+            data={'path': output_path, 'count': len(list_data), 'format': export_format}
+        )
 
 
 @register_executor
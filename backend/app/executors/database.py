@@ -1,6 +1,7 @@
 """数据库操作执行器"""
-import pymysql
-from pymysql.cursors import DictCursor
+import json
+import re
+from contextlib import aclosing
 from typing import Dict, Any, Optional
 
 from .base import (
@@ -10,16 +11,59 @@ from .base import (
     register_executor,
 )
 from .type_utils import to_int
+from app.services.data_row_store import DataRowStore
+from app.services.db_pool import (
+    DbConfig,
+    DbLease,
+    get_db_pool_manager,
+    fetch_all,
+    execute_sql,
+    bulk_insert,
+    DEFAULT_INSERT_BATCH_SIZE,
+    DEFAULT_FETCH_BATCH_SIZE,
+)
+from app.services.worker_pool import run_in_worker
 
 
-# 全局数据库连接池（存储在context中）
-def get_db_connections(context: ExecutionContext) -> Dict[str, pymysql.Connection]:
-    """获取数据库连接池"""
+# 工作流中的命名连接（存储在context中），连接本身来自全局连接池
+def get_db_connections(context: ExecutionContext) -> Dict[str, DbLease]:
+    """获取当前工作流的命名数据库连接"""
     if not hasattr(context, '_db_connections'):
         context._db_connections = {}
     return context._db_connections
 
 
+async def release_db_connections(context: ExecutionContext):
+    """工作流结束时把所有命名连接归还连接池"""
+    connections = getattr(context, '_db_connections', None)
+    if not connections:
+        return
+    leases = list(connections.values())
+    connections.clear()
+    for lease in leases:
+        try:
+            await run_in_worker(lease.release)
+        except Exception as e:
+            print(f"归还数据库连接失败: {e}")
+
+
+def _missing_connection(connection_name: str) -> ModuleResult:
+    return ModuleResult(
+        success=False, 
+        error=f"数据库连接 '{connection_name}' 不存在，请先使用「连接数据库」模块"
+    )
+
+
+def _parse_bool(value, context: ExecutionContext) -> bool:
+    # 支持变量引用
+    if isinstance(value, str):
+        value = context.resolve_value(value)
+    return value in [True, 'true', 'True', '1', 1]
+
+
+_SINGLE_VARIABLE_PATTERN = re.compile(r'^\s*\{([^{}]+)\}\s*$')
+
+
 @register_executor
 class DbConnectExecutor(ModuleExecutor):
     """连接数据库"""
@@ -40,27 +84,24 @@ class DbConnectExecutor(ModuleExecutor):
         connections = get_db_connections(context)
         
         try:
-            # 如果已有同名连接，先关闭
+            # 如果已有同名连接，先归还连接池
             if connection_name in connections:
                 try:
-                    connections[connection_name].close()
+                    await run_in_worker(connections[connection_name].release)
                 except:
                     pass
                 del connections[connection_name]
             
-            # 创建新连接
-            conn = pymysql.connect(
+            # 从连接池取出连接（优先复用之前工作流归还的连接）
+            db_config = DbConfig(
                 host=host,
                 port=port,
                 user=user,
                 password=password,
                 database=database if database else None,
                 charset=charset,
-                cursorclass=DictCursor,
-                autocommit=True
             )
-            
-            connections[connection_name] = conn
+            connections[connection_name] = await get_db_pool_manager().lease(db_config)
             
             db_info = f"{host}:{port}"
             if database:
@@ -87,42 +128,55 @@ class DbQueryExecutor(ModuleExecutor):
         connection_name = context.resolve_value(config.get('connectionName', 'default'))
         sql = context.resolve_value(config.get('sql', ''))
         variable_name = context.resolve_value(config.get('variableName', ''))
-        single_row_raw = config.get('singleRow', False)
-        # 支持变量引用
-        if isinstance(single_row_raw, str):
-            single_row_raw = context.resolve_value(single_row_raw)
-        single_row = single_row_raw in [True, 'true', 'True', '1', 1]
+        single_row = _parse_bool(config.get('singleRow', False), context)
+        # 结果模式：all 一次性读取到变量；rows 流式读取到数据行存储变量（可直接用于遍历列表）；
+        # table 流式追加到数据表格
+        result_mode = context.resolve_value(config.get('resultMode', 'all')) or 'all'
+        fetch_size = to_int(config.get('fetchSize', DEFAULT_FETCH_BATCH_SIZE), DEFAULT_FETCH_BATCH_SIZE, context)
         
         connections = get_db_connections(context)
         conn = connections.get(connection_name)
         
         if not conn:
-            return ModuleResult(
-                success=False, 
-                error=f"数据库连接 '{connection_name}' 不存在，请先使用「连接数据库」模块"
-            )
+            return _missing_connection(connection_name)
         
         if not sql:
             return ModuleResult(success=False, error="SQL语句不能为空")
         
         try:
-            with conn.cursor() as cursor:
-                cursor.execute(sql)
-                if single_row:
-                    result = cursor.fetchone()
-                else:
-                    result = cursor.fetchall()
+            if single_row or result_mode == 'all':
+                result = await conn.run(fetch_all, sql, single_row)
+                
+                # 保存到变量
+                if variable_name:
+                    context.variables[variable_name] = result
+                
+                row_count = 1 if single_row and result else len(result) if result else 0
+                
+                return ModuleResult(
+                    success=True,
+                    message=f"查询成功，返回 {row_count} 条记录",
+                    data={"rowCount": row_count, "data": result}
+                )
             
-            # 保存到变量
-            if variable_name:
-                context.variables[variable_name] = result
+            # 服务端游标分批读取，不一次性加载全部结果
+            target = context.data_rows if result_mode == 'table' else DataRowStore()
+            row_count = 0
+            async with aclosing(conn.stream(sql, max(1, fetch_size))) as batches:
+                async for rows in batches:
+                    target.extend(rows)
+                    row_count += len(rows)
             
-            row_count = 1 if single_row and result else len(result) if result else 0
+            if result_mode != 'table' and variable_name:
+                context.variables[variable_name] = target
             
+            message = f"查询成功，流式读取 {row_count} 条记录"
+            if result_mode == 'table':
+                message += "到数据表格"
             return ModuleResult(
                 success=True,
-                message=f"查询成功，返回 {row_count} 条记录",
-                data={"rowCount": row_count, "data": result}
+                message=message,
+                data={"rowCount": row_count}
             )
         except Exception as e:
             return ModuleResult(success=False, error=f"查询失败: {str(e)}")
@@ -145,23 +199,14 @@ class DbExecuteExecutor(ModuleExecutor):
         conn = connections.get(connection_name)
         
         if not conn:
-            return ModuleResult(
-                success=False, 
-                error=f"数据库连接 '{connection_name}' 不存在，请先使用「连接数据库」模块"
-            )
+            return _missing_connection(connection_name)
         
         if not sql:
             return ModuleResult(success=False, error="SQL语句不能为空")
         
         try:
-            with conn.cursor() as cursor:
-                affected_rows = cursor.execute(sql)
-                
-                # 尝试获取结果（如果是SELECT语句）
-                try:
-                    result = cursor.fetchall()
-                except:
-                    result = None
+            # 同时尝试获取结果（如果是SELECT语句）
+            affected_rows, result, _ = await conn.run(execute_sql, sql)
             
             # 保存影响行数到变量
             if variable_name:
@@ -178,7 +223,7 @@ class DbExecuteExecutor(ModuleExecutor):
 
 @register_executor
 class DbInsertExecutor(ModuleExecutor):
-    """插入数据"""
+    """插入数据（单行，或列表/数据表格批量插入）"""
     
     @property
     def module_type(self) -> str:
@@ -189,24 +234,27 @@ class DbInsertExecutor(ModuleExecutor):
         table = context.resolve_value(config.get('table', ''))
         data = config.get('data', {})
         variable_name = context.resolve_value(config.get('variableName', ''))
+        use_table_data = _parse_bool(config.get('useTableData', False), context)
+        batch_size = to_int(config.get('batchSize', DEFAULT_INSERT_BATCH_SIZE), DEFAULT_INSERT_BATCH_SIZE, context)
         
         connections = get_db_connections(context)
         conn = connections.get(connection_name)
         
         if not conn:
-            return ModuleResult(
-                success=False, 
-                error=f"数据库连接 '{connection_name}' 不存在，请先使用「连接数据库」模块"
-            )
+            return _missing_connection(connection_name)
         
         if not table:
             return ModuleResult(success=False, error="请指定表名")
         
         try:
             # 解析数据
-            if isinstance(data, str):
-                import json
-                data = json.loads(context.resolve_value(data))
+            if use_table_data:
+                data = context.data_rows
+            elif isinstance(data, str):
+                data = self._resolve_data(data, context)
+            
+            if isinstance(data, (list, DataRowStore)):
+                return await self._bulk_insert(conn, table, data, max(1, batch_size), variable_name, context)
             
             # 解析数据中的变量
             resolved_data = {}
@@ -224,9 +272,7 @@ class DbInsertExecutor(ModuleExecutor):
             placeholders = ', '.join(['%s'] * len(resolved_data))
             sql = f"INSERT INTO `{table}` ({columns}) VALUES ({placeholders})"
             
-            with conn.cursor() as cursor:
-                cursor.execute(sql, list(resolved_data.values()))
-                last_id = cursor.lastrowid
+            _, _, last_id = await conn.run(execute_sql, sql, list(resolved_data.values()))
             
             # 保存插入ID到变量
             if variable_name:
@@ -239,6 +285,49 @@ class DbInsertExecutor(ModuleExecutor):
             )
         except Exception as e:
             return ModuleResult(success=False, error=f"插入失败: {str(e)}")
+    
+    def _resolve_data(self, data: str, context: ExecutionContext) -> Any:
+        """解析插入数据：单个变量引用（如 {rows}）直接取变量值，否则按JSON解析"""
+        match = _SINGLE_VARIABLE_PATTERN.match(data)
+        if match:
+            value = context.lookup_variable(match.group(1).strip(), None)
+            if isinstance(value, (list, dict, DataRowStore)):
+                return value
+        return json.loads(context.resolve_value(data))
+    
+    async def _bulk_insert(self, conn: DbLease, table: str, rows, batch_size: int,
+                           variable_name: str, context: ExecutionContext) -> ModuleResult:
+        """批量插入多行（每 batch_size 行合并为一条多行 INSERT）"""
+        if not rows:
+            return ModuleResult(success=False, error="插入数据不能为空")
+        
+        if isinstance(rows, DataRowStore):
+            columns = list(rows.columns)
+        else:
+            if not all(isinstance(row, dict) for row in rows):
+                return ModuleResult(success=False, error="批量插入的数据必须是对象数组")
+            columns = []
+            seen = set()
+            for row in rows:
+                for key in row:
+                    if key not in seen:
+                        seen.add(key)
+                        columns.append(key)
+        
+        if not columns:
+            return ModuleResult(success=False, error="插入数据不能为空")
+        
+        inserted, last_id = await conn.run(bulk_insert, table, columns, rows, batch_size)
+        
+        # 保存插入行数到变量
+        if variable_name:
+            context.variables[variable_name] = inserted
+        
+        return ModuleResult(
+            success=True,
+            message=f"批量插入成功，共 {inserted} 行",
+            data={"insertedRows": inserted, "lastInsertId": last_id}
+        )
 
 
 @register_executor
@@ -260,10 +349,7 @@ class DbUpdateExecutor(ModuleExecutor):
         conn = connections.get(connection_name)
         
         if not conn:
-            return ModuleResult(
-                success=False, 
-                error=f"数据库连接 '{connection_name}' 不存在，请先使用「连接数据库」模块"
-            )
+            return _missing_connection(connection_name)
         
         if not table:
             return ModuleResult(success=False, error="请指定表名")
@@ -271,7 +357,6 @@ class DbUpdateExecutor(ModuleExecutor):
         try:
             # 解析数据
             if isinstance(data, str):
-                import json
                 data = json.loads(context.resolve_value(data))
             
             # 解析数据中的变量
@@ -291,8 +376,7 @@ class DbUpdateExecutor(ModuleExecutor):
             if where:
                 sql += f" WHERE {where}"
             
-            with conn.cursor() as cursor:
-                affected_rows = cursor.execute(sql, list(resolved_data.values()))
+            affected_rows, _, _ = await conn.run(execute_sql, sql, list(resolved_data.values()))
             
             # 保存影响行数到变量
             if variable_name:
@@ -325,10 +409,7 @@ class DbDeleteExecutor(ModuleExecutor):
         conn = connections.get(connection_name)
         
         if not conn:
-            return ModuleResult(
-                success=False, 
-                error=f"数据库连接 '{connection_name}' 不存在，请先使用「连接数据库」模块"
-            )
+            return _missing_connection(connection_name)
         
         if not table:
             return ModuleResult(success=False, error="请指定表名")
@@ -339,8 +420,7 @@ class DbDeleteExecutor(ModuleExecutor):
         try:
             sql = f"DELETE FROM `{table}` WHERE {where}"
             
-            with conn.cursor() as cursor:
-                affected_rows = cursor.execute(sql)
+            affected_rows, _, _ = await conn.run(execute_sql, sql)
             
             # 保存影响行数到变量
             if variable_name:
@@ -373,8 +453,9 @@ class DbCloseExecutor(ModuleExecutor):
             return ModuleResult(success=True, message=f"连接 '{connection_name}' 不存在或已关闭")
         
         try:
-            conn.close()
+            # 连接归还连接池，供后续工作流复用
             del connections[connection_name]
+            await run_in_worker(conn.release)
             
             return ModuleResult(
                 success=True,
@@ -6,7 +6,7 @@ from typing import Optional
 
 from .base import ModuleExecutor, ExecutionContext, ModuleResult, register_executor
 from .type_utils import to_int, to_float, to_bool
-from .media_utils import get_media_duration, run_ffmpeg_with_progress, run_ffmpeg
+from .media_utils import get_media_duration, run_ffmpeg_with_progress, run_ffmpeg_async, encode_segmented
 
 
 # ==================== 图片格式转换 ====================
@@ -75,8 +75,7 @@ class ImageFormatConvertExecutor(ModuleExecutor):
             
             await context.send_progress(f"🖼️ 开始转换图片格式: {output_format.upper()}...")
             
-            loop = asyncio.get_running_loop()
-            success, message = await loop.run_in_executor(None, lambda: run_ffmpeg(args, timeout=300))
+            success, message = await run_ffmpeg_async(args, timeout=300)
             
             if not success:
                 return ModuleResult(success=False, error=f"图片格式转换失败: {message}")
@@ -142,8 +141,8 @@ class VideoFormatConvertExecutor(ModuleExecutor):
             # 获取视频时长
             duration = get_media_duration(input_path)
             
-            # 构建 FFmpeg 命令
-            args = ['-i', input_path]
+            # 编码参数（输入输出在执行时添加）
+            args = []
             
             # 视频编码器
             if video_codec == 'auto':
@@ -200,19 +199,28 @@ class VideoFormatConvertExecutor(ModuleExecutor):
             if resolution:
                 args.extend(['-s', resolution])
             
-            args.append(output_path)
-            
             if duration:
                 await context.send_progress(f"🎬 开始转换视频格式: {output_format.upper()}，预计时长 {duration:.0f} 秒...")
             else:
                 await context.send_progress(f"🎬 开始转换视频格式: {output_format.upper()}...")
             
-            success, message = await run_ffmpeg_with_progress(
-                args,
-                timeout=7200,
-                total_duration=duration,
-                context=context
-            )
+            if video_codec != 'copy' and audio_codec != 'copy':
+                # 重新编码时长视频分段并行编码
+                success, message = await encode_segmented(
+                    input_path,
+                    output_path,
+                    args,
+                    total_duration=duration,
+                    timeout=7200,
+                    context=context
+                )
+            else:
+                success, message = await run_ffmpeg_with_progress(
+                    ['-i', input_path] + args + [output_path],
+                    timeout=7200,
+                    total_duration=duration,
+                    context=context
+                )
             
             if not success:
                 return ModuleResult(success=False, error=f"视频格式转换失败: {message}")
@@ -0,0 +1,417 @@
+"""执行器清单 - 模块类型到 (执行器模块, 执行器类) 的静态映射
+
+ExecutorRegistry 按此清单延迟导入执行器模块：启动时不再导入全部执行器
+（以及 cv2、polars、pandas、pymysql 等依赖），第一次获取某个模块类型时才导入它所在的模块。
+
+EXECUTOR_MODULES 的顺序与原先 __init__.py 中的导入顺序一致，同一模块类型被多次注册时以最后一次为准。
+新增或修改执行器后重新生成清单（不需要导入执行器，只解析源码）：
+
+运行方式（在 backend 目录下）：
+    python app/executors/manifest.py
+"""
+
+# 注册执行器的模块（按注册顺序，后面的覆盖前面的同类型实现）
+EXECUTOR_MODULES = [
+    'basic',
+    'basic_variable',  # 变量操作执行器
+    'advanced',
+    'advanced_file_ops',  # 文件操作执行器
+    'advanced_browser',
+    'advanced_image',
+    'advanced_ocr',  # 点击/悬停文本（覆盖 advanced 中的旧实现）
+    'advanced_keyboard',
+    'advanced_pillow',
+    'control',
+    'captcha',
+    'data_structure',
+    'ai',
+    'ai_scraper',
+    'ai_firecrawl',
+    'table',
+    'subflow',
+    'database',
+    'media',
+    'media_record',
+    'media_m3u8',
+    'qq',
+    'wechat',
+    'pdf_ops',
+    'pdf_convert',
+    'document_convert',
+    'screen_share',
+    'trigger',
+    'utility_tools',
+    'format_factory',
+    'python_script',
+    'table_extract',
+    'record_extract',  # 批量提取记录
+    'switch_tab',
+    # 手机自动化模块
+    'phone_device',
+    'phone_touch',
+    'phone_input',
+    'phone_screen',
+    'phone_app',
+    'phone_file',
+    'phone_advanced',
+    'phone_vision',
+    'phone_settings',
+    'phone_clipboard',
+    # 测试报告模块
+    'test_allure',
+]
+
+# === 以下由 python app/executors/manifest.py 生成，请勿手动修改 ===
+EXECUTOR_MANIFEST: dict[str, tuple[str, str]] = {
+    'group': ('basic_variable', 'GroupExecutor'),
+    'open_page': ('basic', 'OpenPageExecutor'),
+    'click_element': ('basic', 'ClickElementExecutor'),
+    'hover_element': ('basic', 'HoverElementExecutor'),
+    'input_text': ('basic', 'InputTextExecutor'),
+    'get_element_info': ('basic', 'GetElementInfoExecutor'),
+    'wait': ('basic_variable', 'WaitExecutor'),
+    'wait_element': ('basic_variable', 'WaitElementExecutor'),
+    'wait_image': ('basic', 'WaitImageExecutor'),
+    'close_page': ('basic', 'ClosePageExecutor'),
+    'set_variable': ('basic_variable', 'SetVariableExecutor'),
+    'print_log': ('basic_variable', 'PrintLogExecutor'),
+    'play_sound': ('basic', 'PlaySoundExecutor'),
+    'system_notification': ('basic', 'SystemNotificationExecutor'),
+    'play_music': ('basic', 'PlayMusicExecutor'),
+    'play_video': ('basic', 'PlayVideoExecutor'),
+    'view_image': ('basic', 'ViewImageExecutor'),
+    'input_prompt': ('basic', 'InputPromptExecutor'),
+    'random_number': ('basic_variable', 'RandomNumberExecutor'),
+    'get_time': ('basic_variable', 'GetTimeExecutor'),
+    'screenshot': ('basic', 'ScreenshotExecutor'),
+    'text_to_speech': ('basic', 'TextToSpeechExecutor'),
+    'js_script': ('basic', 'JsScriptExecutor'),
+    'refresh_page': ('basic', 'RefreshPageExecutor'),
+    'go_back': ('basic', 'GoBackExecutor'),
+    'go_forward': ('basic', 'GoForwardExecutor'),
+    'handle_dialog': ('basic', 'HandleDialogExecutor'),
+    'inject_javascript': ('basic', 'InjectJavaScriptExecutor'),
+    'switch_iframe': ('basic', 'SwitchIframeExecutor'),
+    'switch_to_main': ('basic', 'SwitchToMainExecutor'),
+    'increment_decrement': ('basic_variable', 'IncrementDecrementExecutor'),
+    'api_request': ('advanced', 'ApiRequestExecutor'),
+    'json_parse': ('advanced', 'JsonParseExecutor'),
+    'base64': ('advanced', 'Base64Executor'),
+    'select_dropdown': ('advanced_browser', 'SelectDropdownExecutor'),
+    'set_checkbox': ('advanced_browser', 'SetCheckboxExecutor'),
+    'drag_element': ('advanced_browser', 'DragElementExecutor'),
+    'scroll_page': ('advanced_browser', 'ScrollPageExecutor'),
+    'upload_file': ('advanced_browser', 'UploadFileExecutor'),
+    'download_file': ('advanced_browser', 'DownloadFileExecutor'),
+    'save_image': ('advanced_browser', 'SaveImageExecutor'),
+    'send_email': ('advanced', 'SendEmailExecutor'),
+    'read_excel': ('advanced', 'ReadExcelExecutor'),
+    'set_clipboard': ('advanced', 'SetClipboardExecutor'),
+    'get_clipboard': ('advanced', 'GetClipboardExecutor'),
+    'keyboard_action': ('advanced_keyboard', 'KeyboardActionExecutor'),
+    'real_mouse_scroll': ('advanced', 'RealMouseScrollExecutor'),
+    'shutdown_system': ('advanced', 'ShutdownSystemExecutor'),
+    'lock_screen': ('advanced', 'LockScreenExecutor'),
+    'window_focus': ('advanced', 'WindowFocusExecutor'),
+    'real_mouse_click': ('advanced', 'RealMouseClickExecutor'),
+    'real_mouse_move': ('advanced', 'RealMouseMoveExecutor'),
+    'real_mouse_drag': ('advanced', 'RealMouseDragExecutor'),
+    'real_keyboard': ('advanced_keyboard', 'RealKeyboardExecutor'),
+    'run_command': ('advanced', 'RunCommandExecutor'),
+    'click_image': ('advanced_image', 'ClickImageExecutor'),
+    'get_mouse_position': ('advanced', 'GetMousePositionExecutor'),
+    'screenshot_screen': ('advanced', 'ScreenshotScreenExecutor'),
+    'rename_file': ('advanced_file_ops', 'RenameFileExecutor'),
+    'network_capture': ('advanced', 'NetworkCaptureExecutor'),
+    'list_files': ('advanced_file_ops', 'ListFilesExecutor'),
+    'copy_file': ('advanced_file_ops', 'CopyFileExecutor'),
+    'move_file': ('advanced_file_ops', 'MoveFileExecutor'),
+    'delete_file': ('advanced_file_ops', 'DeleteFileExecutor'),
+    'create_folder': ('advanced', 'CreateFolderExecutor'),
+    'file_exists': ('advanced', 'FileExistsExecutor'),
+    'get_file_info': ('advanced', 'GetFileInfoExecutor'),
+    'read_text_file': ('advanced', 'ReadTextFileExecutor'),
+    'write_text_file': ('advanced', 'WriteTextFileExecutor'),
+    'rename_folder': ('advanced', 'RenameFolderExecutor'),
+    'macro_recorder': ('advanced', 'MacroRecorderExecutor'),
+    'export_log': ('advanced', 'ExportLogExecutor'),
+    'click_text': ('advanced_ocr', 'ClickTextExecutor'),
+    'hover_image': ('advanced_image', 'HoverImageExecutor'),
+    'hover_text': ('advanced_ocr', 'HoverTextExecutor'),
+    'share_folder': ('advanced', 'ShareFolderExecutor'),
+    'share_file': ('advanced', 'ShareFileExecutor'),
+    'stop_share': ('advanced', 'StopShareExecutor'),
+    'get_child_elements': ('advanced_browser', 'GetChildElementsExecutor'),
+    'get_sibling_elements': ('advanced_browser', 'GetSiblingElementsExecutor'),
+    'element_exists': ('advanced_browser', 'ElementExistsExecutor'),
+    'element_visible': ('advanced_browser', 'ElementVisibleExecutor'),
+    'drag_image': ('advanced_image', 'DragImageExecutor'),
+    'image_exists': ('advanced_image', 'ImageExistsExecutor'),
+    'image_resize': ('advanced_pillow', 'ImageResizeExecutor'),
+    'image_crop': ('advanced_pillow', 'ImageCropExecutor'),
+    'image_rotate': ('advanced_pillow', 'ImageRotateExecutor'),
+    'image_flip': ('advanced_pillow', 'ImageFlipExecutor'),
+    'image_blur': ('advanced_pillow', 'ImageBlurExecutor'),
+    'image_sharpen': ('advanced_pillow', 'ImageSharpenExecutor'),
+    'image_brightness': ('advanced_pillow', 'ImageBrightnessExecutor'),
+    'image_contrast': ('advanced_pillow', 'ImageContrastExecutor'),
+    'image_color_balance': ('advanced_pillow', 'ImageColorBalanceExecutor'),
+    'image_convert_format': ('advanced_pillow', 'ImageConvertFormatExecutor'),
+    'image_add_text': ('advanced_pillow', 'ImageAddTextExecutor'),
+    'image_merge': ('advanced_pillow', 'ImageMergeExecutor'),
+    'image_thumbnail': ('advanced_pillow', 'ImageThumbnailExecutor'),
+    'image_filter': ('advanced_pillow', 'ImageFilterExecutor'),
+    'image_get_info': ('advanced_pillow', 'ImageGetInfoExecutor'),
+    'image_remove_bg': ('advanced_pillow', 'ImageRemoveBackgroundExecutor'),
+    'condition': ('control', 'ConditionExecutor'),
+    'loop': ('control', 'LoopExecutor'),
+    'foreach': ('control', 'ForeachExecutor'),
+    'break_loop': ('control', 'BreakLoopExecutor'),
+    'continue_loop': ('control', 'ContinueLoopExecutor'),
+    'scheduled_task': ('control', 'ScheduledTaskExecutor'),
+    'ocr_captcha': ('captcha', 'OCRCaptchaExecutor'),
+    'slider_captcha': ('captcha', 'SliderCaptchaExecutor'),
+    'list_operation': ('data_structure', 'ListOperationExecutor'),
+    'list_get': ('data_structure', 'ListGetExecutor'),
+    'list_length': ('data_structure', 'ListLengthExecutor'),
+    'list_export': ('data_structure', 'ListExportExecutor'),
+    'dict_operation': ('data_structure', 'DictOperationExecutor'),
+    'dict_get': ('data_structure', 'DictGetExecutor'),
+    'dict_keys': ('data_structure', 'DictKeysExecutor'),
+    'regex_extract': ('data_structure', 'RegexExtractExecutor'),
+    'string_replace': ('data_structure', 'StringReplaceExecutor'),
+    'string_split': ('data_structure', 'StringSplitExecutor'),
+    'string_join': ('data_structure', 'StringJoinExecutor'),
+    'string_concat': ('data_structure', 'StringConcatExecutor'),
+    'string_trim': ('data_structure', 'StringTrimExecutor'),
+    'string_case': ('data_structure', 'StringCaseExecutor'),
+    'string_substring': ('data_structure', 'StringSubstringExecutor'),
+    'ai_chat': ('ai', 'AIChatExecutor'),
+    'ai_vision': ('ai', 'AIVisionExecutor'),
+    'ai_smart_scraper': ('ai_scraper', 'AISmartScraperExecutor'),
+    'ai_element_selector': ('ai_scraper', 'AIElementSelectorExecutor'),
+    'firecrawl_scrape': ('ai_firecrawl', 'FirecrawlScrapeExecutor'),
+    'firecrawl_map': ('ai_firecrawl', 'FirecrawlMapExecutor'),
+    'firecrawl_crawl': ('ai_firecrawl', 'FirecrawlCrawlExecutor'),
+    'table_add_row': ('table', 'TableAddRowExecutor'),
+    'table_add_column': ('table', 'TableAddColumnExecutor'),
+    'table_set_cell': ('table', 'TableSetCellExecutor'),
+    'table_get_cell': ('table', 'TableGetCellExecutor'),
+    'table_delete_row': ('table', 'TableDeleteRowExecutor'),
+    'table_clear': ('table', 'TableClearExecutor'),
+    'table_export': ('table', 'TableExportExecutor'),
+    'subflow': ('subflow', 'SubflowExecutor'),
+    'db_connect': ('database', 'DbConnectExecutor'),
+    'db_query': ('database', 'DbQueryExecutor'),
+    'db_execute': ('database', 'DbExecuteExecutor'),
+    'db_insert': ('database', 'DbInsertExecutor'),
+    'db_update': ('database', 'DbUpdateExecutor'),
+    'db_delete': ('database', 'DbDeleteExecutor'),
+    'db_close': ('database', 'DbCloseExecutor'),
+    'format_convert': ('media', 'FormatConvertExecutor'),
+    'compress_image': ('media', 'CompressImageExecutor'),
+    'compress_video': ('media', 'CompressVideoExecutor'),
+    'extract_audio': ('media', 'ExtractAudioExecutor'),
+    'trim_video': ('media', 'TrimVideoExecutor'),
+    'merge_media': ('media', 'MergeMediaExecutor'),
+    'add_watermark': ('media', 'AddWatermarkExecutor'),
+    'face_recognition': ('media', 'FaceRecognitionExecutor'),
+    'image_ocr': ('media', 'ImageOCRExecutor'),
+    'rotate_video': ('media', 'RotateVideoExecutor'),
+    'video_speed': ('media', 'VideoSpeedExecutor'),
+    'extract_frame': ('media', 'ExtractFrameExecutor'),
+    'add_subtitle': ('media', 'AddSubtitleExecutor'),
+    'adjust_volume': ('media', 'AdjustVolumeExecutor'),
+    'resize_video': ('media', 'ResizeVideoExecutor'),
+    'image_grayscale': ('media', 'ImageGrayscaleExecutor'),
+    'image_round_corners': ('media', 'ImageRoundCornersExecutor'),
+    'audio_to_text': ('media', 'AudioToTextExecutor'),
+    'qr_generate': ('media', 'QRGenerateExecutor'),
+    'qr_decode': ('media', 'QRDecodeExecutor'),
+    'screen_record': ('media_record', 'ScreenRecordExecutor'),
+    'camera_capture': ('media_record', 'CameraCaptureExecutor'),
+    'camera_record': ('media_record', 'CameraRecordExecutor'),
+    'download_m3u8': ('media_m3u8', 'DownloadM3U8Executor'),
+    'qq_send_message': ('qq', 'QQSendMessageExecutor'),
+    'qq_send_image': ('qq', 'QQSendImageExecutor'),
+    'qq_send_file': ('qq', 'QQSendFileExecutor'),
+    'qq_get_friends': ('qq', 'QQGetFriendListExecutor'),
+    'qq_get_groups': ('qq', 'QQGetGroupListExecutor'),
+    'qq_get_group_members': ('qq', 'QQGetGroupMembersExecutor'),
+    'qq_get_login_info': ('qq', 'QQGetLoginInfoExecutor'),
+    'qq_wait_message': ('qq', 'QQWaitMessageExecutor'),
+    'wechat_send_message': ('wechat', 'WeChatSendMessageExecutor'),
+    'wechat_send_file': ('wechat', 'WeChatSendFileExecutor'),
+    'pdf_merge': ('pdf_ops', 'PDFMergeExecutor'),
+    'pdf_split': ('pdf_ops', 'PDFSplitExecutor'),
+    'pdf_extract_text': ('pdf_ops', 'PDFExtractTextExecutor'),
+    'pdf_extract_images': ('pdf_ops', 'PDFExtractImagesExecutor'),
+    'pdf_encrypt': ('pdf_ops', 'PDFEncryptExecutor'),
+    'pdf_decrypt': ('pdf_ops', 'PDFDecryptExecutor'),
+    'pdf_add_watermark': ('pdf_ops', 'PDFAddWatermarkExecutor'),
+    'pdf_rotate': ('pdf_ops', 'PDFRotateExecutor'),
+    'pdf_delete_pages': ('pdf_ops', 'PDFDeletePagesExecutor'),
+    'pdf_get_info': ('pdf_ops', 'PDFGetInfoExecutor'),
+    'pdf_compress': ('pdf_ops', 'PDFCompressExecutor'),
+    'pdf_insert_pages': ('pdf_ops', 'PDFInsertPagesExecutor'),
+    'pdf_reorder_pages': ('pdf_ops', 'PDFReorderPagesExecutor'),
+    'pdf_to_images': ('pdf_convert', 'PDFToImagesExecutor'),
+    'images_to_pdf': ('pdf_convert', 'ImagesToPDFExecutor'),
+    'pdf_to_word': ('pdf_convert', 'PDFToWordExecutor'),
+    'markdown_to_html': ('document_convert', 'MarkdownToHTMLExecutor'),
+    'html_to_markdown': ('document_convert', 'HTMLToMarkdownExecutor'),
+    'markdown_to_pdf': ('document_convert', 'MarkdownToPDFExecutor'),
+    'markdown_to_docx': ('document_convert', 'MarkdownToDocxExecutor'),
+    'docx_to_markdown': ('document_convert', 'DocxToMarkdownExecutor'),
+    'html_to_docx': ('document_convert', 'HTMLToDocxExecutor'),
+    'docx_to_html': ('document_convert', 'DocxToHTMLExecutor'),
+    'markdown_to_epub': ('document_convert', 'MarkdownToEPUBExecutor'),
+    'epub_to_markdown': ('document_convert', 'EPUBToMarkdownExecutor'),
+    'latex_to_pdf': ('document_convert', 'LaTeXToPDFExecutor'),
+    'rst_to_html': ('document_convert', 'RSTToHTMLExecutor'),
+    'org_to_html': ('document_convert', 'OrgModeToHTMLExecutor'),
+    'universal_doc_convert': ('document_convert', 'UniversalDocumentConvertExecutor'),
+    'start_screen_share': ('screen_share', 'StartScreenShareExecutor'),
+    'stop_screen_share': ('screen_share', 'StopScreenShareExecutor'),
+    'webhook_trigger': ('trigger', 'WebhookTriggerExecutor'),
+    'hotkey_trigger': ('trigger', 'HotkeyTriggerExecutor'),
+    'file_watcher_trigger': ('trigger', 'FileWatcherTriggerExecutor'),
+    'email_trigger': ('trigger', 'EmailTriggerExecutor'),
+    'api_trigger': ('trigger', 'ApiTriggerExecutor'),
+    'mouse_trigger': ('trigger', 'MouseTriggerExecutor'),
+    'image_trigger': ('trigger', 'ImageTriggerExecutor'),
+    'sound_trigger': ('trigger', 'SoundTriggerExecutor'),
+    'face_trigger': ('trigger', 'FaceTriggerExecutor'),
+    'gesture_trigger': ('trigger', 'GestureTriggerExecutor'),
+    'element_change_trigger': ('trigger', 'ElementChangeTriggerExecutor'),
+    'file_hash_compare': ('utility_tools', 'FileHashCompareExecutor'),
+    'file_diff_compare': ('utility_tools', 'FileDiffCompareExecutor'),
+    'folder_hash_compare': ('utility_tools', 'FolderHashCompareExecutor'),
+    'folder_diff_compare': ('utility_tools', 'FolderDiffCompareExecutor'),
+    'random_password_generator': ('utility_tools', 'RandomPasswordGeneratorExecutor'),
+    'url_encode_decode': ('utility_tools', 'URLEncodeDecodeExecutor'),
+    'md5_encrypt': ('utility_tools', 'MD5EncryptExecutor'),
+    'sha_encrypt': ('utility_tools', 'SHAEncryptExecutor'),
+    'timestamp_converter': ('utility_tools', 'TimestampConverterExecutor'),
+    'rgb_to_hsv': ('utility_tools', 'RGBToHSVExecutor'),
+    'rgb_to_cmyk': ('utility_tools', 'RGBToCMYKExecutor'),
+    'hex_to_cmyk': ('utility_tools', 'HEXToCMYKExecutor'),
+    'uuid_generator': ('utility_tools', 'UUIDGeneratorExecutor'),
+    'printer_call': ('utility_tools', 'PrinterCallExecutor'),
+    'image_format_convert': ('format_factory', 'ImageFormatConvertExecutor'),
+    'video_format_convert': ('format_factory', 'VideoFormatConvertExecutor'),
+    'audio_format_convert': ('format_factory', 'AudioFormatConvertExecutor'),
+    'video_to_audio': ('format_factory', 'VideoToAudioExecutor'),
+    'video_to_gif': ('format_factory', 'VideoToGIFExecutor'),
+    'batch_format_convert': ('format_factory', 'BatchFormatConvertExecutor'),
+    'python_script': ('python_script', 'PythonScriptExecutor'),
+    'extract_table_data': ('table_extract', 'ExtractTableDataExecutor'),
+    'extract_records': ('record_extract', 'ExtractRecordsExecutor'),
+    'switch_tab': ('switch_tab', 'SwitchTabExecutor'),
+    'phone_tap': ('phone_touch', 'PhoneTapExecutor'),
+    'phone_swipe': ('phone_touch', 'PhoneSwipeExecutor'),
+    'phone_input_text': ('phone_input', 'PhoneInputTextExecutor'),
+    'phone_press_key': ('phone_input', 'PhonePressKeyExecutor'),
+    'phone_screenshot': ('phone_screen', 'PhoneScreenshotExecutor'),
+    'phone_start_mirror': ('phone_screen', 'PhoneStartMirrorExecutor'),
+    'phone_stop_mirror': ('phone_screen', 'PhoneStopMirrorExecutor'),
+    'phone_install_app': ('phone_app', 'PhoneInstallAppExecutor'),
+    'phone_start_app': ('phone_app', 'PhoneStartAppExecutor'),
+    'phone_push_file': ('phone_file', 'PhonePushFileExecutor'),
+    'phone_pull_file': ('phone_file', 'PhonePullFileExecutor'),
+    'phone_long_press': ('phone_advanced', 'PhoneLongPressExecutor'),
+    'phone_stop_app': ('phone_advanced', 'PhoneStopAppExecutor'),
+    'phone_uninstall_app': ('phone_advanced', 'PhoneUninstallAppExecutor'),
+    'phone_click_image': ('phone_vision', 'PhoneClickImageExecutor'),
+    'phone_click_text': ('phone_vision', 'PhoneClickTextExecutor'),
+    'phone_wait_image': ('phone_vision', 'PhoneWaitImageExecutor'),
+    'phone_image_exists': ('phone_vision', 'PhoneImageExistsExecutor'),
+    'phone_set_volume': ('phone_settings', 'PhoneSetVolumeExecutor'),
+    'phone_set_brightness': ('phone_settings', 'PhoneSetBrightnessExecutor'),
+    'phone_set_clipboard': ('phone_clipboard', 'PhoneSetClipboardExecutor'),
+    'phone_get_clipboard': ('phone_clipboard', 'PhoneGetClipboardExecutor'),
+}
+# === 生成结束 ===
+
+
+def build_manifest(package_dir=None) -> dict:
+    """解析执行器源码，按导入顺序模拟注册过程，返回 {模块类型: (模块名, 类名)}"""
+    import ast
+    from pathlib import Path
+
+    package_dir = Path(package_dir or Path(__file__).resolve().parent)
+    manifest: dict = {}
+    loaded: list = []
+    classes: dict = {}
+
+    def top_level(body):
+        # 模块导入时执行的语句（包括 try/if 中的语句，不包括函数体）
+        for node in body:
+            if isinstance(node, ast.Try):
+                yield from top_level(node.body)
+                for handler in node.handlers:
+                    yield from top_level(handler.body)
+            elif isinstance(node, ast.If):
+                yield from top_level(node.body)
+                yield from top_level(node.orelse)
+            else:
+                yield node
+
+    def module_type_of(class_node):
+        for item in class_node.body:
+            if isinstance(item, ast.FunctionDef) and item.name == 'module_type':
+                for statement in ast.walk(item):
+                    if isinstance(statement, ast.Return) and isinstance(statement.value, ast.Constant):
+                        return statement.value.value
+        raise ValueError(f"无法确定 {class_node.name} 的 module_type（需要直接返回字符串常量）")
+
+    def load(name):
+        path = package_dir / f'{name}.py'
+        if name in loaded or name == 'base' or not path.exists():
+            if name in EXECUTOR_MODULES and not path.exists():
+                print(f"警告: 执行器模块不存在，已跳过: {name}")
+            return
+        loaded.append(name)
+        tree = ast.parse(path.read_text(encoding='utf-8'))
+        for node in top_level(tree.body):
+            if isinstance(node, ast.ImportFrom):
+                # 导入包内的其他模块时，被导入模块中的执行器先注册
+                if node.level == 1 and node.module is None:
+                    for alias in node.names:
+                        load(alias.name)
+                elif node.level == 1:
+                    load(node.module.split('.')[0])
+                elif node.module and node.module.startswith('app.executors.'):
+                    load(node.module.split('.')[2])
+            elif isinstance(node, ast.ClassDef):
+                classes[(name, node.name)] = node
+                if any(getattr(d, 'id', None) == 'register_executor' for d in node.decorator_list):
+                    manifest[module_type_of(node)] = (name, node.name)
+            elif (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)
+                  and getattr(node.value.func, 'attr', None) == 'register' and node.value.args):
+                # registry.register(SomeExecutor)
+                class_name = node.value.args[0].id
+                manifest[module_type_of(classes[(name, class_name)])] = (name, class_name)
+
+    for module_name in EXECUTOR_MODULES:
+        load(module_name)
+    return manifest
+
+
+def _write_manifest():
+    from pathlib import Path
+
+    path = Path(__file__).resolve()
+    source = path.read_text(encoding='utf-8')
+    begin = source.index('EXECUTOR_MANIFEST: dict')
+    end = source.index('# === 生成结束 ===')
+    manifest = build_manifest()
+    lines = ['EXECUTOR_MANIFEST: dict[str, tuple[str, str]] = {']
+    lines += [f"    {module_type!r}: {entry!r}," for module_type, entry in manifest.items()]
+    lines.append('}\n')
+    path.write_text(source[:begin] + '\n'.join(lines) + source[end:], encoding='utf-8')
+    print(f"已生成执行器清单: {len(manifest)} 个模块类型")
+
+
+if __name__ == '__main__':
+    _write_manifest()
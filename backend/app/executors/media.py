@@ -1,413 +1,23 @@
 """媒体处理模块执行器 - 基于FFmpeg"""
 import asyncio
 import os
-import subprocess
 import tempfile
 import time
-import re
-from pathlib import Path
-from typing import Optional, Callable
 
 from .base import (
     ModuleExecutor,
     ExecutionContext,
     ModuleResult,
     register_executor,
-    get_ffmpeg_path,
-    get_ffprobe_path,
 )
 from .type_utils import to_int, to_float
-
-
-# 全局进程管理器 - 跟踪所有运行中的 FFmpeg 进程
-class FFmpegProcessManager:
-    """FFmpeg 进程管理器，用于跟踪和清理进程"""
-    _instance = None
-    _lock = asyncio.Lock()
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._processes: dict[int, subprocess.Popen] = {}
-            cls._instance._process_id = 0
-        return cls._instance
-    
-    async def register(self, process: subprocess.Popen) -> int:
-        """注册一个新进程，返回进程ID"""
-        async with self._lock:
-            self._process_id += 1
-            pid = self._process_id
-            self._processes[pid] = process
-            return pid
-    
-    async def unregister(self, pid: int):
-        """注销进程"""
-        async with self._lock:
-            if pid in self._processes:
-                del self._processes[pid]
-    
-    async def terminate_all(self):
-        """终止所有正在运行的 FFmpeg 进程"""
-        async with self._lock:
-            for pid, process in list(self._processes.items()):
-                try:
-                    if process.poll() is None:  # 进程仍在运行
-                        process.terminate()
-                        try:
-                            process.wait(timeout=2)
-                        except subprocess.TimeoutExpired:
-                            process.kill()
-                except Exception as e:
-                    print(f"终止 FFmpeg 进程 {pid} 失败: {e}")
-            self._processes.clear()
-    
-    def get_running_count(self) -> int:
-        """获取正在运行的进程数量"""
-        return sum(1 for p in self._processes.values() if p.poll() is None)
-
-
-# 全局进程管理器实例
-ffmpeg_manager = FFmpegProcessManager()
-
-
-def get_media_duration(input_path: str) -> Optional[float]:
-    """获取媒体文件时长（秒）"""
-    ffprobe = get_ffprobe_path()
-    print(f"[DEBUG] 获取媒体时长: {input_path}")
-    try:
-        result = subprocess.run(
-            [ffprobe, '-v', 'error', '-show_entries', 'format=duration',
-             '-of', 'default=noprint_wrappers=1:nokey=1', input_path],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            duration = float(result.stdout.strip())
-            print(f"[DEBUG] 媒体时长: {duration} 秒")
-            return duration
-        else:
-            print(f"[DEBUG] 获取时长失败: returncode={result.returncode}, stderr={result.stderr}")
-    except Exception as e:
-        print(f"[DEBUG] 获取时长异常: {e}")
-    return None
-
-
-async def run_ffmpeg_with_progress(
-    args: list, 
-    timeout: int = 600,
-    on_progress: Optional[Callable[[float, str], None]] = None,
-    total_duration: Optional[float] = None,
-    context: Optional['ExecutionContext'] = None
-) -> tuple[bool, str]:
-    """
-    运行 ffmpeg 命令，支持进度回调
-    
-    Args:
-        args: ffmpeg 参数列表
-        timeout: 超时时间（秒）
-        on_progress: 进度回调函数 (progress_percent, status_message) - 同步回调
-        total_duration: 总时长（秒），用于计算进度
-        context: 执行上下文，用于发送进度日志到前端
-    
-    Returns:
-        (success, message)
-    """
-    import time as time_module
-    import threading
-    
-    ffmpeg = get_ffmpeg_path()
-    print(f"[DEBUG] FFmpeg 路径: {ffmpeg}")
-    print(f"[DEBUG] FFmpeg 参数: {args}")
-    
-    # 使用 asyncio.subprocess 来运行 FFmpeg，这样可以更好地处理异步
-    # 但为了兼容性，我们使用 subprocess + 线程的方式
-    cmd = [ffmpeg, '-y'] + args  # -y 放在前面，覆盖输出文件
-    print(f"[DEBUG] 完整命令: {' '.join(cmd)}")
-    
-    process = None
-    pid = None
-    stderr_output = []
-    last_progress_msg = ['']
-    
-    try:
-        # 启动 FFmpeg 进程
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            stdin=subprocess.PIPE,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        )
-        
-        print(f"[DEBUG] FFmpeg 进程已启动, PID: {process.pid}")
-        
-        # 注册进程
-        pid = await ffmpeg_manager.register(process)
-        
-        loop = asyncio.get_running_loop()
-        start_time = time_module.time()
-        progress_data = {'percent': 0, 'msg': '', 'updated': False}  # 使用字典存储进度数据
-        
-        def read_stderr():
-            """读取 stderr 输出（FFmpeg 的进度信息在 stderr 中）"""
-            last_update_time = -10  # 初始值设为负数，确保第一次立即更新
-            buffer = ""
-            line_count = 0
-            
-            try:
-                # FFmpeg 使用 \r 来更新进度行，所以我们需要按字符读取
-                while True:
-                    char = process.stderr.read(1)
-                    if not char:
-                        # 进程结束
-                        break
-                    
-                    char_str = char.decode('utf-8', errors='ignore')
-                    
-                    if char_str == '\r' or char_str == '\n':
-                        # 一行结束，处理缓冲区
-                        line_str = buffer.strip()
-                        buffer = ""
-                        
-                        if not line_str:
-                            continue
-                        
-                        line_count += 1
-                        stderr_output.append(line_str)
-                        
-                        # 每10行打印一次原始输出（调试用）
-                        if line_count <= 5 or line_count % 50 == 0:
-                            print(f"[DEBUG] FFmpeg 输出 #{line_count}: {line_str[:100]}")
-                        
-                        # 解析 FFmpeg 的进度输出
-                        # FFmpeg 输出格式: frame=  123 fps= 30 q=28.0 size=    1234kB time=00:00:05.00 bitrate= 123.4kbits/s speed=1.5x
-                        
-                        # 提取关键信息用于进度显示
-                        size_match = re.search(r'size=\s*(\d+)kB', line_str)
-                        time_match = re.search(r'time=(\d+):(\d+):(\d+\.?\d*)', line_str)
-                        speed_match = re.search(r'speed=\s*([\d.]+)x', line_str)
-                        bitrate_match = re.search(r'bitrate=\s*([\d.]+)kbits/s', line_str)
-                        
-                        if time_match:
-                            hours = int(time_match.group(1))
-                            minutes = int(time_match.group(2))
-                            seconds = float(time_match.group(3))
-                            current_time = hours * 3600 + minutes * 60 + seconds
-                            
-                            # 如果有总时长，计算百分比进度
-                            if total_duration and total_duration > 0:
-                                # 计算进度
-                                progress = min(99.9, (current_time / total_duration) * 100)
-                                elapsed = time_module.time() - start_time
-                                
-                                # 每3秒更新一次进度日志（减少间隔以提高响应性）
-                                if elapsed - last_update_time >= 3:
-                                    last_update_time = elapsed
-                                    if progress > 0:
-                                        eta = (elapsed / progress) * (100 - progress)
-                                        msg = f"处理中 {progress:.1f}%，预计剩余 {eta:.0f}秒"
-                                    else:
-                                        msg = "处理中..."
-                                    
-                                    # 更新进度数据
-                                    progress_data['percent'] = progress
-                                    progress_data['msg'] = msg
-                                    progress_data['updated'] = True
-                                    last_progress_msg[0] = msg
-                                    print(f"[DEBUG] FFmpeg 进度: {msg}")
-                                    
-                                    if on_progress:
-                                        on_progress(progress, msg)
-                            else:
-                                # 没有总时长（如M3U8下载），显示已处理时间和文件大小
-                                elapsed = time_module.time() - start_time
-                                if elapsed - last_update_time >= 3:
-                                    last_update_time = elapsed
-                                    
-                                    # 格式化时间
-                                    time_str = f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
-                                    
-                                    # 构建进度消息
-                                    msg_parts = [f"已处理 {time_str}"]
-                                    
-                                    if size_match:
-                                        size_kb = int(size_match.group(1))
-                                        if size_kb < 1024:
-                                            msg_parts.append(f"大小 {size_kb}KB")
-                                        else:
-                                            msg_parts.append(f"大小 {size_kb/1024:.1f}MB")
-                                    
-                                    if speed_match:
-                                        speed = float(speed_match.group(1))
-                                        msg_parts.append(f"速度 {speed:.1f}x")
-                                    
-                                    if bitrate_match:
-                                        bitrate = float(bitrate_match.group(1))
-                                        if bitrate < 1024:
-                                            msg_parts.append(f"码率 {bitrate:.0f}kbps")
-                                        else:
-                                            msg_parts.append(f"码率 {bitrate/1024:.1f}Mbps")
-                                    
-                                    msg = "，".join(msg_parts)
-                                    
-                                    # 更新进度数据
-                                    progress_data['msg'] = msg
-                                    progress_data['updated'] = True
-                                    last_progress_msg[0] = msg
-                                    print(f"[DEBUG] FFmpeg 进度: {msg}")
-                                    
-                                    if on_progress:
-                                        on_progress(0, msg)  # 进度为0表示未知百分比
-                        
-                        # 检查是否有错误
-                        if 'error' in line_str.lower() or 'invalid' in line_str.lower():
-                            print(f"[DEBUG] FFmpeg 可能的错误: {line_str}")
-                    else:
-                        buffer += char_str
-                
-                print(f"[DEBUG] FFmpeg stderr 读取完成，共 {line_count} 行")
-                        
-            except Exception as e:
-                print(f"[DEBUG] 读取 stderr 异常: {e}")
-                import traceback
-                traceback.print_exc()
-            
-            return process.wait()
-        
-        # 异步发送进度更新
-        async def send_progress_periodically():
-            """定期发送进度更新到前端"""
-            last_sent = ''
-            check_count = 0
-            try:
-                while True:
-                    await asyncio.sleep(2)  # 减少检查间隔到2秒
-                    check_count += 1
-                    current_msg = last_progress_msg[0]
-                    
-                    # 调试：每次检查都打印状态
-                    if check_count <= 3 or check_count % 5 == 0:
-                        print(f"[DEBUG] 进度检查 #{check_count}: msg='{current_msg}', last_sent='{last_sent}', updated={progress_data.get('updated', False)}")
-                    
-                    if current_msg and current_msg != last_sent:
-                        last_sent = current_msg
-                        print(f"[DEBUG] 准备发送进度到前端: {current_msg}")
-                        if context:
-                            try:
-                                await context.send_progress(f"🎬 {current_msg}")
-                                print(f"[DEBUG] 进度已发送到前端")
-                            except Exception as e:
-                                print(f"[DEBUG] 发送进度失败: {e}")
-                                import traceback
-                                traceback.print_exc()
-            except asyncio.CancelledError:
-                print(f"[DEBUG] 进度发送任务已取消，共检查 {check_count} 次")
-                raise
-        
-        # 启动进度发送任务
-        progress_task = asyncio.create_task(send_progress_periodically())
-        
-        # 在线程池中执行 stderr 读取
-        try:
-            return_code = await asyncio.wait_for(
-                loop.run_in_executor(None, read_stderr),
-                timeout=timeout
-            )
-            print(f"[DEBUG] FFmpeg 返回码: {return_code}")
-        except asyncio.TimeoutError:
-            print(f"[DEBUG] FFmpeg 执行超时")
-            if process.poll() is None:
-                process.terminate()
-                try:
-                    process.wait(timeout=2)
-                except:
-                    process.kill()
-            return False, "FFmpeg 执行超时"
-        except asyncio.CancelledError:
-            print(f"[DEBUG] FFmpeg 任务被取消")
-            if process.poll() is None:
-                process.terminate()
-                try:
-                    process.wait(timeout=2)
-                except:
-                    process.kill()
-            raise
-        finally:
-            progress_task.cancel()
-            try:
-                await progress_task
-            except asyncio.CancelledError:
-                pass
-        
-        if return_code == 0:
-            print(f"[DEBUG] FFmpeg 执行成功")
-            return True, ""
-        else:
-            error_msg = '\n'.join(stderr_output[-20:])  # 最后20行错误信息
-            print(f"[DEBUG] FFmpeg 执行失败: {error_msg}")
-            return False, error_msg
-            
-    except asyncio.CancelledError:
-        if process and process.poll() is None:
-            process.terminate()
-            try:
-                process.wait(timeout=2)
-            except:
-                process.kill()
-        raise
-    except Exception as e:
-        print(f"[DEBUG] FFmpeg 异常: {e}")
-        import traceback
-        traceback.print_exc()
-        if process and process.poll() is None:
-            process.terminate()
-        return False, str(e)
-    finally:
-        if pid is not None:
-            await ffmpeg_manager.unregister(pid)
-
-
-def run_ffmpeg(args: list, timeout: int = 600) -> tuple[bool, str]:
-    """运行ffmpeg命令（同步版本，用于简单操作）"""
-    ffmpeg = get_ffmpeg_path()
-    cmd = [ffmpeg, '-y'] + args  # -y 放在前面
-    
-    print(f"[DEBUG] 同步 FFmpeg 命令: {' '.join(cmd)}")
-    
-    process = None
-    try:
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            stdin=subprocess.PIPE,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        )
-        
-        stdout, stderr = process.communicate(timeout=timeout)
-        
-        if process.returncode == 0:
-            print(f"[DEBUG] 同步 FFmpeg 执行成功")
-            return True, stdout.decode('utf-8', errors='ignore')
-        else:
-            error_msg = stderr.decode('utf-8', errors='ignore')
-            print(f"[DEBUG] 同步 FFmpeg 执行失败: {error_msg[-500:]}")
-            return False, error_msg
-    except subprocess.TimeoutExpired:
-        if process:
-            process.terminate()
-            try:
-                process.wait(timeout=2)
-            except:
-                process.kill()
-        return False, "FFmpeg执行超时"
-    except Exception as e:
-        print(f"[DEBUG] 同步 FFmpeg 异常: {e}")
-        if process and process.poll() is None:
-            process.terminate()
-        return False, str(e)
+from .media_utils import (
+    get_media_duration,
+    run_ffmpeg_with_progress,
+    run_ffmpeg_async,
+    encode_segmented,
+)
+from ..services.ocr_service import get_ocr_service
 
 
 @register_executor
@@ -521,7 +131,7 @@ class CompressImageExecutor(ModuleExecutor):
             # 确保输出目录存在
             os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
             
-            # 构建ffmpeg命令（-y 会在 run_ffmpeg 中添加）
+            # 构建ffmpeg命令（-y 会在 run_ffmpeg_async 中添加）
             args = ['-i', input_path]
             
             # 构建缩放滤镜
@@ -550,9 +160,8 @@ class CompressImageExecutor(ModuleExecutor):
             # 发送开始处理的进度日志
             await context.send_progress(f"🖼️ 开始压缩图片...")
             
-            # 图片压缩通常很快，使用简单的同步执行
-            loop = asyncio.get_running_loop()
-            success, message = await loop.run_in_executor(None, lambda: run_ffmpeg(args))
+            # 图片压缩通常很快，不解析进度
+            success, message = await run_ffmpeg_async(args)
             
             if not success:
                 return ModuleResult(success=False, error=f"图片压缩失败: {message}")
@@ -611,19 +220,16 @@ class CompressVideoExecutor(ModuleExecutor):
             duration = get_media_duration(input_path)
             original_size = os.path.getsize(input_path)
             
-            # 构建ffmpeg命令（注意：-y 会在 run_ffmpeg_with_progress 中添加）
-            args = ['-i', input_path]
-            args.extend(['-c:v', 'libx264'])
-            args.extend(['-preset', preset])
-            args.extend(['-crf', str(crf)])
-            args.extend(['-c:a', 'aac'])
-            args.extend(['-b:a', '128k'])
+            # 编码参数（输入输出由 encode_segmented 添加，-y 会在执行时添加）
+            encode_args = ['-c:v', 'libx264']
+            encode_args.extend(['-preset', preset])
+            encode_args.extend(['-crf', str(crf)])
+            encode_args.extend(['-c:a', 'aac'])
+            encode_args.extend(['-b:a', '128k'])
             
             # 设置分辨率
             if resolution:
-                args.extend(['-s', resolution])
-            
-            args.append(output_path)
+                encode_args.extend(['-s', resolution])
             
             print(f"[DEBUG] 视频压缩参数: 输入={input_path}, 输出={output_path}, preset={preset}, crf={crf}")
             
@@ -633,11 +239,13 @@ class CompressVideoExecutor(ModuleExecutor):
             else:
                 await context.send_progress(f"🎬 开始压缩视频...")
             
-            # 使用带进度的 FFmpeg 执行
-            success, message = await run_ffmpeg_with_progress(
-                args, 
-                timeout=7200,  # 视频压缩可能需要很长时间
+            # 长视频分段并行编码，其余情况与普通带进度执行相同
+            success, message = await encode_segmented(
+                input_path,
+                output_path,
+                encode_args,
                 total_duration=duration,
+                timeout=7200,  # 视频压缩可能需要很长时间
                 context=context
             )
             
@@ -774,7 +382,7 @@ class TrimVideoExecutor(ModuleExecutor):
             # 确保输出目录存在
             os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
             
-            # 构建ffmpeg命令（-y 会在 run_ffmpeg 中添加）
+            # 构建ffmpeg命令（-y 会在 run_ffmpeg_async 中添加）
             args = ['-i', input_path]
             args.extend(['-ss', str(start_time)])
             
@@ -788,8 +396,7 @@ class TrimVideoExecutor(ModuleExecutor):
             await context.send_progress(f"🎬 开始裁剪视频 ({start_time} - {end_time or '结尾'})...")
             
             # 视频裁剪使用 copy 模式，通常很快
-            loop = asyncio.get_running_loop()
-            success, message = await loop.run_in_executor(None, lambda: run_ffmpeg(args))
+            success, message = await run_ffmpeg_async(args)
             
             if not success:
                 return ModuleResult(success=False, error=f"视频裁剪失败: {message}")
@@ -951,15 +558,14 @@ class MergeMediaExecutor(ModuleExecutor):
                     escaped_path = file_path.replace("'", "'\\''")
                     f.write(f"file '{escaped_path}'\n")
             
-            # 构建ffmpeg命令（-y 会在 run_ffmpeg 中添加）
+            # 构建ffmpeg命令（-y 会在 run_ffmpeg_async 中添加）
             args = ['-f', 'concat', '-safe', '0', '-i', list_file, '-c', 'copy', output_path]
             
             # 发送开始处理的进度日志
             await context.send_progress(f"🎬 开始合并 {len(input_files)} 个媒体文件...")
             
             # 媒体合并使用 copy 模式，通常较快
-            loop = asyncio.get_running_loop()
-            success, message = await loop.run_in_executor(None, lambda: run_ffmpeg(args))
+            success, message = await run_ffmpeg_async(args)
             
             if not success:
                 return ModuleResult(success=False, error=f"媒体合并失败: {message}")
@@ -1084,8 +690,7 @@ class AddWatermarkExecutor(ModuleExecutor):
                 )
             else:
                 await context.send_progress(f"🎬 开始添加水印...")
-                loop = asyncio.get_running_loop()
-                success, message = await loop.run_in_executor(None, lambda: run_ffmpeg(args, timeout=3600))
+                success, message = await run_ffmpeg_async(args, timeout=3600)
             
             if not success:
                 return ModuleResult(success=False, error=f"添加水印失败: {message}")
@@ -1199,17 +804,28 @@ class FaceRecognitionExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=f"人脸识别失败: {str(e)}")
 
 
-# 全局缓存 easyocr reader，避免每次重新加载模型
-_easyocr_reader = None
-_easyocr_lock = asyncio.Lock()
-
-def get_easyocr_reader():
-    """获取缓存的 easyocr reader"""
-    global _easyocr_reader
-    if _easyocr_reader is None:
-        import easyocr
-        _easyocr_reader = easyocr.Reader(['ch_sim', 'en'], gpu=False, verbose=False)
-    return _easyocr_reader
+def _ocr_image(pil_image, ocr_type: str) -> str:
+    """识别 PIL 图像（在 OCR 服务的工作线程中执行）"""
+    ocr = get_ocr_service()
+    if ocr_type == 'captcha':
+        # 验证码模式 - 使用 ddddocr
+        from PIL import Image, ImageEnhance
+        import io
+        gray_image = pil_image.convert('L')
+        enhancer = ImageEnhance.Contrast(gray_image)
+        enhanced_image = enhancer.enhance(1.5)
+        if enhanced_image.width < 200 or enhanced_image.height < 50:
+            scale = max(200 / enhanced_image.width, 50 / enhanced_image.height, 2)
+            new_size = (int(enhanced_image.width * scale), int(enhanced_image.height * scale))
+            enhanced_image = enhanced_image.resize(new_size, Image.Resampling.LANCZOS)
+        
+        img_bytes = io.BytesIO()
+        enhanced_image.save(img_bytes, format='PNG')
+        return ocr.classify_captcha(img_bytes.getvalue())
+    
+    # 通用OCR模式 - 使用 easyocr（支持中英文）
+    import numpy as np
+    return ocr.read_text(np.array(pil_image))
 
 
 @register_executor
@@ -1250,10 +866,9 @@ class ImageOCRExecutor(ModuleExecutor):
                 if y1 > y2:
                     y1, y2 = y2, y1
                 
-                def capture_and_ocr():
+                def capture():
                     import ctypes
-                    from PIL import Image, ImageEnhance
-                    import io
+                    from PIL import Image
                     import numpy as np
                     
                     # 设置 DPI 感知，确保坐标准确
@@ -1301,46 +916,11 @@ class ImageOCRExecutor(ModuleExecutor):
                         from PIL import ImageGrab
                         pil_image = ImageGrab.grab(bbox=(x1, y1, x2, y2))
                     
-                    if ocr_type == 'captcha':
-                        # 验证码模式 - 使用 ddddocr
-                        import ddddocr
-                        gray_image = pil_image.convert('L')
-                        enhancer = ImageEnhance.Contrast(gray_image)
-                        enhanced_image = enhancer.enhance(1.5)
-                        if enhanced_image.width < 200 or enhanced_image.height < 50:
-                            scale = max(200 / enhanced_image.width, 50 / enhanced_image.height, 2)
-                            new_size = (int(enhanced_image.width * scale), int(enhanced_image.height * scale))
-                            enhanced_image = enhanced_image.resize(new_size, Image.Resampling.LANCZOS)
-                        
-                        img_bytes = io.BytesIO()
-                        enhanced_image.save(img_bytes, format='PNG')
-                        image_bytes = img_bytes.getvalue()
-                        
-                        ocr = ddddocr.DdddOcr()
-                        result = ocr.classification(image_bytes)
-                        return result
-                    else:
-                        # 通用OCR模式 - 使用 easyocr
-                        import easyocr
-                        
-                        # 转换为 numpy 数组
-                        img_array = np.array(pil_image)
-                        
-                        # 创建 easyocr reader（支持中英文）
-                        reader = easyocr.Reader(['ch_sim', 'en'], gpu=False, verbose=False)
-                        
-                        # 识别
-                        results = reader.readtext(img_array)
-                        
-                        # 按位置排序（从上到下，从左到右）
-                        results_sorted = sorted(results, key=lambda x: (x[0][0][1], x[0][0][0]))
-                        
-                        # 提取文本
-                        texts = [item[1] for item in results_sorted]
-                        
-                        return '\n'.join(texts) if texts else ""
+                    return pil_image
                 
-                text = await loop.run_in_executor(None, capture_and_ocr)
+                pil_image = await loop.run_in_executor(None, capture)
+                ocr = get_ocr_service()
+                text = await ocr.run(_ocr_image, pil_image, ocr_type)
                 
                 if result_variable:
                     context.set_variable(result_variable, text)
@@ -1361,46 +941,14 @@ class ImageOCRExecutor(ModuleExecutor):
                 if not os.path.exists(image_path):
                     return ModuleResult(success=False, error=f"图片不存在: {image_path}")
                 
-                def do_ocr():
-                    from PIL import Image, ImageEnhance
-                    import io
-                    import numpy as np
-                    
+                def load_image():
+                    from PIL import Image
                     with Image.open(image_path) as img:
-                        pil_image = img.convert('RGB')
-                        
-                        if ocr_type == 'captcha':
-                            # 验证码模式 - 使用 ddddocr
-                            import ddddocr
-                            gray_image = pil_image.convert('L')
-                            enhancer = ImageEnhance.Contrast(gray_image)
-                            enhanced_image = enhancer.enhance(1.5)
-                            if enhanced_image.width < 200 or enhanced_image.height < 50:
-                                scale = max(200 / enhanced_image.width, 50 / enhanced_image.height, 2)
-                                new_size = (int(enhanced_image.width * scale), int(enhanced_image.height * scale))
-                                enhanced_image = enhanced_image.resize(new_size, Image.Resampling.LANCZOS)
-                            
-                            img_bytes = io.BytesIO()
-                            enhanced_image.save(img_bytes, format='PNG')
-                            image_bytes = img_bytes.getvalue()
-                            
-                            ocr = ddddocr.DdddOcr()
-                            result = ocr.classification(image_bytes)
-                            return result
-                        else:
-                            # 通用OCR模式 - 使用 easyocr
-                            import easyocr
-                            
-                            img_array = np.array(pil_image)
-                            reader = easyocr.Reader(['ch_sim', 'en'], gpu=False, verbose=False)
-                            results = reader.readtext(img_array)
-                            
-                            results_sorted = sorted(results, key=lambda x: (x[0][0][1], x[0][0][0]))
-                            texts = [item[1] for item in results_sorted]
-                            
-                            return '\n'.join(texts) if texts else ""
+                        return img.convert('RGB')
                 
-                text = await loop.run_in_executor(None, do_ocr)
+                pil_image = await loop.run_in_executor(None, load_image)
+                ocr = get_ocr_service()
+                text = await ocr.run(_ocr_image, pil_image, ocr_type)
                 
                 if result_variable:
                     context.set_variable(result_variable, text)
@@ -1411,8 +959,8 @@ class ImageOCRExecutor(ModuleExecutor):
                     data={'text': text, 'length': len(text)}
                 )
                 
-        except ImportError:
-            return ModuleResult(success=False, error="ddddocr库未安装，请运行: pip install ddddocr")
+        except ImportError as e:
+            return ModuleResult(success=False, error=str(e))
         except Exception as e:
             return ModuleResult(success=False, error=f"OCR识别失败: {str(e)}")
 
@@ -1645,9 +1193,8 @@ class ExtractFrameExecutor(ModuleExecutor):
             # 发送开始处理的进度日志
             await context.send_progress(f"🎬 开始提取视频帧（{timestamp}）...")
             
-            # 截取帧通常很快，使用同步执行
-            loop = asyncio.get_running_loop()
-            success, message = await loop.run_in_executor(None, lambda: run_ffmpeg(args, timeout=60))
+            # 截取帧通常很快，不解析进度
+            success, message = await run_ffmpeg_async(args, timeout=60)
             
             if not success:
                 return ModuleResult(success=False, error=f"提取视频帧失败: {message}")
@@ -1,338 +1,670 @@
-"""媒体处理工具函数 - FFmpeg相关"""
+"""媒体处理工具函数 - FFmpeg相关
+
+- FFmpegProcessManager 跟踪所有运行中的 FFmpeg 进程，工作流停止时统一终止
+- FFmpegJobScheduler 限制同时运行的 FFmpeg 任务数（默认按 CPU 核数），
+  通过子进程管道读取 -progress pipe:1 的输出计算进度
+- ffprobe 结果按 路径 + 修改时间 + 大小 缓存，同一文件不重复探测
+- 长视频可以分段并行编码，再用 concat 无损拼接
+"""
 import asyncio
+import json
 import os
 import subprocess
-import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
 from typing import Optional, Callable
 
-from .base import get_ffmpeg_path, get_ffprobe_path
+from .base import ExecutionContext, get_ffmpeg_path, get_ffprobe_path
+from app.utils.config import get_backend_config
+
+
+_CREATION_FLAGS = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+
+# 进度上报的最小间隔（秒）
+PROGRESS_REPORT_INTERVAL = 3
+# 失败时返回的 stderr 行数
+ERROR_TAIL_LINES = 20
+DEFAULT_PROBE_CACHE_SIZE = 256
+# 输入时长达到该值（秒）时分段并行编码，0 表示关闭（默认关闭，分段拼接可能在分段处
+# 产生细微的时间戳或画面差异，需要在 backend.ffmpeg.segmentMinDuration 中显式开启）
+DEFAULT_SEGMENT_MIN_DURATION = 0
+# 每段的最短时长（秒）
+MIN_SEGMENT_SECONDS = 60
+
+
+def _is_running(process) -> bool:
+    if isinstance(process, subprocess.Popen):
+        return process.poll() is None
+    return process.returncode is None
 
 
 # 全局进程管理器 - 跟踪所有运行中的 FFmpeg 进程
 class FFmpegProcessManager:
-    """FFmpeg 进程管理器，用于跟踪和清理进程"""
+    """FFmpeg 进程管理器，用于跟踪和清理进程（subprocess.Popen 或 asyncio 子进程）"""
     _instance = None
     _lock = asyncio.Lock()
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance._processes: dict[int, subprocess.Popen] = {}
+            cls._instance._processes = {}
             cls._instance._process_id = 0
         return cls._instance
-    
-    async def register(self, process: subprocess.Popen) -> int:
+
+    async def register(self, process) -> int:
         """注册一个新进程，返回进程ID"""
         async with self._lock:
             self._process_id += 1
             pid = self._process_id
             self._processes[pid] = process
             return pid
-    
+
     async def unregister(self, pid: int):
         """注销进程"""
         async with self._lock:
             if pid in self._processes:
                 del self._processes[pid]
-    
+
     async def terminate_all(self):
-        """终止所有正在运行的 FFmpeg 进程"""
+        """终止所有正在运行的 FFmpeg 进程（先 terminate，2 秒后仍未退出则 kill）"""
         async with self._lock:
-            for pid, process in list(self._processes.items()):
-                try:
-                    if process.poll() is None:
-                        process.terminate()
-                        try:
-                            process.wait(timeout=2)
-                        except subprocess.TimeoutExpired:
-                            process.kill()
-                except Exception as e:
-                    print(f"终止 FFmpeg 进程 {pid} 失败: {e}")
+            processes = list(self._processes.items())
             self._processes.clear()
-    
+
+        for pid, process in processes:
+            try:
+                if _is_running(process):
+                    process.terminate()
+            except Exception as e:
+                print(f"终止 FFmpeg 进程 {pid} 失败: {e}")
+
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline and any(_is_running(p) for _, p in processes):
+            await asyncio.sleep(0.1)
+
+        for pid, process in processes:
+            try:
+                if _is_running(process):
+                    process.kill()
+            except Exception as e:
+                print(f"强制结束 FFmpeg 进程 {pid} 失败: {e}")
+
     def get_running_count(self) -> int:
         """获取正在运行的进程数量"""
-        return sum(1 for p in self._processes.values() if p.poll() is None)
+        return sum(1 for p in self._processes.values() if _is_running(p))
 
 
 # 全局进程管理器实例
 ffmpeg_manager = FFmpegProcessManager()
 
 
-def get_media_duration(input_path: str) -> Optional[float]:
-    """获取媒体文件时长（秒）"""
+# ==================== 子进程 ====================
+
+class _ThreadedStream:
+    """在线程中读取管道，提供与 asyncio.StreamReader 相同的 readline()"""
+
+    def __init__(self, pipe, loop: asyncio.AbstractEventLoop):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._loop = loop
+        threading.Thread(target=self._pump, args=(pipe,), daemon=True).start()
+
+    def _pump(self, pipe):
+        try:
+            for line in iter(pipe.readline, b''):
+                self._put(line)
+        except Exception:
+            pass
+        finally:
+            self._put(b'')
+
+    def _put(self, line: bytes):
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, line)
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    async def readline(self) -> bytes:
+        return await self._queue.get()
+
+
+class _ThreadedProcess:
+    """事件循环不支持子进程时（Windows SelectorEventLoop）的替代实现"""
+
+    def __init__(self, process: subprocess.Popen):
+        loop = asyncio.get_running_loop()
+        self._process = process
+        self.pid = process.pid
+        self.stdout = _ThreadedStream(process.stdout, loop)
+        self.stderr = _ThreadedStream(process.stderr, loop)
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self._process.poll()
+
+    def terminate(self):
+        self._process.terminate()
+
+    def kill(self):
+        self._process.kill()
+
+    async def wait(self) -> int:
+        return await asyncio.get_running_loop().run_in_executor(None, self._process.wait)
+
+
+async def _spawn(cmd: list):
+    """启动 FFmpeg 子进程，stdout/stderr 均为管道"""
+    try:
+        return await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            creationflags=_CREATION_FLAGS,
+        )
+    except NotImplementedError:
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            creationflags=_CREATION_FLAGS,
+        )
+        return _ThreadedProcess(process)
+
+
+async def _stop(process):
+    """终止进程，2 秒内未退出则强制结束"""
+    if not _is_running(process):
+        return
+    try:
+        process.terminate()
+        await asyncio.wait_for(process.wait(), timeout=2)
+    except Exception:
+        try:
+            process.kill()
+        except Exception:
+            pass
+
+
+# ==================== 进度 ====================
+
+def _format_clock(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class FFmpegProgress:
+    """汇总一个或多个 FFmpeg 任务（分段编码时每段一个）的进度，节流后回调并发送到前端"""
+
+    def __init__(
+        self,
+        total_duration: Optional[float] = None,
+        on_progress: Optional[Callable[[float, str], None]] = None,
+        context: Optional['ExecutionContext'] = None,
+    ):
+        self.total_duration = total_duration if total_duration and total_duration > 0 else None
+        self.on_progress = on_progress
+        self.context = context
+        self._parts: dict[int, float] = {}
+        self._start_time = time.monotonic()
+        self._last_report = float('-inf')
+        self._last_sent = ''
+
+    async def update(self, processed: float, stats: dict, part: int = 0):
+        """processed 为该任务已输出的时长（秒），stats 为 -progress 的最后一组键值"""
+        self._parts[part] = processed
+        now = time.monotonic()
+        if now - self._last_report < PROGRESS_REPORT_INTERVAL:
+            return
+        self._last_report = now
+
+        done = sum(self._parts.values())
+        elapsed = now - self._start_time
+        if self.total_duration:
+            percent = min(99.9, done / self.total_duration * 100)
+            if percent > 0:
+                eta = elapsed / percent * (100 - percent)
+                msg = f"处理中 {percent:.1f}%，预计剩余 {eta:.0f}秒"
+            else:
+                msg = "处理中..."
+        else:
+            percent = 0
+            msg_parts = [f"已处理 {_format_clock(done)}"]
+            size = stats.get('total_size', '')
+            if size.isdigit():
+                size_kb = int(size) / 1024
+                msg_parts.append(f"大小 {size_kb:.0f}KB" if size_kb < 1024 else f"大小 {size_kb / 1024:.1f}MB")
+            speed = stats.get('speed', '').rstrip('x').strip()
+            try:
+                msg_parts.append(f"速度 {float(speed):.1f}x")
+            except ValueError:
+                pass
+            bitrate = stats.get('bitrate', '').replace('kbits/s', '').strip()
+            try:
+                bitrate_value = float(bitrate)
+                msg_parts.append(f"码率 {bitrate_value:.0f}kbps" if bitrate_value < 1024 else f"码率 {bitrate_value / 1024:.1f}Mbps")
+            except ValueError:
+                pass
+            msg = "，".join(msg_parts)
+
+        print(f"[DEBUG] FFmpeg 进度: {msg}")
+        if self.on_progress:
+            self.on_progress(percent, msg)
+        if self.context and msg != self._last_sent:
+            self._last_sent = msg
+            try:
+                await self.context.send_progress(f"🎬 {msg}")
+            except Exception as e:
+                print(f"[DEBUG] 发送进度失败: {e}")
+
+
+def _out_time_seconds(stats: dict) -> Optional[float]:
+    """从 -progress 输出中取已输出的时长（out_time_us，旧版本 FFmpeg 的 out_time_ms 同样是微秒）"""
+    for key in ('out_time_us', 'out_time_ms'):
+        value = stats.get(key, '')
+        if value.lstrip('-').isdigit():
+            return max(0, int(value)) / 1_000_000
+    return None
+
+
+# ==================== 任务调度 ====================
+
+class FFmpegJobScheduler:
+    """FFmpeg 任务调度器：限制同时运行的 FFmpeg 进程数，超出的任务排队等待"""
+
+    def __init__(self, max_jobs: int, segment_min_duration: float = DEFAULT_SEGMENT_MIN_DURATION):
+        self.max_jobs = max(1, int(max_jobs))
+        self.segment_min_duration = segment_min_duration
+        self._semaphore = asyncio.Semaphore(self.max_jobs)
+        self.running = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def run(
+        self,
+        args: list,
+        timeout: float = 600,
+        progress: Optional[FFmpegProgress] = None,
+        part: int = 0,
+        context: Optional['ExecutionContext'] = None,
+    ) -> tuple[bool, str]:
+        """
+        排队运行一个 FFmpeg 任务
+
+        Args:
+            args: ffmpeg 参数列表（不含 ffmpeg 本身和 -y）
+            timeout: 超时时间（秒），从开始运行时计算，不含排队时间
+            progress: 进度汇总对象，为 None 时不解析进度
+            part: 分段编码时的段序号
+            context: 执行上下文，排队时发送等待提示
+
+        Returns:
+            (success, message) - 成功时 message 为 stdout 输出（未解析进度时），失败时为 stderr 最后几行
+        """
+        if self._semaphore.locked() and context:
+            try:
+                await context.send_progress(f"⏳ 等待 FFmpeg 空闲（{self.running}/{self.max_jobs} 个任务运行中）...")
+            except Exception:
+                pass
+
+        self.queued += 1
+        acquired = False
+        try:
+            await self._semaphore.acquire()
+            acquired = True
+            self.queued -= 1
+            self.running += 1
+            success, message = await self._execute(args, timeout, progress, part)
+            if success:
+                self.completed += 1
+            else:
+                self.failed += 1
+            return success, message
+        finally:
+            if acquired:
+                self.running -= 1
+                self._semaphore.release()
+            else:
+                self.queued -= 1
+
+    async def _execute(self, args: list, timeout: float, progress: Optional[FFmpegProgress], part: int) -> tuple[bool, str]:
+        cmd = [get_ffmpeg_path(), '-y']
+        if progress is not None:
+            cmd += ['-progress', 'pipe:1', '-nostats']
+        cmd += args
+        print(f"[DEBUG] FFmpeg 命令: {' '.join(cmd)}")
+
+        process = await _spawn(cmd)
+        pid = await ffmpeg_manager.register(process)
+        stderr_tail: deque = deque(maxlen=ERROR_TAIL_LINES)
+        stdout_lines: list = []
+
+        async def read_stderr():
+            while True:
+                line = await process.stderr.readline()
+                if not line:
+                    break
+                text = line.decode('utf-8', errors='ignore').strip()
+                if text:
+                    stderr_tail.append(text)
+
+        async def read_stdout():
+            stats: dict = {}
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                text = line.decode('utf-8', errors='ignore').strip()
+                if progress is None:
+                    stdout_lines.append(text)
+                    continue
+                key, sep, value = text.partition('=')
+                if not sep:
+                    continue
+                stats[key] = value.strip()
+                # 每组进度以 progress=continue/end 结束
+                if key == 'progress':
+                    processed = _out_time_seconds(stats)
+                    if processed is not None:
+                        await progress.update(processed, stats, part)
+                    stats = {}
+
+        readers = asyncio.gather(read_stdout(), read_stderr())
+        # 超时或取消时读取任务随之取消，取走结果避免“exception was never retrieved”
+        readers.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            await asyncio.wait_for(readers, timeout=timeout)
+            return_code = await process.wait()
+        except asyncio.TimeoutError:
+            print("[DEBUG] FFmpeg 执行超时")
+            await _stop(process)
+            return False, "FFmpeg 执行超时"
+        except asyncio.CancelledError:
+            print("[DEBUG] FFmpeg 任务被取消")
+            await _stop(process)
+            raise
+        finally:
+            await ffmpeg_manager.unregister(pid)
+
+        if return_code == 0:
+            return True, '\n'.join(stdout_lines)
+        error_msg = '\n'.join(stderr_tail)
+        print(f"[DEBUG] FFmpeg 执行失败 (返回码 {return_code}): {error_msg[-500:]}")
+        return False, error_msg
+
+    def segment_count(self, duration: Optional[float]) -> int:
+        """输入时长对应的分段数，1 表示不分段"""
+        if not duration or self.max_jobs < 2 or self.segment_min_duration <= 0:
+            return 1
+        if duration < self.segment_min_duration:
+            return 1
+        return max(1, min(self.max_jobs, int(duration // MIN_SEGMENT_SECONDS)))
+
+    def get_stats(self) -> dict:
+        return {
+            'maxJobs': self.max_jobs,
+            'running': self.running,
+            'queued': self.queued,
+            'completed': self.completed,
+            'failed': self.failed,
+            'probeCache': get_probe_cache().get_stats(),
+        }
+
+
+_scheduler: Optional[FFmpegJobScheduler] = None
+
+
+def get_ffmpeg_scheduler() -> FFmpegJobScheduler:
+    """获取 FFmpeg 任务调度器单例
+
+    配置项（WebRPAConfig.json 的 backend.ffmpeg）：
+        maxJobs: 同时运行的 FFmpeg 进程数，默认 CPU 核数的一半（1-4）
+        probeCacheSize: 缓存的 ffprobe 结果数量
+        segmentMinDuration: 输入时长达到该值（秒）时分段并行编码，默认 0 表示关闭，
+            例如设为 600 时对 10 分钟以上的视频分段编码
+    """
+    global _scheduler
+    if _scheduler is None:
+        ffmpeg_config = get_backend_config().get('ffmpeg', {}) or {}
+        default_jobs = max(1, min(4, (os.cpu_count() or 2) // 2))
+        _scheduler = FFmpegJobScheduler(
+            max_jobs=ffmpeg_config.get('maxJobs', default_jobs),
+            segment_min_duration=ffmpeg_config.get('segmentMinDuration', DEFAULT_SEGMENT_MIN_DURATION),
+        )
+    return _scheduler
+
+
+# ==================== ffprobe 缓存 ====================
+
+class MediaProbeCache:
+    """ffprobe 结果缓存，文件修改时间或大小变化后重新探测"""
+
+    def __init__(self, max_entries: int = DEFAULT_PROBE_CACHE_SIZE):
+        self.max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, input_path: str) -> Optional[dict]:
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            # 网络地址等无法 stat 的输入不缓存
+            return _run_ffprobe(input_path)
+
+        key = os.path.abspath(input_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        info = _run_ffprobe(input_path)
+        if info is not None:
+            with self._lock:
+                self._entries[key] = (signature, info)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return info
+
+    def get_stats(self) -> dict:
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+_probe_cache: Optional[MediaProbeCache] = None
+
+
+def get_probe_cache() -> MediaProbeCache:
+    global _probe_cache
+    if _probe_cache is None:
+        ffmpeg_config = get_backend_config().get('ffmpeg', {}) or {}
+        _probe_cache = MediaProbeCache(ffmpeg_config.get('probeCacheSize', DEFAULT_PROBE_CACHE_SIZE))
+    return _probe_cache
+
+
+def _run_ffprobe(input_path: str) -> Optional[dict]:
     ffprobe = get_ffprobe_path()
-    print(f"[DEBUG] 获取媒体时长: {input_path}")
     try:
         result = subprocess.run(
-            [ffprobe, '-v', 'error', '-show_entries', 'format=duration',
-             '-of', 'default=noprint_wrappers=1:nokey=1', input_path],
+            [ffprobe, '-v', 'error', '-show_format', '-show_streams', '-of', 'json', input_path],
             capture_output=True,
             text=True,
+            encoding='utf-8',
+            errors='ignore',
             timeout=30,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+            creationflags=_CREATION_FLAGS
         )
         if result.returncode == 0 and result.stdout.strip():
-            duration = float(result.stdout.strip())
+            return json.loads(result.stdout)
+        print(f"[DEBUG] ffprobe 失败: returncode={result.returncode}, stderr={result.stderr}")
+    except Exception as e:
+        print(f"[DEBUG] ffprobe 异常: {e}")
+    return None
+
+
+def probe_media(input_path: str) -> Optional[dict]:
+    """获取媒体文件的 ffprobe 信息（format 和 streams），结果按文件修改时间缓存"""
+    return get_probe_cache().probe(input_path)
+
+
+def get_media_duration(input_path: str) -> Optional[float]:
+    """获取媒体文件时长（秒）"""
+    info = probe_media(input_path)
+    if not info:
+        return None
+    durations = [info.get('format', {}).get('duration')]
+    durations += [stream.get('duration') for stream in info.get('streams', [])]
+    for value in durations:
+        try:
+            duration = float(value)
+        except (TypeError, ValueError):
+            continue
+        if duration > 0:
             print(f"[DEBUG] 媒体时长: {duration} 秒")
             return duration
-        else:
-            print(f"[DEBUG] 获取时长失败: returncode={result.returncode}, stderr={result.stderr}")
-    except Exception as e:
-        print(f"[DEBUG] 获取时长异常: {e}")
     return None
 
 
+# ==================== 对外接口 ====================
+
 async def run_ffmpeg_with_progress(
-    args: list, 
+    args: list,
     timeout: int = 600,
     on_progress: Optional[Callable[[float, str], None]] = None,
     total_duration: Optional[float] = None,
     context: Optional['ExecutionContext'] = None
 ) -> tuple[bool, str]:
     """
-    运行 ffmpeg 命令，支持进度回调
-    
+    运行 ffmpeg 命令，支持进度回调（经过任务调度器排队）
+
     Args:
         args: ffmpeg 参数列表
         timeout: 超时时间（秒）
         on_progress: 进度回调函数 (progress_percent, status_message) - 同步回调
         total_duration: 总时长（秒），用于计算进度
         context: 执行上下文，用于发送进度日志到前端
-    
+
     Returns:
         (success, message)
     """
-    import time as time_module
-    
-    ffmpeg = get_ffmpeg_path()
-    print(f"[DEBUG] FFmpeg 路径: {ffmpeg}")
-    print(f"[DEBUG] FFmpeg 参数: {args}")
-    
-    cmd = [ffmpeg, '-y'] + args
-    print(f"[DEBUG] 完整命令: {' '.join(cmd)}")
-    
-    process = None
-    pid = None
-    stderr_output = []
-    last_progress_msg = ['']
-    
+    progress = FFmpegProgress(total_duration, on_progress, context)
     try:
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            stdin=subprocess.PIPE,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        )
-        
-        print(f"[DEBUG] FFmpeg 进程已启动, PID: {process.pid}")
-        pid = await ffmpeg_manager.register(process)
-        
-        loop = asyncio.get_running_loop()
-        start_time = time_module.time()
-        progress_data = {'percent': 0, 'msg': '', 'updated': False}
-        
-        def read_stderr():
-            """读取 stderr 输出"""
-            last_update_time = -10
-            buffer = ""
-            line_count = 0
-            
-            try:
-                while True:
-                    char = process.stderr.read(1)
-                    if not char:
-                        break
-                    
-                    char_str = char.decode('utf-8', errors='ignore')
-                    
-                    if char_str == '\r' or char_str == '\n':
-                        line_str = buffer.strip()
-                        buffer = ""
-                        
-                        if not line_str:
-                            continue
-                        
-                        line_count += 1
-                        stderr_output.append(line_str)
-                        
-                        if line_count <= 5 or line_count % 50 == 0:
-                            print(f"[DEBUG] FFmpeg 输出 #{line_count}: {line_str[:100]}")
-                        
-                        size_match = re.search(r'size=\s*(\d+)kB', line_str)
-                        time_match = re.search(r'time=(\d+):(\d+):(\d+\.?\d*)', line_str)
-                        speed_match = re.search(r'speed=\s*([\d.]+)x', line_str)
-                        bitrate_match = re.search(r'bitrate=\s*([\d.]+)kbits/s', line_str)
-                        
-                        if time_match:
-                            hours = int(time_match.group(1))
-                            minutes = int(time_match.group(2))
-                            seconds = float(time_match.group(3))
-                            current_time = hours * 3600 + minutes * 60 + seconds
-                            
-                            if total_duration and total_duration > 0:
-                                progress = min(99.9, (current_time / total_duration) * 100)
-                                elapsed = time_module.time() - start_time
-                                
-                                if elapsed - last_update_time >= 3:
-                                    last_update_time = elapsed
-                                    if progress > 0:
-                                        eta = (elapsed / progress) * (100 - progress)
-                                        msg = f"处理中 {progress:.1f}%，预计剩余 {eta:.0f}秒"
-                                    else:
-                                        msg = "处理中..."
-                                    
-                                    progress_data['percent'] = progress
-                                    progress_data['msg'] = msg
-                                    progress_data['updated'] = True
-                                    last_progress_msg[0] = msg
-                                    print(f"[DEBUG] FFmpeg 进度: {msg}")
-                                    
-                                    if on_progress:
-                                        on_progress(progress, msg)
-                            else:
-                                elapsed = time_module.time() - start_time
-                                if elapsed - last_update_time >= 3:
-                                    last_update_time = elapsed
-                                    time_str = f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
-                                    msg_parts = [f"已处理 {time_str}"]
-                                    
-                                    if size_match:
-                                        size_kb = int(size_match.group(1))
-                                        if size_kb < 1024:
-                                            msg_parts.append(f"大小 {size_kb}KB")
-                                        else:
-                                            msg_parts.append(f"大小 {size_kb/1024:.1f}MB")
-                                    
-                                    if speed_match:
-                                        speed = float(speed_match.group(1))
-                                        msg_parts.append(f"速度 {speed:.1f}x")
-                                    
-                                    if bitrate_match:
-                                        bitrate = float(bitrate_match.group(1))
-                                        if bitrate < 1024:
-                                            msg_parts.append(f"码率 {bitrate:.0f}kbps")
-                                        else:
-                                            msg_parts.append(f"码率 {bitrate/1024:.1f}Mbps")
-                                    
-                                    msg = "，".join(msg_parts)
-                                    progress_data['msg'] = msg
-                                    progress_data['updated'] = True
-                                    last_progress_msg[0] = msg
-                                    print(f"[DEBUG] FFmpeg 进度: {msg}")
-                                    
-                                    if on_progress:
-                                        on_progress(0, msg)
-                        
-                        if 'error' in line_str.lower() or 'invalid' in line_str.lower():
-                            print(f"[DEBUG] FFmpeg 可能的错误: {line_str}")
-                    else:
-                        buffer += char_str
-                
-                print(f"[DEBUG] FFmpeg stderr 读取完成，共 {line_count} 行")
-                        
-            except Exception as e:
-                print(f"[DEBUG] 读取 stderr 异常: {e}")
-                import traceback
-                traceback.print_exc()
-            
-            return process.wait()
-        
-        async def send_progress_periodically():
-            """定期发送进度更新到前端"""
-            last_sent = ''
-            check_count = 0
-            try:
-                while True:
-                    await asyncio.sleep(2)
-                    check_count += 1
-                    current_msg = last_progress_msg[0]
-                    
-                    if check_count <= 3 or check_count % 5 == 0:
-                        print(f"[DEBUG] 进度检查 #{check_count}: msg='{current_msg}', last_sent='{last_sent}'")
-                    
-                    if current_msg and current_msg != last_sent:
-                        last_sent = current_msg
-                        print(f"[DEBUG] 准备发送进度到前端: {current_msg}")
-                        if context:
-                            try:
-                                await context.send_progress(f"🎬 {current_msg}")
-                                print(f"[DEBUG] 进度已发送到前端")
-                            except Exception as e:
-                                print(f"[DEBUG] 发送进度失败: {e}")
-            except asyncio.CancelledError:
-                print(f"[DEBUG] 进度发送任务已取消，共检查 {check_count} 次")
-                raise
-        
-        progress_task = asyncio.create_task(send_progress_periodically())
-        
-        try:
-            return_code = await asyncio.wait_for(
-                loop.run_in_executor(None, read_stderr),
-                timeout=timeout
-            )
-            print(f"[DEBUG] FFmpeg 返回码: {return_code}")
-        except asyncio.TimeoutError:
-            print(f"[DEBUG] FFmpeg 执行超时")
-            if process.poll() is None:
-                process.terminate()
-                try:
-                    process.wait(timeout=2)
-                except:
-                    process.kill()
-            return False, "FFmpeg 执行超时"
-        except asyncio.CancelledError:
-            print(f"[DEBUG] FFmpeg 任务被取消")
-            if process.poll() is None:
-                process.terminate()
-                try:
-                    process.wait(timeout=2)
-                except:
-                    process.kill()
-            raise
-        finally:
-            progress_task.cancel()
-            try:
-                await progress_task
-            except asyncio.CancelledError:
-                pass
-        
-        if return_code == 0:
-            print(f"[DEBUG] FFmpeg 执行成功")
-            return True, ""
-        else:
-            error_msg = '\n'.join(stderr_output[-20:])
-            print(f"[DEBUG] FFmpeg 执行失败: {error_msg}")
-            return False, error_msg
-            
+        success, message = await get_ffmpeg_scheduler().run(args, timeout, progress=progress, context=context)
     except asyncio.CancelledError:
-        if process and process.poll() is None:
-            process.terminate()
-            try:
-                process.wait(timeout=2)
-            except:
-                process.kill()
         raise
     except Exception as e:
         print(f"[DEBUG] FFmpeg 异常: {e}")
-        import traceback
-        traceback.print_exc()
-        if process and process.poll() is None:
-            process.terminate()
         return False, str(e)
-    finally:
-        if pid is not None:
-            await ffmpeg_manager.unregister(pid)
+    return success, "" if success else message
+
+
+async def run_ffmpeg_async(args: list, timeout: int = 600, context: Optional['ExecutionContext'] = None) -> tuple[bool, str]:
+    """运行 ffmpeg 命令（不解析进度，用于简单操作），返回值与 run_ffmpeg 相同"""
+    try:
+        return await get_ffmpeg_scheduler().run(args, timeout, context=context)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[DEBUG] FFmpeg 异常: {e}")
+        return False, str(e)
+
+
+async def encode_segmented(
+    input_path: str,
+    output_path: str,
+    encode_args: list,
+    total_duration: Optional[float],
+    timeout: int = 7200,
+    context: Optional['ExecutionContext'] = None,
+    on_progress: Optional[Callable[[float, str], None]] = None,
+) -> tuple[bool, str]:
+    """
+    重新编码一个媒体文件，输入足够长时分段并行编码后用 concat 无损拼接
+
+    只适用于重新编码（不能是 -c copy，也不能含依赖时间轴的滤镜如淡入淡出），
+    每段使用精确定位（-ss 放在 -i 之前，转码时 FFmpeg 默认逐帧精确定位）。
+
+    Args:
+        encode_args: 编码参数（不含 -i 输入和输出路径）
+    """
+    scheduler = get_ffmpeg_scheduler()
+    count = scheduler.segment_count(total_duration)
+    if count <= 1:
+        return await run_ffmpeg_with_progress(
+            ['-i', input_path] + encode_args + [output_path],
+            timeout=timeout,
+            on_progress=on_progress,
+            total_duration=total_duration,
+            context=context,
+        )
+
+    # 多段同时编码时平分 CPU 线程，避免互相抢占
+    segment_args = list(encode_args)
+    if '-threads' not in segment_args:
+        segment_args += ['-threads', str(max(1, (os.cpu_count() or 1) // min(count, scheduler.max_jobs)))]
+
+    if context:
+        await context.send_progress(f"🎬 输入时长 {total_duration:.0f} 秒，分 {count} 段并行编码...")
+
+    ext = os.path.splitext(output_path)[1] or '.mp4'
+    progress = FFmpegProgress(total_duration, on_progress, context)
+    length = total_duration / count
+
+    with tempfile.TemporaryDirectory(prefix='webrpa_segments_', ignore_cleanup_errors=True) as work_dir:
+        segment_paths = []
+        tasks = []
+        for index in range(count):
+            segment_path = os.path.join(work_dir, f'part{index:03d}{ext}')
+            segment_paths.append(segment_path)
+            args = ['-ss', f'{index * length:.3f}', '-i', input_path]
+            if index < count - 1:
+                args += ['-t', f'{length:.3f}']
+            args += segment_args + ['-avoid_negative_ts', 'make_zero', segment_path]
+            tasks.append(asyncio.create_task(scheduler.run(args, timeout, progress=progress, part=index)))
+
+        try:
+            for finished in asyncio.as_completed(tasks):
+                success, message = await finished
+                if not success:
+                    return False, f"分段编码失败: {message}"
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        list_path = os.path.join(work_dir, 'segments.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for segment_path in segment_paths:
+                escaped = Path(segment_path).as_posix().replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        if context:
+            await context.send_progress(f"🎬 {count} 段编码完成，正在合并...")
+        success, message = await scheduler.run(
+            ['-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy', output_path],
+            timeout,
+        )
+        if not success:
+            return False, f"合并分段失败: {message}"
+    return True, ""
 
 
 def run_ffmpeg(args: list, timeout: int = 600) -> tuple[bool, str]:
-    """运行ffmpeg命令（同步版本，用于简单操作）"""
+    """运行ffmpeg命令（同步版本，不经过任务调度器；异步代码中请使用 run_ffmpeg_async）"""
     ffmpeg = get_ffmpeg_path()
     cmd = [ffmpeg, '-y'] + args
-    
+
     print(f"[DEBUG] 同步 FFmpeg 命令: {' '.join(cmd)}")
-    
+
     process = None
     try:
         process = subprocess.Popen(
@@ -340,11 +672,11 @@ def run_ffmpeg(args: list, timeout: int = 600) -> tuple[bool, str]:
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             stdin=subprocess.PIPE,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+            creationflags=_CREATION_FLAGS
         )
-        
+
         stdout, stderr = process.communicate(timeout=timeout)
-        
+
         if process.returncode == 0:
             print(f"[DEBUG] 同步 FFmpeg 执行成功")
             return True, stdout.decode('utf-8', errors='ignore')
@@ -16,7 +16,6 @@
 
 使用 pypdf 库替代 PyMuPDF，完全符合 MIT 许可证
 """
-import asyncio
 import os
 from typing import List
 from pypdf import PdfReader, PdfWriter, Transformation
@@ -25,6 +24,7 @@ from PIL import Image
 import io
 
 from .base import ModuleExecutor, ExecutionContext, ModuleResult, register_executor
+from app.services.worker_pool import run_in_worker, KIND_PROCESS
 
 
 def ensure_pdf_libs():
@@ -93,8 +93,7 @@ class PDFMergeExecutor(ModuleExecutor):
                 return ModuleResult(success=False, error=f"PDF文件不存在: {pdf_path}")
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._merge, pdf_paths, output_path)
+            result = await run_in_worker(self._merge, pdf_paths, output_path, kind=KIND_PROCESS)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -152,9 +151,8 @@ class PDFSplitExecutor(ModuleExecutor):
         os.makedirs(output_dir, exist_ok=True)
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, self._split, pdf_path, output_dir, split_mode, page_ranges
+            result = await run_in_worker(
+                self._split, pdf_path, output_dir, split_mode, page_ranges, kind=KIND_PROCESS
             )
             
             if result_variable:
@@ -234,8 +232,7 @@ class PDFExtractTextExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=f"PDF文件不存在: {pdf_path}")
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._extract, pdf_path, page_range, output_path)
+            result = await run_in_worker(self._extract, pdf_path, page_range, output_path, kind=KIND_PROCESS)
             
             if result_variable:
                 context.set_variable(result_variable, result['text'])
@@ -301,8 +298,7 @@ class PDFExtractImagesExecutor(ModuleExecutor):
         os.makedirs(output_dir, exist_ok=True)
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._extract, pdf_path, output_dir, min_size)
+            result = await run_in_worker(self._extract, pdf_path, output_dir, min_size, kind=KIND_PROCESS)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -416,9 +412,8 @@ class PDFEncryptExecutor(ModuleExecutor):
             output_path = f"{base}_encrypted{ext}"
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, self._encrypt, pdf_path, output_path, user_password, owner_password, permissions
+            result = await run_in_worker(
+                self._encrypt, pdf_path, output_path, user_password, owner_password, permissions, kind=KIND_PROCESS
             )
             
             if result_variable:
@@ -481,8 +476,7 @@ class PDFDecryptExecutor(ModuleExecutor):
             output_path = f"{base}_decrypted{ext}"
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._decrypt, pdf_path, password, output_path)
+            result = await run_in_worker(self._decrypt, pdf_path, password, output_path, kind=KIND_PROCESS)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -548,10 +542,9 @@ class PDFAddWatermarkExecutor(ModuleExecutor):
             output_path = f"{base}_watermarked{ext}"
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, self._add_watermark, pdf_path, output_path, watermark_type,
-                watermark_text, watermark_image, opacity, position, font_size, color
+            result = await run_in_worker(
+                self._add_watermark, pdf_path, output_path, watermark_type,
+                watermark_text, watermark_image, opacity, position, font_size, color, kind=KIND_PROCESS
             )
             
             if result_variable:
@@ -671,8 +664,7 @@ class PDFRotateExecutor(ModuleExecutor):
             output_path = f"{base}_rotated{ext}"
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._rotate, pdf_path, output_path, rotation, page_range)
+            result = await run_in_worker(self._rotate, pdf_path, output_path, rotation, page_range, kind=KIND_PROCESS)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -728,8 +720,7 @@ class PDFDeletePagesExecutor(ModuleExecutor):
             output_path = f"{base}_modified{ext}"
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._delete, pdf_path, output_path, page_range)
+            result = await run_in_worker(self._delete, pdf_path, output_path, page_range, kind=KIND_PROCESS)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -783,8 +774,7 @@ class PDFGetInfoExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=f"PDF文件不存在: {pdf_path}")
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._get_info, pdf_path, password)
+            result = await run_in_worker(self._get_info, pdf_path, password, kind=KIND_PROCESS)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -864,8 +854,7 @@ class PDFCompressExecutor(ModuleExecutor):
             output_path = f"{base}_compressed{ext}"
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._compress, pdf_path, output_path, image_quality)
+            result = await run_in_worker(self._compress, pdf_path, output_path, image_quality, kind=KIND_PROCESS)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -940,8 +929,7 @@ class PDFInsertPagesExecutor(ModuleExecutor):
             output_path = f"{base}_inserted{ext}"
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._insert, pdf_path, insert_pdf, output_path, insert_position)
+            result = await run_in_worker(self._insert, pdf_path, insert_pdf, output_path, insert_position, kind=KIND_PROCESS)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -1018,8 +1006,7 @@ class PDFReorderPagesExecutor(ModuleExecutor):
             output_path = f"{base}_reordered{ext}"
         
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._reorder, pdf_path, output_path, page_order)
+            result = await run_in_worker(self._reorder, pdf_path, output_path, page_order, kind=KIND_PROCESS)
             
             if result_variable:
                 context.set_variable(result_variable, result)
@@ -2,12 +2,11 @@
 from .base import ModuleExecutor, ExecutionContext, ModuleResult, register_executor
 from .phone_utils import ensure_phone_connected
 from ..services.adb_manager import get_adb_manager
+from ..services.ocr_service import get_ocr_service, match_text
 from .type_utils import to_int, to_float
 from pathlib import Path
 import asyncio
-import tempfile
 import time
-import os
 
 
 @register_executor
@@ -37,8 +36,7 @@ class PhoneClickImageExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=error)
         
         try:
-            import cv2
-            import numpy as np
+            from app.services.vision_service import Frame, get_vision_service
         except ImportError:
             return ModuleResult(
                 success=False,
@@ -48,13 +46,14 @@ class PhoneClickImageExecutor(ModuleExecutor):
         try:
             adb = get_adb_manager()
             
-            # 读取模板图像
-            template = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            vision = get_vision_service()
+            
+            # 读取模板图像（解码结果按文件修改时间缓存）
+            template = vision.load_template(image_path)
             if template is None:
                 return ModuleResult(success=False, error="无法读取图像文件，请检查图像格式")
             
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-            h, w = template_gray.shape
+            w, h = template.width, template.height
             
             context.log(f"📐 模板图像尺寸: {w}x{h}")
             
@@ -64,66 +63,56 @@ class PhoneClickImageExecutor(ModuleExecutor):
             best_confidence = 0
             check_count = 0
             
-            # 创建临时目录保存截图
-            with tempfile.TemporaryDirectory() as temp_dir:
-                screenshot_path = os.path.join(temp_dir, 'phone_screenshot.png')
+            while time.time() - start_time < wait_timeout:
+                check_count += 1
                 
-                while time.time() - start_time < wait_timeout:
-                    check_count += 1
-                    
-                    # 截取手机屏幕
-                    success, error = adb.screenshot(screenshot_path, device_id)
-                    if not success:
-                        return ModuleResult(success=False, error=f"截取手机屏幕失败: {error}")
-                    
-                    # 读取截图
-                    screen = cv2.imread(screenshot_path)
-                    if screen is None:
-                        await asyncio.sleep(0.3)
-                        continue
-                    
-                    screen_gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
-                    screen_h, screen_w = screen_gray.shape
-                    
-                    # 第一次循环时输出屏幕尺寸
-                    if check_count == 1:
-                        context.log(f"📱 手机屏幕截图尺寸: {screen_w}x{screen_h}")
-                    
-                    # 检查模板是否大于屏幕
-                    if w > screen_w or h > screen_h:
-                        return ModuleResult(
-                            success=False,
-                            error=f"❌ 模板图像 ({w}x{h}) 大于手机屏幕 ({screen_w}x{screen_h})，请截取更小的区域作为模板"
-                        )
-                    
-                    # 模板匹配
-                    result = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                    
-                    # 更新并输出当前最高匹配度
-                    if max_val > best_confidence:
-                        best_confidence = max_val
-                        context.log(f"🔍 第{check_count}次检测 - 当前最高匹配度: {best_confidence:.2%} (阈值: {confidence:.2%})")
-                    
-                    if max_val >= confidence:
-                        # 找到匹配
-                        img_left = max_loc[0]
-                        img_top = max_loc[1]
-                        img_right = img_left + w
-                        img_bottom = img_top + h
-                        
-                        # 根据点击位置计算坐标
-                        click_x, click_y = self._calculate_click_position(
-                            click_position, img_left, img_top, img_right, img_bottom, w, h
-                        )
-                        
-                        best_confidence = max_val
-                        found = True
-                        context.log(f"✅ 找到匹配！位置: ({img_left}, {img_top}), 匹配度: {best_confidence:.2%}")
-                        break
-                    
-                    await asyncio.sleep(0.3)
-            
+                # 截取手机屏幕（原始像素直接读入内存，不经过PNG编码和临时文件）
+                success, screen, error = adb.capture_screen(device_id)
+                if not success:
+                    return ModuleResult(success=False, error=f"截取手机屏幕失败: {error}")
+                
+                frame = Frame.from_rgba(screen)
+                screen_h, screen_w = frame.height, frame.width
+                
+                # 第一次循环时输出屏幕尺寸
+                if check_count == 1:
+                    context.log(f"📱 手机屏幕截图尺寸: {screen_w}x{screen_h}")
+                
+                # 检查模板是否大于屏幕
+                if w > screen_w or h > screen_h:
+                    return ModuleResult(
+                        success=False,
+                        error=f"❌ 模板图像 ({w}x{h}) 大于手机屏幕 ({screen_w}x{screen_h})，请截取更小的区域作为模板"
+                    )
+                
+                # 模板匹配（金字塔粗搜 + 上次命中位置附近优先）
+                match = vision.find(frame, template, confidence)
+                max_val, max_loc = match.confidence, (match.left, match.top)
+                
+                # 更新并输出当前最高匹配度
+                if max_val > best_confidence:
+                    best_confidence = max_val
+                    context.log(f"🔍 第{check_count}次检测 - 当前最高匹配度: {best_confidence:.2%} (阈值: {confidence:.2%})")
+                
+                if max_val >= confidence:
+                    # 找到匹配
+                    img_left = max_loc[0]
+                    img_top = max_loc[1]
+                    img_right = img_left + w
+                    img_bottom = img_top + h
+                    
+                    # 根据点击位置计算坐标
+                    click_x, click_y = self._calculate_click_position(
+                        click_position, img_left, img_top, img_right, img_bottom, w, h
+                    )
+                    
+                    best_confidence = max_val
+                    found = True
+                    context.log(f"✅ 找到匹配！位置: ({img_left}, {img_top}), 匹配度: {best_confidence:.2%}")
+                    break
+                
+                await asyncio.sleep(0.3)
+        
             if not found:
                 return ModuleResult(
                     success=False,
@@ -221,19 +210,10 @@ class PhoneClickTextExecutor(ModuleExecutor):
         if not success:
             return ModuleResult(success=False, error=error)
         
+        # 使用共享的 RapidOCR 服务 - 模型只加载一次，只重新识别变化的屏幕区域
+        ocr = get_ocr_service()
         try:
-            import numpy as np
-            from PIL import Image
-        except ImportError:
-            return ModuleResult(
-                success=False,
-                error="需要安装 Pillow: pip install Pillow"
-            )
-        
-        # 使用 RapidOCR - 速度快，支持中文
-        try:
-            from rapidocr_onnxruntime import RapidOCR
-            ocr = RapidOCR()
+            await ocr.run(ocr.get_engine)
         except ImportError:
             return ModuleResult(
                 success=False,
@@ -241,7 +221,6 @@ class PhoneClickTextExecutor(ModuleExecutor):
             )
         
         try:
-            import re
             adb = get_adb_manager()
             
             start_time = time.time()
@@ -249,80 +228,31 @@ class PhoneClickTextExecutor(ModuleExecutor):
             click_x, click_y = 0, 0
             matched_text = ""
             
-            # 创建临时目录保存截图
-            with tempfile.TemporaryDirectory() as temp_dir:
-                screenshot_path = os.path.join(temp_dir, 'phone_screenshot.png')
+            while time.time() - start_time < wait_timeout:
+                # 截取手机屏幕（RGBA 原始像素）
+                success, img_array, error = adb.capture_screen(device_id)
+                if not success:
+                    return ModuleResult(success=False, error=f"截取手机屏幕失败: {error}")
                 
-                while time.time() - start_time < wait_timeout:
-                    # 截取手机屏幕
-                    success, error = adb.screenshot(screenshot_path, device_id)
-                    if not success:
-                        return ModuleResult(success=False, error=f"截取手机屏幕失败: {error}")
-                    
-                    # 读取截图
-                    img = Image.open(screenshot_path)
-                    img_array = np.array(img)
-                    
-                    # OCR识别
-                    try:
-                        result, _ = ocr(img_array)
-                    except Exception as e:
-                        context.log(f"OCR识别失败: {e}")
-                        await asyncio.sleep(0.3)
-                        continue
-                    
-                    if not result:
-                        await asyncio.sleep(0.3)
-                        continue
-                    
-                    # 查找匹配的文本
-                    matches = []
-                    for item in result:
-                        # item 格式: [box, text, confidence]
-                        # box 格式: [[x1,y1], [x2,y1], [x2,y2], [x1,y2]]
-                        box, recognized_text, confidence = item
-                        
-                        if not recognized_text:
-                            continue
-                        
-                        # 匹配检查
-                        is_match = False
-                        if match_mode == 'exact':
-                            is_match = recognized_text == target_text
-                        elif match_mode == 'contains':
-                            is_match = target_text in recognized_text
-                        elif match_mode == 'regex':
-                            try:
-                                is_match = bool(re.search(target_text, recognized_text))
-                            except:
-                                is_match = False
-                        
-                        if is_match:
-                            x1 = int(min(p[0] for p in box))
-                            y1 = int(min(p[1] for p in box))
-                            x2 = int(max(p[0] for p in box))
-                            y2 = int(max(p[1] for p in box))
-                            
-                            center_x = (x1 + x2) // 2
-                            center_y = (y1 + y2) // 2
-                            matches.append({
-                                'text': recognized_text,
-                                'x': center_x,
-                                'y': center_y,
-                                'confidence': confidence
-                            })
-                    
-                    # 检查是否找到足够的匹配
-                    if len(matches) >= occurrence:
-                        match = matches[occurrence - 1]
-                        click_x = match['x']
-                        click_y = match['y']
-                        matched_text = match['text']
-                        found = True
-                        break
-                    
+                # OCR识别
+                try:
+                    boxes = await ocr.run(ocr.recognize_screen, img_array, ('phone', device_id))
+                except Exception as e:
+                    context.log(f"OCR识别失败: {e}")
                     await asyncio.sleep(0.3)
-            
+                    continue
+                
+                # 检查是否找到足够的匹配
+                matches = match_text(boxes, target_text, match_mode)
+                if len(matches) >= occurrence:
+                    match = matches[occurrence - 1]
+                    click_x, click_y = match.center
+                    matched_text = match.text
+                    found = True
+                    break
+                
+                await asyncio.sleep(0.3)
+        
             if not found:
                 return ModuleResult(
                     success=False,
@@ -379,8 +309,7 @@ class PhoneWaitImageExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=error)
         
         try:
-            import cv2
-            import numpy as np
+            from app.services.vision_service import Frame, get_vision_service
         except ImportError:
             return ModuleResult(
                 success=False,
@@ -390,13 +319,14 @@ class PhoneWaitImageExecutor(ModuleExecutor):
         try:
             adb = get_adb_manager()
             
-            # 读取模板图像
-            template = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            vision = get_vision_service()
+            
+            # 读取模板图像（解码结果按文件修改时间缓存）
+            template = vision.load_template(image_path)
             if template is None:
                 return ModuleResult(success=False, error="无法读取图像文件，请检查图像格式")
             
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-            h, w = template_gray.shape
+            w, h = template.width, template.height
             
             context.log(f"📐 模板图像尺寸: {w}x{h}")
             
@@ -406,58 +336,48 @@ class PhoneWaitImageExecutor(ModuleExecutor):
             best_confidence = 0
             check_count = 0
             
-            # 创建临时目录保存截图
-            with tempfile.TemporaryDirectory() as temp_dir:
-                screenshot_path = os.path.join(temp_dir, 'phone_screenshot.png')
+            while time.time() - start_time < wait_timeout:
+                check_count += 1
                 
-                while time.time() - start_time < wait_timeout:
-                    check_count += 1
-                    
-                    # 截取手机屏幕
-                    success, error = adb.screenshot(screenshot_path, device_id)
-                    if not success:
-                        return ModuleResult(success=False, error=f"截取手机屏幕失败: {error}")
-                    
-                    # 读取截图
-                    screen = cv2.imread(screenshot_path)
-                    if screen is None:
-                        await asyncio.sleep(check_interval)
-                        continue
-                    
-                    screen_gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
-                    screen_h, screen_w = screen_gray.shape
-                    
-                    # 第一次循环时输出屏幕尺寸
-                    if check_count == 1:
-                        context.log(f"📱 手机屏幕截图尺寸: {screen_w}x{screen_h}")
-                    
-                    # 检查模板是否大于屏幕
-                    if w > screen_w or h > screen_h:
-                        return ModuleResult(
-                            success=False,
-                            error=f"❌ 模板图像 ({w}x{h}) 大于手机屏幕 ({screen_w}x{screen_h})，请截取更小的区域作为模板"
-                        )
-                    
-                    # 模板匹配
-                    result = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                    
-                    # 更新最高匹配度
-                    if max_val > best_confidence:
-                        best_confidence = max_val
-                        context.log(f"🔍 第{check_count}次检测 - 当前最高匹配度: {best_confidence:.2%} (阈值: {confidence:.2%})")
-                    
-                    if max_val >= confidence:
-                        # 找到匹配
-                        match_x = max_loc[0] + w // 2
-                        match_y = max_loc[1] + h // 2
-                        best_confidence = max_val
-                        found = True
-                        context.log(f"✅ 找到匹配！位置: ({match_x}, {match_y}), 匹配度: {best_confidence:.2%}")
-                        break
-                    
-                    await asyncio.sleep(check_interval)
-            
+                # 截取手机屏幕（原始像素直接读入内存，不经过PNG编码和临时文件）
+                success, screen, error = adb.capture_screen(device_id)
+                if not success:
+                    return ModuleResult(success=False, error=f"截取手机屏幕失败: {error}")
+                
+                frame = Frame.from_rgba(screen)
+                screen_h, screen_w = frame.height, frame.width
+                
+                # 第一次循环时输出屏幕尺寸
+                if check_count == 1:
+                    context.log(f"📱 手机屏幕截图尺寸: {screen_w}x{screen_h}")
+                
+                # 检查模板是否大于屏幕
+                if w > screen_w or h > screen_h:
+                    return ModuleResult(
+                        success=False,
+                        error=f"❌ 模板图像 ({w}x{h}) 大于手机屏幕 ({screen_w}x{screen_h})，请截取更小的区域作为模板"
+                    )
+                
+                # 模板匹配（金字塔粗搜 + 上次命中位置附近优先）
+                match = vision.find(frame, template, confidence)
+                max_val, max_loc = match.confidence, (match.left, match.top)
+                
+                # 更新最高匹配度
+                if max_val > best_confidence:
+                    best_confidence = max_val
+                    context.log(f"🔍 第{check_count}次检测 - 当前最高匹配度: {best_confidence:.2%} (阈值: {confidence:.2%})")
+                
+                if max_val >= confidence:
+                    # 找到匹配
+                    match_x = max_loc[0] + w // 2
+                    match_y = max_loc[1] + h // 2
+                    best_confidence = max_val
+                    found = True
+                    context.log(f"✅ 找到匹配！位置: ({match_x}, {match_y}), 匹配度: {best_confidence:.2%}")
+                    break
+                
+                await asyncio.sleep(check_interval)
+        
             if not found:
                 return ModuleResult(
                     success=False,
@@ -511,8 +431,7 @@ class PhoneImageExistsExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=error)
         
         try:
-            import cv2
-            import numpy as np
+            from app.services.vision_service import Frame, get_vision_service
         except ImportError:
             return ModuleResult(
                 success=False,
@@ -522,13 +441,14 @@ class PhoneImageExistsExecutor(ModuleExecutor):
         try:
             adb = get_adb_manager()
             
-            # 读取模板图像
-            template = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            vision = get_vision_service()
+            
+            # 读取模板图像（解码结果按文件修改时间缓存）
+            template = vision.load_template(image_path)
             if template is None:
                 return ModuleResult(success=False, error="无法读取图像文件，请检查图像格式")
             
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-            h, w = template_gray.shape
+            w, h = template.width, template.height
             
             context.log(f"📐 模板图像尺寸: {w}x{h}")
             
@@ -538,57 +458,47 @@ class PhoneImageExistsExecutor(ModuleExecutor):
             best_confidence = 0
             check_count = 0
             
-            # 创建临时目录保存截图
-            with tempfile.TemporaryDirectory() as temp_dir:
-                screenshot_path = os.path.join(temp_dir, 'phone_screenshot.png')
+            while time.time() - start_time < wait_timeout:
+                check_count += 1
                 
-                while time.time() - start_time < wait_timeout:
-                    check_count += 1
-                    
-                    # 截取手机屏幕
-                    success, error = adb.screenshot(screenshot_path, device_id)
-                    if not success:
-                        return ModuleResult(success=False, error=f"截取手机屏幕失败: {error}")
-                    
-                    # 读取截图
-                    screen = cv2.imread(screenshot_path)
-                    if screen is None:
-                        await asyncio.sleep(0.3)
-                        continue
-                    
-                    screen_gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
-                    screen_h, screen_w = screen_gray.shape
-                    
-                    # 第一次循环时输出屏幕尺寸
-                    if check_count == 1:
-                        context.log(f"📱 手机屏幕截图尺寸: {screen_w}x{screen_h}")
-                    
-                    # 检查模板是否大于屏幕
-                    if w > screen_w or h > screen_h:
-                        return ModuleResult(
-                            success=False,
-                            error=f"❌ 模板图像 ({w}x{h}) 大于手机屏幕 ({screen_w}x{screen_h})，请截取更小的区域作为模板"
-                        )
-                    
-                    # 模板匹配
-                    result = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                    
-                    # 更新最高匹配度
-                    if max_val > best_confidence:
-                        best_confidence = max_val
-                        context.log(f"🔍 第{check_count}次检测 - 当前最高匹配度: {best_confidence:.2%} (阈值: {confidence:.2%})")
-                    
-                    if max_val >= confidence:
-                        # 找到匹配
-                        match_x = max_loc[0] + w // 2
-                        match_y = max_loc[1] + h // 2
-                        found = True
-                        context.log(f"✅ 找到匹配！位置: ({match_x}, {match_y}), 匹配度: {best_confidence:.2%}")
-                        break
-                    
-                    await asyncio.sleep(0.3)
-            
+                # 截取手机屏幕（原始像素直接读入内存，不经过PNG编码和临时文件）
+                success, screen, error = adb.capture_screen(device_id)
+                if not success:
+                    return ModuleResult(success=False, error=f"截取手机屏幕失败: {error}")
+                
+                frame = Frame.from_rgba(screen)
+                screen_h, screen_w = frame.height, frame.width
+                
+                # 第一次循环时输出屏幕尺寸
+                if check_count == 1:
+                    context.log(f"📱 手机屏幕截图尺寸: {screen_w}x{screen_h}")
+                
+                # 检查模板是否大于屏幕
+                if w > screen_w or h > screen_h:
+                    return ModuleResult(
+                        success=False,
+                        error=f"❌ 模板图像 ({w}x{h}) 大于手机屏幕 ({screen_w}x{screen_h})，请截取更小的区域作为模板"
+                    )
+                
+                # 模板匹配（金字塔粗搜 + 上次命中位置附近优先）
+                match = vision.find(frame, template, confidence)
+                max_val, max_loc = match.confidence, (match.left, match.top)
+                
+                # 更新最高匹配度
+                if max_val > best_confidence:
+                    best_confidence = max_val
+                    context.log(f"🔍 第{check_count}次检测 - 当前最高匹配度: {best_confidence:.2%} (阈值: {confidence:.2%})")
+                
+                if max_val >= confidence:
+                    # 找到匹配
+                    match_x = max_loc[0] + w // 2
+                    match_y = max_loc[1] + h // 2
+                    found = True
+                    context.log(f"✅ 找到匹配！位置: ({match_x}, {match_y}), 匹配度: {best_confidence:.2%}")
+                    break
+                
+                await asyncio.sleep(0.3)
+        
             # 根据是否找到图像返回不同的分支
             branch = 'true' if found else 'false'
             
@@ -0,0 +1,192 @@
+"""批量提取记录模块 - 一次 evaluate 提取列表中所有记录的多个字段
+
+替代“循环列表项 + 每个字段一个获取元素信息模块”的写法：
+容器选择器匹配每一条记录，字段选择器相对于记录容器查找，所有记录在页面内一次序列化返回。
+"""
+import json
+
+from .base import (
+    ModuleExecutor,
+    ExecutionContext,
+    ModuleResult,
+    register_executor,
+)
+from .type_utils import to_int, to_bool
+
+
+# 字段读取方式与获取元素信息模块的“获取属性”一致
+_EXTRACT_SCRIPT = """(elements, {fields, limit}) => {
+    const find = (root, selector) => {
+        if (!selector) return root;
+        if (selector.startsWith('xpath=') || selector.startsWith('/') || selector.startsWith('./') || selector.startsWith('(')) {
+            let expr = selector.startsWith('xpath=') ? selector.slice(6) : selector;
+            // 绝对 XPath 改为相对于记录容器
+            if (expr.startsWith('/')) expr = '.' + expr;
+            return document.evaluate(expr, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return root.querySelector(selector);
+    };
+    const read = (el, attribute) => {
+        if (!el) return null;
+        switch (attribute) {
+            case 'text': return (el.textContent || '').trim();
+            case 'innerText': return (el.innerText || '').trim();
+            case 'innerHTML': return el.innerHTML;
+            case 'outerHTML': return el.outerHTML;
+            case 'value': return el.value !== undefined ? el.value : el.getAttribute('value');
+            case 'attributes': {
+                const attrs = {};
+                for (const attr of el.attributes) attrs[attr.name] = attr.value;
+                return attrs;
+            }
+            default: return el.getAttribute(attribute);
+        }
+    };
+    const count = limit > 0 ? Math.min(limit, elements.length) : elements.length;
+    const records = [];
+    for (let i = 0; i < count; i++) {
+        const record = {};
+        for (const [name, selector, attribute] of fields) {
+            let value = null;
+            try {
+                value = read(find(elements[i], selector), attribute);
+            } catch (e) {
+                value = null;
+            }
+            record[name] = value;
+        }
+        records.push(record);
+    }
+    return {records, total: elements.length};
+}"""
+
+
+def parse_fields(fields) -> list:
+    """解析字段配置，返回 [(字段名, 相对选择器, 属性), ...]
+
+    支持以下格式（或其 JSON 字符串）:
+    - {"标题": ".title", "链接": {"selector": "a", "attribute": "href"}, "价格": [".price", "text"]}
+    - [{"name": "标题", "selector": ".title", "attribute": "text"}, ...]
+    相对选择器为空时读取记录容器本身，属性默认为 text。
+    """
+    if isinstance(fields, str):
+        if not fields.strip():
+            return []
+        try:
+            fields = json.loads(fields)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"字段配置JSON解析失败: {str(e)}")
+
+    if isinstance(fields, dict):
+        items = list(fields.items())
+    elif isinstance(fields, list):
+        items = []
+        for item in fields:
+            if not isinstance(item, dict) or not item.get('name'):
+                raise ValueError("字段列表中的每一项必须是包含 name 的对象")
+            items.append((item['name'], item))
+    else:
+        raise ValueError("字段配置必须是JSON对象或数组")
+
+    parsed = []
+    for name, spec in items:
+        name = str(name).strip()
+        if not name:
+            raise ValueError("字段名不能为空")
+        if spec is None or isinstance(spec, str):
+            selector, attribute = spec or '', 'text'
+        elif isinstance(spec, (list, tuple)) and 1 <= len(spec) <= 2:
+            selector = spec[0] or ''
+            attribute = spec[1] if len(spec) > 1 and spec[1] else 'text'
+        elif isinstance(spec, dict):
+            selector = spec.get('selector') or ''
+            attribute = spec.get('attribute') or 'text'
+        else:
+            raise ValueError(f"字段 {name} 的配置格式不正确")
+        parsed.append((name, str(selector).strip(), str(attribute).strip()))
+    return parsed
+
+
+@register_executor
+class ExtractRecordsExecutor(ModuleExecutor):
+    """批量提取记录模块执行器"""
+
+    @property
+    def module_type(self) -> str:
+        return "extract_records"
+
+    async def execute(self, config: dict, context: ExecutionContext) -> ModuleResult:
+        """
+        批量提取列表记录
+
+        配置参数:
+        - containerSelector: 记录容器选择器（匹配每一条记录）
+        - fields: 字段配置（字段名 -> 相对选择器/属性），见 parse_fields
+        - limit: 最多提取的记录数（0 表示全部）
+        - saveToTable: 是否写入数据表（默认是，字段名即列名）
+        - variableName: 存储变量名（记录列表，可选）
+        - timeout: 等待记录出现的超时（毫秒，0 表示不限制）
+        """
+        container_selector = context.resolve_value(config.get('containerSelector', ''))
+        fields_config = config.get('fields', '')
+        if isinstance(fields_config, str):
+            fields_config = context.resolve_value(fields_config)
+        limit = to_int(config.get('limit', 0), 0, context)
+        save_to_table = to_bool(config.get('saveToTable', True), context)
+        variable_name = config.get('variableName', '')
+        timeout_ms = to_int(config.get('timeout', 30000), 30000, context)
+
+        if not container_selector:
+            return ModuleResult(success=False, error="记录容器选择器不能为空")
+
+        try:
+            fields = parse_fields(fields_config)
+        except ValueError as e:
+            return ModuleResult(success=False, error=str(e))
+        if not fields:
+            return ModuleResult(success=False, error="至少需要配置一个字段")
+
+        if context.page is None:
+            return ModuleResult(success=False, error="没有打开的页面")
+
+        try:
+            await context.switch_to_latest_page()
+            page = await context.get_current_frame()
+            if not page:
+                return ModuleResult(success=False, error="未找到活动页面")
+
+            containers = page.locator(container_selector)
+            try:
+                await containers.first.wait_for(state='attached', timeout=None if timeout_ms == 0 else timeout_ms)
+            except Exception:
+                return ModuleResult(success=False, error=f"未找到记录元素: {container_selector}")
+
+            result = await containers.evaluate_all(_EXTRACT_SCRIPT, {
+                'fields': [list(field) for field in fields],
+                'limit': limit,
+            })
+            records = result['records']
+
+            if save_to_table and records:
+                context.data_rows.extend(records)
+            if variable_name:
+                context.set_variable(variable_name, records)
+
+            field_names = [name for name, _, _ in fields]
+            message = f"已提取 {len(records)} 条记录（{len(field_names)} 个字段）"
+            if len(records) < result['total']:
+                message += f"，共匹配 {result['total']} 条"
+
+            return ModuleResult(
+                success=True,
+                message=message,
+                data={
+                    'recordCount': len(records),
+                    'matchedCount': result['total'],
+                    'fields': field_names,
+                    'records': records if variable_name else None,
+                }
+            )
+
+        except Exception as e:
+            return ModuleResult(success=False, error=f"批量提取记录失败: {str(e)}")
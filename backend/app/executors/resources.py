@@ -0,0 +1,73 @@
+"""模块资源类别声明 - 供工作流调度器按资源类别限制并发
+
+执行器可以通过类属性 resource_class 声明自己的资源类别，
+未声明的模块按下表确定类别，不在表中的模块不受资源并发限制。
+
+等待类和触发器类模块（wait_element、element_change_trigger、network_capture、wait_image、
+click_text 等）大部分时间在轮询或等待事件，element_change_trigger 甚至没有超时，
+占用槽位会让少数等待中的节点阻塞其他所有同类节点，因此不在表中。
+"""
+
+# 资源类别
+RESOURCE_BROWSER = 'browser'  # 浏览器页面（Playwright）
+RESOURCE_PHONE = 'phone'      # 手机设备（ADB），按设备分别限制
+RESOURCE_MEDIA = 'media'      # CPU密集型媒体/图像/文档处理
+RESOURCE_NETWORK = 'network'  # 网络请求
+
+RESOURCE_CLASSES = (RESOURCE_BROWSER, RESOURCE_PHONE, RESOURCE_MEDIA, RESOURCE_NETWORK)
+
+
+_BROWSER_MODULES = {
+    'open_page', 'click_element', 'hover_element', 'input_text', 'get_element_info',
+    'close_page', 'refresh_page', 'go_back', 'go_forward', 'handle_dialog',
+    'inject_javascript', 'switch_iframe', 'switch_to_main', 'switch_tab', 'screenshot', 'js_script',
+    'select_dropdown', 'set_checkbox', 'drag_element', 'scroll_page', 'upload_file', 'download_file',
+    'save_image', 'get_child_elements', 'get_sibling_elements', 'element_exists', 'element_visible',
+    'extract_table_data', 'extract_records', 'ocr_captcha', 'slider_captcha',
+    'firecrawl_scrape', 'firecrawl_map', 'firecrawl_crawl', 'ai_smart_scraper', 'ai_element_selector',
+}
+
+_MEDIA_MODULES = {
+    # FFmpeg
+    'format_convert', 'compress_image', 'compress_video', 'extract_audio', 'trim_video', 'merge_media',
+    'add_watermark', 'rotate_video', 'video_speed', 'extract_frame', 'add_subtitle', 'adjust_volume',
+    'resize_video', 'download_m3u8', 'image_format_convert', 'video_format_convert', 'audio_format_convert',
+    'video_to_audio', 'video_to_gif', 'batch_format_convert',
+    # 识别（click_image、wait_image、click_text 等在超时前反复截屏查找，属于等待类模块）
+    'face_recognition', 'image_ocr', 'audio_to_text', 'qr_decode', 'image_exists',
+    # 图像处理
+    'image_grayscale', 'image_round_corners', 'qr_generate', 'image_resize', 'image_crop', 'image_rotate',
+    'image_flip', 'image_blur', 'image_sharpen', 'image_brightness', 'image_contrast', 'image_color_balance',
+    'image_convert_format', 'image_add_text', 'image_merge', 'image_thumbnail', 'image_filter',
+    'image_remove_bg',
+    # PDF/文档
+    'pdf_to_images', 'images_to_pdf', 'pdf_to_word', 'pdf_merge', 'pdf_split', 'pdf_extract_text',
+    'pdf_extract_images', 'pdf_encrypt', 'pdf_decrypt', 'pdf_add_watermark', 'pdf_rotate',
+    'pdf_delete_pages', 'pdf_compress', 'pdf_insert_pages', 'pdf_reorder_pages',
+    'markdown_to_pdf', 'markdown_to_docx', 'docx_to_markdown', 'html_to_docx', 'docx_to_html',
+    'markdown_to_epub', 'epub_to_markdown', 'latex_to_pdf', 'universal_doc_convert',
+    # 哈希比较
+    'file_hash_compare', 'folder_hash_compare',
+}
+
+_NETWORK_MODULES = {
+    'api_request', 'send_email', 'ai_chat', 'ai_vision',
+    'qq_send_message', 'qq_send_image', 'qq_send_file', 'qq_get_friends', 'qq_get_groups',
+    'qq_get_group_members', 'qq_get_login_info',
+}
+
+
+MODULE_RESOURCE_CLASSES: dict[str, str] = {
+    **{t: RESOURCE_BROWSER for t in _BROWSER_MODULES},
+    **{t: RESOURCE_MEDIA for t in _MEDIA_MODULES},
+    **{t: RESOURCE_NETWORK for t in _NETWORK_MODULES},
+}
+
+
+def get_default_resource_class(module_type: str):
+    """获取模块默认的资源类别，没有资源类别时返回 None"""
+    resource_class = MODULE_RESOURCE_CLASSES.get(module_type)
+    if resource_class is None and module_type.startswith('phone_'):
+        # 手机模块（phone_click_image 等视觉模块也以手机设备为瓶颈）
+        return RESOURCE_PHONE
+    return resource_class
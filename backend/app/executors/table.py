@@ -1,5 +1,4 @@
 """数据表格操作模块执行器 - 异步版本"""
-import asyncio
 import os
 import json
 from datetime import datetime
@@ -63,9 +62,7 @@ class TableAddColumnExecutor(ModuleExecutor):
             return ModuleResult(success=False, error="列名不能为空")
         
         try:
-            for row in context.data_rows:
-                if column_name not in row:
-                    row[column_name] = default_value
+            context.data_rows.add_column(column_name, default_value)
             
             if not context.data_rows:
                 context.data_rows.append({column_name: default_value})
@@ -111,7 +108,7 @@ class TableSetCellExecutor(ModuleExecutor):
             return ModuleResult(success=False, error=f"行索引 {row_index} 超出范围")
         
         try:
-            context.data_rows[row_index][column_name] = cell_value
+            context.data_rows.set_cell(row_index, column_name, cell_value)
             
             return ModuleResult(
                 success=True,
@@ -259,7 +256,12 @@ class TableExportExecutor(ModuleExecutor):
             else:
                 file_name = f"data_{timestamp}"
             
-            ext = '.xlsx' if export_format == 'excel' else '.csv'
+            from app.services.data_export import FORMAT_CSV, FORMAT_EXTENSIONS
+            
+            # 支持 excel / csv / parquet / ipc，其他值按CSV导出（与旧版本一致）
+            if export_format not in FORMAT_EXTENSIONS:
+                export_format = FORMAT_CSV
+            ext = FORMAT_EXTENSIONS[export_format]
             if not file_name.endswith(ext):
                 file_name += ext
             
@@ -278,17 +280,12 @@ class TableExportExecutor(ModuleExecutor):
             
             from app.services.data_collector import DataCollector
             
-            collector = DataCollector()
-            for row in context.data_rows:
-                collector.add_row(row)
+            # 直接使用数据行存储，不再逐行复制
+            collector = DataCollector(rows=context.data_rows)
             
-            # 使用线程池执行同步导出操作
-            loop = asyncio.get_running_loop()
-            if export_format == 'excel':
-                # 传递Sheet名称参数
-                await loop.run_in_executor(None, collector.to_excel, final_path, sheet_name)
-            else:
-                await loop.run_in_executor(None, collector.to_csv, final_path)
+            # 使用共享工作线程池执行同步导出操作（Excel 会传递Sheet名称参数）
+            from app.services.worker_pool import run_in_worker
+            await run_in_worker(collector.export, final_path, export_format, sheet_name)
             
             if variable_name:
                 context.set_variable(variable_name, final_path)
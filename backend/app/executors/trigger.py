@@ -14,7 +14,7 @@ from .base import (
     register_executor,
 )
 from .type_utils import to_int, to_float
-from ..utils.jsonpath_parser import parse_jsonpath
+from ..utils.jsonpath_parser import compile_jsonpath
 
 
 @register_executor
@@ -458,9 +458,16 @@ class ApiTriggerExecutor(ModuleExecutor):
         - conditionValue: 期望的值
         - conditionOperator: 比较运算符（==, !=, >, <, contains）
         - checkInterval: 检查间隔（秒，默认10）
+        - maxInterval: 数据未变化时的最大检查间隔（秒），0表示固定间隔
+        - pollMode: 监听方式（poll 轮询 / longpoll 长轮询 / sse 事件流）
         - timeout: 超时时间（秒），0表示无限等待
         - saveToVariable: 保存响应数据的变量名
+
+        所有API触发器共用一个轮询引擎（见 app.services.api_poll_engine），
+        请求带 If-None-Match / If-Modified-Since，304 或响应未变化时不重复判断条件
         """
+        from ..services.api_poll_engine import ApiWatch, ApiWatchOptions, POLL_MODES, get_api_poll_engine
+
         api_url = context.resolve_value(config.get('apiUrl', ''))
         method = context.resolve_value(config.get('method', 'GET'))
         headers_str = context.resolve_value(config.get('headers', '{}'))
@@ -469,11 +476,15 @@ class ApiTriggerExecutor(ModuleExecutor):
         condition_value = context.resolve_value(config.get('conditionValue', ''))
         condition_operator = context.resolve_value(config.get('conditionOperator', '=='))
         check_interval = to_int(config.get('checkInterval', 10), 10, context)
+        max_interval = to_int(config.get('maxInterval', 0), 0, context)
+        poll_mode = context.resolve_value(config.get('pollMode', 'poll')) or 'poll'
         timeout = to_int(config.get('timeout', 0), 0, context)
         save_to_variable = config.get('saveToVariable', 'api_response')
 
         if not api_url:
             return ModuleResult(success=False, error="API地址不能为空")
+        if poll_mode not in POLL_MODES:
+            return ModuleResult(success=False, error=f"不支持的监听方式: {poll_mode}")
 
         # 解析headers和body
         try:
@@ -486,100 +497,112 @@ class ApiTriggerExecutor(ModuleExecutor):
         except json.JSONDecodeError:
             return ModuleResult(success=False, error="请求体格式错误，必须是有效的JSON")
 
-        import httpx
-
-        context.add_log('info', f"🌐 API轮询已启动", None)
+        mode_names = {'poll': 'API轮询', 'longpoll': 'API长轮询', 'sse': 'API事件流监听'}
+        context.add_log('info', f"🌐 {mode_names[poll_mode]}已启动", None)
         context.add_log('info', f"📍 API地址: {api_url}", None)
         context.add_log('info', f"🔧 HTTP方法: {method}", None)
-        await context.send_progress(f"🌐 API轮询已启动")
+        await context.send_progress(f"🌐 {mode_names[poll_mode]}已启动")
         await context.send_progress(f"📍 API地址: {api_url}")
         await context.send_progress(f"🔧 HTTP方法: {method}")
         if condition_path:
             context.add_log('info', f"🔍 条件: {condition_path} {condition_operator} {condition_value}", None)
             await context.send_progress(f"🔍 条件: {condition_path} {condition_operator} {condition_value}")
 
-        start_time = time.time()
-        check_count = 0
-
-        while True:
-            check_count += 1
+        # JSONPath 只编译一次，每次检查直接求值
+        compiled_path = compile_jsonpath(condition_path) if condition_path else None
 
+        def matcher(data):
+            # 如果没有设置条件，任意一次成功的响应即触发
+            if compiled_path is None:
+                return True, ''
             try:
-                # 发送API请求
-                async with httpx.AsyncClient() as client:
-                    if method == 'POST':
-                        response = await client.post(api_url, headers=headers, json=body, timeout=30)
-                    else:
-                        response = await client.get(api_url, headers=headers, timeout=30)
-
-                    response.raise_for_status()
-                    response_data = response.json()
-
-                # 如果没有设置条件，直接返回
-                if not condition_path:
-                    context.set_variable(save_to_variable, response_data)
-                    return ModuleResult(
-                        success=True,
-                        message=f"API请求成功（第{check_count}次检查）",
-                        data=response_data
-                    )
-
-                # 检查条件
-                try:
-                    actual_value = parse_jsonpath(response_data, condition_path)
-                    
-                    if actual_value is None:
-                        # 路径不存在或值为None
-                        context.add_log('warning', f"⚠️ 第{check_count}次检查，JSONPath未找到值: {condition_path}", None)
-                    else:
-                        # 比较值
-                        condition_met = False
-                        if condition_operator == '==':
-                            condition_met = str(actual_value) == str(condition_value)
-                        elif condition_operator == '!=':
-                            condition_met = str(actual_value) != str(condition_value)
-                        elif condition_operator == '>':
-                            try:
-                                condition_met = float(actual_value) > float(condition_value)
-                            except (ValueError, TypeError):
-                                pass
-                        elif condition_operator == '<':
-                            try:
-                                condition_met = float(actual_value) < float(condition_value)
-                            except (ValueError, TypeError):
-                                pass
-                        elif condition_operator == 'contains':
-                            condition_met = str(condition_value) in str(actual_value)
-
-                        if condition_met:
-                            context.set_variable(save_to_variable, response_data)
-                            return ModuleResult(
-                                success=True,
-                                message=f"API条件满足（第{check_count}次检查）: {condition_path} = {actual_value}",
-                                data=response_data
-                            )
-                except Exception as parse_error:
-                    context.add_log('warning', f"⚠️ 第{check_count}次检查，JSONPath解析失败: {str(parse_error)}", None)
-
-                # 条件未满足，继续等待
-                context.add_log('info', f"⏳ 第{check_count}次检查，条件未满足，{check_interval}秒后重试...", None)
-                await context.send_progress(f"⏳ 第{check_count}次检查，条件未满足，{check_interval}秒后重试...")
+                actual_value = compiled_path(data)
+            except Exception as parse_error:
+                context.add_log('warning', f"⚠️ 第{watch.checks}次检查，JSONPath解析失败: {str(parse_error)}", None)
+                return False, ''
+            if actual_value is None:
+                # 路径不存在或值为None
+                context.add_log('warning', f"⚠️ 第{watch.checks}次检查，JSONPath未找到值: {condition_path}", None)
+                return False, ''
+            if _compare(actual_value, condition_operator, condition_value):
+                return True, f"{condition_path} = {actual_value}"
+            return False, ''
+
+        async def on_check(current, status, detail):
+            if status == 'error':
+                context.add_log('warning', f"⚠️ 第{current.checks}次检查失败: {detail}", None)
+                await context.send_progress(f"⚠️ 第{current.checks}次检查失败: {detail}", "warning")
+                return
+            if poll_mode == 'sse':
+                message = f"⏳ 第{current.checks}次事件，条件未满足，继续等待..."
+                if status == 'unchanged':
+                    message = f"⏳ {detail}，{current.next_delay:.1f}秒后重连..."
+            elif poll_mode == 'longpoll':
+                reason = detail if status == 'unchanged' else '条件未满足'
+                message = f"⏳ 第{current.checks}次检查，{reason}，继续等待..."
+            else:
+                reason = '数据未变化' if status == 'unchanged' else '条件未满足'
+                message = f"⏳ 第{current.checks}次检查，{reason}，{current.next_delay:.1f}秒后重试..."
+            context.add_log('info', message, None)
+            await context.send_progress(message)
+
+        options = ApiWatchOptions(
+            url=api_url,
+            method='POST' if method == 'POST' else 'GET',
+            headers=headers if isinstance(headers, dict) else {},
+            body=body,
+            interval=max(check_interval, 0),
+            max_interval=max_interval,
+            mode=poll_mode,
+            # 长轮询由服务端挂起请求，读超时需要比普通请求长
+            request_timeout=max(90, check_interval) if poll_mode == 'longpoll' else 30,
+        )
+        watch = ApiWatch(options, matcher, on_check)
+        engine = get_api_poll_engine()
+        engine.add(watch)
+        try:
+            try:
+                if timeout > 0:
+                    check_count, response_data, detail = await asyncio.wait_for(watch.result, timeout)
+                else:
+                    check_count, response_data, detail = await watch.result
+            except asyncio.TimeoutError:
+                return ModuleResult(
+                    success=False,
+                    error=f"API轮询超时（{timeout}秒，共检查{watch.checks}次）"
+                )
+        finally:
+            engine.remove(watch)
 
-            except Exception as e:
-                context.add_log('warning', f"⚠️ 第{check_count}次检查失败: {str(e)}", None)
-                await context.send_progress(f"⚠️ 第{check_count}次检查失败: {str(e)}", "warning")
+        context.set_variable(save_to_variable, response_data)
+        if not condition_path:
+            return ModuleResult(
+                success=True,
+                message=f"API请求成功（第{check_count}次检查）",
+                data=response_data
+            )
+        return ModuleResult(
+            success=True,
+            message=f"API条件满足（第{check_count}次检查）: {detail}",
+            data=response_data
+        )
 
-            # 检查超时
-            if timeout > 0:
-                elapsed = time.time() - start_time
-                if elapsed >= timeout:
-                    return ModuleResult(
-                        success=False,
-                        error=f"API轮询超时（{timeout}秒，共检查{check_count}次）"
-                    )
 
-            # 等待下次检查
-            await asyncio.sleep(check_interval)
+def _compare(actual_value, operator: str, expected) -> bool:
+    """API触发器的条件比较"""
+    if operator == '==':
+        return str(actual_value) == str(expected)
+    if operator == '!=':
+        return str(actual_value) != str(expected)
+    if operator in ('>', '<'):
+        try:
+            actual_number, expected_number = float(actual_value), float(expected)
+        except (ValueError, TypeError):
+            return False
+        return actual_number > expected_number if operator == '>' else actual_number < expected_number
+    if operator == 'contains':
+        return str(expected) in str(actual_value)
+    return False
 
 
 
@@ -0,0 +1,250 @@
+"""变量模板编译器 - 将配置字符串编译为可复用的模板，避免每次解析都重新跑正则
+
+解析规则与 ExecutionContext.resolve_value 原有实现保持一致：
+- 先替换 ${varName} 格式
+- 再多轮替换 {varName} 格式（不匹配前面带 $ 的），每轮只处理最内层的花括号，
+  以支持 {listName[{indexVar}]} 这种嵌套引用
+- 访问路径支持 [0]、[-1]、[key]、["key"]、['key']，字典键找不到时尝试数字键
+- 变量不存在或访问失败时保留原文
+"""
+import json
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Optional, Union
+
+
+# ${varName} 格式
+_DOLLAR_PATTERN = re.compile(r'\$\{([^}]+)\}')
+# {varName} 格式（只匹配最内层，且前面不是 $）
+_BRACE_PATTERN = re.compile(r'(?<!\$)\{([^{}]+)\}')
+# 基础变量名 + 访问路径
+_ACCESS_PATTERN = re.compile(r'^([a-zA-Z_\u4e00-\u9fa5][a-zA-Z0-9_\u4e00-\u9fa5]*)((?:\[[^\]]+\])*)')
+_BRACKET_PATTERN = re.compile(r'\[([^\]]+)\]')
+
+# {varName} 的最大解析轮数
+_MAX_BRACE_PASSES = 5
+# 模板缓存容量，以及可以进入缓存的最大字符串长度（过长的多半是变量值展开后的文本）
+_CACHE_SIZE = 4096
+_MAX_CACHED_LENGTH = 4096
+
+_MISSING = object()
+
+
+class AccessPath:
+    """预解析的变量访问路径，如 data[0][name]"""
+
+    __slots__ = ('base_name', 'accessors')
+
+    def __init__(self, base_name: str, accessors: tuple[tuple[str, Optional[int]], ...]):
+        self.base_name = base_name
+        # 每个访问器为 (键, 键对应的整数值或None)
+        self.accessors = accessors
+
+    @classmethod
+    def parse(cls, expr: str) -> Optional['AccessPath']:
+        """解析访问表达式，无法解析时返回 None"""
+        base_match = _ACCESS_PATTERN.match(expr.strip())
+        if not base_match:
+            return None
+
+        accessors = []
+        for accessor in _BRACKET_PATTERN.findall(base_match.group(2)):
+            accessor = accessor.strip()
+            # 移除引号（如果有）
+            if (accessor.startswith('"') and accessor.endswith('"')) or \
+               (accessor.startswith("'") and accessor.endswith("'")):
+                accessor = accessor[1:-1]
+            try:
+                index = int(accessor)
+            except ValueError:
+                index = None
+            accessors.append((accessor, index))
+
+        return cls(base_match.group(1), tuple(accessors))
+
+    def lookup(self, variables: dict[str, Any]) -> Any:
+        """按访问路径读取变量值（不拷贝），找不到时返回 _MISSING"""
+        result = variables.get(self.base_name, _MISSING)
+        if result is _MISSING:
+            return _MISSING
+
+        for key, index in self.accessors:
+            if isinstance(result, list):
+                # 列表索引访问（支持负数索引，如 -1 表示最后一个元素）
+                if index is None or not -len(result) <= index < len(result):
+                    return _MISSING
+                result = result[index]
+            elif isinstance(result, dict):
+                # 字典键访问 - 先尝试原始键，再尝试数字键
+                try:
+                    if key in result:
+                        result = result[key]
+                    elif index is not None and index in result:
+                        result = result[index]
+                    else:
+                        return _MISSING
+                except TypeError:
+                    return _MISSING
+            else:
+                # 不支持的类型
+                return _MISSING
+
+        return result
+
+
+# 模板片段：字面量为 str，变量引用为 (原文, AccessPath 或 None)
+_Segment = Union[str, tuple[str, Optional[AccessPath]]]
+
+
+class CompiledTemplate:
+    """编译后的模板：字面量与变量引用交替排列的片段列表"""
+
+    __slots__ = ('segments', 'has_refs')
+
+    def __init__(self, segments: tuple[_Segment, ...]):
+        self.segments = segments
+        self.has_refs = any(not isinstance(s, str) for s in segments)
+
+    @classmethod
+    def compile(cls, text: str, pattern: re.Pattern) -> 'CompiledTemplate':
+        segments: list[_Segment] = []
+        pos = 0
+        for match in pattern.finditer(text):
+            if match.start() > pos:
+                segments.append(text[pos:match.start()])
+            segments.append((match.group(0), AccessPath.parse(match.group(1))))
+            pos = match.end()
+        if pos < len(text):
+            segments.append(text[pos:])
+        return cls(tuple(segments))
+
+    def render(self, variables: dict[str, Any]) -> tuple[str, bool]:
+        """渲染模板，返回 (文本, 是否有引用被替换)"""
+        parts = []
+        replaced = False
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+            raw, path = segment
+            value = path.lookup(variables) if path is not None else _MISSING
+            if value is _MISSING or value is None:
+                parts.append(raw)
+                continue
+            replaced = True
+            if isinstance(value, (list, dict)):
+                # 如果是复杂类型，转为JSON字符串
+                parts.append(json.dumps(value, ensure_ascii=False))
+            else:
+                parts.append(str(value))
+        return ''.join(parts), replaced
+
+
+class TemplateCache:
+    """以模板字符串为键的 LRU 编译缓存（线程安全）"""
+
+    def __init__(self, pattern: re.Pattern, maxsize: int = _CACHE_SIZE):
+        self._pattern = pattern
+        self._maxsize = maxsize
+        self._cache: OrderedDict[str, CompiledTemplate] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> CompiledTemplate:
+        if len(text) > _MAX_CACHED_LENGTH:
+            return CompiledTemplate.compile(text, self._pattern)
+
+        with self._lock:
+            compiled = self._cache.get(text)
+            if compiled is not None:
+                self._cache.move_to_end(text)
+                self.hits += 1
+                return compiled
+
+        compiled = CompiledTemplate.compile(text, self._pattern)
+        with self._lock:
+            self.misses += 1
+            self._cache[text] = compiled
+            if len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+_dollar_templates = TemplateCache(_DOLLAR_PATTERN)
+_brace_templates = TemplateCache(_BRACE_PATTERN)
+_access_paths: dict[str, Optional[AccessPath]] = {}
+
+
+def render_template(text: str, variables: dict[str, Any]) -> str:
+    """解析字符串中的变量引用"""
+    # 没有花括号的字符串不可能包含变量引用
+    if '{' not in text:
+        return text
+
+    compiled = _dollar_templates.get(text)
+    if compiled.has_refs:
+        text, _ = compiled.render(variables)
+
+    # 多轮解析 {varName}，上一轮没有任何替换时结果不会再变化，直接结束
+    for _ in range(_MAX_BRACE_PASSES):
+        compiled = _brace_templates.get(text)
+        if not compiled.has_refs:
+            break
+        text, replaced = compiled.render(variables)
+        if not replaced:
+            break
+
+    return text
+
+
+def lookup_variable(expr: str, variables: dict[str, Any], default: Any = None) -> Any:
+    """按访问路径读取变量（如 data[0][name]），返回原始对象而不是拷贝
+
+    调用方不应修改返回的列表/字典，需要修改时请自行拷贝。
+    """
+    if expr.startswith('${') and expr.endswith('}'):
+        expr = expr[2:-1]
+    elif expr.startswith('{') and expr.endswith('}'):
+        expr = expr[1:-1]
+
+    path = _access_paths.get(expr, _MISSING)
+    if path is _MISSING:
+        path = AccessPath.parse(expr)
+        if len(_access_paths) >= _CACHE_SIZE:
+            _access_paths.clear()
+        _access_paths[expr] = path
+
+    if path is None:
+        return default
+    value = path.lookup(variables)
+    return default if value is _MISSING else value
+
+
+def get_cache_stats() -> dict[str, int]:
+    """获取模板缓存统计信息"""
+    return {
+        'dollarSize': len(_dollar_templates),
+        'dollarHits': _dollar_templates.hits,
+        'dollarMisses': _dollar_templates.misses,
+        'braceSize': len(_brace_templates),
+        'braceHits': _brace_templates.hits,
+        'braceMisses': _brace_templates.misses,
+    }
+
+
+def clear_template_cache():
+    """清空模板缓存"""
+    _dollar_templates.clear()
+    _brace_templates.clear()
+    _access_paths.clear()
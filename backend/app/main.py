@@ -136,6 +136,14 @@ async def startup_event():
     )
     hotkey_service.start()
     
+    # 按配置在后台预加载 OCR 模型
+    from app.services.ocr_service import warmup_ocr_service
+    warmup_ocr_service()
+    
+    # 按配置在后台预先导入执行器模块
+    from app.executors import start_prewarm
+    start_prewarm()
+    
     # 初始化计划任务管理器的工作流执行回调
     from app.services.scheduled_task_manager import scheduled_task_manager
     from app.api.workflows import workflows_store, executions_store, execution_results, execution_data
@@ -290,6 +298,21 @@ async def shutdown_event():
     from app.services.global_hotkey import get_hotkey_service
     hotkey_service = get_hotkey_service()
     hotkey_service.stop()
+    
+    from app.services.http_client_pool import get_http_client_pool
+    await get_http_client_pool().close_all()
+    
+    from app.services.browser_pool import get_browser_pool
+    await get_browser_pool().close_all()
+    
+    from app.services.ocr_service import get_ocr_service
+    get_ocr_service().shutdown()
+    
+    from app.services.file_watch_service import get_file_watch_service
+    get_file_watch_service().close_all()
+    
+    from app.services.scheduled_task_manager import scheduled_task_manager
+    scheduled_task_manager.flush()
 
 
 # 当前活动的工作流ID（用于热键控制）
@@ -346,14 +369,20 @@ async def on_hotkey_macro_stop():
 
 
 # Socket.IO事件处理
+# 当前已连接的客户端
+connected_clients: set[str] = set()
+
+
 @sio.event
 async def connect(sid, environ):
     print(f"Client connected: {sid}")
+    connected_clients.add(sid)
 
 
 @sio.event
 async def disconnect(sid):
     print(f"Client disconnected: {sid}")
+    connected_clients.discard(sid)
     # 清理该客户端的日志开关状态
     if sid in log_enabled_by_client:
         del log_enabled_by_client[sid]
@@ -399,6 +428,11 @@ def is_log_enabled() -> bool:
     return len(log_enabled_by_client) > 0 or True  # 始终返回True，确保日志发送
 
 
+def has_connected_clients() -> bool:
+    """检查是否有客户端连接（没有客户端时遥测事件直接丢弃）"""
+    return len(connected_clients) > 0
+
+
 def clear_all_pending_events():
     """清理所有等待中的事件，用于停止执行时释放阻塞的线程"""
     # 清理输入弹窗事件
@@ -1,12 +1,20 @@
-"""ADB 管理器 - 封装 Android Debug Bridge 命令"""
+"""ADB 管理器 - 封装 Android Debug Bridge 命令
+
+shell 命令默认通过每台设备的持久 shell 会话执行（见 adb_shell），
+截图通过 exec-out screencap 直接读取原始像素，不在设备上生成临时文件。
+"""
 import subprocess
 import json
 import re
 import os
+import threading
 import time
 from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 
+from app.services.adb_shell import EXIT_TIMEOUT, AdbShellSession
+from app.utils.config import get_backend_config
+
 
 class ADBManager:
     """ADB 管理器类"""
@@ -28,6 +36,12 @@ class ADBManager:
             raise FileNotFoundError(f"ADB 可执行文件不存在: {self.adb_path}")
         
         print(f"[ADBManager] 使用 ADB 路径: {self.adb_path}")
+        
+        # 每台设备一个持久 shell 会话（配置项 backend.adb.persistentShell 可关闭）
+        adb_config = get_backend_config().get('adb', {}) or {}
+        self.persistent_shell = adb_config.get('persistentShell', True)
+        self._shell_sessions: Dict[str, AdbShellSession] = {}
+        self._shell_lock = threading.Lock()
     
     def auto_connect_device(self) -> Tuple[bool, Optional[str], Optional[str]]:
         """自动连接设备（如果有设备则返回，没有则尝试启动 ADB 服务器）
@@ -135,6 +149,20 @@ class ADBManager:
         Returns:
             (成功与否, 标准输出, 标准错误)
         """
+        if self.persistent_shell:
+            device_id, rest = (args[1], args[2:]) if args[:1] == ['-s'] and len(args) > 1 else (None, args)
+            if len(rest) > 1 and rest[0] == 'shell':
+                # adb 会把 shell 后的参数用空格拼接后交给设备上的 sh 执行，这里保持相同的拼接方式
+                ok, exit_code, stdout, stderr = self._get_shell_session(device_id).run(
+                    ' '.join(rest[1:]), timeout=timeout
+                )
+                if ok:
+                    success = exit_code == 0 if check else True
+                    return success, stdout, stderr
+                if exit_code == EXIT_TIMEOUT:
+                    return False, "", stderr
+                print(f"[ADBManager] 持久 shell 执行失败，改用独立进程: {stderr}")
+        
         try:
             cmd = [self.adb_path] + args
             print(f"[ADBManager] 执行命令: {' '.join(cmd)}")
@@ -156,6 +184,23 @@ class ADBManager:
         except Exception as e:
             return False, "", str(e)
     
+    def _get_shell_session(self, device_id: Optional[str]) -> AdbShellSession:
+        """获取设备的持久 shell 会话"""
+        key = device_id or ''
+        with self._shell_lock:
+            session = self._shell_sessions.get(key)
+            if session is None:
+                session = AdbShellSession(self.adb_path, device_id)
+                self._shell_sessions[key] = session
+            return session
+    
+    def close_shell_sessions(self):
+        """关闭所有持久 shell 会话"""
+        with self._shell_lock:
+            sessions, self._shell_sessions = list(self._shell_sessions.values()), {}
+        for session in sessions:
+            session.close()
+    
     def start_server(self) -> Tuple[bool, str]:
         """启动 ADB 服务器
         
@@ -173,6 +218,7 @@ class ADBManager:
         Returns:
             (成功与否, 错误信息)
         """
+        self.close_shell_sessions()
         success, stdout, stderr = self._run_command(['kill-server'])
         if not success:
             return False, f"停止 ADB 服务器失败: {stderr}"
@@ -556,6 +602,49 @@ class ADBManager:
             return False, f"按键失败: {stderr}"
         return True, ""
     
+    def _exec_out(self, args: List[str], device_id: Optional[str] = None,
+                  timeout: int = 15) -> Tuple[bool, bytes, str]:
+        """执行 adb exec-out 命令，返回原始二进制输出"""
+        device_args = ['-s', device_id] if device_id else []
+        try:
+            result = subprocess.run(
+                [self.adb_path] + device_args + ['exec-out'] + args,
+                capture_output=True,
+                timeout=timeout,
+                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0),
+            )
+        except subprocess.TimeoutExpired:
+            return False, b"", f"命令执行超时（{timeout}秒）"
+        except Exception as e:
+            return False, b"", str(e)
+        if result.returncode != 0:
+            return False, result.stdout, result.stderr.decode('utf-8', errors='ignore')
+        return True, result.stdout, ""
+    
+    def capture_screen(self, device_id: Optional[str] = None):
+        """截取屏幕原始像素（不经过PNG编码和临时文件）
+        
+        Returns:
+            (成功与否, RGBA 图像数组 (h, w, 4), 错误信息)
+        """
+        import numpy as np
+        
+        success, data, error = self._exec_out(['screencap'], device_id)
+        if not success:
+            return False, None, f"截图失败: {error}"
+        if len(data) < 12:
+            return False, None, "截图失败: 设备返回的数据为空"
+        
+        # 头部为 宽、高、像素格式（Android 9+ 还有色彩空间），均为小端 uint32
+        width, height, pixel_format = np.frombuffer(data, dtype='<u4', count=3)
+        width, height = int(width), int(height)
+        header_size = len(data) - width * height * 4
+        if pixel_format != 1 or header_size not in (12, 16):
+            return False, None, f"截图失败: 不支持的像素格式 {int(pixel_format)}"
+        
+        pixels = np.frombuffer(data, dtype=np.uint8, offset=header_size).reshape(height, width, 4)
+        return True, pixels, ""
+    
     def screenshot(self, save_path: str, device_id: Optional[str] = None) -> Tuple[bool, str]:
         """截取屏幕
         
@@ -566,26 +655,13 @@ class ADBManager:
         Returns:
             (成功与否, 错误信息)
         """
-        device_args = ['-s', device_id] if device_id else []
-        
-        # 先截图到设备
-        temp_path = '/sdcard/screenshot_temp.png'
-        success, stdout, stderr = self._run_command(
-            device_args + ['shell', 'screencap', '-p', temp_path]
-        )
-        if not success:
-            return False, f"截图失败: {stderr}"
-        
-        # 拉取到本地
-        success, stdout, stderr = self._run_command(
-            device_args + ['pull', temp_path, save_path]
-        )
-        if not success:
-            return False, f"拉取截图失败: {stderr}"
-        
-        # 删除设备上的临时文件
-        self._run_command(device_args + ['shell', 'rm', temp_path], check=False)
+        # 设备端编码PNG后直接输出到标准输出，不再经过 /sdcard 临时文件和 pull
+        success, data, error = self._exec_out(['screencap', '-p'], device_id)
+        if not success or not data:
+            return False, f"截图失败: {error or '设备返回的数据为空'}"
         
+        with open(save_path, 'wb') as f:
+            f.write(data)
         return True, ""
     
     def install_apk(self, apk_path: str, device_id: Optional[str] = None) -> Tuple[bool, str]:
@@ -860,6 +936,10 @@ class ADBManager:
         Returns:
             (成功与否, 错误信息)
         """
+        with self._shell_lock:
+            session = self._shell_sessions.pop(f"{ip_address}:{port}", None)
+        if session is not None:
+            session.close()
         success, stdout, stderr = self._run_command(['disconnect', f"{ip_address}:{port}"])
         if not success:
             return False, f"断开连接失败: {stderr}"
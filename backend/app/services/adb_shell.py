@@ -0,0 +1,179 @@
+"""ADB 持久 shell 会话 - 每台设备保持一个 `adb shell` 进程，命令通过队列依次执行
+
+每条命令写入同一个 shell 的标准输入，命令结束后在 stdout/stderr 各输出一行结束标记
+（stdout 的标记带退出码），读到两个标记即得到该命令的输出，不再为每次点击/滑动/按键启动新的 adb 进程。
+命令超时或进程退出时关闭会话，下一条命令自动重建。
+调用方等待超时后，仍在队列中的命令被标记为已取消，出队时跳过，不会在之后才在设备上执行。
+"""
+import queue
+import subprocess
+import threading
+import uuid
+from typing import Optional, Tuple
+
+
+# 命令超时时返回的退出码（会话已被关闭，不应再用独立进程重试）
+EXIT_TIMEOUT = -2
+
+class _ShellCommand:
+    __slots__ = ('command', 'timeout', 'done', 'result', 'state_lock', 'started', 'cancelled')
+
+    def __init__(self, command: str, timeout: float):
+        self.command = command
+        self.timeout = timeout
+        self.done = threading.Event()
+        self.result: Tuple[bool, int, str, str] = (False, -1, '', '')
+        self.state_lock = threading.Lock()
+        self.started = False
+        self.cancelled = False
+
+    def start(self) -> bool:
+        """出队时调用，命令已被取消时返回 False"""
+        with self.state_lock:
+            if self.cancelled:
+                return False
+            self.started = True
+            return True
+
+    def cancel(self) -> bool:
+        """调用方等待超时时调用，命令尚未开始执行时取消并返回 True"""
+        with self.state_lock:
+            if self.started:
+                return False
+            self.cancelled = True
+            return True
+
+
+class AdbShellSession:
+    """单台设备的持久 shell 会话"""
+
+    def __init__(self, adb_path: str, device_id: Optional[str] = None):
+        self.adb_path = adb_path
+        self.device_id = device_id
+        self._process: Optional[subprocess.Popen] = None
+        self._stdout: 'queue.Queue[Optional[str]]' = queue.Queue()
+        self._stderr: 'queue.Queue[Optional[str]]' = queue.Queue()
+        self._commands: 'queue.Queue[Optional[_ShellCommand]]' = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.executed = 0
+        self.restarts = 0
+        self.cancelled = 0
+
+    def _start_process(self):
+        device_args = ['-s', self.device_id] if self.device_id else []
+        self._stdout = queue.Queue()
+        self._stderr = queue.Queue()
+        self._process = subprocess.Popen(
+            [self.adb_path] + device_args + ['shell'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0),
+        )
+        for stream, lines in ((self._process.stdout, self._stdout), (self._process.stderr, self._stderr)):
+            threading.Thread(target=self._pump, args=(stream, lines), daemon=True).start()
+        self.restarts += 1
+
+    @staticmethod
+    def _pump(stream, lines: queue.Queue):
+        """把子进程输出按行放入队列（进程结束时放入 None）"""
+        try:
+            for raw in iter(stream.readline, b''):
+                lines.put(raw.decode('utf-8', errors='ignore'))
+        except Exception:
+            pass
+        finally:
+            lines.put(None)
+
+    def _kill_process(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.kill()
+            process.wait(timeout=2)
+        except Exception:
+            pass
+
+    def run(self, command: str, timeout: float = 30) -> Tuple[bool, int, str, str]:
+        """执行一条 shell 命令，返回 (是否正常完成, 退出码, 标准输出, 标准错误)"""
+        with self._lock:
+            if self._closed:
+                return False, -1, '', 'ADB shell 会话已关闭'
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, daemon=True,
+                                                name=f'adb-shell-{self.device_id or "default"}')
+                self._worker.start()
+
+        item = _ShellCommand(command, timeout)
+        self._commands.put(item)
+        # 排队时间 + 执行时间
+        if not item.done.wait(timeout * 2 + 5):
+            if item.cancel():
+                return False, EXIT_TIMEOUT, '', f'命令排队超时（{timeout}秒），已取消'
+            return False, EXIT_TIMEOUT, '', f'命令执行超时（{timeout}秒）'
+        return item.result
+
+    def _work(self):
+        """命令队列：按提交顺序依次在同一个 shell 中执行"""
+        while True:
+            item = self._commands.get()
+            if item is None:
+                break
+            if not item.start():
+                self.cancelled += 1
+                continue
+            try:
+                item.result = self._execute(item.command, item.timeout)
+            except TimeoutError as e:
+                item.result = (False, EXIT_TIMEOUT, '', str(e))
+            except Exception as e:
+                self._kill_process()
+                item.result = (False, -1, '', str(e))
+            item.done.set()
+
+    def _execute(self, command: str, timeout: float) -> Tuple[bool, int, str, str]:
+        if self._process is None or self._process.poll() is not None:
+            self._start_process()
+
+        marker = f"__WEBRPA_{uuid.uuid4().hex}__"
+        # 标准输入重定向到 /dev/null，避免命令读取到后续写入的脚本
+        script = f"{{ {command}\n}} </dev/null\necho \"{marker} $?\"\necho \"{marker}\" >&2\n"
+        self._process.stdin.write(script.encode('utf-8'))
+        self._process.stdin.flush()
+
+        stdout, exit_code = self._read_until(self._stdout, marker, timeout)
+        stderr, _ = self._read_until(self._stderr, marker, timeout)
+        self.executed += 1
+        return True, exit_code, stdout, stderr
+
+    def _read_until(self, lines: queue.Queue, marker: str, timeout: float) -> Tuple[str, int]:
+        output = []
+        while True:
+            try:
+                line = lines.get(timeout=timeout)
+            except queue.Empty:
+                self._kill_process()
+                raise TimeoutError(f"命令执行超时（{timeout}秒）")
+            if line is None:
+                self._kill_process()
+                raise RuntimeError("ADB shell 进程已退出")
+            index = line.find(marker)
+            if index < 0:
+                output.append(line)
+                continue
+            if index > 0:
+                # 命令输出没有以换行结尾
+                output.append(line[:index])
+            code = line[index + len(marker):].strip()
+            return ''.join(output), int(code) if code.lstrip('-').isdigit() else 0
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._commands.put(None)
+        self._kill_process()
@@ -0,0 +1,411 @@
+"""API轮询引擎 - 多个 API 触发器共用一个调度循环
+
+- 每个事件循环只有一个调度任务，按下次检查时间维护一个最小堆，
+  不再为每个 API 触发器单独运行一个 sleep 循环
+- 请求使用 HTTP 客户端池中的客户端，保持 keep-alive 连接
+- 条件请求：记录 ETag / Last-Modified，下次发送 If-None-Match / If-Modified-Since，
+  304 响应或响应体与上次完全相同时跳过 JSON 解析和条件判断
+- 自适应间隔：数据未变化时逐步拉长检查间隔（不超过 maxInterval），数据变化后恢复；
+  请求失败时指数退避，并对所有间隔加入随机抖动，避免大量触发器同时发请求
+- 支持长轮询（服务端挂起请求直到有新数据）和 SSE（text/event-stream）接口
+"""
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import random
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+from app.services.http_client_pool import RETRY_STATUS_CODES, _retry_after, get_http_client_pool
+from app.utils.config import get_backend_config
+
+
+DEFAULT_MAX_CONCURRENT = 20
+DEFAULT_MAX_BACKOFF = 300
+DEFAULT_JITTER = 0.1
+# 数据未变化时间隔的增长倍数
+INTERVAL_GROWTH = 1.5
+# 长轮询两次请求之间的最小间隔（秒）
+LONG_POLL_GAP = 0.05
+
+POLL_MODES = ('poll', 'longpoll', 'sse')
+
+
+@dataclass
+class ApiWatchOptions:
+    """一个 API 监听的请求参数"""
+    url: str
+    method: str = 'GET'
+    headers: dict = field(default_factory=dict)
+    body: Any = None
+    interval: float = 10  # 基础检查间隔（秒）
+    max_interval: float = 0  # 数据未变化时的最大间隔，0 表示与 interval 相同（不自适应）
+    mode: str = 'poll'  # poll / longpoll / sse
+    request_timeout: float = 30
+
+
+# matcher(data) -> (条件是否满足, 说明)；on_check(watch, status, detail) 在每次检查后调用，
+# status 为 unchanged（数据未变化）/ not_met（条件未满足）/ error（请求失败）
+Matcher = Callable[[Any], tuple]
+CheckCallback = Callable[['ApiWatch', str, str], Awaitable[None]]
+
+
+class ApiWatch:
+    """一个 API 监听，条件满足后 result 得到 (检查次数, 响应数据, 说明)"""
+
+    def __init__(self, options: ApiWatchOptions, matcher: Matcher,
+                 on_check: Optional[CheckCallback] = None):
+        self.options = options
+        self.matcher = matcher
+        self.on_check = on_check
+        self.result: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        self.checks = 0
+        self.failures = 0
+        self.not_modified = 0
+        self.current_interval = max(0.0, float(options.interval))
+        self.next_delay = 0.0
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.body_hash: Optional[bytes] = None
+        self.last_event_id: Optional[str] = None
+        self.retry_delay: Optional[float] = None  # SSE 服务端指定的重连间隔
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.result.done()
+
+    @property
+    def max_interval(self) -> float:
+        return max(float(self.options.max_interval or 0), float(self.options.interval))
+
+
+class _LoopScheduler:
+    """绑定到一个事件循环的调度器"""
+
+    def __init__(self, engine: 'ApiPollEngine'):
+        self.engine = engine
+        self.heap: list = []
+        self.watches: set = set()
+        self.wakeup = asyncio.Event()
+        self.semaphore = asyncio.Semaphore(engine.max_concurrent)
+        self.task: Optional[asyncio.Task] = None
+
+
+class ApiPollEngine:
+    """API 触发器的共享轮询引擎"""
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF, jitter: float = DEFAULT_JITTER):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_backoff = max(1.0, float(max_backoff))
+        self.jitter = min(max(0.0, float(jitter)), 0.5)
+        # 事件循环 -> 调度器（按循环对象本身索引，循环被回收后条目自动移除）
+        self._schedulers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopScheduler] = \
+            weakref.WeakKeyDictionary()
+        self._seq = itertools.count()
+
+        self.requests = 0
+        self.not_modified = 0
+        self.unchanged_bodies = 0
+        self.errors = 0
+
+    def add(self, watch: ApiWatch):
+        """开始监听"""
+        scheduler = self._get_scheduler()
+        scheduler.watches.add(watch)
+        if watch.options.mode == 'sse':
+            watch._task = asyncio.get_running_loop().create_task(self._run_sse(watch))
+            return
+        self._schedule(scheduler, watch, 0)
+        if scheduler.task is None or scheduler.task.done():
+            scheduler.task = asyncio.get_running_loop().create_task(self._run(scheduler))
+
+    def remove(self, watch: ApiWatch):
+        """停止监听（条件满足、超时或工作流被取消时调用）"""
+        if not watch.result.done():
+            watch.result.cancel()
+        if watch._task is not None and not watch._task.done():
+            watch._task.cancel()
+        scheduler = self._schedulers.get(asyncio.get_running_loop())
+        if scheduler is not None:
+            scheduler.watches.discard(watch)
+            scheduler.wakeup.set()
+
+    def get_stats(self) -> dict:
+        return {
+            'watches': sum(len(s.watches) for s in self._schedulers.values()),
+            'requests': self.requests,
+            'notModified': self.not_modified,
+            'unchangedBodies': self.unchanged_bodies,
+            'errors': self.errors,
+        }
+
+    def _get_scheduler(self) -> _LoopScheduler:
+        loop = asyncio.get_running_loop()
+        scheduler = self._schedulers.get(loop)
+        if scheduler is None:
+            # 调度器持有所属循环的引用，已关闭的循环不会被自动回收，在这里清理
+            for old_loop in [old for old in self._schedulers if old.is_closed()]:
+                del self._schedulers[old_loop]
+            scheduler = _LoopScheduler(self)
+            self._schedulers[loop] = scheduler
+        return scheduler
+
+    def _jittered(self, delay: float) -> float:
+        if delay <= 0 or not self.jitter:
+            return max(0.0, delay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _schedule(self, scheduler: _LoopScheduler, watch: ApiWatch, delay: float):
+        watch.next_delay = delay
+        heapq.heappush(scheduler.heap, (time.monotonic() + delay, next(self._seq), watch))
+        scheduler.wakeup.set()
+
+    async def _run(self, scheduler: _LoopScheduler):
+        """调度循环：到期的监听各自起一个检查任务，检查完成后重新入堆"""
+        loop = asyncio.get_running_loop()
+        try:
+            while scheduler.watches:
+                if not scheduler.heap:
+                    scheduler.wakeup.clear()
+                    await scheduler.wakeup.wait()
+                    continue
+                due, _, watch = scheduler.heap[0]
+                if watch.done or watch not in scheduler.watches:
+                    heapq.heappop(scheduler.heap)
+                    continue
+                delay = due - time.monotonic()
+                if delay > 0:
+                    scheduler.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(scheduler.wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                heapq.heappop(scheduler.heap)
+                watch._task = asyncio.get_running_loop().create_task(self._check(scheduler, watch))
+        finally:
+            if self._schedulers.get(loop) is scheduler and not scheduler.watches:
+                del self._schedulers[loop]
+
+    async def _check(self, scheduler: _LoopScheduler, watch: ApiWatch):
+        """发送一次请求并判断条件"""
+        options = watch.options
+        watch.checks += 1
+        try:
+            async with scheduler.semaphore:
+                response = await self._request(watch)
+        except asyncio.CancelledError:
+            raise
+        except httpx.ReadTimeout:
+            if options.mode == 'longpoll':
+                # 长轮询超时表示期间没有新数据
+                await self._after_check(scheduler, watch, 'unchanged', '长轮询超时，没有新数据')
+            else:
+                await self._after_error(scheduler, watch, '请求超时')
+            return
+        except Exception as e:
+            await self._after_error(scheduler, watch, str(e) or type(e).__name__)
+            return
+
+        if response.status_code == 304:
+            self.not_modified += 1
+            watch.not_modified += 1
+            await self._after_check(scheduler, watch, 'unchanged', '数据未变化（304）')
+            return
+        if response.status_code >= 400:
+            retry_after = None
+            if response.status_code in RETRY_STATUS_CODES and response.headers.get('Retry-After'):
+                retry_after = _retry_after(response, 0)
+            await self._after_error(scheduler, watch, f"HTTP {response.status_code}", retry_after)
+            return
+
+        watch.etag = response.headers.get('ETag') or watch.etag
+        watch.last_modified = response.headers.get('Last-Modified') or watch.last_modified
+        content = response.content
+        body_hash = hashlib.blake2b(content, digest_size=16).digest()
+        if body_hash == watch.body_hash:
+            self.unchanged_bodies += 1
+            await self._after_check(scheduler, watch, 'unchanged', '数据未变化')
+            return
+
+        try:
+            data = json.loads(content)
+        except ValueError as e:
+            await self._after_error(scheduler, watch, f"响应不是有效的JSON: {str(e)}")
+            return
+        # 只有解析成功的响应才记录，解析失败的同一响应下次仍按失败处理
+        watch.body_hash = body_hash
+        if self._match(watch, data):
+            return
+        await self._after_check(scheduler, watch, 'not_met', '')
+
+    async def _request(self, watch: ApiWatch) -> httpx.Response:
+        options = watch.options
+        headers = dict(options.headers or {})
+        lower = {key.lower() for key in headers}
+        if watch.etag and 'if-none-match' not in lower:
+            headers['If-None-Match'] = watch.etag
+        if watch.last_modified and 'if-modified-since' not in lower:
+            headers['If-Modified-Since'] = watch.last_modified
+
+        self.requests += 1
+        async with get_http_client_pool().client(options.url) as client:
+            return await client.request(
+                options.method,
+                options.url,
+                headers=headers,
+                json=options.body,
+                timeout=options.request_timeout,
+            )
+
+    def _match(self, watch: ApiWatch, data: Any) -> bool:
+        """条件满足时设置结果并返回 True"""
+        met, detail = watch.matcher(data)
+        if met and not watch.done:
+            watch.result.set_result((watch.checks, data, detail))
+        return met
+
+    async def _after_check(self, scheduler: _LoopScheduler, watch: ApiWatch, status: str, detail: str):
+        watch.failures = 0
+        if watch.options.mode == 'longpoll':
+            delay = LONG_POLL_GAP
+        else:
+            if status == 'unchanged':
+                grown = max(watch.current_interval * INTERVAL_GROWTH, 1.0)
+                watch.current_interval = min(grown, watch.max_interval)
+            else:
+                watch.current_interval = float(watch.options.interval)
+            delay = self._jittered(watch.current_interval)
+        await self._reschedule(scheduler, watch, status, detail, delay)
+
+    async def _after_error(self, scheduler: _LoopScheduler, watch: ApiWatch, detail: str,
+                           retry_after: Optional[float] = None):
+        self.errors += 1
+        watch.failures += 1
+        watch.current_interval = float(watch.options.interval)
+        delay = self._backoff(watch) if retry_after is None else retry_after
+        await self._reschedule(scheduler, watch, 'error', detail, delay)
+
+    def _backoff(self, watch: ApiWatch) -> float:
+        base = max(float(watch.options.interval), 1.0)
+        return self._jittered(min(base * 2 ** (watch.failures - 1), self.max_backoff))
+
+    async def _reschedule(self, scheduler: _LoopScheduler, watch: ApiWatch, status: str, detail: str,
+                          delay: float):
+        if watch.done or watch not in scheduler.watches:
+            return
+        watch.next_delay = delay
+        await self._notify(watch, status, detail)
+        if not watch.done and watch in scheduler.watches:
+            self._schedule(scheduler, watch, delay)
+
+    async def _notify(self, watch: ApiWatch, status: str, detail: str):
+        if watch.on_check is None:
+            return
+        try:
+            await watch.on_check(watch, status, detail)
+        except Exception:
+            pass
+
+    async def _run_sse(self, watch: ApiWatch):
+        """SSE：保持一个流式连接，每个 data 事件判断一次条件，断开后按退避间隔重连"""
+        options = watch.options
+        while not watch.done:
+            headers = dict(options.headers or {})
+            headers.setdefault('Accept', 'text/event-stream')
+            headers.setdefault('Cache-Control', 'no-cache')
+            if watch.last_event_id:
+                headers['Last-Event-ID'] = watch.last_event_id
+            try:
+                self.requests += 1
+                async with get_http_client_pool().client(options.url) as client, client.stream(
+                    options.method,
+                    options.url,
+                    headers=headers,
+                    json=options.body,
+                    timeout=httpx.Timeout(options.request_timeout, read=None),
+                ) as response:
+                    if response.status_code >= 400:
+                        raise httpx.HTTPStatusError(
+                            f"HTTP {response.status_code}", request=response.request, response=response)
+                    watch.failures = 0
+                    if await self._read_events(watch, response):
+                        return
+                delay = self._jittered(watch.retry_delay or float(options.interval))
+                detail = '事件流已断开'
+                status = 'unchanged'
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                watch.failures += 1
+                delay = self._backoff(watch)
+                detail = str(e) or type(e).__name__
+                status = 'error'
+            watch.next_delay = delay
+            await self._notify(watch, status, detail)
+            await asyncio.sleep(delay)
+
+    async def _read_events(self, watch: ApiWatch, response: httpx.Response) -> bool:
+        """逐个解析事件，条件满足时返回 True"""
+        data_lines: list = []
+        async for line in response.aiter_lines():
+            if line:
+                if line.startswith(':'):
+                    continue
+                name, _, value = line.partition(':')
+                if value.startswith(' '):
+                    value = value[1:]
+                if name == 'data':
+                    data_lines.append(value)
+                elif name == 'id':
+                    watch.last_event_id = value
+                elif name == 'retry' and value.isdigit():
+                    watch.retry_delay = int(value) / 1000
+                continue
+            if not data_lines:
+                continue
+
+            text = '\n'.join(data_lines)
+            data_lines = []
+            watch.checks += 1
+            try:
+                data = json.loads(text)
+            except ValueError:
+                data = text
+            if self._match(watch, data):
+                return True
+            watch.next_delay = 0
+            await self._notify(watch, 'not_met', '')
+        return False
+
+
+_api_poll_engine: Optional[ApiPollEngine] = None
+
+
+def get_api_poll_engine() -> ApiPollEngine:
+    """获取API轮询引擎单例
+
+    配置项（WebRPAConfig.json 的 backend.apiTrigger）：
+        maxConcurrent: 同时进行的检查请求数上限
+        maxBackoff: 请求失败时的最大退避间隔（秒）
+        jitter: 检查间隔的随机抖动比例（0~0.5）
+    """
+    global _api_poll_engine
+    if _api_poll_engine is None:
+        trigger_config = get_backend_config().get('apiTrigger', {}) or {}
+        _api_poll_engine = ApiPollEngine(
+            max_concurrent=trigger_config.get('maxConcurrent', DEFAULT_MAX_CONCURRENT),
+            max_backoff=trigger_config.get('maxBackoff', DEFAULT_MAX_BACKOFF),
+            jitter=trigger_config.get('jitter', DEFAULT_JITTER),
+        )
+    return _api_poll_engine
@@ -0,0 +1,352 @@
+"""浏览器池服务 - 在多次工作流执行之间复用 Playwright 和浏览器
+
+原先每次执行都启动新的 Playwright 驱动进程，打开网页模块再启动新的浏览器和上下文，
+计划任务连续执行时每次都要付出数秒的启动开销。浏览器池：
+- 每个事件循环共享一个长期运行的 Playwright 实例
+- 按 浏览器类型/channel/可执行文件路径/用户数据目录/无头模式/启动参数 分组保存已启动的浏览器上下文
+- 执行以租约方式独占一个浏览器上下文，执行结束后归还（浏览器保持打开）；
+  下一次租出前重置状态：非持久化上下文换成同一浏览器中新建的上下文（Cookie、localStorage/sessionStorage、
+  权限都不会带到下一次执行）；持久化上下文新建一个干净的标签页并关闭之前的标签页（保留用户数据目录中的登录状态）
+- 租出前检查健康状态，浏览器已断开、上下文已关闭（例如用户手动关闭了窗口）或重置失败的直接丢弃
+- 超过最大存活时间的浏览器不再租出，关闭后重新启动
+- 空闲浏览器超过上限时关闭最久未使用的；无头浏览器空闲超时后关闭
+  （有界面的浏览器空闲时保持打开，与原先执行结束后浏览器保持打开的行为一致）
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from app.utils.config import get_backend_config
+
+
+DEFAULT_MAX_IDLE = 4
+DEFAULT_MAX_LIFETIME = 3600
+DEFAULT_IDLE_TIMEOUT = 300
+# 租出前重置浏览器状态的超时秒数，超时视为浏览器不健康
+RESET_TIMEOUT = 10
+# 空闲浏览器清理检查间隔
+REAP_INTERVAL = 30
+
+
+@dataclass(frozen=True)
+class BrowserKey:
+    """浏览器池的键，启动参数完全相同的浏览器才能互相替代"""
+    browser_type: str
+    channel: Optional[str] = None
+    executable_path: Optional[str] = None
+    user_data_dir: Optional[str] = None
+    headless: bool = False
+    args: tuple = ()
+
+
+class BrowserEntry:
+    """池中的一个浏览器上下文"""
+
+    def __init__(self, key: BrowserKey, browser: Any, context: Any,
+                 new_context: Optional[Callable[[Any], Awaitable[Any]]] = None):
+        self.key = key
+        # 持久化上下文（launch_persistent_context）没有单独的 Browser 对象
+        self.browser = browser
+        self.context = context
+        # 重置时在 browser 上新建上下文的协程函数（与首次启动时的上下文设置一致）
+        self.new_context = new_context
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.lease: Optional['BrowserLease'] = None
+        self.lease_count = 0
+        self.closed = False
+        self.attach_context(context)
+        if browser is not None:
+            browser.on("disconnected", lambda *_: self._mark_closed())
+
+    def attach_context(self, context: Any):
+        """换成新的上下文，之后只有它关闭才视为浏览器已关闭"""
+        self.context = context
+        context.on("close", lambda *_: self._context_closed(context))
+
+    def _context_closed(self, context: Any):
+        if context is self.context:
+            self._mark_closed()
+
+    def _mark_closed(self):
+        self.closed = True
+
+    @property
+    def persistent(self) -> bool:
+        return self.browser is None
+
+    def is_healthy(self) -> bool:
+        if self.closed:
+            return False
+        if self.browser is not None and not self.browser.is_connected():
+            return False
+        return True
+
+
+class BrowserLease:
+    """一次执行对浏览器上下文的租约"""
+
+    def __init__(self, entry: BrowserEntry, page: Any = None):
+        self.entry = entry
+        self.page = page
+        self.released = False
+
+    @property
+    def browser(self) -> Any:
+        return self.entry.browser
+
+    @property
+    def context(self) -> Any:
+        return self.entry.context
+
+
+class _LoopState:
+    """单个事件循环内的浏览器池状态（Playwright 对象只能在创建它的事件循环中使用）"""
+
+    def __init__(self):
+        self.playwright: Any = None
+        self.playwright_lock = asyncio.Lock()
+        self.entries: list[BrowserEntry] = []
+        self.reaper: Optional[asyncio.Task] = None
+
+
+class BrowserPool:
+    """进程级的浏览器池"""
+
+    def __init__(self, enabled: bool = True, max_idle: int = DEFAULT_MAX_IDLE,
+                 max_lifetime: float = DEFAULT_MAX_LIFETIME, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.enabled = enabled
+        self.max_idle = max(0, int(max_idle))
+        self.max_lifetime = max(0.0, float(max_lifetime))
+        self.idle_timeout = max(0.0, float(idle_timeout))
+        self._states: dict[asyncio.AbstractEventLoop, _LoopState] = {}
+
+        self.launched = 0
+        self.reused = 0
+        self.recycled = 0
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            for old_loop in [old for old in self._states if old.is_closed()]:
+                del self._states[old_loop]
+            state = self._states[loop] = _LoopState()
+        return state
+
+    async def get_playwright(self) -> Any:
+        """获取当前事件循环共享的 Playwright 实例（第一次调用时启动）"""
+        state = self._state()
+        if state.playwright is None:
+            async with state.playwright_lock:
+                if state.playwright is None:
+                    from playwright.async_api import async_playwright
+                    state.playwright = await async_playwright().start()
+        return state.playwright
+
+    def is_shared_playwright(self, playwright: Any) -> bool:
+        return any(state.playwright is playwright for state in self._states.values())
+
+    def _expired(self, entry: BrowserEntry) -> bool:
+        return bool(self.max_lifetime) and time.monotonic() - entry.created_at > self.max_lifetime
+
+    async def checkout(self, key: BrowserKey) -> Optional[BrowserLease]:
+        """租用一个空闲的同配置浏览器，没有可用的返回 None（由调用方启动后通过 adopt 放入池中）"""
+        if not self.enabled:
+            return None
+        state = self._state()
+        # 最近使用的优先，它的页面缓存和连接最热
+        candidates = sorted(
+            (entry for entry in state.entries if entry.key == key and entry.lease is None),
+            key=lambda entry: entry.last_used, reverse=True,
+        )
+        for entry in candidates:
+            if not entry.is_healthy() or self._expired(entry):
+                if not entry.closed:
+                    self.recycled += 1
+                await self._close_entry(state, entry)
+                continue
+            lease = BrowserLease(entry)
+            entry.lease = lease
+            try:
+                lease.page = await asyncio.wait_for(self._reset(entry), RESET_TIMEOUT)
+            except Exception as e:
+                print(f"[BrowserPool] 重置浏览器状态失败，丢弃该浏览器: {e}")
+                entry.lease = None
+                await self._close_entry(state, entry)
+                continue
+            entry.lease_count += 1
+            self.reused += 1
+            return lease
+
+        # 没有可复用的浏览器：先关闭占用同一用户数据目录的空闲浏览器，避免与即将启动的浏览器冲突
+        if key.user_data_dir:
+            for entry in list(state.entries):
+                if entry.lease is None and entry.key.user_data_dir == key.user_data_dir:
+                    await self._close_entry(state, entry)
+        return None
+
+    async def _reset(self, entry: BrowserEntry) -> Any:
+        """重置浏览器状态
+
+        非持久化上下文：新建上下文替换旧的，清空 Cookie、本地存储、IndexedDB 和权限等全部状态。
+        持久化上下文：先新建干净的标签页再关闭旧标签页（保证上下文始终有页面，不会随最后一个标签页关闭）。
+        """
+        if not entry.persistent:
+            old_context = entry.context
+            if entry.new_context is not None:
+                context = await entry.new_context(entry.browser)
+            else:
+                context = await entry.browser.new_context()
+            entry.attach_context(context)
+            try:
+                await old_context.close()
+            except Exception:
+                pass
+            return await context.new_page()
+
+        context = entry.context
+        old_pages = list(context.pages)
+        page = await context.new_page()
+        for old_page in old_pages:
+            try:
+                await old_page.close()
+            except Exception:
+                pass
+        return page
+
+    def adopt(self, key: BrowserKey, browser: Any, context: Any,
+              new_context: Optional[Callable[[Any], Awaitable[Any]]] = None) -> Optional[BrowserLease]:
+        """把调用方新启动的浏览器放入池中，并直接租给调用方
+
+        new_context: 非持久化上下文重置时用于新建上下文的协程函数，参数为 Browser；
+            不传时使用默认参数的 browser.new_context()
+        """
+        if not self.enabled or context is None:
+            return None
+        state = self._state()
+        entry = BrowserEntry(key, browser, context, new_context)
+        lease = BrowserLease(entry)
+        entry.lease = lease
+        entry.lease_count = 1
+        state.entries.append(entry)
+        self.launched += 1
+        if state.reaper is None or state.reaper.done():
+            state.reaper = asyncio.get_running_loop().create_task(self._reap(state))
+        return lease
+
+    async def release(self, lease: BrowserLease):
+        """归还租约，浏览器保持打开等待下一次租用"""
+        if lease.released:
+            return
+        lease.released = True
+        entry = lease.entry
+        if entry.lease is not lease:
+            return
+        entry.lease = None
+        entry.last_used = time.monotonic()
+        state = self._state()
+        if not entry.is_healthy():
+            await self._close_entry(state, entry)
+            return
+        await self._trim(state)
+
+    async def discard(self, lease: BrowserLease):
+        """归还租约并关闭浏览器（停止执行、执行后自动关闭浏览器时使用）
+
+        浏览器已经被之后的执行重新租用时不关闭
+        """
+        lease.released = True
+        entry = lease.entry
+        if entry.lease is not None and entry.lease is not lease:
+            return
+        entry.lease = None
+        await self._close_entry(self._state(), entry)
+
+    async def _trim(self, state: _LoopState):
+        """空闲浏览器超过上限时关闭最久未使用的"""
+        idle = sorted((entry for entry in state.entries if entry.lease is None), key=lambda entry: entry.last_used)
+        while len(idle) > self.max_idle:
+            await self._close_entry(state, idle.pop(0))
+
+    async def _reap(self, state: _LoopState):
+        """定期关闭空闲超时、超过存活时间或已失效的空闲浏览器，池为空时退出"""
+        while state.entries:
+            await asyncio.sleep(REAP_INTERVAL)
+            now = time.monotonic()
+            for entry in list(state.entries):
+                if entry.lease is not None:
+                    continue
+                if not entry.is_healthy():
+                    await self._close_entry(state, entry)
+                elif entry.key.headless and (
+                    (self.idle_timeout and now - entry.last_used > self.idle_timeout) or self._expired(entry)
+                ):
+                    self.recycled += 1
+                    await self._close_entry(state, entry)
+
+    async def _close_entry(self, state: _LoopState, entry: BrowserEntry):
+        if entry in state.entries:
+            state.entries.remove(entry)
+        if entry.closed and (entry.browser is None or not entry.browser.is_connected()):
+            return
+        entry.closed = True
+        try:
+            if entry.browser is not None:
+                await entry.browser.close()
+            else:
+                await entry.context.close()
+        except Exception as e:
+            print(f"[BrowserPool] 关闭浏览器时出错: {e}")
+
+    async def close_all(self):
+        """关闭当前事件循环中的所有浏览器并停止共享的 Playwright（应用关闭时调用）"""
+        loop = asyncio.get_running_loop()
+        state = self._states.pop(loop, None)
+        if state is None:
+            return
+        if state.reaper is not None:
+            state.reaper.cancel()
+        for entry in list(state.entries):
+            await self._close_entry(state, entry)
+        if state.playwright is not None:
+            try:
+                await state.playwright.stop()
+            except Exception as e:
+                print(f"[BrowserPool] 停止 Playwright 时出错: {e}")
+
+    def get_stats(self) -> dict:
+        entries = [entry for state in self._states.values() for entry in state.entries]
+        return {
+            'enabled': self.enabled,
+            'browsers': len(entries),
+            'leased': sum(1 for entry in entries if entry.lease is not None),
+            'launched': self.launched,
+            'reused': self.reused,
+            'recycled': self.recycled,
+        }
+
+
+_browser_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """获取浏览器池单例
+
+    配置项（WebRPAConfig.json 的 backend.browserPool）：
+        enabled: 是否启用浏览器池（默认启用；关闭后每次执行独立启动 Playwright 和浏览器）
+        maxIdle: 最多保留的空闲浏览器数量
+        maxLifetime: 浏览器最长存活秒数，超过后不再租出，关闭后重新启动（0 表示不限制）
+        idleTimeout: 无头浏览器空闲多少秒后关闭（0 表示不关闭）
+    """
+    global _browser_pool
+    if _browser_pool is None:
+        pool_config = get_backend_config().get('browserPool', {}) or {}
+        _browser_pool = BrowserPool(
+            enabled=pool_config.get('enabled', True),
+            max_idle=pool_config.get('maxIdle', DEFAULT_MAX_IDLE),
+            max_lifetime=pool_config.get('maxLifetime', DEFAULT_MAX_LIFETIME),
+            idle_timeout=pool_config.get('idleTimeout', DEFAULT_IDLE_TIMEOUT),
+        )
+    return _browser_pool
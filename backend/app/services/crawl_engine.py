@@ -0,0 +1,229 @@
+"""全站爬取引擎 - 共享浏览器上下文的并发爬虫
+
+- 待爬队列按广度优先（deque），URL 规范化后去重，同一 URL 只入队一次
+- N 个工作协程各自复用一个页面，共用同一个浏览器上下文
+- 每个页面只加载一次：一次 evaluate 同时取回 HTML 和链接
+- 按主机限制并发数和请求间隔（礼貌爬取）
+- 可拦截图片/字体/媒体请求
+- 每爬完一个页面立即回调，调用方可以增量写入变量或数据表
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from app.services.worker_pool import run_in_worker
+
+
+# 开启资源拦截时中止的请求类型
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+
+_SNAPSHOT_SCRIPT = """() => ({
+    html: document.documentElement.outerHTML,
+    links: Array.from(document.querySelectorAll('a[href]'), a => a.href),
+})"""
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """规范化 URL（协议和主机小写、去掉默认端口和锚点、空路径补 /），非 http(s) 返回 None"""
+    if base:
+        url = urljoin(base, url)
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if ':' in netloc:
+        netloc = f'[{netloc}]'  # IPv6
+    if port and port != _DEFAULT_PORTS[scheme]:
+        netloc = f'{netloc}:{port}'
+    if parts.username or parts.password:
+        netloc = f"{parts.username or ''}{':' + parts.password if parts.password else ''}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+@dataclass
+class CrawlOptions:
+    """爬取选项"""
+    max_depth: int = 2
+    limit: int = 100
+    concurrency: int = 4
+    per_host_limit: int = 4  # 同一主机的最大并发页面数，0 表示不限制
+    per_host_delay: float = 0  # 同一主机两次请求之间的最小间隔（秒）
+    include_patterns: list = field(default_factory=list)
+    exclude_patterns: list = field(default_factory=list)
+    allow_external_links: bool = False
+    block_resources: bool = False
+    timeout: float = 30000  # 页面加载超时（毫秒）
+    wait_until: str = 'networkidle'
+
+
+class _HostLimiter:
+    """单个主机的并发和间隔限制"""
+
+    def __init__(self, limit: int, delay: float):
+        self._semaphore = asyncio.Semaphore(limit) if limit > 0 else None
+        self._delay = delay
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        if self._semaphore is not None:
+            await self._semaphore.acquire()
+        if self._delay > 0:
+            async with self._lock:
+                wait = self._next_at - time.monotonic()
+                self._next_at = max(time.monotonic(), self._next_at) + self._delay
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+    async def __aexit__(self, *exc):
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+
+class CrawlEngine:
+    """一次全站爬取"""
+
+    def __init__(self, options: CrawlOptions,
+                 parse_page: Callable[[str, str], dict],
+                 on_result: Optional[Callable[[dict], Awaitable[None]]] = None,
+                 on_progress: Optional[Callable[[str, str], Awaitable[None]]] = None):
+        """
+        Args:
+            parse_page: (url, html) -> 页面结果，在工作线程中执行
+            on_result: 每得到一个页面结果时调用
+            on_progress: 进度消息回调 (message, level)
+        """
+        self.options = options
+        self.parse_page = parse_page
+        self.on_result = on_result
+        self.on_progress = on_progress
+
+        self.results: list = []
+        self.failed = 0
+        self._frontier: deque = deque()
+        self._seen: set = set()
+        self._in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._hosts: dict = {}
+        self._base_host = ''
+
+    def _allowed(self, url: str) -> bool:
+        options = self.options
+        if not options.allow_external_links and urlsplit(url).netloc != self._base_host:
+            return False
+        if options.include_patterns and not any(p in url for p in options.include_patterns):
+            return False
+        if options.exclude_patterns and any(p in url for p in options.exclude_patterns):
+            return False
+        return True
+
+    def _enqueue(self, url: Optional[str], depth: int):
+        if not url or url in self._seen or depth > self.options.max_depth:
+            return
+        self._seen.add(url)
+        if self._allowed(url):
+            self._frontier.append((url, depth))
+
+    async def _next(self) -> Optional[tuple]:
+        """取出下一个待爬 URL；全部完成或达到页面限制时返回 None"""
+        async with self._condition:
+            while True:
+                budget = self.options.limit - len(self.results) - self._in_flight
+                if self._frontier and budget > 0:
+                    self._in_flight += 1
+                    return self._frontier.popleft()
+                if self._in_flight == 0:
+                    return None
+                await self._condition.wait()
+
+    async def _done(self):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _host_limiter(self, url: str) -> _HostLimiter:
+        host = urlsplit(url).netloc
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            limiter = _HostLimiter(self.options.per_host_limit, self.options.per_host_delay)
+            self._hosts[host] = limiter
+        return limiter
+
+    async def _progress(self, message: str, level: str = 'info'):
+        if self.on_progress:
+            await self.on_progress(message, level)
+
+    async def _worker(self, browser_context):
+        page = None
+        try:
+            while True:
+                item = await self._next()
+                if item is None:
+                    return
+                url, depth = item
+                try:
+                    await self._progress(f"⏳ 正在爬取 ({len(self.results) + self._in_flight}/{self.options.limit}): {url}")
+                    if page is None or page.is_closed():
+                        page = await browser_context.new_page()
+                    async with self._host_limiter(url):
+                        await page.goto(url, timeout=self.options.timeout, wait_until=self.options.wait_until)
+                        snapshot = await page.evaluate(_SNAPSHOT_SCRIPT)
+                    # 重定向后的地址也记为已访问
+                    self._seen.add(normalize_url(page.url) or url)
+
+                    result = await run_in_worker(self.parse_page, url, snapshot['html'])
+                    if len(self.results) < self.options.limit:
+                        self.results.append(result)
+                        if self.on_result:
+                            await self.on_result(result)
+
+                    if depth < self.options.max_depth:
+                        for link in snapshot['links']:
+                            self._enqueue(normalize_url(link, url), depth + 1)
+                except Exception as e:
+                    self.failed += 1
+                    await self._progress(f"⚠️ 跳过页面 {url}: {str(e)}", "warning")
+                finally:
+                    await self._done()
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+
+    async def run(self, start_url: str, browser_context) -> list:
+        """从 start_url 开始爬取，返回页面结果（按完成顺序）"""
+        start = normalize_url(start_url)
+        if not start:
+            raise ValueError(f"无效的URL: {start_url}")
+        self._base_host = urlsplit(start).netloc
+        self._condition = asyncio.Condition()
+
+        if self.options.block_resources:
+            async def block(route):
+                if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+                    await route.abort()
+                else:
+                    await route.continue_()
+            await browser_context.route('**/*', block)
+
+        self._enqueue(start, 0)
+        workers = [asyncio.create_task(self._worker(browser_context))
+                   for _ in range(max(1, self.options.concurrency))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+        return self.results
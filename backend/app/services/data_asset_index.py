@@ -0,0 +1,424 @@
+"""Excel 数据资源索引 - 持久化文件元数据，工作表名称按需读取
+
+原先导入 data_assets 模块时就遍历上传目录并用 openpyxl/xlrd 打开每个工作簿读取工作表名称，
+文件多或文件大时拖慢后端启动；按名称查找文件是线性扫描，非 UUID 文件名的文件每次启动都换一个新 ID，
+上传时的原始文件名重启后也会丢失。数据资源索引：
+- 元数据保存在 SQLite（uploads/data_assets.db），ID、原始文件名、上传时间重启后保持不变
+- 第一次访问时才加载索引并遍历目录，只 stat 文件：修改时间和大小没变的沿用索引中的信息，
+  变化的清空工作表名称，新增的登记，已不存在的删除
+- 工作表名称在第一次需要时才打开工作簿读取，读取结果写回索引，文件不变就不会再次打开
+- 内存中按 ID 和原始文件名建立映射，查找为 O(1)；同名文件按登记序号排列，按名称查找取最早登记的
+- 文件夹集合在创建、重命名、删除文件夹和上传、移动文件时增量维护，列出文件夹不再遍历目录
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS data_assets (
+    id TEXT PRIMARY KEY,
+    rel_path TEXT NOT NULL UNIQUE,
+    original_name TEXT NOT NULL,
+    uploaded_at TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sheet_names TEXT,
+    error TEXT,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_COLUMNS = "id, rel_path, original_name, uploaded_at, size, mtime_ns, sheet_names, error, seq"
+_PLACEHOLDERS = ", ".join("?" * len(_COLUMNS.split(", ")))
+
+
+def read_sheet_names(file_path: str) -> list[str]:
+    """打开工作簿读取工作表名称（根据文件格式选择不同的库）"""
+    if file_path.lower().endswith('.xls'):
+        import xlrd
+        # on_demand 只读取工作簿目录，不加载工作表内容
+        wb = xlrd.open_workbook(file_path, on_demand=True)
+        try:
+            return wb.sheet_names()
+        finally:
+            wb.release_resources()
+    import openpyxl
+    wb = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        return wb.sheetnames
+    finally:
+        wb.close()
+
+
+def _is_uuid_name(name: str) -> bool:
+    return len(name) == 36 and name.count('-') == 4
+
+
+def _in_folder(folder: str, parent: str) -> bool:
+    """folder 是否是 parent 本身或其子文件夹"""
+    return folder == parent or folder.startswith(parent + '/')
+
+
+@dataclass
+class DataAsset:
+    """一个 Excel 文件的索引信息"""
+    id: str
+    rel_path: str
+    original_name: str
+    uploaded_at: str
+    size: int
+    mtime_ns: int
+    sheet_names: Optional[list[str]] = None  # None 表示尚未读取
+    error: Optional[str] = None  # 读取工作表名称失败的原因
+    seq: int = 0  # 登记序号，移动、重命名和更新时保持不变
+
+    @property
+    def name(self) -> str:
+        return self.rel_path.rsplit('/', 1)[-1]
+
+    @property
+    def folder(self) -> str:
+        return self.rel_path.rsplit('/', 1)[0] if '/' in self.rel_path else ''
+
+    def to_row(self) -> tuple:
+        sheet_names = json.dumps(self.sheet_names, ensure_ascii=False) if self.sheet_names is not None else None
+        return (self.id, self.rel_path, self.original_name, self.uploaded_at,
+                self.size, self.mtime_ns, sheet_names, self.error, self.seq)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'DataAsset':
+        asset_id, rel_path, original_name, uploaded_at, size, mtime_ns, sheet_names, error, seq = row
+        return cls(asset_id, rel_path, original_name, uploaded_at, size, mtime_ns,
+                   json.loads(sheet_names) if sheet_names is not None else None, error, seq)
+
+
+class DataAssetIndex:
+    """Excel 数据资源索引（第一次访问时加载，方法可在工作线程中调用）"""
+
+    def __init__(self, root: str, db_path: str):
+        self.root = root
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._loaded = False
+        self._assets: dict[str, DataAsset] = {}
+        self._by_name: dict[str, list[str]] = {}
+        self._by_path: dict[str, str] = {}
+        self._folders: set[str] = set()
+        self._next_seq = 1
+
+        self.workbooks_opened = 0
+
+    # ---- 路径 ----
+
+    def full_path(self, rel_path: str = '') -> str:
+        if not rel_path:
+            return self.root
+        return os.path.join(self.root, rel_path.replace('/', os.sep))
+
+    def rel_path(self, full_path: str) -> str:
+        rel = os.path.relpath(full_path, self.root)
+        return '' if rel == '.' else rel.replace(os.sep, '/')
+
+    def to_dict(self, asset: DataAsset) -> dict:
+        """资源信息（与原先 data_assets 字典中的字段一致）"""
+        return {
+            'id': asset.id,
+            'name': asset.name,
+            'originalName': asset.original_name,
+            'size': asset.size,
+            'uploadedAt': asset.uploaded_at,
+            'sheetNames': asset.sheet_names if asset.sheet_names is not None else [],
+            'path': self.full_path(asset.rel_path),
+            'folder': asset.folder,
+        }
+
+    # ---- 加载 ----
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(data_assets)")}
+            if 'seq' not in columns:
+                # 旧版索引没有登记序号，按原有的 rowid 顺序补上
+                conn.execute("ALTER TABLE data_assets ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+                conn.execute("UPDATE data_assets SET seq = rowid")
+        except sqlite3.Error as e:
+            # 上传目录只读等情况下只在内存中保存索引
+            print(f"[DataAssets] 打开资源索引失败，本次只使用内存索引: {self.db_path} ({e})")
+            conn = sqlite3.connect(':memory:', check_same_thread=False, isolation_level=None)
+            conn.executescript(_SCHEMA)
+        return conn
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._conn = self._connect()
+        indexed = {
+            row[1]: DataAsset.from_row(row)
+            for row in self._conn.execute(f"SELECT {_COLUMNS} FROM data_assets ORDER BY seq")
+        }
+        used_ids = {asset.id for asset in indexed.values()}
+        self._next_seq = max((asset.seq for asset in indexed.values()), default=0) + 1
+        found: list[DataAsset] = []
+        upserts: list[DataAsset] = []
+
+        for root, dirs, files in os.walk(self.root):
+            # 按名称排序，新发现的文件每次都按相同的顺序登记
+            dirs.sort()
+            folder = self.rel_path(root)
+            if folder:
+                self._folders.add(folder)
+            for filename in sorted(files):
+                if not filename.lower().endswith(EXCEL_EXTENSIONS):
+                    continue
+                rel_path = f"{folder}/{filename}" if folder else filename
+                try:
+                    stat = os.stat(os.path.join(root, filename))
+                except OSError as e:
+                    print(f"[DataAssets] 读取Excel文件信息失败 {filename}: {str(e)}")
+                    continue
+                asset = indexed.pop(rel_path, None)
+                if asset is None:
+                    # 新文件：UUID 格式的文件名直接作为 ID，否则生成新 ID 并保存到索引
+                    name_without_ext = os.path.splitext(filename)[0]
+                    asset_id = name_without_ext if _is_uuid_name(name_without_ext) else str(uuid.uuid4())
+                    if asset_id in used_ids:
+                        asset_id = str(uuid.uuid4())
+                    used_ids.add(asset_id)
+                    asset = DataAsset(asset_id, rel_path, filename,
+                                      datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                                      stat.st_size, stat.st_mtime_ns, seq=self._take_seq())
+                    upserts.append(asset)
+                elif asset.mtime_ns != stat.st_mtime_ns or asset.size != stat.st_size:
+                    # 文件有变化，工作表名称在下次需要时重新读取
+                    asset.size, asset.mtime_ns = stat.st_size, stat.st_mtime_ns
+                    asset.sheet_names = asset.error = None
+                    upserts.append(asset)
+                found.append(asset)
+
+        for asset in sorted(found, key=lambda a: a.seq):
+            self._add(asset)
+        self._write(upserts, [asset.id for asset in indexed.values()])
+        self._loaded = True
+        print(f"[DataAssets] 已加载 {len(self._assets)} 个Excel文件（新增或变化 {len(upserts)} 个，移除 {len(indexed)} 个）")
+
+    def _write(self, upserts: list[DataAsset], deletes: list[str] = ()):
+        if not upserts and not deletes:
+            return
+        self._conn.execute("BEGIN")
+        try:
+            if deletes:
+                self._conn.executemany("DELETE FROM data_assets WHERE id = ?", [(i,) for i in deletes])
+            if upserts:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO data_assets ({_COLUMNS}) VALUES ({_PLACEHOLDERS})",
+                    [asset.to_row() for asset in upserts],
+                )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _take_seq(self) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        return seq
+
+    # ---- 内存映射 ----
+
+    def _add_folder(self, folder: str):
+        while folder and folder not in self._folders:
+            self._folders.add(folder)
+            folder = folder.rsplit('/', 1)[0] if '/' in folder else ''
+
+    def _add(self, asset: DataAsset):
+        self._assets[asset.id] = asset
+        ids = self._by_name.setdefault(asset.original_name, [])
+        ids.append(asset.id)
+        if len(ids) > 1 and self._assets[ids[-2]].seq > asset.seq:
+            # 移动或重命名的文件保持原来的登记顺序
+            ids.sort(key=lambda i: self._assets[i].seq)
+        self._by_path[asset.rel_path] = asset.id
+        self._add_folder(asset.folder)
+
+    def _remove(self, asset: DataAsset):
+        self._assets.pop(asset.id, None)
+        if self._by_path.get(asset.rel_path) == asset.id:
+            del self._by_path[asset.rel_path]
+        ids = self._by_name.get(asset.original_name)
+        if ids and asset.id in ids:
+            ids.remove(asset.id)
+            if not ids:
+                del self._by_name[asset.original_name]
+
+    # ---- 查询 ----
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def ensure_loaded(self):
+        """加载索引（第一次调用时遍历上传目录，阻塞操作，在事件循环中应通过工作线程调用）"""
+        with self._lock:
+            self._ensure_loaded()
+
+    def get(self, asset_id: str) -> Optional[DataAsset]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._assets.get(asset_id)
+
+    def get_by_name(self, original_name: str) -> Optional[DataAsset]:
+        """按原始文件名查找，同名文件取最早登记的一个"""
+        with self._lock:
+            self._ensure_loaded()
+            ids = self._by_name.get(original_name)
+            return self._assets[ids[0]] if ids else None
+
+    def list_assets(self, folder: Optional[str] = None) -> list[DataAsset]:
+        """列出资源（folder 为 None 时列出全部），并确保工作表名称已读取
+
+        工作表名称读取失败（不是有效的 Excel 文件）的资源不列出
+        """
+        with self._lock:
+            self._ensure_loaded()
+            assets = [a for a in self._assets.values() if folder is None or a.folder == folder]
+        self.ensure_sheet_names(assets)
+        return [a for a in assets if a.error is None]
+
+    def list_folders(self) -> list[str]:
+        with self._lock:
+            self._ensure_loaded()
+            return sorted(self._folders)
+
+    def ensure_sheet_names(self, assets: list[DataAsset]):
+        """为尚未读取工作表名称的资源打开工作簿读取，结果写回索引"""
+        pending = [a for a in assets if a.sheet_names is None and a.error is None]
+        if not pending:
+            return
+        results = []
+        # 打开工作簿时不持有锁，避免阻塞其他查询
+        for asset in pending:
+            mtime_ns = asset.mtime_ns
+            try:
+                sheet_names, error = read_sheet_names(self.full_path(asset.rel_path)), None
+            except Exception as e:
+                sheet_names, error = None, str(e) or e.__class__.__name__
+                print(f"[DataAssets] 读取Excel文件失败 {asset.name}: {error}")
+            self.workbooks_opened += 1
+            results.append((asset, mtime_ns, sheet_names, error))
+
+        with self._lock:
+            updated = []
+            for asset, mtime_ns, sheet_names, error in results:
+                # 读取期间文件被删除或替换时丢弃结果
+                if self._assets.get(asset.id) is not asset or asset.mtime_ns != mtime_ns:
+                    continue
+                asset.sheet_names, asset.error = sheet_names, error
+                updated.append(asset)
+            self._write(updated)
+
+    # ---- 修改（文件系统操作由调用方完成）----
+
+    def add(self, full_path: str, original_name: str, sheet_names: list[str]) -> DataAsset:
+        """登记新上传的文件"""
+        stat = os.stat(full_path)
+        name_without_ext = os.path.splitext(os.path.basename(full_path))[0]
+        with self._lock:
+            self._ensure_loaded()
+            existing_id = self._by_path.get(self.rel_path(full_path))
+            if existing_id:
+                self._remove(self._assets[existing_id])
+            asset_id = name_without_ext if _is_uuid_name(name_without_ext) else str(uuid.uuid4())
+            if asset_id in self._assets:
+                self._remove(self._assets[asset_id])
+            asset = DataAsset(asset_id, self.rel_path(full_path), original_name,
+                              datetime.now().isoformat(), stat.st_size, stat.st_mtime_ns, sheet_names,
+                              seq=self._take_seq())
+            self._add(asset)
+            self._write([asset], [existing_id] if existing_id and existing_id != asset.id else [])
+            return asset
+
+    def update_path(self, asset_id: str, new_full_path: str, original_name: Optional[str] = None) -> DataAsset:
+        """文件被移动或重命名后更新索引（original_name 不为 None 时同时修改原始文件名）"""
+        with self._lock:
+            self._ensure_loaded()
+            asset = self._assets[asset_id]
+            self._remove(asset)
+            asset.rel_path = self.rel_path(new_full_path)
+            if original_name is not None:
+                asset.original_name = original_name
+            self._add(asset)
+            self._write([asset])
+            return asset
+
+    def remove(self, asset_id: str):
+        with self._lock:
+            self._ensure_loaded()
+            asset = self._assets.get(asset_id)
+            if asset:
+                self._remove(asset)
+                self._write([], [asset_id])
+
+    def add_folder(self, folder: str):
+        with self._lock:
+            self._ensure_loaded()
+            self._add_folder(folder)
+
+    def rename_folder(self, old_folder: str, new_folder: str):
+        """文件夹被重命名后更新其中所有文件和子文件夹"""
+        with self._lock:
+            self._ensure_loaded()
+            self._folders = {
+                new_folder + f[len(old_folder):] if _in_folder(f, old_folder) else f
+                for f in self._folders
+            }
+            self._add_folder(new_folder)
+            updated = [a for a in self._assets.values() if _in_folder(a.folder, old_folder)]
+            for asset in updated:
+                self._remove(asset)
+                asset.rel_path = new_folder + asset.rel_path[len(old_folder):]
+                self._add(asset)
+            self._write(updated)
+
+    def remove_folder(self, folder: str) -> int:
+        """文件夹被删除后移除其中所有文件和子文件夹，返回移除的文件数"""
+        with self._lock:
+            self._ensure_loaded()
+            self._folders = {f for f in self._folders if not _in_folder(f, folder)}
+            removed = [a for a in self._assets.values() if _in_folder(a.folder, folder)]
+            for asset in removed:
+                self._remove(asset)
+            self._write([], [asset.id for asset in removed])
+            return len(removed)
+
+    def get_stats(self) -> dict:
+        return {
+            'loaded': self._loaded,
+            'assets': len(self._assets),
+            'folders': len(self._folders),
+            'workbooksOpened': self.workbooks_opened,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._loaded = False
+            self._next_seq = 1
+            self._assets.clear()
+            self._by_name.clear()
+            self._by_path.clear()
+            self._folders.clear()
@@ -0,0 +1,494 @@
+"""数据导出引擎 - 按批次流式写出 Excel/CSV/Parquet/Arrow 文件
+
+- Excel 新文件：xlsxwriter constant_memory 模式逐行写出，样式只创建一次并共享
+- Excel 已有文件：目标Sheet同样用 xlsxwriter 流式写出，再在 zip 层面替换进原文件，
+  其他Sheet、共享字符串等部件原样复制，不再用 openpyxl 加载和保存整个工作簿
+- CSV/Parquet/Arrow：使用 Polars 原生写出，数据行存储通过 LazyFrame 流式写出
+
+数据源可以是 DataRowStore（按批次读取，不合并成一个大表）或 Polars DataFrame。
+"""
+import importlib.util
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+from html import unescape
+from pathlib import Path
+from typing import Iterator, Optional, Union
+from xml.sax.saxutils import quoteattr
+
+import polars as pl
+
+from app.services.data_row_store import DataRowStore
+
+
+FORMAT_EXCEL = 'excel'
+FORMAT_CSV = 'csv'
+FORMAT_PARQUET = 'parquet'
+FORMAT_IPC = 'ipc'
+
+FORMAT_EXTENSIONS = {
+    FORMAT_EXCEL: '.xlsx',
+    FORMAT_CSV: '.csv',
+    FORMAT_PARQUET: '.parquet',
+    FORMAT_IPC: '.arrow',
+}
+
+# 列宽上限（字符数）
+MAX_COLUMN_WIDTH = 50
+# 替换Sheet时复制 zip 部件的缓冲区大小
+COPY_CHUNK_SIZE = 1024 * 1024
+
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_WORKSHEET_REL = _REL_NS + '/worksheet'
+_CALC_CHAIN_REL = _REL_NS + '/calcChain'
+_WORKSHEET_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml'
+
+_ATTR_PATTERN = re.compile(r'([\w:.-]+)="([^"]*)"')
+_STYLE_ATTR_PATTERN = re.compile(rb'(<(?:c|row)\b[^>]*?\ss=")(\d+)(")')
+
+DataSource = Union[DataRowStore, pl.DataFrame]
+
+
+def get_format_extension(export_format: str) -> str:
+    """获取导出格式对应的文件扩展名"""
+    if export_format not in FORMAT_EXTENSIONS:
+        raise ValueError(f"不支持的导出格式: {export_format}")
+    return FORMAT_EXTENSIONS[export_format]
+
+
+def _iter_frames(source: DataSource) -> Iterator[pl.DataFrame]:
+    if isinstance(source, DataRowStore):
+        yield from source.iter_frames()
+    elif source.height:
+        yield source
+
+
+def _get_columns(source: DataSource) -> list[str]:
+    return list(source.columns)
+
+
+def _lazy(source: DataSource) -> pl.LazyFrame:
+    if isinstance(source, DataRowStore):
+        return source.lazy_frame()
+    return source.lazy()
+
+
+def _cell_width(value) -> int:
+    return len(str(value)) if value is not None else 0
+
+
+def export_data(source: DataSource, filepath: str, export_format: str = FORMAT_EXCEL,
+                sheet_name: str = '数据', append: bool = False) -> str:
+    """导出数据
+
+    Args:
+        source: 数据源（DataRowStore 或 DataFrame）
+        filepath: 文件路径
+        export_format: excel / csv / parquet / ipc
+        sheet_name: Excel Sheet名称（文件已存在时只替换该Sheet）
+        append: CSV 追加写入（文件已存在时不再写表头）
+    """
+    get_format_extension(export_format)
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+    if export_format == FORMAT_EXCEL:
+        write_excel(source, filepath, sheet_name)
+    elif export_format == FORMAT_CSV:
+        write_csv(source, filepath, append=append)
+    elif export_format == FORMAT_PARQUET:
+        _lazy(source).sink_parquet(filepath)
+    else:
+        _lazy(source).sink_ipc(filepath)
+    return filepath
+
+
+def write_csv(source: DataSource, filepath: str, append: bool = False):
+    """写出CSV（追加模式下按批次追加数据行）"""
+    if append and Path(filepath).exists() and Path(filepath).stat().st_size > 0:
+        with open(filepath, 'ab') as f:
+            for frame in _iter_frames(source):
+                frame.write_csv(f, include_header=False)
+        return
+    if not _get_columns(source):
+        pl.DataFrame().write_csv(filepath)
+        return
+    _lazy(source).sink_csv(filepath)
+
+
+def write_excel(source: DataSource, filepath: str, sheet_name: str = '数据'):
+    """写出带样式的Excel文件"""
+    if importlib.util.find_spec('xlsxwriter') is None:
+        # 没有xlsxwriter时使用polars默认导出（合并为一个DataFrame）
+        print("[警告] 缺少必要的库: xlsxwriter，使用polars默认导出")
+        frame = source.to_dataframe() if isinstance(source, DataRowStore) else source
+        frame.write_excel(filepath, worksheet=sheet_name)
+        return
+
+    if Path(filepath).exists():
+        try:
+            _replace_excel_sheet(source, filepath, sheet_name)
+            return
+        except Exception as e:
+            # 替换Sheet失败时回退到xlsxwriter（会覆盖整个文件）
+            print(f"[警告] 替换Sheet失败: {e}，将使用xlsxwriter创建新文件")
+
+    _write_new_excel(source, filepath, sheet_name)
+
+
+def _write_new_excel(source: DataSource, filepath: str, sheet_name: str):
+    """使用 xlsxwriter constant_memory 模式创建新文件，逐行写出"""
+    from xlsxwriter import Workbook
+
+    workbook = Workbook(filepath, {'constant_memory': True})
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+
+        # 样式只创建一次，所有单元格共享
+        header_format = workbook.add_format({
+            'bold': True,
+            'font_size': 11,
+            'font_color': 'white',
+            'bg_color': '#4472C4',
+            'border': 1,
+            'border_color': '#2F5496',
+            'align': 'center',
+            'valign': 'vcenter',
+            'text_wrap': True,
+        })
+        cell_format = workbook.add_format({
+            'font_size': 10,
+            'border': 1,
+            'border_color': '#D9D9D9',
+            'align': 'left',
+            'valign': 'vcenter',
+        })
+        alt_cell_format = workbook.add_format({
+            'font_size': 10,
+            'border': 1,
+            'border_color': '#D9D9D9',
+            'bg_color': '#F2F2F2',
+            'align': 'left',
+            'valign': 'vcenter',
+        })
+
+        columns = _get_columns(source)
+        widths = [len(str(name)) for name in columns]
+
+        # 写入表头（constant_memory 模式下行写完后不能再修改，行高需要先设置）
+        worksheet.set_row(0, 25)
+        for col_idx, col_name in enumerate(columns):
+            worksheet.write(0, col_idx, col_name, header_format)
+
+        # 按批次逐行写入数据，同时统计列宽
+        row_idx = 0
+        for frame in _iter_frames(source):
+            for row in frame.iter_rows():
+                row_format = alt_cell_format if row_idx % 2 == 1 else cell_format
+                for col_idx, value in enumerate(row):
+                    worksheet.write(row_idx + 1, col_idx, value, row_format)
+                    width = _cell_width(value)
+                    if width > widths[col_idx]:
+                        widths[col_idx] = width
+                row_idx += 1
+
+        for col_idx, width in enumerate(widths):
+            worksheet.set_column(col_idx, col_idx, min(width + 4, MAX_COLUMN_WIDTH))
+
+        # 冻结首行
+        worksheet.freeze_panes(1, 0)
+    finally:
+        workbook.close()
+
+
+def _replace_excel_sheet(source: DataSource, filepath: str, sheet_name: str):
+    """替换已有文件中的Sheet，其他Sheet的内容原样保留
+
+    目标Sheet用 xlsxwriter constant_memory 模式写到临时文件，再把其中的工作表部件和样式
+    合并进原文件的 zip 包，其余部件按块复制，不需要把整个工作簿加载到内存中。
+    原文件的结构无法直接替换时（例如目标是图表Sheet）退回 openpyxl 重建。
+    """
+    target = Path(filepath)
+    with tempfile.TemporaryDirectory(prefix='webrpa_export_') as work_dir:
+        sheet_path = os.path.join(work_dir, 'sheet.xlsx')
+        _write_new_excel(source, sheet_path, sheet_name)
+
+        fd, output_path = tempfile.mkstemp(prefix=f'.{target.stem}_', suffix='.xlsx', dir=target.parent)
+        os.close(fd)
+        try:
+            try:
+                _swap_excel_sheet(filepath, sheet_path, sheet_name, output_path)
+            except _UnsupportedWorkbook as e:
+                print(f"[DataExport] 无法直接替换Sheet（{e}），使用openpyxl重建")
+                os.remove(output_path)
+                _rebuild_excel_sheet(source, filepath, sheet_name)
+                return
+            os.replace(output_path, filepath)
+        finally:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
+
+class _UnsupportedWorkbook(Exception):
+    """工作簿结构不支持在 zip 层面替换Sheet"""
+
+
+def _attrs(tag: str) -> dict:
+    return {name: unescape(value) for name, value in _ATTR_PATTERN.findall(tag)}
+
+
+def _resolve_part(base_dir: str, target: str) -> str:
+    """关系中的 Target 转换为 zip 内的部件名"""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _rels_path(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, '_rels', name + '.rels')
+
+
+def _section(xml: str, tag: str) -> re.Match:
+    match = re.search(rf'<{tag}\b[^>]*?(?<!/)>(.*?)</{tag}>', xml, re.S)
+    if match is None:
+        raise _UnsupportedWorkbook(f"styles.xml 缺少 {tag}")
+    return match
+
+
+def _children(content: str, tag: str) -> list[str]:
+    return re.findall(rf'<{tag}\b(?:[^>]*/>|.*?</{tag}>)', content, re.S)
+
+
+def _merge_children(xml: str, tag: str, child_tag: str, children: list[str]) -> tuple[str, list[int]]:
+    """把子元素合并到 styles.xml 的某个集合中，返回新的 XML 和各子元素合并后的编号
+
+    已有完全相同的元素时直接使用它，反复导出到同一个文件时样式表不会越来越大。
+    """
+    match = _section(xml, tag)
+    existing = _children(match.group(1), child_tag)
+    positions = {child: index for index, child in reversed(list(enumerate(existing)))}
+    added, indices = [], []
+    for child in children:
+        if child not in positions:
+            positions[child] = len(existing) + len(added)
+            added.append(child)
+        indices.append(positions[child])
+    if not added:
+        return xml, indices
+    open_tag = xml[match.start():match.start(1)]
+    if 'count="' in open_tag:
+        open_tag = re.sub(r'count="\d+"', f'count="{len(existing) + len(added)}"', open_tag)
+    xml = xml[:match.start()] + open_tag + match.group(1) + ''.join(added) + xml[match.end(1):]
+    return xml, indices
+
+
+def _merge_styles(target_xml: str, source_xml: str) -> tuple[str, dict[int, int]]:
+    """把 xlsxwriter 生成的字体/填充/边框/单元格格式合并到原文件的样式表，返回单元格格式编号的映射
+
+    xlsxwriter 的第一个字体、前两个填充、第一个边框和第一个单元格格式是默认值，
+    引用它们时使用原文件中对应的默认值。
+    """
+    if re.search(r'<numFmts\b', source_xml):
+        raise _UnsupportedWorkbook("导出格式包含自定义数字格式")
+    fonts = _children(_section(source_xml, 'fonts').group(1), 'font')
+    fills = _children(_section(source_xml, 'fills').group(1), 'fill')
+    borders = _children(_section(source_xml, 'borders').group(1), 'border')
+    xfs = _children(_section(source_xml, 'cellXfs').group(1), 'xf')
+
+    target_xml, font_ids = _merge_children(target_xml, 'fonts', 'font', fonts[1:])
+    target_xml, fill_ids = _merge_children(target_xml, 'fills', 'fill', fills[2:])
+    target_xml, border_ids = _merge_children(target_xml, 'borders', 'border', borders[1:])
+
+    def remap(xf: str) -> str:
+        def shift(attr: str, skip: int, ids: list[int]):
+            def repl(match):
+                value = int(match.group(1))
+                return f'{attr}="{ids[value - skip] if value >= skip else value}"'
+            return repl
+        xf = re.sub(r'fontId="(\d+)"', shift('fontId', 1, font_ids), xf)
+        xf = re.sub(r'fillId="(\d+)"', shift('fillId', 2, fill_ids), xf)
+        xf = re.sub(r'borderId="(\d+)"', shift('borderId', 1, border_ids), xf)
+        return re.sub(r'xfId="\d+"', 'xfId="0"', xf)
+
+    target_xml, xf_ids = _merge_children(target_xml, 'cellXfs', 'xf', [remap(xf) for xf in xfs[1:]])
+    return target_xml, {index: xf_ids[index - 1] for index in range(1, len(xfs))}
+
+
+def _copy_sheet_xml(src, dst, mapping: dict[int, int]):
+    """按块复制工作表 XML，替换单元格和行上的格式编号"""
+    def repl(match):
+        index = int(match.group(2))
+        return match.group(1) + str(mapping.get(index, index)).encode() + match.group(3)
+
+    pending = b''
+    while True:
+        chunk = src.read(COPY_CHUNK_SIZE)
+        data = pending + chunk
+        if chunk:
+            # 只处理到最后一个完整的标签，剩余部分与下一块一起处理
+            cut = data.rfind(b'>') + 1
+            data, pending = data[:cut], data[cut:]
+        else:
+            pending = b''
+        # 新Sheet不作为选中的标签页，保留原文件的当前标签页
+        data = data.replace(b' tabSelected="1"', b'')
+        dst.write(_STYLE_ATTR_PATTERN.sub(repl, data))
+        if not chunk:
+            break
+
+
+def _find_part(zf: zipfile.ZipFile, rels_part: str, rel_type: str, base_dir: str) -> Optional[str]:
+    rels = zf.read(rels_part).decode('utf-8')
+    for tag in re.findall(r'<Relationship\b[^>]*>', rels):
+        attrs = _attrs(tag)
+        if attrs.get('Type') == rel_type:
+            return _resolve_part(base_dir, attrs['Target'])
+    return None
+
+
+def _swap_excel_sheet(filepath: str, sheet_path: str, sheet_name: str, output_path: str):
+    """把 sheet_path（只含一个Sheet的新文件）中的Sheet替换进 filepath，结果写到 output_path"""
+    with zipfile.ZipFile(filepath) as target, zipfile.ZipFile(sheet_path) as source:
+        workbook_part = _find_part(target, '_rels/.rels', _REL_NS + '/officeDocument', '') or 'xl/workbook.xml'
+        workbook_dir = posixpath.dirname(workbook_part)
+        workbook_rels_part = _rels_path(workbook_part)
+        workbook_xml = target.read(workbook_part).decode('utf-8')
+        rels_xml = target.read(workbook_rels_part).decode('utf-8')
+        content_types = target.read('[Content_Types].xml').decode('utf-8')
+
+        rels = {}
+        for tag in re.findall(r'<Relationship\b[^>]*>', rels_xml):
+            attrs = _attrs(tag)
+            rels[attrs.get('Id')] = (tag, attrs)
+
+        # 查找同名Sheet
+        sheet_part = None
+        for tag in re.findall(r'<sheet\b[^>]*>', workbook_xml):
+            attrs = _attrs(tag)
+            if attrs.get('name') != sheet_name:
+                continue
+            rel_id = next((value for name, value in attrs.items() if name.endswith(':id')), None)
+            rel = rels.get(rel_id)
+            if rel is None or rel[1].get('Type') != _WORKSHEET_REL:
+                raise _UnsupportedWorkbook(f"Sheet '{sheet_name}' 不是普通工作表")
+            sheet_part = _resolve_part(workbook_dir, rel[1]['Target'])
+            break
+
+        if sheet_part is None:
+            # 新增Sheet：登记关系、Sheet 和内容类型（追加在最后）
+            prefix = re.search(rf'xmlns:(\w+)="{re.escape(_REL_NS)}"', workbook_xml)
+            if prefix is None or '</sheets>' not in workbook_xml:
+                raise _UnsupportedWorkbook("workbook.xml 结构不支持")
+            names = set(target.namelist())
+            number = 1
+            while posixpath.join(workbook_dir, f'worksheets/sheet{number}.xml') in names:
+                number += 1
+            sheet_part = posixpath.join(workbook_dir, f'worksheets/sheet{number}.xml')
+            rel_numbers = [int(n) for n in re.findall(r'Id="rId(\d+)"', rels_xml)]
+            rel_id = f'rId{max(rel_numbers, default=0) + 1}'
+            sheet_ids = [int(n) for n in re.findall(r'<sheet\b[^>]*?\ssheetId="(\d+)"', workbook_xml)]
+            rels_xml = rels_xml.replace('</Relationships>', (
+                f'<Relationship Id="{rel_id}" Type="{_WORKSHEET_REL}" '
+                f'Target="worksheets/sheet{number}.xml"/></Relationships>'))
+            workbook_xml = workbook_xml.replace('</sheets>', (
+                f'<sheet name={quoteattr(sheet_name)} '
+                f'sheetId="{max(sheet_ids, default=0) + 1}" {prefix.group(1)}:id="{rel_id}"/></sheets>'))
+            content_types = content_types.replace('</Types>', (
+                f'<Override PartName="/{sheet_part}" ContentType="{_WORKSHEET_CONTENT_TYPE}"/></Types>'))
+
+        # 计算链引用了旧Sheet中的公式，删除后由 Excel 重新生成
+        calc_chain = None
+        for rel_id, (tag, attrs) in rels.items():
+            if attrs.get('Type') == _CALC_CHAIN_REL:
+                calc_chain = _resolve_part(workbook_dir, attrs['Target'])
+                rels_xml = rels_xml.replace(tag, '')
+        if calc_chain:
+            content_types = re.sub(rf'<Override\b[^>]*PartName="/{re.escape(calc_chain)}"[^>]*/>', '', content_types)
+
+        styles_part = _find_part(target, workbook_rels_part, _REL_NS + '/styles', workbook_dir)
+        if styles_part is None:
+            raise _UnsupportedWorkbook("缺少样式表")
+        styles_xml, mapping = _merge_styles(target.read(styles_part).decode('utf-8'),
+                                            source.read('xl/styles.xml').decode('utf-8'))
+
+        replaced = {
+            workbook_part: workbook_xml,
+            workbook_rels_part: rels_xml,
+            '[Content_Types].xml': content_types,
+            styles_part: styles_xml,
+        }
+        # 旧Sheet的关系（批注、图片等）不再被引用
+        skipped = {sheet_part, _rels_path(sheet_part), calc_chain}
+
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as output:
+            for info in target.infolist():
+                if info.filename in skipped:
+                    continue
+                if info.filename in replaced:
+                    output.writestr(info.filename, replaced[info.filename].encode('utf-8'))
+                    continue
+                with target.open(info) as src, output.open(info.filename, 'w') as dst:
+                    shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+            with source.open('xl/worksheets/sheet1.xml') as src, output.open(sheet_part, 'w') as dst:
+                _copy_sheet_xml(src, dst, mapping)
+
+
+def _rebuild_excel_sheet(source: DataSource, filepath: str, sheet_name: str):
+    """用 openpyxl 加载整个工作簿重建Sheet（无法在 zip 层面替换时使用）"""
+    import openpyxl
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    wb = openpyxl.load_workbook(filepath)
+
+    # 保持原有Sheet顺序
+    index = None
+    if sheet_name in wb.sheetnames:
+        index = wb.sheetnames.index(sheet_name)
+        del wb[sheet_name]
+    ws = wb.create_sheet(sheet_name, index)
+
+    # 样式对象只创建一次，所有单元格共享
+    header_side = Side(style='thin', color='2F5496')
+    cell_side = Side(style='thin', color='D9D9D9')
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    header_border = Border(left=header_side, right=header_side, top=header_side, bottom=header_side)
+    alt_fill = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
+    cell_border = Border(left=cell_side, right=cell_side, top=cell_side, bottom=cell_side)
+
+    columns = _get_columns(source)
+    widths = [len(str(name)) for name in columns]
+
+    for col_idx, col_name in enumerate(columns, 1):
+        cell = ws.cell(row=1, column=col_idx, value=col_name)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        cell.border = header_border
+
+    row_idx = 2
+    for frame in _iter_frames(source):
+        for row in frame.iter_rows():
+            alt = row_idx % 2 == 0
+            for col_idx, value in enumerate(row, 1):
+                cell = ws.cell(row=row_idx, column=col_idx, value=value)
+                cell.border = cell_border
+                if alt:
+                    cell.fill = alt_fill
+                width = _cell_width(value)
+                if width > widths[col_idx - 1]:
+                    widths[col_idx - 1] = width
+            row_idx += 1
+
+    for col_idx, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(width + 4, MAX_COLUMN_WIDTH)
+
+    # 冻结首行
+    ws.freeze_panes = 'A2'
+
+    wb.save(filepath)
@@ -0,0 +1,453 @@
+"""数据行存储 - 按列式批次保存工作流收集的数据行
+
+ExecutionContext.data_rows 使用该存储代替 list[dict]：
+- 新增的行先放在内存尾部（普通 dict，可以直接修改）
+- 尾部达到 chunkSize 行后冻结为 Polars 列式批次
+- 内存中冻结的行数超过 spillThresholdRows 后，最早的批次写入磁盘（Arrow IPC 或 Parquet）
+- 列按首次出现的顺序记录，新列随时可以加入；行数统计为 O(1)
+- Polars 在第一次冻结批次时才导入，只收集少量数据的工作流不需要加载它
+
+保持 list 的常用接口（len、下标访问、迭代、append、pop、clear、copy），
+冻结后的行通过下标读取时返回新的 dict，修改单元格需要使用 set_cell / add_column。
+
+冻结批次中，值类型单一的列（bool/int/float/str）按原生类型保存，
+其他列（混合类型、列表、字典等）按 JSON 文本保存，读取时还原。
+缺失的单元格和 None 在冻结后都读取为 None。
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import shutil
+import tempfile
+import weakref
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from app.utils.config import get_backend_config
+
+if TYPE_CHECKING:
+    import polars as pl
+
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_SPILL_THRESHOLD_ROWS = 200_000
+DEFAULT_SPILL_FORMAT = 'ipc'
+
+_NATIVE_TYPES = (bool, int, float, str)
+
+
+def _json_default(value: Any) -> str:
+    return str(value)
+
+
+def _encode_json(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+
+def _decode_json(text: Optional[str]) -> Any:
+    if text is None:
+        return None
+    return json.loads(text)
+
+
+def _display_value(text: Optional[str]) -> Optional[str]:
+    """JSON 列导出时的显示文本：字符串保持原样，其他值显示为 JSON"""
+    if text is None:
+        return None
+    value = json.loads(text)
+    return value if isinstance(value, str) else text
+
+
+def _decode_lazy(lazy: pl.LazyFrame, json_columns: frozenset) -> pl.LazyFrame:
+    """把 JSON 列转换为显示文本"""
+    import polars as pl
+    if not json_columns:
+        return lazy
+    return lazy.with_columns(
+        pl.col(column).map_elements(_display_value, return_dtype=pl.String)
+        for column in json_columns
+    )
+
+
+class _Chunk:
+    """冻结的数据批次（在内存中或已写入磁盘）"""
+    __slots__ = ('frame', 'path', 'row_count', 'json_columns')
+
+    def __init__(self, frame: pl.DataFrame, json_columns: frozenset):
+        self.frame: Optional[pl.DataFrame] = frame
+        self.path: Optional[str] = None
+        self.row_count = frame.height
+        self.json_columns = json_columns
+
+    @property
+    def spilled(self) -> bool:
+        return self.frame is None
+
+    def load(self) -> pl.DataFrame:
+        import polars as pl
+        if self.frame is not None:
+            return self.frame
+        if self.path.endswith('.parquet'):
+            return pl.read_parquet(self.path)
+        return pl.read_ipc(self.path)
+
+    def decode_row(self, row: dict) -> dict:
+        for column in self.json_columns:
+            row[column] = _decode_json(row.get(column))
+        return row
+
+
+def _build_chunk(rows: list[dict], columns: list[str]) -> _Chunk:
+    """把一批 dict 行转换为列式批次"""
+    import polars as pl
+    series = []
+    json_columns = set()
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        value_types = {type(v) for v in values if v is not None}
+        if not value_types:
+            series.append(pl.Series(column, values, dtype=pl.Null))
+            continue
+        if len(value_types) == 1 and next(iter(value_types)) in _NATIVE_TYPES:
+            try:
+                series.append(pl.Series(column, values, dtype=_polars_dtype(next(iter(value_types)))))
+                continue
+            except (OverflowError, TypeError, pl.exceptions.PolarsError):
+                pass  # 超出 Int64 范围的整数等按 JSON 保存
+        json_columns.add(column)
+        series.append(pl.Series(column, [_encode_json(v) for v in values], dtype=pl.String))
+    return _Chunk(pl.DataFrame(series), frozenset(json_columns))
+
+
+def _polars_dtype(value_type: type):
+    import polars as pl
+    if value_type is bool:
+        return pl.Boolean
+    if value_type is int:
+        return pl.Int64
+    if value_type is float:
+        return pl.Float64
+    return pl.String
+
+
+def _remove_dir(path: str):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+class DataRowStore:
+    """数据行存储"""
+
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        spill_threshold_rows: Optional[int] = None,
+        spill_format: Optional[str] = None,
+        spill_dir: Optional[str] = None,
+    ):
+        store_config = get_backend_config().get('dataRows', {}) or {}
+        self.chunk_size = max(1, int(chunk_size or store_config.get('chunkSize', DEFAULT_CHUNK_SIZE)))
+        self.spill_threshold_rows = int(
+            spill_threshold_rows or store_config.get('spillThresholdRows', DEFAULT_SPILL_THRESHOLD_ROWS)
+        )
+        self.spill_format = spill_format or store_config.get('spillFormat', DEFAULT_SPILL_FORMAT)
+        self._spill_root = spill_dir or store_config.get('spillDir') or None
+
+        self.columns: list[str] = []
+        self._column_set: set[str] = set()
+        self._chunks: list[_Chunk] = []
+        self._chunk_offsets: list[int] = []  # 每个批次第一行的全局下标
+        self._frozen_rows = 0
+        self._in_memory_rows = 0  # 内存中冻结批次的行数
+        self._tail: list[dict] = []
+
+        self._spill_dir: Optional[str] = None
+        self._spill_seq = 0
+        self._finalizer: Optional[weakref.finalize] = None
+        self._cached_index: Optional[int] = None  # 最近读取的磁盘批次
+        self._cached_frame: Optional[pl.DataFrame] = None
+
+    # ===== list 兼容接口 =====
+
+    def __len__(self) -> int:
+        return self._frozen_rows + len(self._tail)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return f"<DataRowStore rows={len(self)} columns={len(self.columns)}>"
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(len(self._chunks)):
+            chunk = self._chunks[index]
+            for row in self._load_chunk(index).iter_rows(named=True):
+                yield chunk.decode_row(row)
+        yield from self._tail
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = self._normalize_index(index)
+        if index >= self._frozen_rows:
+            return self._tail[index - self._frozen_rows]
+        chunk_index, offset = self._locate(index)
+        row = self._load_chunk(chunk_index).row(offset, named=True)
+        return self._chunks[chunk_index].decode_row(row)
+
+    def append(self, row: dict):
+        """追加一行"""
+        self._track_columns(row)
+        self._tail.append(row)
+        if len(self._tail) >= self.chunk_size:
+            self._freeze_tail()
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def pop(self, index: int = -1) -> dict:
+        """删除并返回指定行"""
+        import polars as pl
+        index = self._normalize_index(index)
+        if index >= self._frozen_rows:
+            return self._tail.pop(index - self._frozen_rows)
+
+        chunk_index, offset = self._locate(index)
+        frame = self._load_chunk(chunk_index)
+        row = self._chunks[chunk_index].decode_row(frame.row(offset, named=True))
+        remaining = pl.concat([frame.slice(0, offset), frame.slice(offset + 1)])
+        self._replace_chunk(chunk_index, remaining)
+        return row
+
+    def clear(self):
+        """清空所有数据（同时删除磁盘上的批次文件）"""
+        self.columns = []
+        self._column_set = set()
+        self._chunks = []
+        self._chunk_offsets = []
+        self._frozen_rows = 0
+        self._in_memory_rows = 0
+        self._tail = []
+        self._cached_index = None
+        self._cached_frame = None
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self._spill_dir = None
+
+    def copy(self) -> list[dict]:
+        """复制为 list[dict]（兼容旧代码，数据量大时应使用 to_dataframe / iter_frames）"""
+        return self.to_dicts()
+
+    # ===== 单元格/列操作 =====
+
+    def set_cell(self, index: int, column: str, value: Any):
+        """设置单元格的值"""
+        index = self._normalize_index(index)
+        if index >= self._frozen_rows:
+            self._tail[index - self._frozen_rows][column] = value
+            self._track_column(column)
+            return
+        chunk_index, offset = self._locate(index)
+        rows = self._chunk_rows(chunk_index)
+        rows[offset][column] = value
+        self._track_column(column)
+        self._rebuild_chunk(chunk_index, rows)
+
+    def add_column(self, column: str, default: Any = None):
+        """添加列，已有行中缺少该列的单元格设置为默认值"""
+        self._track_column(column)
+        for row in self._tail:
+            if column not in row:
+                row[column] = default
+        for chunk_index, chunk in enumerate(self._chunks):
+            frame = self._load_chunk(chunk_index)
+            if column in frame.columns and frame[column].null_count() == 0:
+                continue
+            rows = self._chunk_rows(chunk_index)
+            for row in rows:
+                if row.get(column) is None:
+                    row[column] = default
+            self._rebuild_chunk(chunk_index, rows)
+
+    # ===== 读取 =====
+
+    def to_dicts(self) -> list[dict]:
+        return list(self)
+
+    def iter_frames(self) -> Iterator[pl.DataFrame]:
+        """按批次迭代 Polars DataFrame（列按 self.columns 对齐，JSON 列转换为显示文本）"""
+        for index in range(len(self._chunks)):
+            yield self._export_frame(self._load_chunk(index), self._chunks[index].json_columns)
+        if self._tail:
+            chunk = _build_chunk(self._tail, self.columns)
+            yield self._export_frame(chunk.frame, chunk.json_columns)
+
+    def lazy_frame(self) -> pl.LazyFrame:
+        """返回覆盖全部数据的 LazyFrame（磁盘批次按需扫描，可配合 sink_* 流式写出）"""
+        import polars as pl
+        parts = []
+        for chunk in self._chunks:
+            if not chunk.spilled:
+                lazy = chunk.frame.lazy()
+            elif chunk.path.endswith('.parquet'):
+                lazy = pl.scan_parquet(chunk.path)
+            else:
+                lazy = pl.scan_ipc(chunk.path)
+            parts.append(_decode_lazy(lazy, chunk.json_columns))
+        if self._tail:
+            chunk = _build_chunk(self._tail, self.columns)
+            parts.append(_decode_lazy(chunk.frame.lazy(), chunk.json_columns))
+        if not parts:
+            return pl.LazyFrame()
+        return pl.concat(parts, how='diagonal_relaxed').select(self.columns)
+
+    def to_dataframe(self) -> pl.DataFrame:
+        """合并为一个 Polars DataFrame"""
+        import polars as pl
+        frames = list(self.iter_frames())
+        if not frames:
+            return pl.DataFrame()
+        if len(frames) == 1:
+            return frames[0]
+        return pl.concat(frames, how='diagonal_relaxed').select(self.columns)
+
+    @property
+    def row_count(self) -> int:
+        return len(self)
+
+    def get_stats(self) -> dict:
+        return {
+            'rows': len(self),
+            'columns': len(self.columns),
+            'chunks': len(self._chunks),
+            'spilledChunks': sum(1 for chunk in self._chunks if chunk.spilled),
+            'inMemoryRows': self._in_memory_rows + len(self._tail),
+        }
+
+    # ===== 内部实现 =====
+
+    def _normalize_index(self, index: int) -> int:
+        total = len(self)
+        if index < 0:
+            index += total
+        if index < 0 or index >= total:
+            raise IndexError('data row index out of range')
+        return index
+
+    def _track_column(self, column: str):
+        if column not in self._column_set:
+            self._column_set.add(column)
+            self.columns.append(column)
+
+    def _track_columns(self, row: dict):
+        for column in row:
+            if column not in self._column_set:
+                self._column_set.add(column)
+                self.columns.append(column)
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        chunk_index = bisect.bisect_right(self._chunk_offsets, index) - 1
+        return chunk_index, index - self._chunk_offsets[chunk_index]
+
+    def _load_chunk(self, chunk_index: int) -> pl.DataFrame:
+        chunk = self._chunks[chunk_index]
+        if not chunk.spilled:
+            return chunk.frame
+        if self._cached_index != chunk_index:
+            self._cached_frame = chunk.load()
+            self._cached_index = chunk_index
+        return self._cached_frame
+
+    def _chunk_rows(self, chunk_index: int) -> list[dict]:
+        chunk = self._chunks[chunk_index]
+        return [chunk.decode_row(row) for row in self._load_chunk(chunk_index).iter_rows(named=True)]
+
+    def _export_frame(self, frame: pl.DataFrame, json_columns: frozenset) -> pl.DataFrame:
+        import polars as pl
+        frame = _decode_lazy(frame.lazy(), json_columns).collect() if json_columns else frame
+        missing = [column for column in self.columns if column not in frame.columns]
+        if missing:
+            frame = frame.with_columns(pl.lit(None).alias(column) for column in missing)
+        return frame.select(self.columns)
+
+    def _freeze_tail(self):
+        chunk = _build_chunk(self._tail, self._chunk_columns(self._tail))
+        self._chunk_offsets.append(self._frozen_rows)
+        self._chunks.append(chunk)
+        self._frozen_rows += chunk.row_count
+        self._in_memory_rows += chunk.row_count
+        self._tail = []
+        self._maybe_spill()
+
+    def _chunk_columns(self, rows: list[dict]) -> list[str]:
+        present = set()
+        for row in rows:
+            present.update(row)
+        return [column for column in self.columns if column in present]
+
+    def _rebuild_chunk(self, chunk_index: int, rows: list[dict]):
+        chunk = _build_chunk(rows, self._chunk_columns(rows))
+        self._replace_chunk(chunk_index, chunk.frame, chunk.json_columns)
+
+    def _replace_chunk(self, chunk_index: int, frame: pl.DataFrame, json_columns: Optional[frozenset] = None):
+        """替换批次内容（行数变化时更新后续批次的偏移）"""
+        old = self._chunks[chunk_index]
+        if json_columns is None:
+            json_columns = old.json_columns
+        if old.spilled:
+            self._remove_spill_file(old)
+        else:
+            self._in_memory_rows -= old.row_count
+        delta = frame.height - old.row_count
+
+        if frame.height == 0:
+            del self._chunks[chunk_index]
+            del self._chunk_offsets[chunk_index]
+        else:
+            self._chunks[chunk_index] = _Chunk(frame, json_columns)
+            self._in_memory_rows += frame.height
+        for i in range(chunk_index + (0 if frame.height == 0 else 1), len(self._chunk_offsets)):
+            self._chunk_offsets[i] += delta
+        self._frozen_rows += delta
+        self._cached_index = None
+        self._cached_frame = None
+        self._maybe_spill()
+
+    def _maybe_spill(self):
+        """内存中冻结的行数超过阈值时，把最早的内存批次写入磁盘"""
+        if self.spill_threshold_rows <= 0:
+            return
+        for chunk in self._chunks:
+            if self._in_memory_rows <= self.spill_threshold_rows:
+                break
+            if chunk.spilled:
+                continue
+            self._spill_chunk(chunk)
+
+    def _spill_chunk(self, chunk: _Chunk):
+        if self._spill_dir is None:
+            if self._spill_root:
+                os.makedirs(self._spill_root, exist_ok=True)
+            self._spill_dir = tempfile.mkdtemp(prefix='webrpa_rows_', dir=self._spill_root)
+            self._finalizer = weakref.finalize(self, _remove_dir, self._spill_dir)
+
+        self._spill_seq += 1
+        if self.spill_format == 'parquet':
+            path = os.path.join(self._spill_dir, f'chunk_{self._spill_seq}.parquet')
+            chunk.frame.write_parquet(path)
+        else:
+            path = os.path.join(self._spill_dir, f'chunk_{self._spill_seq}.arrow')
+            chunk.frame.write_ipc(path)
+        chunk.path = path
+        chunk.frame = None
+        self._in_memory_rows -= chunk.row_count
+
+    def _remove_spill_file(self, chunk: _Chunk):
+        try:
+            os.remove(chunk.path)
+        except OSError:
+            pass
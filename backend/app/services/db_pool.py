@@ -0,0 +1,354 @@
+"""数据库连接池服务 - 在工作流执行之间复用 MySQL 连接
+
+- 按连接参数（主机/端口/用户/库/字符集）分池，连接在工作流结束后归还连接池而不是关闭
+- 取出空闲连接时做健康检查（ping），空闲超过 maxIdleSeconds 的连接直接淘汰
+- 工作流中的命名连接（db_connect 的 connectionName）在整个执行期间独占一条连接，
+  保证会话状态（事务、会话变量）与原来的单连接行为一致
+- 所有阻塞的数据库操作都在共享工作线程池中执行，不阻塞事件循环
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+import pymysql
+from pymysql.constants import SERVER_STATUS
+from pymysql.cursors import DictCursor, SSDictCursor
+
+from app.services.worker_pool import run_in_worker
+from app.utils.config import get_backend_config
+
+
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_MAX_IDLE_SECONDS = 300
+DEFAULT_HEALTH_CHECK_SECONDS = 30
+DEFAULT_ACQUIRE_TIMEOUT = 30
+DEFAULT_INSERT_BATCH_SIZE = 1000
+DEFAULT_FETCH_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class DbConfig:
+    """数据库连接参数（同时作为连接池的键）"""
+    host: str
+    port: int
+    user: str
+    password: str
+    database: Optional[str]
+    charset: str = 'utf8mb4'
+
+    def connect(self) -> pymysql.Connection:
+        return pymysql.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            charset=self.charset,
+            cursorclass=DictCursor,
+            autocommit=True
+        )
+
+
+class _IdleConnection:
+    __slots__ = ('conn', 'idle_since', 'checked_at')
+
+    def __init__(self, conn: pymysql.Connection, checked_at: float):
+        self.conn = conn
+        self.idle_since = time.monotonic()
+        self.checked_at = checked_at
+
+
+def _close_quietly(conn: pymysql.Connection):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """单个数据库的连接池（线程安全，方法都是同步的，应在工作线程中调用）"""
+
+    def __init__(self, config: DbConfig, max_connections: int, max_idle_seconds: float,
+                 health_check_seconds: float):
+        self.config = config
+        self.max_connections = max(1, max_connections)
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_seconds = health_check_seconds
+
+        self._idle: deque[_IdleConnection] = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def acquire(self, timeout: float = DEFAULT_ACQUIRE_TIMEOUT) -> pymysql.Connection:
+        """取出一条可用连接（优先复用最近归还的空闲连接）"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"数据库连接池已满（最多 {self.max_connections} 条连接）")
+        try:
+            while True:
+                with self._lock:
+                    idle = self._idle.pop() if self._idle else None
+                if idle is None:
+                    break
+                now = time.monotonic()
+                if now - idle.idle_since > self.max_idle_seconds:
+                    self.evicted += 1
+                    _close_quietly(idle.conn)
+                    continue
+                if now - idle.checked_at > self.health_check_seconds:
+                    try:
+                        idle.conn.ping(reconnect=True)
+                    except Exception:
+                        self.evicted += 1
+                        _close_quietly(idle.conn)
+                        continue
+                self.reused += 1
+                return idle.conn
+
+            conn = self.config.connect()
+            self.created += 1
+            return conn
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: pymysql.Connection, broken: bool = False):
+        """归还连接；连接已损坏时直接关闭，未提交的事务会先回滚"""
+        try:
+            if broken or not conn.open:
+                _close_quietly(conn)
+                return
+            if conn.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS or not conn.get_autocommit():
+                try:
+                    conn.rollback()
+                    conn.autocommit(True)
+                except Exception:
+                    _close_quietly(conn)
+                    return
+            with self._lock:
+                self._idle.append(_IdleConnection(conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def evict_idle(self) -> int:
+        """关闭空闲超时的连接，返回关闭的数量"""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            while self._idle and now - self._idle[0].idle_since > self.max_idle_seconds:
+                expired.append(self._idle.popleft())
+        for idle in expired:
+            _close_quietly(idle.conn)
+        self.evicted += len(expired)
+        return len(expired)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for item in idle:
+            _close_quietly(item.conn)
+
+    def get_stats(self) -> dict:
+        return {
+            'host': f"{self.config.host}:{self.config.port}",
+            'database': self.config.database,
+            'idle': len(self._idle),
+            'created': self.created,
+            'reused': self.reused,
+            'evicted': self.evicted,
+        }
+
+
+class DbLease:
+    """工作流中一个命名连接独占的数据库连接"""
+
+    def __init__(self, pool: ConnectionPool, conn: pymysql.Connection):
+        self.pool = pool
+        self.conn = conn
+        self._lock = threading.Lock()  # 同一时间只有一个工作线程使用连接
+        # 并行分支共用同一命名连接时串行执行；流式查询从打开游标到关闭游标期间一直持有，
+        # 避免其他分支在两批之间使用连接导致 "Commands out of sync"
+        self._session_lock = asyncio.Lock()
+        self._broken = False
+        self._released = False
+
+    @property
+    def config(self) -> DbConfig:
+        return self.pool.config
+
+    def _call(self, func: Callable, *args) -> Any:
+        with self._lock:
+            try:
+                return func(self.conn, *args)
+            except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+                self._broken = True
+                raise
+
+    async def run(self, func: Callable, *args) -> Any:
+        """在工作线程中用该连接执行 func(conn, *args)"""
+        if self._released:
+            raise RuntimeError("数据库连接已关闭")
+        async with self._session_lock:
+            return await run_in_worker(self._call, func, *args)
+
+    async def stream(self, sql: str, batch_size: int = DEFAULT_FETCH_BATCH_SIZE) -> AsyncIterator[list[dict]]:
+        """使用服务端游标分批读取查询结果，不一次性加载全部结果
+
+        读取期间独占该命名连接，调用方应使用 contextlib.aclosing 保证提前退出时关闭游标
+        """
+        if self._released:
+            raise RuntimeError("数据库连接已关闭")
+        async with self._session_lock:
+            cursor = await run_in_worker(self._call, _open_stream, sql)
+            try:
+                while True:
+                    rows = await run_in_worker(self._call, _fetch_batch, cursor, batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                await run_in_worker(self._call, _close_cursor, cursor)
+
+    def release(self):
+        """归还连接到连接池（阻塞操作，应在工作线程中调用）"""
+        if self._released:
+            return
+        self._released = True
+        with self._lock:
+            self.pool.release(self.conn, broken=self._broken)
+
+
+class DbPoolManager:
+    """按连接参数管理连接池"""
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS,
+                 health_check_seconds: float = DEFAULT_HEALTH_CHECK_SECONDS):
+        self.max_connections = max_connections
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_seconds = health_check_seconds
+        self._pools: dict[DbConfig, ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def get_pool(self, config: DbConfig) -> ConnectionPool:
+        with self._lock:
+            pool = self._pools.get(config)
+            if pool is None:
+                pool = ConnectionPool(config, self.max_connections, self.max_idle_seconds,
+                                      self.health_check_seconds)
+                self._pools[config] = pool
+            return pool
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            pools = list(self._pools.values())
+        return sum(pool.evict_idle() for pool in pools)
+
+    async def lease(self, config: DbConfig) -> DbLease:
+        """为工作流的命名连接取出一条独占连接"""
+        pool = self.get_pool(config)
+        await run_in_worker(self.evict_idle)
+        conn = await run_in_worker(pool.acquire)
+        return DbLease(pool, conn)
+
+    def close_all(self):
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def get_stats(self) -> list[dict]:
+        with self._lock:
+            return [pool.get_stats() for pool in self._pools.values()]
+
+
+_db_pool_manager: Optional[DbPoolManager] = None
+
+
+def get_db_pool_manager() -> DbPoolManager:
+    """获取数据库连接池管理器单例
+
+    配置项（WebRPAConfig.json 的 backend.database）：
+        maxConnections: 每个数据库的最大连接数
+        maxIdleSeconds: 空闲连接的最长保留时间
+        healthCheckSeconds: 空闲超过该时间的连接在复用前先 ping
+    """
+    global _db_pool_manager
+    if _db_pool_manager is None:
+        db_config = get_backend_config().get('database', {}) or {}
+        _db_pool_manager = DbPoolManager(
+            max_connections=db_config.get('maxConnections', DEFAULT_MAX_CONNECTIONS),
+            max_idle_seconds=db_config.get('maxIdleSeconds', DEFAULT_MAX_IDLE_SECONDS),
+            health_check_seconds=db_config.get('healthCheckSeconds', DEFAULT_HEALTH_CHECK_SECONDS),
+        )
+    return _db_pool_manager
+
+
+# ===== 在工作线程中执行的数据库操作 =====
+
+def fetch_all(conn: pymysql.Connection, sql: str, single_row: bool = False):
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchone() if single_row else cursor.fetchall()
+
+
+def execute_sql(conn: pymysql.Connection, sql: str, params=None) -> tuple[int, Any, Any]:
+    """执行SQL，返回 (影响行数, 结果, 最后插入ID)"""
+    with conn.cursor() as cursor:
+        affected_rows = cursor.execute(sql, params)
+        try:
+            result = cursor.fetchall()
+        except Exception:
+            result = None
+        return affected_rows, result, cursor.lastrowid
+
+
+def bulk_insert(conn: pymysql.Connection, table: str, columns: list[str], rows: Iterable[dict],
+                batch_size: int = DEFAULT_INSERT_BATCH_SIZE) -> tuple[int, Any]:
+    """批量插入，返回 (插入行数, 最后插入ID)
+
+    每批数据通过 executemany 发送，pymysql 会把一批合并为一条多行 INSERT 语句；
+    行中缺少的列插入 NULL。rows 可以是 list[dict] 或数据行存储，按批次读取。
+    """
+    column_sql = ', '.join(f'`{c}`' for c in columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    sql = f"INSERT INTO `{table}` ({column_sql}) VALUES ({placeholders})"
+
+    inserted = 0
+    last_id = None
+    batch = []
+    with conn.cursor() as cursor:
+        for row in rows:
+            batch.append(tuple(row.get(c) for c in columns))
+            if len(batch) >= batch_size:
+                inserted += cursor.executemany(sql, batch) or 0
+                last_id = cursor.lastrowid
+                batch = []
+        if batch:
+            inserted += cursor.executemany(sql, batch) or 0
+            last_id = cursor.lastrowid
+    return inserted, last_id
+
+
+def _open_stream(conn: pymysql.Connection, sql: str) -> SSDictCursor:
+    cursor = conn.cursor(SSDictCursor)
+    try:
+        cursor.execute(sql)
+    except BaseException:
+        cursor.close()
+        raise
+    return cursor
+
+
+def _fetch_batch(conn: pymysql.Connection, cursor: SSDictCursor, batch_size: int) -> list[dict]:
+    return cursor.fetchmany(batch_size)
+
+
+def _close_cursor(conn: pymysql.Connection, cursor: SSDictCursor):
+    cursor.close()
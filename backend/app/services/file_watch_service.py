@@ -0,0 +1,359 @@
+"""文件监控服务 - 按目录共享的文件变化监控
+
+- 每个目录只建立一个监控，所有文件监控触发器（包括计划任务启动的工作流中的）共用
+- 安装了 watchdog 时使用系统文件通知（Windows ReadDirectoryChangesW / Linux inotify / macOS FSEvents），
+  否则回退到轮询：轮询保存目录索引，每次只重新列出修改时间变化的目录；
+  没有订阅 modified 事件时不需要逐个 stat 文件
+- 一批连续的事件先去抖（debounce）再合并：同一文件先创建后修改只报告一次 created，
+  创建后又删除的不报告，删除后又创建的报告为 modified
+"""
+import asyncio
+import fnmatch
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from app.services.worker_pool import run_in_worker
+from app.utils.config import get_backend_config
+
+
+EVENT_CREATED = 'created'
+EVENT_MODIFIED = 'modified'
+EVENT_DELETED = 'deleted'
+
+# 一批事件中按该顺序通知订阅者
+EVENT_ORDER = (EVENT_CREATED, EVENT_MODIFIED, EVENT_DELETED)
+
+BACKEND_AUTO = 'auto'
+BACKEND_POLLING = 'polling'
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE_MS = 200
+# 持续有事件时，最多延迟的去抖窗口倍数
+MAX_DEBOUNCE_FACTOR = 5
+
+
+def _watchdog_available() -> bool:
+    try:
+        import watchdog.observers  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _coalesce(previous: Optional[str], current: str) -> Optional[str]:
+    """合并同一文件在一个去抖窗口内的两个事件，返回 None 表示相互抵消"""
+    if previous is None:
+        return current
+    if previous == EVENT_CREATED:
+        return None if current == EVENT_DELETED else EVENT_CREATED
+    if previous == EVENT_DELETED:
+        return EVENT_MODIFIED if current == EVENT_CREATED else current
+    return current
+
+
+@dataclass
+class Subscription:
+    """一个文件监控触发器的订阅（触发一次后失效）"""
+    watch_type: str  # created / modified / deleted / any
+    pattern: str
+    callback: Callable[[str, str], None]
+    file_path: Optional[str] = None  # 只监控单个文件时的文件路径
+    fired: bool = False
+
+    def matches(self, event_type: str, path: str) -> bool:
+        if self.watch_type not in (event_type, 'any'):
+            return False
+        if self.file_path is not None and os.path.normcase(path) != os.path.normcase(self.file_path):
+            return False
+        return fnmatch.fnmatch(os.path.basename(path), self.pattern or '*')
+
+
+class PollingIndex:
+    """轮询用的目录索引（在工作线程中调用 scan）"""
+
+    def __init__(self, root: str, recursive: bool):
+        self.root = root
+        self.recursive = recursive
+        # 目录 -> (目录修改时间, {文件名: (修改时间, 大小)}, {子目录名})
+        self._dirs: dict[str, tuple] = {}
+        self.ready = False
+
+    def scan(self, stat_files: bool) -> list:
+        """重新扫描，返回 [(事件类型, 路径)]；首次扫描只建立索引"""
+        events: list = []
+        emit = events.append if self.ready else (lambda event: None)
+        self._scan_dir(self.root, stat_files, emit)
+        self.ready = True
+        return events
+
+    def _scan_dir(self, path: str, stat_files: bool, emit: Callable):
+        try:
+            dir_mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._forget(path, emit)
+            return
+
+        known = self._dirs.get(path)
+        if known is not None and known[0] == dir_mtime and not stat_files:
+            # 目录项没有增删，只需继续检查子目录
+            subdirs = known[2]
+        else:
+            files: dict = {}
+            subdirs = set()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.add(entry.name)
+                            elif entry.is_file():
+                                stat = entry.stat() if stat_files else None
+                                files[entry.name] = (stat.st_mtime_ns, stat.st_size) if stat else None
+                        except OSError:
+                            continue
+            except OSError:
+                self._forget(path, emit)
+                return
+
+            old_files = known[1] if known else {}
+            for name, info in files.items():
+                if name not in old_files:
+                    emit((EVENT_CREATED, os.path.join(path, name)))
+                elif info is not None and old_files[name] is not None and info != old_files[name]:
+                    emit((EVENT_MODIFIED, os.path.join(path, name)))
+            for name in old_files:
+                if name not in files:
+                    emit((EVENT_DELETED, os.path.join(path, name)))
+            if known:
+                for name in known[2] - subdirs:
+                    self._forget(os.path.join(path, name), emit)
+            self._dirs[path] = (dir_mtime, files, subdirs)
+
+        if self.recursive:
+            for name in subdirs:
+                self._scan_dir(os.path.join(path, name), stat_files, emit)
+
+    def _forget(self, path: str, emit: Callable):
+        """目录被删除：报告其下所有文件的删除"""
+        known = self._dirs.pop(path, None)
+        if known is None:
+            return
+        for name in known[1]:
+            emit((EVENT_DELETED, os.path.join(path, name)))
+        for name in known[2]:
+            self._forget(os.path.join(path, name), emit)
+
+
+class DirectoryWatch:
+    """一个目录的共享监控"""
+
+    def __init__(self, service: 'FileWatchService', directory: str, recursive: bool):
+        self.service = service
+        self.directory = directory
+        self.recursive = recursive
+        self.subscriptions: dict[str, Subscription] = {}
+        self.backend = BACKEND_POLLING
+        self.events_received = 0
+        self.batches_delivered = 0
+
+        self._loop = asyncio.get_running_loop()
+        self._pending: dict[str, str] = {}
+        self._batch_started = 0.0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._observer = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._index: Optional[PollingIndex] = None
+
+    def start(self, use_watchdog: bool):
+        if use_watchdog:
+            try:
+                self._start_observer()
+                self.backend = 'watchdog'
+                return
+            except Exception as e:
+                print(f"[FileWatch] 系统文件通知不可用，改用轮询: {self.directory} ({e})")
+        self._index = PollingIndex(self.directory, self.recursive)
+        self._poll_task = self._loop.create_task(self._poll_loop())
+
+    def _start_observer(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        watch = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                if event.event_type == 'moved':
+                    watch._post(EVENT_DELETED, event.src_path)
+                    watch._post(EVENT_CREATED, event.dest_path)
+                elif event.event_type in EVENT_ORDER:
+                    watch._post(event.event_type, event.src_path)
+
+        observer = Observer()
+        observer.daemon = True
+        observer.schedule(Handler(), self.directory, recursive=self.recursive)
+        observer.start()
+        self._observer = observer
+
+    def _post(self, event_type: str, path: str):
+        """由 watchdog 线程调用，转到事件循环处理"""
+        try:
+            self._loop.call_soon_threadsafe(self.add_event, event_type, os.fsdecode(path))
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    async def _poll_loop(self):
+        try:
+            while True:
+                stat_files = any(s.watch_type in (EVENT_MODIFIED, 'any')
+                                 for s in self.subscriptions.values())
+                try:
+                    events = await run_in_worker(self._index.scan, stat_files)
+                except Exception as e:
+                    print(f"[FileWatch] 扫描目录失败: {self.directory} ({e})")
+                    events = []
+                for event_type, path in events:
+                    self.add_event(event_type, path)
+                await asyncio.sleep(self.service.poll_interval)
+        except asyncio.CancelledError:
+            pass
+
+    def add_event(self, event_type: str, path: str):
+        """记录一个事件，去抖窗口结束后合并通知"""
+        self.events_received += 1
+        merged = _coalesce(self._pending.pop(path, None), event_type)
+        if merged is not None:
+            self._pending[path] = merged
+
+        now = time.monotonic()
+        if self._flush_handle is None:
+            self._batch_started = now
+        else:
+            self._flush_handle.cancel()
+        debounce = self.service.debounce
+        deadline = min(now + debounce, self._batch_started + debounce * MAX_DEBOUNCE_FACTOR)
+        self._flush_handle = self._loop.call_later(max(0.0, deadline - now), self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        self.batches_delivered += 1
+        for event_type in EVENT_ORDER:
+            for path, merged in pending.items():
+                if merged != event_type:
+                    continue
+                for subscription in list(self.subscriptions.values()):
+                    if subscription.fired or not subscription.matches(event_type, path):
+                        continue
+                    subscription.fired = True
+                    try:
+                        subscription.callback(event_type, path)
+                    except Exception as e:
+                        print(f"[FileWatch] 文件监控回调执行失败: {e}")
+
+    def stop(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            # 停止 observer 需要等待其线程退出，放到后台线程中避免阻塞事件循环
+            def stop_observer():
+                try:
+                    observer.stop()
+                    observer.join(timeout=5)
+                except Exception:
+                    pass
+            threading.Thread(target=stop_observer, daemon=True).start()
+
+    def get_stats(self) -> dict:
+        return {
+            'directory': self.directory,
+            'recursive': self.recursive,
+            'backend': self.backend,
+            'subscriptions': len(self.subscriptions),
+            'eventsReceived': self.events_received,
+            'batchesDelivered': self.batches_delivered,
+        }
+
+
+class FileWatchService:
+    """管理按目录共享的监控（在事件循环线程中调用）"""
+
+    def __init__(self, backend: str = BACKEND_AUTO, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 debounce_ms: float = DEFAULT_DEBOUNCE_MS):
+        self.use_watchdog = backend != BACKEND_POLLING and _watchdog_available()
+        self.poll_interval = max(0.1, poll_interval)
+        self.debounce = max(0.0, debounce_ms / 1000)
+        self._watches: dict[tuple, DirectoryWatch] = {}
+        self._subscription_watch: dict[str, tuple] = {}
+
+    def subscribe(self, subscription_id: str, watch_path: str, watch_type: str, file_pattern: str,
+                  callback: Callable[[str, str], None]):
+        """订阅路径的变化；路径是文件时监控其所在目录并只报告该文件"""
+        path = os.path.abspath(watch_path)
+        if os.path.isfile(path):
+            key = (os.path.normcase(os.path.dirname(path)), False)
+            directory, file_path = os.path.dirname(path), path
+        else:
+            key = (os.path.normcase(path), True)
+            directory, file_path = path, None
+
+        watch = self._watches.get(key)
+        if watch is None:
+            watch = DirectoryWatch(self, directory, recursive=key[1])
+            watch.start(self.use_watchdog)
+            self._watches[key] = watch
+        watch.subscriptions[subscription_id] = Subscription(watch_type, file_pattern, callback, file_path)
+        self._subscription_watch[subscription_id] = key
+
+    def unsubscribe(self, subscription_id: str):
+        key = self._subscription_watch.pop(subscription_id, None)
+        watch = self._watches.get(key) if key else None
+        if watch is None:
+            return
+        watch.subscriptions.pop(subscription_id, None)
+        if not watch.subscriptions:
+            del self._watches[key]
+            watch.stop()
+
+    def close_all(self):
+        watches, self._watches = list(self._watches.values()), {}
+        self._subscription_watch.clear()
+        for watch in watches:
+            watch.stop()
+
+    def get_stats(self) -> list:
+        return [watch.get_stats() for watch in self._watches.values()]
+
+
+_file_watch_service: Optional[FileWatchService] = None
+
+
+def get_file_watch_service() -> FileWatchService:
+    """获取文件监控服务单例
+
+    配置项（WebRPAConfig.json 的 backend.fileWatcher）：
+        backend: auto（有 watchdog 时使用系统通知）或 polling（强制轮询）
+        pollInterval: 轮询间隔（秒）
+        debounceMs: 合并连续事件的去抖时间（毫秒）
+    """
+    global _file_watch_service
+    if _file_watch_service is None:
+        watch_config = get_backend_config().get('fileWatcher', {}) or {}
+        _file_watch_service = FileWatchService(
+            backend=watch_config.get('backend', BACKEND_AUTO),
+            poll_interval=watch_config.get('pollInterval', DEFAULT_POLL_INTERVAL),
+            debounce_ms=watch_config.get('debounceMs', DEFAULT_DEBOUNCE_MS),
+        )
+    return _file_watch_service
@@ -0,0 +1,332 @@
+"""HTTP客户端池服务 - 在请求之间复用 httpx.AsyncClient
+
+- 按 源站(scheme://host:port)/代理/证书校验/HTTP2 分组缓存客户端，保持 keep-alive 连接，
+  循环中的多次请求不再重复建立 TCP/TLS 连接
+- 客户端在工作流和 API 触发器之间共享，因此不保存 Cookie（响应中的 Set-Cookie 被忽略），
+  需要 Cookie 时由请求头显式传入；默认不跟随重定向（与原来的 httpx 默认行为一致），可按请求开启
+- 安装了 h2 时可以启用 HTTP/2（同一连接上多路复用）
+- 客户端数量超过上限时淘汰最久未使用的客户端，正在使用的客户端等最后一个请求结束后才关闭；
+  事件循环关闭后，其上的客户端在下一次创建客户端时清理
+- request_batch 按有限并发发送一批请求，支持重试退避和限速，结果按输入顺序返回
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from http.cookiejar import CookieJar
+from typing import Any, AsyncIterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.utils.config import get_backend_config
+
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30
+DEFAULT_MAX_CLIENTS = 32
+
+# 需要重试的HTTP状态码
+RETRY_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+@dataclass(frozen=True)
+class ClientKey:
+    """客户端池的键"""
+    origin: str
+    proxy: Optional[str] = None
+    verify: bool = True
+    http2: bool = False
+
+
+@dataclass
+class RequestSpec:
+    """一次HTTP请求"""
+    url: str
+    method: str = 'GET'
+    headers: Optional[dict] = None
+    body: Any = None
+    timeout: float = 30
+    follow_redirects: bool = False
+
+
+class _DiscardCookieJar(CookieJar):
+    """不保存任何 Cookie 的 CookieJar，避免一个工作流的会话 Cookie 被其他请求带上"""
+
+    def set_cookie(self, cookie):
+        pass
+
+    def extract_cookies(self, response, request):
+        pass
+
+
+class _PooledClient:
+    """池中的一个客户端及其使用状态"""
+    __slots__ = ('client', 'loop', 'users', 'evicted')
+
+    def __init__(self, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+        self.client = client
+        self.loop = loop
+        self.users = 0
+        self.evicted = False
+
+
+def get_origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class HttpClientPool:
+    """进程级的 httpx 客户端池"""
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+                 max_clients: int = DEFAULT_MAX_CLIENTS,
+                 http2: bool = False):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_clients = max(1, max_clients)
+        self.http2 = http2 and _h2_available()
+        # 客户端绑定创建它的事件循环，键中包含事件循环（计划任务等可能在其他线程的事件循环中请求）
+        self._clients: OrderedDict[tuple, _PooledClient] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.reused = 0
+        self.closed = 0
+
+    def _acquire(self, url: str, proxy: Optional[str], verify: bool,
+                 http2: Optional[bool]) -> _PooledClient:
+        """获取（或创建）访问该地址使用的客户端，并登记为使用中"""
+        use_http2 = self.http2 if http2 is None else (http2 and _h2_available())
+        key = ClientKey(get_origin(url), proxy or None, verify, use_http2)
+        loop = asyncio.get_running_loop()
+        pool_key = (loop, key)
+
+        with self._lock:
+            entry = self._clients.get(pool_key)
+            if entry is not None and not entry.client.is_closed:
+                self._clients.move_to_end(pool_key)
+                self.reused += 1
+                entry.users += 1
+                return entry
+
+            entry = _PooledClient(httpx.AsyncClient(
+                proxy=key.proxy,
+                verify=key.verify,
+                http2=key.http2,
+                limits=self.limits,
+                cookies=_DiscardCookieJar(),
+            ), loop)
+            entry.users += 1
+            self._clients[pool_key] = entry
+            self.created += 1
+
+            # 清理已关闭的事件循环上的客户端（无法再关闭，直接丢弃引用）
+            for dead_key in [k for k, e in self._clients.items() if e.loop.is_closed()]:
+                self._clients.pop(dead_key).evicted = True
+                self.closed += 1
+            evicted = []
+            while len(self._clients) > self.max_clients:
+                _, oldest = self._clients.popitem(last=False)
+                oldest.evicted = True
+                evicted.append(oldest)
+        for oldest in evicted:
+            if oldest.users == 0:
+                self._close_entry(oldest)
+        return entry
+
+    def _release(self, entry: _PooledClient):
+        with self._lock:
+            entry.users -= 1
+            should_close = entry.evicted and entry.users == 0
+        if should_close:
+            self._close_entry(entry)
+
+    def _close_entry(self, entry: _PooledClient):
+        """在客户端所属的事件循环中关闭客户端"""
+        self.closed += 1
+        if entry.loop.is_closed():
+            return
+        try:
+            if entry.loop is asyncio.get_running_loop():
+                entry.loop.create_task(entry.client.aclose())
+                return
+        except RuntimeError:
+            pass
+        try:
+            asyncio.run_coroutine_threadsafe(entry.client.aclose(), entry.loop)
+        except RuntimeError:
+            pass
+
+    @asynccontextmanager
+    async def client(self, url: str, proxy: Optional[str] = None, verify: bool = True,
+                     http2: Optional[bool] = None) -> AsyncIterator[httpx.AsyncClient]:
+        """获取访问该地址使用的客户端，在 async with 范围内不会被淘汰关闭"""
+        entry = self._acquire(url, proxy, verify, http2)
+        try:
+            yield entry.client
+        finally:
+            self._release(entry)
+
+    async def request(self, spec: RequestSpec, proxy: Optional[str] = None, verify: bool = True,
+                      http2: Optional[bool] = None) -> httpx.Response:
+        """发送一次请求"""
+        body = spec.body
+        async with self.client(spec.url, proxy=proxy, verify=verify, http2=http2) as client:
+            return await client.request(
+                method=spec.method,
+                url=spec.url,
+                headers=spec.headers or None,
+                json=body if isinstance(body, (dict, list)) else None,
+                content=body.encode('utf-8') if isinstance(body, str) else None,
+                timeout=spec.timeout,
+                follow_redirects=spec.follow_redirects,
+            )
+
+    async def request_batch(self, specs: list[RequestSpec], concurrency: int = 5,
+                            retries: int = 2, retry_delay: float = 1.0, rate_limit: float = 0,
+                            proxy: Optional[str] = None, verify: bool = True,
+                            http2: Optional[bool] = None) -> list[dict]:
+        """按有限并发发送一批请求，结果按输入顺序返回
+
+        Args:
+            specs: 请求列表
+            concurrency: 最大并发请求数
+            retries: 网络错误或可重试状态码（429/5xx等）的最大重试次数
+            retry_delay: 首次重试的等待秒数，之后每次翻倍（响应带 Retry-After 时优先使用）
+            rate_limit: 每秒最多发出的请求数，0 表示不限速
+
+        Returns:
+            每个请求一个结果：{index, url, success, status_code, response, error, attempts}
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        limiter = _RateLimiter(rate_limit)
+
+        async def run_one(index: int, spec: RequestSpec) -> dict:
+            result = {'index': index, 'url': spec.url, 'success': False,
+                      'status_code': None, 'response': None, 'error': None, 'attempts': 0}
+            async with semaphore:
+                for attempt in range(max(0, retries) + 1):
+                    await limiter.wait()
+                    result['attempts'] = attempt + 1
+                    delay = retry_delay * (2 ** attempt)
+                    try:
+                        response = await self.request(spec, proxy=proxy, verify=verify, http2=http2)
+                    except httpx.HTTPError as e:
+                        result['error'] = "请求超时" if isinstance(e, httpx.TimeoutException) else str(e) or type(e).__name__
+                    else:
+                        result['status_code'] = response.status_code
+                        result['response'] = parse_response(response)
+                        if response.status_code not in RETRY_STATUS_CODES:
+                            result['success'] = response.status_code < 400
+                            result['error'] = None if result['success'] else f"HTTP {response.status_code}"
+                            return result
+                        result['error'] = f"HTTP {response.status_code}"
+                        delay = _retry_after(response, delay)
+                    if attempt < retries:
+                        await asyncio.sleep(delay)
+            return result
+
+        return list(await asyncio.gather(*(run_one(i, spec) for i, spec in enumerate(specs))))
+
+    async def close_all(self):
+        with self._lock:
+            entries, self._clients = list(self._clients.values()), OrderedDict()
+        loop = asyncio.get_running_loop()
+        for entry in entries:
+            entry.evicted = True
+            if entry.loop is not loop:
+                self._close_entry(entry)
+                continue
+            try:
+                await entry.client.aclose()
+            except Exception:
+                pass
+
+    def get_stats(self) -> dict:
+        return {
+            'clients': len(self._clients),
+            'http2': self.http2,
+            'created': self.created,
+            'reused': self.reused,
+            'closed': self.closed,
+        }
+
+
+class _RateLimiter:
+    """按固定间隔放行请求"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def _retry_after(response: httpx.Response, default: float) -> float:
+    value = response.headers.get('Retry-After')
+    if value:
+        try:
+            return max(0.0, min(float(value), 60.0))
+        except ValueError:
+            pass
+    return default
+
+
+def parse_response(response: httpx.Response) -> Any:
+    """解析响应内容：JSON 优先，否则返回文本"""
+    try:
+        return response.json()
+    except Exception:
+        return response.text
+
+
+_http_client_pool: Optional[HttpClientPool] = None
+
+
+def get_http_client_pool() -> HttpClientPool:
+    """获取HTTP客户端池单例
+
+    配置项（WebRPAConfig.json 的 backend.httpClient）：
+        maxConnections: 每个客户端的最大连接数
+        maxKeepalive: 每个客户端保持的空闲连接数
+        keepaliveExpiry: 空闲连接保持秒数
+        maxClients: 最多缓存的客户端数量
+        http2: 是否启用 HTTP/2（需要安装 h2）
+    """
+    global _http_client_pool
+    if _http_client_pool is None:
+        http_config = get_backend_config().get('httpClient', {}) or {}
+        _http_client_pool = HttpClientPool(
+            max_connections=http_config.get('maxConnections', DEFAULT_MAX_CONNECTIONS),
+            max_keepalive=http_config.get('maxKeepalive', DEFAULT_MAX_KEEPALIVE),
+            keepalive_expiry=http_config.get('keepaliveExpiry', DEFAULT_KEEPALIVE_EXPIRY),
+            max_clients=http_config.get('maxClients', DEFAULT_MAX_CLIENTS),
+            http2=http_config.get('http2', False),
+        )
+    return _http_client_pool
@@ -0,0 +1,323 @@
+"""OCR服务 - 进程内共享的 OCR 引擎与分块结果缓存
+
+- RapidOCR（屏幕文字）、easyocr（图片OCR）、ddddocr（验证码）各只加载一次模型，可在启动时预热
+- 所有推理都在专用的 OCR 工作线程中串行执行（推理本身会占满多核，并发执行只会相互争抢）
+- recognize_screen 按缓存键（屏幕区域/手机设备）保存上一次的识别结果和分块像素哈希，
+  轮询时只重新识别像素发生变化的区域，未变化区域直接复用上次的文本框
+"""
+import asyncio
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+
+from app.utils.config import get_backend_config
+
+
+ENGINE_RAPID = 'rapid'
+ENGINE_EASYOCR = 'easyocr'
+ENGINE_CAPTCHA = 'captcha'
+
+DEFAULT_TILE_SIZE = 128
+DEFAULT_MAX_CACHED_SCREENS = 8
+# 变化区域超过整图的该比例时直接整图识别
+FULL_OCR_RATIO = 0.5
+# 变化区域向外扩展的像素（包含文字的笔画边缘）
+DIRTY_MARGIN = 8
+# RapidOCR 检测阶段会把短边放大到该尺寸，小区域先补边到该尺寸，避免被整体放大
+DET_MIN_SIDE = 736
+# 同一行文本框的纵向容差（与 RapidOCR 的排序规则一致）
+LINE_TOLERANCE = 10
+
+
+@dataclass
+class TextBox:
+    """一个识别出的文本框（坐标为识别图像内的坐标）"""
+    text: str
+    confidence: float
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+    @property
+    def center(self) -> tuple:
+        return (self.left + self.right) // 2, (self.top + self.bottom) // 2
+
+    def shifted(self, dx: int, dy: int) -> 'TextBox':
+        return TextBox(self.text, self.confidence, self.left + dx, self.top + dy,
+                       self.right + dx, self.bottom + dy)
+
+    def intersects(self, rect: tuple) -> bool:
+        x1, y1, x2, y2 = rect
+        return self.left < x2 and self.right > x1 and self.top < y2 and self.bottom > y1
+
+
+@dataclass
+class _ScreenCache:
+    shape: tuple
+    hashes: np.ndarray  # 每个分块的 CRC32
+    boxes: list
+
+
+def match_text(boxes: list, target_text: str, match_mode: str = 'contains') -> list:
+    """按匹配模式（exact / contains / regex）筛选文本框，保持阅读顺序"""
+    matches = []
+    for box in boxes:
+        if not box.text:
+            continue
+        if match_mode == 'exact':
+            is_match = box.text == target_text
+        elif match_mode == 'regex':
+            try:
+                is_match = bool(re.search(target_text, box.text))
+            except re.error:
+                is_match = False
+        else:
+            is_match = target_text in box.text
+        if is_match:
+            matches.append(box)
+    return matches
+
+
+def _sort_reading_order(boxes: list) -> list:
+    """从上到下、同一行从左到右排序"""
+    boxes = sorted(boxes, key=lambda b: (b.top, b.left))
+    for i in range(len(boxes) - 1):
+        for j in range(i, -1, -1):
+            if abs(boxes[j + 1].top - boxes[j].top) < LINE_TOLERANCE and boxes[j + 1].left < boxes[j].left:
+                boxes[j], boxes[j + 1] = boxes[j + 1], boxes[j]
+            else:
+                break
+    return boxes
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class OcrService:
+    """OCR 引擎缓存 + 专用推理线程"""
+
+    def __init__(self, tile_size: int = DEFAULT_TILE_SIZE,
+                 max_cached_screens: int = DEFAULT_MAX_CACHED_SCREENS):
+        self.tile_size = max(16, tile_size)
+        self.max_cached_screens = max(1, max_cached_screens)
+        self._engines: dict = {}
+        self._engine_lock = threading.Lock()
+        self._screens: OrderedDict[Hashable, _ScreenCache] = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ocr')
+
+        self.full_runs = 0
+        self.partial_runs = 0
+        self.cached_runs = 0
+
+    # ===== 引擎 =====
+
+    def get_engine(self, name: str = ENGINE_RAPID):
+        """获取（首次调用时加载）OCR 引擎，未安装依赖时抛出 ImportError"""
+        engine = self._engines.get(name)
+        if engine is not None:
+            return engine
+        with self._engine_lock:
+            engine = self._engines.get(name)
+            if engine is None:
+                engine = self._load_engine(name)
+                self._engines[name] = engine
+        return engine
+
+    @staticmethod
+    def _load_engine(name: str):
+        if name == ENGINE_RAPID:
+            try:
+                from rapidocr_onnxruntime import RapidOCR
+            except ImportError:
+                raise ImportError("请安装 rapidocr-onnxruntime: pip install rapidocr-onnxruntime")
+            return RapidOCR()
+        if name == ENGINE_EASYOCR:
+            try:
+                import easyocr
+            except ImportError:
+                raise ImportError("请安装 easyocr: pip install easyocr")
+            return easyocr.Reader(['ch_sim', 'en'], gpu=False, verbose=False)
+        if name == ENGINE_CAPTCHA:
+            try:
+                import ddddocr
+            except ImportError:
+                raise ImportError("ddddocr库未安装，请运行: pip install ddddocr")
+            # ddddocr 1.0.6+ (Python 3.13) 不支持 show_ad 等参数
+            return ddddocr.DdddOcr()
+        raise ValueError(f"未知的OCR引擎: {name}")
+
+    def warmup(self, engines: list):
+        """预加载引擎（在 OCR 线程中执行，加载失败只打印日志）"""
+        def load():
+            for name in engines:
+                try:
+                    self.get_engine(name)
+                    print(f"[OCR] 已预加载引擎: {name}")
+                except Exception as e:
+                    print(f"[OCR] 预加载引擎 {name} 失败: {e}")
+        self._executor.submit(load)
+
+    async def run(self, func: Callable, *args):
+        """在 OCR 线程中执行 func(*args)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    # ===== 识别 =====
+
+    def recognize(self, image: np.ndarray) -> list:
+        """RapidOCR 识别整张图像，返回按阅读顺序排列的文本框"""
+        result, _ = self.get_engine(ENGINE_RAPID)(image)
+        boxes = []
+        for points, text, confidence in result or []:
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            boxes.append(TextBox(text or '', _to_float(confidence),
+                                 int(min(xs)), int(min(ys)), int(max(xs)), int(max(ys))))
+        return _sort_reading_order(boxes)
+
+    def recognize_screen(self, image: np.ndarray, cache_key: Hashable) -> list:
+        """识别一帧屏幕截图，只重新识别与该缓存键上一帧相比像素变化的区域
+
+        变化的分块合并为一个矩形，再扩展到与其相交的旧文本框，保证被改动的文本行整行重新识别；
+        矩形之外的旧文本框原样保留。变化区域较大或图像尺寸改变时整图识别。
+        """
+        hashes = self._tile_hashes(image)
+        cached = self._screens.get(cache_key)
+        if cached is not None:
+            self._screens.move_to_end(cache_key)
+
+        if cached is None or cached.shape != image.shape:
+            boxes = self.recognize(image)
+            self.full_runs += 1
+        else:
+            dirty = np.argwhere(hashes != cached.hashes)
+            if dirty.size == 0:
+                self.cached_runs += 1
+                return cached.boxes
+            rect = self._dirty_rect(dirty, image.shape, cached.boxes)
+            height, width = image.shape[:2]
+            if (rect[2] - rect[0]) * (rect[3] - rect[1]) >= FULL_OCR_RATIO * width * height:
+                boxes = self.recognize(image)
+                self.full_runs += 1
+            else:
+                kept = [box for box in cached.boxes if not box.intersects(rect)]
+                boxes = _sort_reading_order(kept + self._recognize_rect(image, rect))
+                self.partial_runs += 1
+
+        self._screens[cache_key] = _ScreenCache(image.shape, hashes, boxes)
+        while len(self._screens) > self.max_cached_screens:
+            self._screens.popitem(last=False)
+        return boxes
+
+    def _tile_hashes(self, image: np.ndarray) -> np.ndarray:
+        size = self.tile_size
+        height, width = image.shape[:2]
+        rows = (height + size - 1) // size
+        cols = (width + size - 1) // size
+        hashes = np.zeros((rows, cols), dtype=np.uint32)
+        for row in range(rows):
+            band = image[row * size:(row + 1) * size]
+            for col in range(cols):
+                hashes[row, col] = zlib.crc32(np.ascontiguousarray(band[:, col * size:(col + 1) * size]))
+        return hashes
+
+    def _dirty_rect(self, dirty: np.ndarray, shape: tuple, boxes: list) -> tuple:
+        """变化分块的外接矩形，扩展到覆盖与其相交的旧文本框"""
+        size = self.tile_size
+        height, width = shape[:2]
+        (row1, col1), (row2, col2) = dirty.min(axis=0), dirty.max(axis=0)
+        x1, y1 = col1 * size - DIRTY_MARGIN, row1 * size - DIRTY_MARGIN
+        x2, y2 = (col2 + 1) * size + DIRTY_MARGIN, (row2 + 1) * size + DIRTY_MARGIN
+
+        changed = True
+        while changed:
+            changed = False
+            for box in boxes:
+                if box.intersects((x1, y1, x2, y2)) and not (
+                        x1 <= box.left and y1 <= box.top and box.right <= x2 and box.bottom <= y2):
+                    x1, y1 = min(x1, box.left - DIRTY_MARGIN), min(y1, box.top - DIRTY_MARGIN)
+                    x2, y2 = max(x2, box.right + DIRTY_MARGIN), max(y2, box.bottom + DIRTY_MARGIN)
+                    changed = True
+        return max(0, int(x1)), max(0, int(y1)), min(width, int(x2)), min(height, int(y2))
+
+    def _recognize_rect(self, image: np.ndarray, rect: tuple) -> list:
+        x1, y1, x2, y2 = rect
+        crop = image[y1:y2, x1:x2]
+        height, width = crop.shape[:2]
+        if min(height, width) < DET_MIN_SIDE:
+            # 右侧/下方用背景色补边，坐标不变
+            border = np.concatenate([crop[0], crop[-1], crop[:, 0], crop[:, -1]])
+            fill = np.median(border, axis=0).astype(crop.dtype)
+            padded = np.empty((max(height, DET_MIN_SIDE), max(width, DET_MIN_SIDE)) + crop.shape[2:],
+                              dtype=crop.dtype)
+            padded[...] = fill
+            padded[:height, :width] = crop
+            crop = padded
+        return [box.shifted(x1, y1) for box in self.recognize(crop)
+                if box.left < width and box.top < height]
+
+    def read_text(self, image: np.ndarray) -> str:
+        """easyocr 识别图像，按位置排序后每行一个文本"""
+        results = self.get_engine(ENGINE_EASYOCR).readtext(image)
+        results_sorted = sorted(results, key=lambda x: (x[0][0][1], x[0][0][0]))
+        return '\n'.join(item[1] for item in results_sorted)
+
+    def classify_captcha(self, image_bytes: bytes) -> str:
+        """ddddocr 识别文本验证码"""
+        return self.get_engine(ENGINE_CAPTCHA).classification(image_bytes)
+
+    def forget_screen(self, cache_key: Hashable):
+        self._screens.pop(cache_key, None)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> dict:
+        return {
+            'engines': sorted(self._engines),
+            'cachedScreens': len(self._screens),
+            'fullRuns': self.full_runs,
+            'partialRuns': self.partial_runs,
+            'cachedRuns': self.cached_runs,
+        }
+
+
+_ocr_service: Optional[OcrService] = None
+
+
+def get_ocr_service() -> OcrService:
+    """获取OCR服务单例
+
+    配置项（WebRPAConfig.json 的 backend.ocr）：
+        warmup: 启动时预加载的引擎，true 表示 ["rapid"]，可选 rapid / easyocr / captcha
+        tileSize: 屏幕变化检测的分块边长（像素）
+        maxCachedScreens: 最多保留识别结果的屏幕/设备数量
+    """
+    global _ocr_service
+    if _ocr_service is None:
+        ocr_config = get_backend_config().get('ocr', {}) or {}
+        _ocr_service = OcrService(
+            tile_size=ocr_config.get('tileSize', DEFAULT_TILE_SIZE),
+            max_cached_screens=ocr_config.get('maxCachedScreens', DEFAULT_MAX_CACHED_SCREENS),
+        )
+    return _ocr_service
+
+
+def warmup_ocr_service():
+    """按配置在后台预加载 OCR 引擎"""
+    warmup = (get_backend_config().get('ocr', {}) or {}).get('warmup', False)
+    if warmup is True:
+        warmup = [ENGINE_RAPID]
+    if isinstance(warmup, list) and warmup:
+        get_ocr_service().warmup(warmup)
@@ -1,6 +1,8 @@
 """计划任务调度管理服务"""
 import asyncio
 import json
+import os
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional, List
@@ -14,23 +16,50 @@ from app.models.scheduled_task import (
     ScheduledTaskExecutionLog,
     ScheduledTaskExecutionLogCreate
 )
+from app.services.task_log_store import DEFAULT_MAX_LOGS, TaskLogStore
 from app.services.trigger_manager import trigger_manager
+from app.utils.config import get_backend_config
+
+
+# 任务数据修改后延迟写入的秒数（合并一次执行中的多次修改）
+DEFAULT_SAVE_DELAY = 1.0
 
 
 class ScheduledTaskManager:
-    """计划任务管理器"""
+    """计划任务管理器
+
+    配置项（WebRPAConfig.json 的 backend.scheduledTasks）：
+        maxLogs: 最多保留的执行日志条数（默认1000）
+        logRetentionDays: 执行日志保留天数，0表示不按天数清理
+        saveDelay: 任务数据修改后延迟写入的秒数
+    """
     
     def __init__(self, data_dir: str = "backend/data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        task_config = get_backend_config().get('scheduledTasks', {}) or {}
         
         # 数据文件路径
         self.tasks_file = self.data_dir / "scheduled_tasks.json"
-        self.logs_file = self.data_dir / "scheduled_task_logs.json"
+        self.logs_file = self.data_dir / "scheduled_task_logs.json"  # 旧版日志文件，启动时导入
         
         # 内存存储
         self.tasks: Dict[str, ScheduledTask] = {}
-        self.logs: List[ScheduledTaskExecutionLog] = []
+        
+        # 执行日志存储（SQLite），正在执行的日志同时保存在内存中
+        self.log_store = TaskLogStore(
+            self.data_dir / "scheduled_task_logs.db",
+            max_logs=task_config.get('maxLogs', DEFAULT_MAX_LOGS),
+            retention_days=task_config.get('logRetentionDays', 0),
+        )
+        self.running_logs: Dict[str, ScheduledTaskExecutionLog] = {}  # task_id -> 执行日志
+        
+        # 任务数据延迟写入
+        self.save_delay = float(task_config.get('saveDelay', DEFAULT_SAVE_DELAY))
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._write_lock = threading.Lock()
+        self._snapshot_seq = 0
+        self._written_seq = 0
         
         # APScheduler调度器
         self.scheduler = AsyncIOScheduler()
@@ -343,8 +372,8 @@ class ScheduledTaskManager:
             start_time=datetime.now().isoformat(),
             status='running'
         )
-        self.logs.append(log)
-        self._save_logs()
+        self.running_logs[task_id] = log
+        self.log_store.add(log)
         
         # 创建异步任务并保存引用
         async def execute_workflow():
@@ -429,8 +458,10 @@ class ScheduledTaskManager:
                 # 从执行器列表中移除
                 if task_id in self.running_executors:
                     del self.running_executors[task_id]
+                if self.running_logs.get(task_id) is log:
+                    del self.running_logs[task_id]
                 self._save_tasks()
-                self._save_logs()
+                self.log_store.update(log)
                 
                 # 处理重复执行
                 if task.trigger.repeat_enabled:
@@ -494,40 +525,32 @@ class ScheduledTaskManager:
         self._save_tasks()
         
         # 4. 更新最后一条日志
-        task_logs = [log for log in self.logs if log.task_id == task_id and log.status == 'running']
-        if task_logs:
-            latest_log = task_logs[-1]
+        latest_log = self.running_logs.get(task_id)
+        if latest_log and latest_log.status == 'running':
             latest_log.end_time = datetime.now().isoformat()
             latest_log.duration = (datetime.fromisoformat(latest_log.end_time) - 
                                   datetime.fromisoformat(latest_log.start_time)).total_seconds()
             latest_log.status = 'stopped'
             latest_log.error = '任务被手动停止'
-            self._save_logs()
+            self.log_store.update(latest_log)
         
         print(f"[ScheduledTaskManager] 任务已停止: {task.name}")
         return True
     
     # ==================== 执行日志管理 ====================
     
-    def get_task_logs(self, task_id: str, limit: int = 100) -> List[ScheduledTaskExecutionLog]:
-        """获取任务执行日志"""
-        task_logs = [log for log in self.logs if log.task_id == task_id]
-        # 按时间倒序排序
-        task_logs.sort(key=lambda x: x.start_time, reverse=True)
-        return task_logs[:limit]
+    def get_task_logs(self, task_id: str, limit: int = 100, offset: int = 0) -> List[ScheduledTaskExecutionLog]:
+        """获取任务执行日志（按时间倒序分页）"""
+        return self.log_store.query(task_id=task_id, limit=limit, offset=offset)
     
-    def get_all_logs(self, limit: int = 100) -> List[ScheduledTaskExecutionLog]:
-        """获取所有执行日志"""
-        sorted_logs = sorted(self.logs, key=lambda x: x.start_time, reverse=True)
-        return sorted_logs[:limit]
+    def get_all_logs(self, limit: int = 100, offset: int = 0,
+                     status: Optional[str] = None) -> List[ScheduledTaskExecutionLog]:
+        """获取所有执行日志（按时间倒序分页）"""
+        return self.log_store.query(limit=limit, offset=offset, status=status)
     
     def clear_logs(self, task_id: Optional[str] = None):
         """清空执行日志"""
-        if task_id:
-            self.logs = [log for log in self.logs if log.task_id != task_id]
-        else:
-            self.logs = []
-        self._save_logs()
+        self.log_store.clear(task_id)
     
     # ==================== 数据持久化 ====================
     
@@ -548,38 +571,60 @@ class ScheduledTaskManager:
                 print(f"[ScheduledTaskManager] 加载任务失败: {e}")
     
     def _save_tasks(self):
-        """保存任务数据"""
+        """保存任务数据（合并短时间内的多次修改，延迟写入）"""
+        if self._save_handle is not None:
+            return
         try:
-            data = [task.dict() for task in self.tasks.values()]
-            with open(self.tasks_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件循环中（加载任务时），直接写入
+            self._write_tasks(self._snapshot_tasks())
+            return
+        self._save_handle = loop.call_later(self.save_delay, self._flush_tasks)
+    
+    def _flush_tasks(self):
+        """在事件循环中取任务快照，在线程池中写入文件"""
+        self._save_handle = None
+        data = self._snapshot_tasks()
+        asyncio.get_running_loop().run_in_executor(None, self._write_tasks, data)
+    
+    def flush(self):
+        """立即写入尚未保存的任务数据（服务关闭时调用）"""
+        if self._save_handle is None:
+            return
+        self._save_handle.cancel()
+        self._save_handle = None
+        self._write_tasks(self._snapshot_tasks())
+    
+    def _snapshot_tasks(self) -> tuple:
+        self._snapshot_seq += 1
+        return self._snapshot_seq, [task.dict() for task in self.tasks.values()]
+    
+    def _write_tasks(self, snapshot: tuple):
+        """写入临时文件后替换，写入过程中退出不会损坏任务文件"""
+        seq, data = snapshot
+        try:
+            with self._write_lock:
+                # 较早的快照不覆盖已写入的较新快照
+                if seq < self._written_seq:
+                    return
+                self._written_seq = seq
+                temp_file = self.tasks_file.with_suffix('.json.tmp')
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(temp_file, self.tasks_file)
         except Exception as e:
             print(f"[ScheduledTaskManager] 保存任务失败: {e}")
     
     def _load_logs(self):
-        """加载执行日志"""
+        """导入旧版执行日志文件"""
         if self.logs_file.exists():
             try:
-                with open(self.logs_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.logs = [ScheduledTaskExecutionLog(**log_data) for log_data in data]
-                # 只保留最近1000条日志
-                if len(self.logs) > 1000:
-                    self.logs = sorted(self.logs, key=lambda x: x.start_time, reverse=True)[:1000]
-                print(f"[ScheduledTaskManager] 加载了 {len(self.logs)} 条执行日志")
+                count = self.log_store.import_json(self.logs_file)
+                print(f"[ScheduledTaskManager] 导入了 {count} 条旧版执行日志")
             except Exception as e:
-                print(f"[ScheduledTaskManager] 加载日志失败: {e}")
-    
-    def _save_logs(self):
-        """保存执行日志"""
-        try:
-            # 只保存最近1000条日志
-            logs_to_save = sorted(self.logs, key=lambda x: x.start_time, reverse=True)[:1000]
-            data = [log.dict() for log in logs_to_save]
-            with open(self.logs_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"[ScheduledTaskManager] 保存日志失败: {e}")
+                print(f"[ScheduledTaskManager] 导入日志失败: {e}")
+        print(f"[ScheduledTaskManager] 共有 {self.log_store.count()} 条执行日志")
 
 
 # 全局计划任务管理器实例
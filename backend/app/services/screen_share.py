@@ -1,6 +1,9 @@
 """屏幕共享服务 - 提供局域网实时屏幕共享功能
 
 使用 WebSocket + MJPEG 流实现低延迟屏幕共享
+
+所有端口共用一个屏幕捕获线程；画面没有变化时跳过编码和推送，
+实际帧率和画质根据客户端数量与编码耗时自动调整（不超过设定值）。
 """
 import asyncio
 import io
@@ -9,11 +12,13 @@ import threading
 import time
 import json
 import struct
+import zlib
 from pathlib import Path
 from typing import Optional, Dict, Set
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import mss
+import numpy as np
 from PIL import Image
 
 
@@ -33,26 +38,134 @@ def get_local_ip() -> str:
 _screen_share_servers: Dict[int, dict] = {}  # port -> {server, thread, stop_event, ...}
 
 
-class ScreenCaptureThread(threading.Thread):
-    """屏幕捕获线程 - 持续捕获屏幕并推送给所有客户端"""
+# 共享捕获源：所有端口、所有客户端共用一个屏幕捕获线程
+_shared_capture: Optional['SharedScreenCapture'] = None
+_shared_capture_lock = threading.Lock()
+
+# 画面变化检测的分块数（行 x 列）与采样步长（像素）
+DIFF_GRID = (8, 8)
+DIFF_SAMPLE_STEP = 4
+# 没有客户端时的帧率（保证新客户端连接时有一帧可用）
+IDLE_FPS = 1
+# 自适应画质下限
+MIN_ADAPTIVE_QUALITY = 30
+
+
+class FrameDiffer:
+    """分块采样的画面变化检测
+    
+    将画面划分为网格，每块按步长采样像素后计算 CRC32，与上一帧比较得到变化的分块。
+    采样读取的数据量约为整帧的 1/(step*step)，远低于编码一帧的开销。
+    """
+    
+    def __init__(self, grid: tuple = DIFF_GRID, step: int = DIFF_SAMPLE_STEP):
+        self.rows, self.cols = grid
+        self.step = max(1, step)
+        self._signatures: Optional[list] = None
+        self._size: Optional[tuple] = None
+    
+    def dirty_tiles(self, raw, width: int, height: int) -> list:
+        """返回变化的分块 [(x0, y0, x1, y1), ...]，首帧或分辨率变化时返回整帧"""
+        pixels = np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 4)
+        sampled = pixels[::self.step, ::self.step, :3]
+        sh, sw = sampled.shape[:2]
+        
+        signatures = []
+        boxes = []
+        for r in range(self.rows):
+            y0, y1 = sh * r // self.rows, sh * (r + 1) // self.rows
+            for c in range(self.cols):
+                x0, x1 = sw * c // self.cols, sw * (c + 1) // self.cols
+                signatures.append(zlib.crc32(np.ascontiguousarray(sampled[y0:y1, x0:x1])))
+                boxes.append((x0 * self.step, y0 * self.step,
+                              min(width, x1 * self.step), min(height, y1 * self.step)))
+        
+        previous, self._signatures = self._signatures, signatures
+        if previous is None or self._size != (width, height):
+            self._size = (width, height)
+            return [(0, 0, width, height)]
+        return [box for box, old, new in zip(boxes, previous, signatures) if old != new]
+
+
+class AdaptiveController:
+    """根据客户端数量和编码耗时调整实际帧率与画质
+    
+    - 没有客户端时降到 IDLE_FPS
+    - 编码耗时超过帧间隔的 70% 时先降画质、再降帧率；低于 30% 时逐步恢复到设定值
+    - 客户端较多时（发送带宽成倍增加）适当降低画质上限
+    """
+    
+    def __init__(self, fps: int, quality: int):
+        self.target_fps = fps
+        self.target_quality = quality
+        self.fps = fps
+        self._active_fps = fps  # 有客户端时的帧率
+        self.quality = quality
+        self._encode_avg = 0.0
+        self._sampled = False  # 上次调整后是否有新的编码耗时
+    
+    def record_encode(self, seconds: float):
+        self._encode_avg = seconds if not self._encode_avg else self._encode_avg * 0.8 + seconds * 0.2
+        self._sampled = True
+    
+    def update(self, client_count: int):
+        if client_count == 0:
+            self.fps = IDLE_FPS
+            return
+        
+        quality_cap = self.target_quality
+        if client_count > 4:
+            quality_cap = max(MIN_ADAPTIVE_QUALITY, self.target_quality - 5 * (client_count - 4))
+        
+        fps = self._active_fps
+        if self._sampled:
+            self._sampled = False
+            budget = 1.0 / fps
+            if self._encode_avg > budget * 0.7:
+                if self.quality > MIN_ADAPTIVE_QUALITY:
+                    self.quality = max(MIN_ADAPTIVE_QUALITY, self.quality - 5)
+                else:
+                    fps = max(IDLE_FPS, int(fps * 0.8))
+            elif self._encode_avg < budget * 0.3:
+                if fps < self.target_fps:
+                    fps = min(self.target_fps, fps + 1)
+                elif self.quality < quality_cap:
+                    self.quality = min(quality_cap, self.quality + 5)
+        self.fps = self._active_fps = fps
+        self.quality = min(self.quality, quality_cap)
+    
+    @property
+    def encode_ms(self) -> float:
+        return self._encode_avg * 1000
+
+
+class ScreenStream:
+    """单个端口的屏幕共享流 - 保存该端口的参数、客户端和最新编码帧"""
     
     def __init__(self, port: int, fps: int = 30, quality: int = 70, scale: float = 1.0):
-        super().__init__(daemon=True)
         self.port = port
         self.fps = min(max(fps, 1), 60)  # 限制 1-60 fps
         self.quality = min(max(quality, 10), 100)  # 限制 10-100
         self.scale = min(max(scale, 0.1), 1.0)  # 限制 0.1-1.0
+        self.controller = AdaptiveController(self.fps, self.quality)
         self.stop_event = threading.Event()
         self.clients: Set = set()  # 存储客户端连接
         self.clients_lock = threading.Lock()
         self.latest_frame: Optional[bytes] = None
         self.frame_lock = threading.Lock()
+        self.frame_cond = threading.Condition(self.frame_lock)
         self.frame_ready = threading.Event()
         self.frame_version = 0  # 帧版本号，用于检测新帧
+        self.next_due = 0.0  # 下一次需要推送新帧的时间
+        self.seen_change = -1  # 已推送到的画面变化序号
+        self.frames_sent = 0
     
     def add_client(self, client):
         with self.clients_lock:
             self.clients.add(client)
+        capture = _shared_capture
+        if capture is not None:
+            capture.wakeup()  # 从空闲帧率立即恢复
     
     def remove_client(self, client):
         with self.clients_lock:
@@ -62,70 +175,180 @@ class ScreenCaptureThread(threading.Thread):
         with self.clients_lock:
             return len(self.clients)
     
+    def publish(self, frame: bytes):
+        with self.frame_cond:
+            self.latest_frame = frame
+            self.frame_version += 1
+            self.frame_cond.notify_all()
+        self.frame_ready.set()
+    
+    def wait_frame(self, last_version: int, timeout: float = 1.0) -> tuple:
+        """等待比 last_version 更新的帧，返回 (帧数据, 版本号)"""
+        with self.frame_cond:
+            if self.frame_version == last_version and not self.stop_event.is_set():
+                self.frame_cond.wait(timeout)
+            return self.latest_frame, self.frame_version
+    
+    def stop(self):
+        self.stop_event.set()
+        self.frame_ready.set()  # 唤醒等待的线程
+        with self.frame_cond:
+            self.frame_cond.notify_all()
+
+
+class SharedScreenCapture(threading.Thread):
+    """共享屏幕捕获线程 - 一个捕获源服务所有端口的屏幕共享流
+    
+    每次捕获先做分块变化检测，画面没有变化时不编码也不推送；
+    参数相同（缩放、画质）的流共用同一次编码结果。
+    MJPEG 客户端只能接收完整帧，因此有分块变化时重新编码整帧。
+    """
+    
+    def __init__(self):
+        super().__init__(daemon=True, name='screen-share-capture')
+        self.streams: Dict[int, ScreenStream] = {}
+        self.streams_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self.differ = FrameDiffer()
+        self.change_seq = 0  # 画面变化序号，每检测到一次变化加一
+        
+        # 统计信息
+        self.captured = 0
+        self.skipped = 0
+        self.encoded = 0
+    
+    def add_stream(self, stream: ScreenStream):
+        with self.streams_lock:
+            self.streams[stream.port] = stream
+        self.wakeup()
+    
+    def remove_stream(self, port: int) -> bool:
+        with self.streams_lock:
+            self.streams.pop(port, None)
+            return not self.streams
+    
+    def wakeup(self):
+        self._wakeup.set()
+    
     def run(self):
         """持续捕获屏幕"""
-        frame_interval = 1.0 / self.fps
-        
         with mss.mss() as sct:
             # 获取主显示器
             monitor = sct.monitors[1]  # 1 是主显示器
             
             while not self.stop_event.is_set():
+                with self.streams_lock:
+                    streams = list(self.streams.values())
+                
+                for stream in streams:
+                    stream.controller.update(stream.get_client_count())
+                fps = max((s.controller.fps for s in streams), default=IDLE_FPS)
                 start_time = time.time()
                 
                 try:
-                    # 捕获屏幕
-                    screenshot = sct.grab(monitor)
-                    
-                    # 转换为 PIL Image
-                    img = Image.frombytes('RGB', screenshot.size, screenshot.bgra, 'raw', 'BGRX')
-                    
-                    # 缩放（如果需要）
-                    if self.scale < 1.0:
-                        new_size = (int(img.width * self.scale), int(img.height * self.scale))
-                        img = img.resize(new_size, Image.Resampling.LANCZOS)
-                    
-                    # 压缩为 JPEG
-                    buffer = io.BytesIO()
-                    img.save(buffer, format='JPEG', quality=self.quality, optimize=True)
-                    frame_data = buffer.getvalue()
-                    
-                    # 更新最新帧
-                    with self.frame_lock:
-                        self.latest_frame = frame_data
-                        self.frame_version += 1
-                    
-                    # 设置帧就绪事件
-                    self.frame_ready.set()
-                    
+                    due = [s for s in streams if s.seen_change < 0 or start_time >= s.next_due]
+                    if due:
+                        self._capture(sct, monitor, due, start_time)
                 except Exception as e:
                     print(f"[ScreenShare] 捕获错误: {e}")
                     import traceback
                     traceback.print_exc()
                 
-                # 控制帧率
+                # 控制帧率（有新客户端连接时提前唤醒）
                 elapsed = time.time() - start_time
-                sleep_time = frame_interval - elapsed
+                sleep_time = 1.0 / fps - elapsed
                 if sleep_time > 0:
-                    time.sleep(sleep_time)
+                    self._wakeup.wait(sleep_time)
+                self._wakeup.clear()
+    
+    def _capture(self, sct, monitor, due: list, now: float):
+        screenshot = sct.grab(monitor)
+        self.captured += 1
+        width, height = screenshot.size
+        
+        if self.differ.dirty_tiles(screenshot.raw, width, height):
+            self.change_seq += 1
+        # 帧率较低的流可能错过了中间的变化，按变化序号判断是否需要推送
+        targets = [s for s in due if s.seen_change < self.change_seq]
+        for stream in due:
+            stream.next_due = now + 1.0 / max(stream.controller.fps, IDLE_FPS)
+        if not targets:
+            self.skipped += 1
+            return
+        
+        # BGRA 原始数据直接解码为 RGB，不经过中间拷贝
+        img = Image.frombuffer('RGB', (width, height), screenshot.raw, 'raw', 'BGRX', 0, 1)
+        
+        encoded: Dict[tuple, bytes] = {}
+        for stream in targets:
+            key = (stream.scale, stream.controller.quality)
+            frame = encoded.get(key)
+            if frame is None:
+                encode_start = time.perf_counter()
+                frame = encode_frame(img, stream.scale, stream.controller.quality)
+                elapsed = time.perf_counter() - encode_start
+                encoded[key] = frame
+                self.encoded += 1
+            else:
+                elapsed = 0.0
+            stream.controller.record_encode(elapsed)
+            stream.seen_change = self.change_seq
+            stream.publish(frame)
     
     def stop(self):
         self.stop_event.set()
-        self.frame_ready.set()  # 唤醒等待的线程
+        self._wakeup.set()
+    
+    def get_stats(self) -> dict:
+        return {
+            'captured': self.captured,
+            'skipped': self.skipped,
+            'encoded': self.encoded,
+        }
+
+
+def encode_frame(img: Image.Image, scale: float, quality: int) -> bytes:
+    """缩放并编码为 JPEG（双线性缩放 + 先整数倍降采样，不做 optimize 二次扫描）"""
+    if scale < 1.0:
+        new_size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+        img = img.resize(new_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=quality, subsampling=2)
+    return buffer.getvalue()
+
+
+def get_shared_capture() -> 'SharedScreenCapture':
+    """获取共享捕获线程（不存在或已停止时创建并启动）"""
+    global _shared_capture
+    with _shared_capture_lock:
+        if _shared_capture is None or not _shared_capture.is_alive():
+            _shared_capture = SharedScreenCapture()
+            _shared_capture.start()
+        return _shared_capture
+
+
+def _release_shared_capture(port: int):
+    """移除端口的流，没有流时停止共享捕获线程"""
+    global _shared_capture
+    with _shared_capture_lock:
+        if _shared_capture is not None and _shared_capture.remove_stream(port):
+            _shared_capture.stop()
+            _shared_capture = None
 
 
 class ScreenShareHandler(BaseHTTPRequestHandler):
     """屏幕共享 HTTP 处理器"""
     
-    # 类变量 - 存储每个端口的捕获线程
-    capture_threads: Dict[int, 'ScreenCaptureThread'] = {}
+    # 类变量 - 存储每个端口的屏幕共享流
+    capture_threads: Dict[int, 'ScreenStream'] = {}
     
     def log_message(self, format, *args):
         """静默日志"""
         pass
     
-    def get_capture_thread(self) -> Optional['ScreenCaptureThread']:
-        """获取当前端口的捕获线程"""
+    def get_capture_thread(self) -> Optional['ScreenStream']:
+        """获取当前端口的屏幕共享流"""
         port = self.server.server_address[1]
         return self.capture_threads.get(port)
     
@@ -191,12 +414,8 @@ class ScreenShareHandler(BaseHTTPRequestHandler):
         
         try:
             while not capture_thread.stop_event.is_set():
-                # 等待新帧
-                capture_thread.frame_ready.wait(timeout=1.0)
-                
-                with capture_thread.frame_lock:
-                    frame = capture_thread.latest_frame
-                    current_version = capture_thread.frame_version
+                # 等待新帧（画面没有变化时不会产生新帧）
+                frame, current_version = capture_thread.wait_frame(last_version, timeout=1.0)
                 
                 # 只发送新帧
                 if frame and current_version != last_version:
@@ -218,9 +437,6 @@ class ScreenShareHandler(BaseHTTPRequestHandler):
                     except Exception as e:
                         print(f"[ScreenShare] 发送帧错误: {e}")
                         break
-                else:
-                    # 没有新帧，短暂等待避免 CPU 空转
-                    time.sleep(0.01)
         finally:
             capture_thread.remove_client(self)
             print(f"[ScreenShare] 客户端断开，共发送 {frame_count} 帧")
@@ -253,17 +469,6 @@ class ScreenShareHandler(BaseHTTPRequestHandler):
         else:
             print("[ScreenShare] 单帧请求失败: 没有可用帧")
             self.send_error(503, "No frame available")
-        
-        if frame:
-            self.send_response(200)
-            self.send_header('Content-Type', 'image/jpeg')
-            self.send_header('Content-Length', str(len(frame)))
-            self.send_header('Cache-Control', 'no-cache')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(frame)
-        else:
-            self.send_error(503, "No frame available")
     
     def send_info(self):
         """发送服务信息"""
@@ -273,6 +478,8 @@ class ScreenShareHandler(BaseHTTPRequestHandler):
             'clients': capture_thread.get_client_count() if capture_thread else 0,
             'fps': capture_thread.fps if capture_thread else 0,
             'quality': capture_thread.quality if capture_thread else 0,
+            'currentFps': capture_thread.controller.fps if capture_thread else 0,
+            'currentQuality': capture_thread.controller.quality if capture_thread else 0,
         }
         data = json.dumps(info).encode('utf-8')
         self.send_response(200)
@@ -515,17 +722,15 @@ def start_screen_share(port: int = 9000, fps: int = 30, quality: int = 70, scale
         stop_screen_share(port)
     
     try:
-        # 创建屏幕捕获线程
-        capture_thread = ScreenCaptureThread(port, fps, quality, scale)
-        
-        # 注册到 Handler 的类变量中（按端口区分）
-        ScreenShareHandler.capture_threads[port] = capture_thread
+        # 创建屏幕共享流
+        capture_thread = ScreenStream(port, fps, quality, scale)
         
         # 创建 HTTP 服务器
         server = ThreadedScreenShareServer(('0.0.0.0', port), ScreenShareHandler)
         
-        # 启动捕获线程
-        capture_thread.start()
+        # 注册到 Handler 的类变量中（按端口区分），并接入共享捕获线程
+        ScreenShareHandler.capture_threads[port] = capture_thread
+        get_shared_capture().add_stream(capture_thread)
         
         # 等待第一帧准备好
         capture_thread.frame_ready.wait(timeout=3.0)
@@ -577,6 +782,7 @@ def stop_screen_share(port: int) -> dict:
         capture_thread = info.get('capture_thread')
         if capture_thread:
             capture_thread.stop()
+        _release_shared_capture(port)
         
         # 停止服务器
         server = info.get('server')
@@ -610,6 +816,9 @@ def get_screen_share_status(port: int) -> dict:
         'quality': info.get('quality', 0),
         'scale': info.get('scale', 1.0),
         'clients': capture_thread.get_client_count() if capture_thread else 0,
+        'currentFps': capture_thread.controller.fps if capture_thread else 0,
+        'currentQuality': capture_thread.controller.quality if capture_thread else 0,
+        'capture': _shared_capture.get_stats() if _shared_capture else {},
     }
 
 
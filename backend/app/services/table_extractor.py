@@ -0,0 +1,240 @@
+"""网页表格提取服务 - 一次 evaluate 序列化整段表格
+
+- 每次 evaluate 在页面内遍历一段表格行（默认 500 行），返回单元格文本、表头标记和跨行合并状态，
+  不再为每个单元格单独发起一次 Playwright 调用
+- 按 colspan/rowspan 展开合并单元格，保证每行的列对齐
+- 识别表头行（<thead> 中的行或全部由 <th> 组成的行）
+- 支持翻页：点击“下一页”后等待表格内容变化再继续提取
+- 分块产出数据，调用方可以边提取边写入数据表或 Excel
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+
+
+DEFAULT_CHUNK_ROWS = 500
+DEFAULT_PAGE_TIMEOUT = 10000
+# Excel 列宽上限（字符）
+MAX_COLUMN_WIDTH = 50
+
+_EXTRACT_SCRIPT = """(el, {start, count, carry, expandSpans}) => {
+    const table = el.tagName === 'TABLE' ? el : el.closest('table');
+    if (!table) return null;
+    const rows = table.rows;
+    const end = Math.min(rows.length, start + count);
+    const pending = carry || [];
+    const out = [];
+    const header = [];
+    for (let r = start; r < end; r++) {
+        const row = rows[r];
+        const cells = row.cells;
+        if (!cells.length) continue;
+        const line = [];
+        let col = 0;
+        const fillPending = () => {
+            while (pending[col] && pending[col].left > 0) {
+                line[col] = pending[col].text;
+                pending[col].left--;
+                col++;
+            }
+        };
+        let allTh = true;
+        for (const cell of cells) {
+            if (cell.tagName !== 'TH') allTh = false;
+            const text = (cell.innerText || '').trim();
+            if (!expandSpans) {
+                line.push(text);
+                continue;
+            }
+            fillPending();
+            const colSpan = Math.min(Math.max(cell.colSpan || 1, 1), 1000);
+            const rowSpan = Math.max(cell.rowSpan || 1, 1);
+            for (let k = 0; k < colSpan; k++) {
+                line[col] = text;
+                pending[col] = rowSpan > 1 ? {text, left: rowSpan - 1} : null;
+                col++;
+            }
+        }
+        if (expandSpans) {
+            fillPending();
+            for (let k = 0; k < line.length; k++) {
+                if (line[k] === undefined) line[k] = '';
+            }
+        }
+        out.push(line);
+        header.push(row.parentElement.tagName === 'THEAD' || allTh);
+    }
+    return {rows: out, header, carry: pending, next: end, total: rows.length};
+}"""
+
+# 表格内容签名（翻页后用于判断表格是否已刷新）
+_SIGNATURE_SCRIPT = """(el) => {
+    const table = el.tagName === 'TABLE' ? el : el.closest('table');
+    if (!table) return '';
+    const body = table.tBodies[0] || table;
+    return table.rows.length + '|' + (body.innerText || '').slice(0, 2000);
+}"""
+
+
+@dataclass
+class TableChunk:
+    """一段表格行"""
+    rows: list
+    header_flags: list
+    page: int = 1  # 所在的页码（从 1 开始）
+    first_row: int = 0  # 第一行在当前页已提取行中的序号（不计没有单元格的行）
+
+
+@dataclass
+class TableExtractOptions:
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+    expand_spans: bool = False
+    next_page_selector: str = ''
+    max_pages: int = 1
+    page_timeout: int = DEFAULT_PAGE_TIMEOUT  # 翻页后等待表格刷新的超时（毫秒）
+
+
+class TableExtractor:
+    """逐段提取一个表格（包括翻页后的表格）"""
+
+    def __init__(self, page, table_selector: str, options: Optional[TableExtractOptions] = None):
+        self.page = page
+        self.table_selector = table_selector
+        self.options = options or TableExtractOptions()
+        self.evaluate_calls = 0
+        self.pages = 0
+
+    async def _resolve_table(self):
+        """选择器指向表格内的元素时改为其所在的表格"""
+        locator = self.page.locator(self.table_selector).first
+        tag_name = await locator.evaluate("el => el.tagName")
+        if tag_name != 'TABLE':
+            locator = locator.locator('xpath=ancestor-or-self::table').first
+            if not await locator.is_visible():
+                raise ValueError("选择的元素不在表格内")
+        return locator
+
+    async def chunks(self) -> AsyncIterator[TableChunk]:
+        """每段一次 evaluate，按顺序产出各页的表格行"""
+        options = self.options
+        for page_no in range(1, max(1, options.max_pages) + 1):
+            table = await self._resolve_table()
+            self.pages = page_no
+
+            start, carry, emitted = 0, None, 0
+            while True:
+                chunk = await table.evaluate(_EXTRACT_SCRIPT, {
+                    'start': start,
+                    'count': max(1, options.chunk_rows),
+                    'carry': carry,
+                    'expandSpans': options.expand_spans,
+                })
+                self.evaluate_calls += 1
+                if chunk is None:
+                    raise ValueError("选择的元素不在表格内")
+                if chunk['rows']:
+                    yield TableChunk(chunk['rows'], chunk['header'], page_no, emitted)
+                    emitted += len(chunk['rows'])
+                start, carry = chunk['next'], chunk['carry']
+                if start >= chunk['total']:
+                    break
+
+            if page_no >= options.max_pages or not options.next_page_selector:
+                break
+            if not await self._goto_next_page(table):
+                break
+
+    async def _goto_next_page(self, table) -> bool:
+        """点击下一页并等待表格内容变化，没有下一页或超时未刷新时返回 False"""
+        next_button = self.page.locator(self.options.next_page_selector).first
+        try:
+            if not await next_button.is_visible() or not await next_button.is_enabled():
+                return False
+            if await next_button.get_attribute('aria-disabled') == 'true':
+                return False
+        except Exception:
+            return False
+
+        before = await table.evaluate(_SIGNATURE_SCRIPT)
+        await next_button.click()
+
+        # 每次重新定位表格，兼容翻页时整个表格元素被替换的页面
+        deadline = time.monotonic() + self.options.page_timeout / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            try:
+                current = await self.page.locator(self.table_selector).first.evaluate(_SIGNATURE_SCRIPT)
+            except Exception:
+                continue
+            if current and current != before:
+                return True
+        return False
+
+
+def header_to_columns(header: list) -> list:
+    """表头转换为数据表列名（空白或重复的列名自动编号）"""
+    columns = []
+    for index, name in enumerate(header):
+        name = str(name).strip() or f"列{index + 1}"
+        base, suffix = name, 2
+        while name in columns:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        columns.append(name)
+    return columns
+
+
+class TableExcelWriter:
+    """流式写入 Excel（write-only 模式，阻塞操作，应在工作线程中调用）
+
+    列宽按第一段数据估算（上限 50 个字符），之后的数据直接追加，不在内存中保留整张表。
+    """
+
+    def __init__(self, path: str, header_row: Optional[int] = None):
+        self.path = path
+        self.header_row = header_row
+        self.rows_written = 0
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("表格数据")
+        self._sized = False
+        self._header_font = Font(bold=True, color="FFFFFF")
+        self._header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        self._header_alignment = Alignment(horizontal="center", vertical="center")
+        self._body_alignment = Alignment(horizontal="left", vertical="center")
+
+    def write_rows(self, rows: list):
+        if not self._sized and rows:
+            self._set_widths(rows)
+        for row in rows:
+            is_header = self.rows_written == self.header_row
+            cells = []
+            for value in row:
+                cell = WriteOnlyCell(self._sheet, value=value)
+                if is_header:
+                    cell.font = self._header_font
+                    cell.fill = self._header_fill
+                    cell.alignment = self._header_alignment
+                else:
+                    cell.alignment = self._body_alignment
+                cells.append(cell)
+            self._sheet.append(cells)
+            self.rows_written += 1
+
+    def _set_widths(self, rows: list):
+        from openpyxl.utils import get_column_letter
+        widths: dict = {}
+        for row in rows:
+            for index, value in enumerate(row):
+                if value:
+                    widths[index] = max(widths.get(index, 0), len(str(value)))
+        for index, width in widths.items():
+            self._sheet.column_dimensions[get_column_letter(index + 1)].width = min(width + 2, MAX_COLUMN_WIDTH)
+        self._sized = True
+
+    def save(self):
+        self._workbook.save(self.path)
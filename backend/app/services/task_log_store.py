@@ -0,0 +1,157 @@
+"""计划任务执行日志存储 - SQLite 单表，按行写入
+
+代替每次都排序并整体重写 scheduled_task_logs.json 的做法：
+- 每条日志一行，新增和状态更新都只写这一行（WAL 模式，不需要每次 fsync）
+- 按 (task_id, start_time) 和 start_time 建索引，按任务/时间分页查询不再扫描全部日志
+- 保留条数和保留天数通过 DELETE 清理，不需要重写整个文件
+- 首次启动时导入旧的 scheduled_task_logs.json，导入后将其重命名为 .json.bak
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from app.models.scheduled_task import ScheduledTaskExecutionLog
+
+
+DEFAULT_MAX_LOGS = 1000
+# 每写入多少条新日志执行一次清理
+PRUNE_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_logs (
+    id TEXT PRIMARY KEY,
+    task_id TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    status TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_task_logs_task_time ON task_logs (task_id, start_time);
+CREATE INDEX IF NOT EXISTS idx_task_logs_time ON task_logs (start_time);
+"""
+
+
+def _to_row(log: ScheduledTaskExecutionLog) -> tuple:
+    return (log.id, log.task_id, log.start_time, log.status, json.dumps(log.dict(), ensure_ascii=False))
+
+
+class TaskLogStore:
+    """计划任务执行日志存储"""
+
+    def __init__(self, db_path: Path, max_logs: int = DEFAULT_MAX_LOGS, retention_days: int = 0):
+        self.db_path = Path(db_path)
+        self.max_logs = max(0, int(max_logs or 0))
+        self.retention_days = max(0, int(retention_days or 0))
+        self._lock = threading.Lock()
+        self._inserts = 0
+        # API 请求和热键回调可能来自不同线程，连接由锁保护
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, log: ScheduledTaskExecutionLog):
+        """新增一条日志，每新增 PRUNE_EVERY 条清理一次旧日志"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_logs (id, task_id, start_time, status, data) VALUES (?, ?, ?, ?, ?)",
+                _to_row(log),
+            )
+            self._inserts += 1
+            if self._inserts >= PRUNE_EVERY:
+                self._inserts = 0
+                self._prune()
+
+    def update(self, log: ScheduledTaskExecutionLog):
+        """更新一条日志（执行结束、被停止），已被清空的日志不再写回"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE task_logs SET status = ?, data = ? WHERE id = ?",
+                (log.status, json.dumps(log.dict(), ensure_ascii=False), log.id),
+            )
+
+    def save_many(self, logs: List[ScheduledTaskExecutionLog]):
+        """批量写入（导入旧日志时使用）"""
+        rows = [_to_row(log) for log in logs]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO task_logs (id, task_id, start_time, status, data) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._prune()
+
+    def query(self, task_id: Optional[str] = None, limit: int = 100, offset: int = 0,
+              status: Optional[str] = None) -> List[ScheduledTaskExecutionLog]:
+        """按开始时间倒序分页查询"""
+        conditions, params = [], []
+        if task_id:
+            conditions.append("task_id = ?")
+            params.append(task_id)
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.extend([max(0, int(limit)), max(0, int(offset))])
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM task_logs {where} ORDER BY start_time DESC LIMIT ? OFFSET ?",
+                params,
+            ).fetchall()
+        return [ScheduledTaskExecutionLog(**json.loads(row[0])) for row in rows]
+
+    def count(self, task_id: Optional[str] = None) -> int:
+        with self._lock:
+            if task_id:
+                row = self._conn.execute("SELECT COUNT(*) FROM task_logs WHERE task_id = ?", (task_id,)).fetchone()
+            else:
+                row = self._conn.execute("SELECT COUNT(*) FROM task_logs").fetchone()
+        return row[0]
+
+    def clear(self, task_id: Optional[str] = None):
+        with self._lock:
+            if task_id:
+                self._conn.execute("DELETE FROM task_logs WHERE task_id = ?", (task_id,))
+            else:
+                self._conn.execute("DELETE FROM task_logs")
+
+    def prune(self):
+        with self._lock:
+            self._prune()
+
+    def _prune(self):
+        """按保留天数和保留条数删除旧日志（正在执行的日志不删除）"""
+        if self.retention_days:
+            cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+            self._conn.execute(
+                "DELETE FROM task_logs WHERE start_time < ? AND status != 'running'", (cutoff,))
+        if self.max_logs:
+            self._conn.execute(
+                "DELETE FROM task_logs WHERE status != 'running' AND rowid IN ("
+                "SELECT rowid FROM task_logs ORDER BY start_time DESC LIMIT -1 OFFSET ?)",
+                (self.max_logs,),
+            )
+
+    def import_json(self, json_path: Path) -> int:
+        """导入旧版 JSON 日志文件，成功后重命名为 .json.bak"""
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        logs = [ScheduledTaskExecutionLog(**item) for item in data]
+        if logs:
+            self.save_many(logs)
+        json_path.replace(json_path.with_suffix('.json.bak'))
+        return len(logs)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
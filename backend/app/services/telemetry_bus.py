@@ -0,0 +1,206 @@
+"""执行遥测事件总线 - 按工作流缓冲 Socket.IO 事件并批量发送
+
+节点执行只把事件放入缓冲区（同步、不等待websocket），后台刷新任务按时间间隔或事件数量批量发送：
+- 每次刷新把缓冲区中的事件合并为一个 execution:batch 事件发送（{events: [{event, data}]}），
+  前端按原事件名逐条分发
+- 同一变量的多次更新、同一节点的开始/完成状态在未发送前合并为最新的一条，
+  合并后的事件移到缓冲区末尾，不会早于在它之前放入的日志等事件到达
+- 缓冲区超过上限时优先丢弃最早的可丢弃事件（详细日志等），错误/用户/系统日志不丢弃
+- 没有客户端连接时直接丢弃待发送事件，不做无用的序列化和发送
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from app.utils.config import get_backend_config
+
+
+DEFAULT_FLUSH_INTERVAL_MS = 50
+DEFAULT_MAX_BATCH_SIZE = 200
+DEFAULT_MAX_BUFFER_SIZE = 5000
+# 批量发送的 Socket.IO 事件名
+BATCH_EVENT = 'execution:batch'
+
+
+class _PendingEvent:
+    """缓冲区中待发送的事件"""
+    __slots__ = ('event', 'payload', 'key', 'droppable', 'dropped')
+
+    def __init__(self, event: str, payload: dict, key: Optional[Any], droppable: bool):
+        self.event = event
+        self.payload = payload
+        self.key = key
+        self.droppable = droppable
+        self.dropped = False
+
+
+class TelemetryBus:
+    """单个工作流执行的遥测事件总线"""
+
+    def __init__(
+        self,
+        emit: Callable[[str, dict], Awaitable[Any]],
+        has_clients: Optional[Callable[[], bool]] = None,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_buffer_size: int = DEFAULT_MAX_BUFFER_SIZE,
+    ):
+        self._emit = emit
+        self._has_clients = has_clients
+        self.flush_interval = max(1, int(flush_interval_ms)) / 1000
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_buffer_size = max(self.max_batch_size, int(max_buffer_size))
+
+        self._buffer: list[_PendingEvent] = []
+        self._keyed: dict[Any, _PendingEvent] = {}  # 可合并事件的 key -> 缓冲区中的事件
+        self._live = 0  # 缓冲区中未被丢弃的事件数
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+        # 统计信息
+        self.published = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.emitted = 0
+        self.batches = 0
+
+    def publish(self, event: str, payload: dict, key: Optional[Any] = None, droppable: bool = False):
+        """放入一个事件（不等待发送）
+
+        Args:
+            event: Socket.IO 事件名
+            payload: 事件数据
+            key: 合并键，缓冲区中已有相同 key 的事件时丢弃它，新事件放到缓冲区末尾
+            droppable: 缓冲区满时是否可以丢弃
+        """
+        if self._closed:
+            return
+        self.published += 1
+
+        if key is not None:
+            pending = self._keyed.get(key)
+            if pending is not None and not pending.dropped:
+                # 旧事件作废，新事件按发布顺序排在末尾
+                pending.dropped = True
+                self._live -= 1
+                self.coalesced += 1
+
+        pending = _PendingEvent(event, payload, key, droppable)
+        self._buffer.append(pending)
+        self._live += 1
+        if key is not None:
+            self._keyed[key] = pending
+
+        if self._live > self.max_buffer_size:
+            self._drop_oldest()
+        elif len(self._buffer) > 2 * self.max_buffer_size:
+            # 频繁合并留下的作废事件过多时压缩缓冲区
+            self._buffer = [pending for pending in self._buffer if not pending.dropped]
+
+        self._ensure_flusher()
+        if self._live >= self.max_batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _drop_oldest(self):
+        """缓冲区已满时丢弃最早的一条可丢弃事件"""
+        for pending in self._buffer:
+            if pending.droppable and not pending.dropped:
+                pending.dropped = True
+                self._live -= 1
+                self.dropped += 1
+                if pending.key is not None and self._keyed.get(pending.key) is pending:
+                    del self._keyed[pending.key]
+                return
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and not self._flusher.done():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher = asyncio.create_task(self._run())
+
+    async def _run(self):
+        """后台刷新任务：等待时间间隔或批量阈值后发送缓冲区中的事件"""
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """立即发送缓冲区中的全部事件"""
+        if not self._buffer:
+            return
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            self._keyed.clear()
+            self._live = 0
+
+            if self._has_clients is not None and not self._has_clients():
+                self.dropped += sum(1 for pending in batch if not pending.dropped)
+                return
+
+            events = [{'event': pending.event, 'data': pending.payload} for pending in batch if not pending.dropped]
+            # 缓冲区通常不超过 max_batch_size，超过时（发送较慢期间积压）分成多个批次
+            for start in range(0, len(events), self.max_batch_size):
+                chunk = events[start:start + self.max_batch_size]
+                try:
+                    await self._emit(BATCH_EVENT, {'events': chunk})
+                    self.emitted += len(chunk)
+                    self.batches += 1
+                except Exception as e:
+                    print(f"[TelemetryBus] 发送 {len(chunk)} 个事件失败: {e}")
+
+    async def close(self):
+        """停止后台刷新任务并发送剩余事件"""
+        self._closed = True
+        if self._flusher is not None and not self._flusher.done():
+            self._wakeup.set()
+            try:
+                await self._flusher
+            except Exception as e:
+                print(f"[TelemetryBus] 刷新任务异常退出: {e}")
+        self._flusher = None
+        await self.flush()
+
+    def get_stats(self) -> dict:
+        """获取统计信息"""
+        return {
+            'pending': self._live,
+            'published': self.published,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'emitted': self.emitted,
+            'batches': self.batches,
+        }
+
+
+def create_telemetry_bus(
+    emit: Callable[[str, dict], Awaitable[Any]],
+    has_clients: Optional[Callable[[], bool]] = None,
+) -> TelemetryBus:
+    """按配置创建遥测事件总线
+
+    配置项（WebRPAConfig.json 的 backend.telemetry）：
+        flushIntervalMs: 刷新间隔（毫秒）
+        maxBatchSize: 缓冲事件数达到该值时立即刷新
+        maxBufferSize: 缓冲区上限，超出后丢弃最早的可丢弃事件
+    """
+    telemetry_config = get_backend_config().get('telemetry', {}) or {}
+    return TelemetryBus(
+        emit,
+        has_clients=has_clients,
+        flush_interval_ms=telemetry_config.get('flushIntervalMs', DEFAULT_FLUSH_INTERVAL_MS),
+        max_batch_size=telemetry_config.get('maxBatchSize', DEFAULT_MAX_BATCH_SIZE),
+        max_buffer_size=telemetry_config.get('maxBufferSize', DEFAULT_MAX_BUFFER_SIZE),
+    )
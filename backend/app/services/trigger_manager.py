@@ -2,16 +2,15 @@
 import asyncio
 import imaplib
 import email
-import os
-import fnmatch
 from datetime import datetime
-from pathlib import Path
 from typing import Callable, Dict, Optional, Set
 from threading import Thread
 import time
 
 from pynput import keyboard
 
+from app.services.file_watch_service import get_file_watch_service
+
 
 class TriggerManager:
     """全局触发器管理器"""
@@ -27,7 +26,6 @@ class TriggerManager:
 
         # 文件监控触发器
         self.file_watchers: Dict[str, dict] = {}  # watcher_id -> {path, type, pattern, callback}
-        self.file_watcher_tasks: Dict[str, asyncio.Task] = {}
 
         # 邮件监控触发器
         self.email_monitors: Dict[str, dict] = {}  # monitor_id -> {config, callback}
@@ -190,7 +188,7 @@ class TriggerManager:
         file_pattern: str,
         callback: Callable
     ) -> str:
-        """注册文件监控触发器"""
+        """注册文件监控触发器（同一目录的监控由文件监控服务共享，触发一次后失效）"""
         import uuid
         watcher_id = str(uuid.uuid4())
 
@@ -198,13 +196,9 @@ class TriggerManager:
             'path': watch_path,
             'type': watch_type,
             'pattern': file_pattern,
-            'callback': callback,
-            'last_snapshot': self._get_directory_snapshot(watch_path)
+            'callback': callback
         }
-
-        # 启动监控任务
-        task = asyncio.create_task(self._file_watcher_loop(watcher_id))
-        self.file_watcher_tasks[watcher_id] = task
+        get_file_watch_service().subscribe(watcher_id, watch_path, watch_type, file_pattern, callback)
 
         print(f"[TriggerManager] 文件监控已注册: {watch_path} ({watch_type})")
         return watcher_id
@@ -213,92 +207,10 @@ class TriggerManager:
         """注销文件监控触发器"""
         if watcher_id in self.file_watchers:
             del self.file_watchers[watcher_id]
-
-        if watcher_id in self.file_watcher_tasks:
-            task = self.file_watcher_tasks[watcher_id]
-            task.cancel()
-            del self.file_watcher_tasks[watcher_id]
+        get_file_watch_service().unsubscribe(watcher_id)
 
         print(f"[TriggerManager] 文件监控已注销: {watcher_id}")
 
-    def _get_directory_snapshot(self, path: str) -> dict:
-        """获取目录快照"""
-        snapshot = {}
-        path_obj = Path(path)
-
-        if path_obj.is_file():
-            # 监控单个文件
-            if path_obj.exists():
-                stat = path_obj.stat()
-                snapshot[str(path_obj)] = {
-                    'mtime': stat.st_mtime,
-                    'size': stat.st_size
-                }
-        else:
-            # 监控目录
-            for file_path in path_obj.rglob('*'):
-                if file_path.is_file():
-                    stat = file_path.stat()
-                    snapshot[str(file_path)] = {
-                        'mtime': stat.st_mtime,
-                        'size': stat.st_size
-                    }
-
-        return snapshot
-
-    async def _file_watcher_loop(self, watcher_id: str):
-        """文件监控循环"""
-        try:
-            while watcher_id in self.file_watchers:
-                watcher = self.file_watchers[watcher_id]
-                watch_path = watcher['path']
-                watch_type = watcher['type']
-                file_pattern = watcher['pattern']
-                callback = watcher['callback']
-                last_snapshot = watcher['last_snapshot']
-
-                # 获取当前快照
-                current_snapshot = self._get_directory_snapshot(watch_path)
-
-                # 检测新增文件
-                if watch_type in ['created', 'any']:
-                    for file_path in current_snapshot:
-                        if file_path not in last_snapshot:
-                            if fnmatch.fnmatch(os.path.basename(file_path), file_pattern):
-                                callback('created', file_path)
-                                watcher['last_snapshot'] = current_snapshot
-                                return  # 触发后退出
-
-                # 检测修改文件
-                if watch_type in ['modified', 'any']:
-                    for file_path in current_snapshot:
-                        if file_path in last_snapshot:
-                            if current_snapshot[file_path]['mtime'] != last_snapshot[file_path]['mtime']:
-                                if fnmatch.fnmatch(os.path.basename(file_path), file_pattern):
-                                    callback('modified', file_path)
-                                    watcher['last_snapshot'] = current_snapshot
-                                    return  # 触发后退出
-
-                # 检测删除文件
-                if watch_type in ['deleted', 'any']:
-                    for file_path in last_snapshot:
-                        if file_path not in current_snapshot:
-                            if fnmatch.fnmatch(os.path.basename(file_path), file_pattern):
-                                callback('deleted', file_path)
-                                watcher['last_snapshot'] = current_snapshot
-                                return  # 触发后退出
-
-                # 更新快照
-                watcher['last_snapshot'] = current_snapshot
-
-                # 等待1秒后再次检查
-                await asyncio.sleep(1)
-
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            print(f"[TriggerManager] 文件监控异常: {e}")
-
     # ==================== 邮件监控触发器 ====================
 
     def register_email_monitor(
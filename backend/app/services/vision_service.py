@@ -0,0 +1,384 @@
+"""图像识别服务 - 屏幕截图、模板缓存与金字塔模板匹配
+
+- 模板按 路径+修改时间 缓存解码后的灰度图及各级缩小图，轮询时不再重复读盘解码
+- 匹配先在缩小的图像金字塔上粗搜候选位置，再在原分辨率的小区域内精确匹配；
+  候选位置接近但未达到置信度时再做一次原图全图匹配，避免缩小图丢失细节导致漏检
+  （差得较远时视为目标不在屏幕上，等待/轮询时不为每次未命中多付一次全图匹配）
+- 记录每个模板上次匹配到的位置（有数量上限），下一次先在其附近的区域内匹配
+- 一次截图可同时匹配多个模板（缩小图只计算一次）
+
+所有方法都是同步的（CPU密集），由调用方在工作线程中执行。
+"""
+import ctypes
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from app.utils.config import get_backend_config
+
+
+DEFAULT_CACHE_SIZE = 64
+# 粗搜时模板缩小后的最短边不小于该像素数（太小的模板在缩小图上没有区分度）
+MIN_COARSE_TEMPLATE_SIDE = 12
+# 最大缩小倍数
+MAX_PYRAMID_FACTOR = 8
+# 粗搜保留的候选位置数
+COARSE_CANDIDATES = 3
+# 上次命中位置附近的搜索范围（模板尺寸的倍数）
+HINT_MARGIN = 1.0
+# 保留的上次命中位置数量
+MAX_HINTS = 256
+# 粗搜最佳匹配度与置信度相差不超过该值时回退为原图全图匹配（0 表示不回退）
+DEFAULT_FALLBACK_MARGIN = 0.2
+
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+
+
+@dataclass
+class Template:
+    """解码后的模板图像"""
+    key: tuple
+    gray: np.ndarray
+    levels: dict  # 缩小倍数 -> 缩小后的模板
+
+    @property
+    def width(self) -> int:
+        return self.gray.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.gray.shape[0]
+
+    @property
+    def pyramid_factor(self) -> int:
+        """该模板可用的最大缩小倍数（1 表示只能原图匹配）"""
+        return max(self.levels) if self.levels else 1
+
+
+@dataclass
+class MatchResult:
+    """模板匹配结果（坐标为屏幕坐标，已加上截图偏移）"""
+    found: bool
+    confidence: float
+    left: int = 0
+    top: int = 0
+    width: int = 0
+    height: int = 0
+
+    @property
+    def right(self) -> int:
+        return self.left + self.width
+
+    @property
+    def bottom(self) -> int:
+        return self.top + self.height
+
+    @property
+    def center(self) -> tuple:
+        return self.left + self.width // 2, self.top + self.height // 2
+
+
+class Frame:
+    """一次截图的灰度图，缓存各级缩小图供多个模板共用"""
+
+    def __init__(self, gray: np.ndarray, offset_x: int = 0, offset_y: int = 0):
+        self.gray = gray
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self._levels: dict = {}
+
+    @classmethod
+    def from_bgr(cls, image: np.ndarray, offset_x: int = 0, offset_y: int = 0) -> 'Frame':
+        return cls(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), offset_x, offset_y)
+
+    @classmethod
+    def from_rgba(cls, image: np.ndarray, offset_x: int = 0, offset_y: int = 0) -> 'Frame':
+        return cls(cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY), offset_x, offset_y)
+
+    @property
+    def width(self) -> int:
+        return self.gray.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.gray.shape[0]
+
+    def level(self, factor: int) -> np.ndarray:
+        if factor <= 1:
+            return self.gray
+        image = self._levels.get(factor)
+        if image is None:
+            image = _downscale(self.gray, factor)
+            self._levels[factor] = image
+        return image
+
+
+def _downscale(image: np.ndarray, factor: int) -> np.ndarray:
+    h, w = image.shape[:2]
+    return cv2.resize(image, (max(1, w // factor), max(1, h // factor)), interpolation=cv2.INTER_AREA)
+
+
+def _match(image: np.ndarray, template: np.ndarray):
+    """返回 (最高匹配度, 位置)，图像小于模板时返回 (0, None)"""
+    if image.shape[0] < template.shape[0] or image.shape[1] < template.shape[1]:
+        return 0.0, None
+    result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return float(max_val), max_loc
+
+
+class VisionService:
+    """模板缓存 + 金字塔匹配（线程安全）"""
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE, pyramid: bool = True,
+                 fallback_margin: float = DEFAULT_FALLBACK_MARGIN):
+        self.cache_size = max(1, cache_size)
+        self.pyramid = pyramid
+        self.fallback_margin = max(0.0, float(fallback_margin))
+        self._templates: OrderedDict[str, Template] = OrderedDict()
+        # (模板key, 截图尺寸) -> 上次命中的 (left, top)，截图内坐标，按最近使用排序
+        self._hints: OrderedDict[tuple, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self._dpi_aware = False
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.hint_hits = 0
+        self.full_fallbacks = 0
+
+    # ===== 模板 =====
+
+    def load_template(self, path: str) -> Optional[Template]:
+        """读取模板（支持中文路径），按 路径+修改时间 缓存，无法解码时返回 None"""
+        abs_path = os.path.abspath(path)
+        stat = os.stat(abs_path)
+        key = (abs_path, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            template = self._templates.get(abs_path)
+            if template is not None and template.key == key:
+                self._templates.move_to_end(abs_path)
+                self.cache_hits += 1
+                return template
+            self.cache_misses += 1
+
+        image = cv2.imdecode(np.fromfile(abs_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        levels = {}
+        factor = 2
+        while factor <= MAX_PYRAMID_FACTOR and min(gray.shape) // factor >= MIN_COARSE_TEMPLATE_SIDE:
+            levels[factor] = _downscale(gray, factor)
+            factor *= 2
+        template = Template(key=key, gray=gray, levels=levels)
+
+        with self._lock:
+            self._templates[abs_path] = template
+            self._templates.move_to_end(abs_path)
+            while len(self._templates) > self.cache_size:
+                self._templates.popitem(last=False)
+        return template
+
+    # ===== 截图 =====
+
+    def _ensure_dpi_aware(self):
+        """设置 DPI 感知，确保坐标准确（只需设置一次）"""
+        if self._dpi_aware:
+            return
+        self._dpi_aware = True
+        try:
+            ctypes.windll.shcore.SetProcessDpiAwareness(2)
+        except Exception:
+            try:
+                ctypes.windll.user32.SetProcessDPIAware()
+            except Exception:
+                pass
+
+    def capture_screen(self, region: Optional[tuple] = None) -> Frame:
+        """截取屏幕并转为灰度图
+
+        Args:
+            region: (x, y, w, h) 搜索区域；为空时截取整个虚拟屏幕（支持多显示器）
+        """
+        self._ensure_dpi_aware()
+        if region:
+            from PIL import ImageGrab
+            x, y, w, h = region
+            screenshot_pil = ImageGrab.grab(bbox=(x, y, x + w, y + h))
+            return Frame(cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2GRAY), x, y)
+
+        try:
+            import win32con
+            import win32gui
+            import win32ui
+        except ImportError:
+            from PIL import ImageGrab
+            screenshot_pil = ImageGrab.grab(all_screens=True)
+            return Frame(cv2.cvtColor(np.array(screenshot_pil), cv2.COLOR_RGB2GRAY), 0, 0)
+
+        user32 = ctypes.windll.user32
+        virtual_left = user32.GetSystemMetrics(SM_XVIRTUALSCREEN)
+        virtual_top = user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
+        virtual_width = user32.GetSystemMetrics(SM_CXVIRTUALSCREEN)
+        virtual_height = user32.GetSystemMetrics(SM_CYVIRTUALSCREEN)
+
+        hdesktop = win32gui.GetDesktopWindow()
+        desktop_dc = win32gui.GetWindowDC(hdesktop)
+        img_dc = win32ui.CreateDCFromHandle(desktop_dc)
+        mem_dc = img_dc.CreateCompatibleDC()
+        screenshot = win32ui.CreateBitmap()
+        try:
+            screenshot.CreateCompatibleBitmap(img_dc, virtual_width, virtual_height)
+            mem_dc.SelectObject(screenshot)
+            mem_dc.BitBlt((0, 0), (virtual_width, virtual_height), img_dc,
+                          (virtual_left, virtual_top), win32con.SRCCOPY)
+            bmpinfo = screenshot.GetInfo()
+            bmpstr = screenshot.GetBitmapBits(True)
+            screen = np.frombuffer(bmpstr, dtype=np.uint8).reshape(
+                (bmpinfo['bmHeight'], bmpinfo['bmWidth'], 4))
+            gray = cv2.cvtColor(screen, cv2.COLOR_BGRA2GRAY)
+        finally:
+            mem_dc.DeleteDC()
+            win32gui.DeleteObject(screenshot.GetHandle())
+            win32gui.ReleaseDC(hdesktop, desktop_dc)
+        return Frame(gray, virtual_left, virtual_top)
+
+    # ===== 匹配 =====
+
+    def find(self, frame: Frame, template: Template, confidence: float) -> MatchResult:
+        """在截图中查找模板，返回最佳匹配（found 表示是否达到置信度）"""
+        hint_key = (template.key, frame.width, frame.height)
+        best_val, best_loc = 0.0, None
+
+        # 1. 上次命中位置附近
+        with self._lock:
+            hint = self._hints.get(hint_key)
+        if hint is not None:
+            val, loc = self._match_around(frame.gray, template.gray, hint, template.width, template.height)
+            if val >= confidence:
+                self.hint_hits += 1
+                return self._result(frame, template, val, loc, hint_key, True)
+            best_val, best_loc = val, loc
+
+        # 2. 金字塔粗搜 + 原图精确匹配
+        factor = min(template.pyramid_factor, MAX_PYRAMID_FACTOR) if self.pyramid else 1
+        if factor > 1:
+            for candidate in self._coarse_candidates(frame.level(factor), template.levels[factor]):
+                hint_loc = (candidate[0] * factor, candidate[1] * factor)
+                val, loc = self._match_around(frame.gray, template.gray, hint_loc,
+                                              template.width, template.height, margin=factor * 2)
+                if val > best_val:
+                    best_val, best_loc = val, loc
+                if best_val >= confidence:
+                    break
+            if confidence - self.fallback_margin <= best_val < confidence:
+                # 粗搜可能漏掉了真实位置（缩小后细节丢失），回退为原图全图匹配
+                self.full_fallbacks += 1
+                val, loc = _match(frame.gray, template.gray)
+                if val > best_val:
+                    best_val, best_loc = val, loc
+        else:
+            best_val, best_loc = _match(frame.gray, template.gray)
+
+        return self._result(frame, template, best_val, best_loc, hint_key, best_val >= confidence)
+
+    def find_many(self, frame: Frame, templates: list, confidence: float) -> list:
+        """在同一张截图中匹配多个模板（缩小图只计算一次）"""
+        return [self.find(frame, template, confidence) for template in templates]
+
+    def capture_and_find(self, region: Optional[tuple], template: Template, confidence: float) -> MatchResult:
+        """截屏并查找模板（同步操作，执行器通过 run_in_worker 在工作线程中调用）"""
+        return self.find(self.capture_screen(region), template, confidence)
+
+    def capture_and_find_many(self, region: Optional[tuple], templates: list, confidence: float) -> list:
+        """截屏并在同一张截图中查找多个模板"""
+        return self.find_many(self.capture_screen(region), templates, confidence)
+
+    def _result(self, frame: Frame, template: Template, val: float, loc, hint_key, found: bool) -> MatchResult:
+        if not found or loc is None:
+            return MatchResult(found=False, confidence=val)
+        with self._lock:
+            self._hints[hint_key] = loc
+            self._hints.move_to_end(hint_key)
+            while len(self._hints) > MAX_HINTS:
+                self._hints.popitem(last=False)
+        return MatchResult(
+            found=True,
+            confidence=val,
+            left=frame.offset_x + loc[0],
+            top=frame.offset_y + loc[1],
+            width=template.width,
+            height=template.height,
+        )
+
+    def _coarse_candidates(self, image: np.ndarray, template: np.ndarray) -> list:
+        """在缩小图上匹配，返回匹配度最高的几个不重叠的位置"""
+        if image.shape[0] < template.shape[0] or image.shape[1] < template.shape[1]:
+            return []
+        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        th, tw = template.shape
+        candidates = []
+        for _ in range(COARSE_CANDIDATES):
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if max_val <= 0:
+                break
+            candidates.append(max_loc)
+            # 屏蔽已选位置周围，避免重复选到同一处
+            x, y = max_loc
+            result[max(0, y - th // 2):y + th // 2 + 1, max(0, x - tw // 2):x + tw // 2 + 1] = -1
+        return candidates
+
+    def _match_around(self, gray: np.ndarray, template: np.ndarray, loc: tuple, w: int, h: int,
+                      margin: Optional[int] = None):
+        """在 loc 附近的区域内做原图匹配，返回截图内坐标"""
+        pad_x = int(w * HINT_MARGIN) if margin is None else margin
+        pad_y = int(h * HINT_MARGIN) if margin is None else margin
+        x0 = max(0, loc[0] - pad_x)
+        y0 = max(0, loc[1] - pad_y)
+        x1 = min(gray.shape[1], loc[0] + w + pad_x)
+        y1 = min(gray.shape[0], loc[1] + h + pad_y)
+        val, found_loc = _match(gray[y0:y1, x0:x1], template)
+        if found_loc is None:
+            return 0.0, None
+        return val, (x0 + found_loc[0], y0 + found_loc[1])
+
+    def get_stats(self) -> dict:
+        return {
+            'templates': len(self._templates),
+            'cacheHits': self.cache_hits,
+            'cacheMisses': self.cache_misses,
+            'hintHits': self.hint_hits,
+            'fullFallbacks': self.full_fallbacks,
+        }
+
+
+_vision_service: Optional[VisionService] = None
+
+
+def get_vision_service() -> VisionService:
+    """获取图像识别服务单例
+
+    配置项（WebRPAConfig.json 的 backend.vision）：
+        templateCacheSize: 缓存的模板数量
+        pyramid: 是否启用金字塔粗搜（关闭后始终原图全屏匹配）
+        fallbackMargin: 粗搜最佳匹配度比置信度低不超过该值时回退为原图全图匹配（0 表示不回退）
+    """
+    global _vision_service
+    if _vision_service is None:
+        vision_config = get_backend_config().get('vision', {}) or {}
+        _vision_service = VisionService(
+            cache_size=vision_config.get('templateCacheSize', DEFAULT_CACHE_SIZE),
+            pyramid=vision_config.get('pyramid', True),
+            fallback_margin=vision_config.get('fallbackMargin', DEFAULT_FALLBACK_MARGIN),
+        )
+    return _vision_service
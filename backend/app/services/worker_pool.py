@@ -0,0 +1,254 @@
+"""工作线程/进程池服务 - 将CPU密集型的同步操作移出事件循环
+
+用法：
+- await run_in_worker(func, *args, kind='thread' | 'process')
+- @offload('process') 装饰同步函数/方法，调用后返回可等待对象
+- 执行器类属性 offload = 'thread'，整个 execute 在线程池中运行（见 run_executor_in_thread）
+
+进程池任务的函数和参数需要可以被 pickle（模块级函数、无状态执行器的绑定方法、基础数据类型）。
+任务按所属工作流记录，工作流停止时通过 cancel_owner 取消尚未完成的任务。
+"""
+import asyncio
+import functools
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from app.utils.config import get_backend_config
+
+
+KIND_THREAD = 'thread'
+KIND_PROCESS = 'process'
+
+# 当前任务所属的工作流（由 WorkflowExecutor 设置，子任务自动继承）
+_current_owner: ContextVar[Optional[str]] = ContextVar('worker_pool_owner', default=None)
+
+
+def set_worker_owner(owner: Optional[str]):
+    """设置当前协程上下文中提交的任务所属的工作流"""
+    _current_owner.set(owner)
+
+
+@dataclass(frozen=True)
+class FunctionRef:
+    """被 @offload 装饰的函数引用 - 在子进程中按模块路径重新定位原始函数"""
+    module: str
+    qualname: str
+
+    def resolve(self) -> Callable:
+        target: Any = importlib.import_module(self.module)
+        for part in self.qualname.split('.'):
+            target = getattr(target, part)
+        return getattr(target, '__wrapped__', target)
+
+
+@dataclass
+class WorkerTask:
+    """提交到工作池的任务（进程池中需要可被 pickle）"""
+    func: Any  # Callable 或 FunctionRef
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    submitted_at: float = 0.0
+
+
+def _invoke(task: WorkerTask) -> tuple[float, Any]:
+    """在工作线程/进程中执行任务，返回 (开始时间, 结果)"""
+    started_at = time.time()
+    func = task.func.resolve() if isinstance(task.func, FunctionRef) else task.func
+    return started_at, func(*task.args, **task.kwargs)
+
+
+class _PoolStats:
+    """单个池的统计信息"""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.in_flight = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def to_dict(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            'maxWorkers': self.max_workers,
+            'inFlight': self.in_flight,
+            'queueDepth': max(0, self.in_flight - self.max_workers),
+            'completed': self.completed,
+            'failed': self.failed,
+            'cancelled': self.cancelled,
+            'avgWaitMs': self.total_wait / finished * 1000 if finished else 0,
+            'maxWaitMs': self.max_wait * 1000,
+            'avgRunMs': self.total_run / finished * 1000 if finished else 0,
+        }
+
+
+class WorkerPool:
+    """共享的线程池 + 进程池"""
+
+    def __init__(self, max_threads: Optional[int] = None, max_processes: Optional[int] = None):
+        cpu_count = os.cpu_count() or 1
+        self.max_threads = max_threads or min(32, cpu_count + 4)
+        self.max_processes = max_processes or max(1, cpu_count - 1)
+
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._owner_futures: dict[str, set[asyncio.Future]] = {}
+        self._stats = {
+            KIND_THREAD: _PoolStats(self.max_threads),
+            KIND_PROCESS: _PoolStats(self.max_processes),
+        }
+
+    def _get_executor(self, kind: str):
+        with self._lock:
+            if kind == KIND_PROCESS:
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(max_workers=self.max_processes)
+                return self._process_pool
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.max_threads, thread_name_prefix='webrpa-worker'
+                )
+            return self._thread_pool
+
+    async def run(self, func: Callable, *args, kind: str = KIND_THREAD, **kwargs) -> Any:
+        """在工作池中执行同步函数"""
+        if kind not in self._stats:
+            raise ValueError(f"不支持的工作池类型: {kind}")
+
+        task = WorkerTask(func=func, args=args, kwargs=kwargs, submitted_at=time.time())
+        stats = self._stats[kind]
+        executor = self._get_executor(kind)
+
+        concurrent_future = executor.submit(_invoke, task)
+        future = asyncio.wrap_future(concurrent_future)
+
+        owner = _current_owner.get()
+        if owner:
+            self._owner_futures.setdefault(owner, set()).add(future)
+
+        stats.in_flight += 1
+        try:
+            started_at, result = await future
+        except asyncio.CancelledError:
+            # 尚未开始执行的任务会从队列中移除
+            concurrent_future.cancel()
+            stats.cancelled += 1
+            raise
+        except Exception:
+            stats.failed += 1
+            raise
+        else:
+            finished_at = time.time()
+            wait = max(0.0, started_at - task.submitted_at)
+            stats.completed += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+            stats.total_run += max(0.0, finished_at - started_at)
+            return result
+        finally:
+            stats.in_flight -= 1
+            if owner:
+                futures = self._owner_futures.get(owner)
+                if futures is not None:
+                    futures.discard(future)
+                    if not futures:
+                        del self._owner_futures[owner]
+
+    def cancel_owner(self, owner: str) -> int:
+        """取消某个工作流提交的所有未完成任务，返回取消的任务数
+
+        已经在运行中的线程/进程任务无法被中断，但等待它的协程会立即收到 CancelledError。
+        """
+        futures = self._owner_futures.pop(owner, set())
+        count = 0
+        for future in futures:
+            if not future.done():
+                future.cancel()
+                count += 1
+        return count
+
+    def get_stats(self) -> dict:
+        """获取工作池统计信息（队列深度、等待时间等）"""
+        return {
+            KIND_THREAD: self._stats[KIND_THREAD].to_dict(),
+            KIND_PROCESS: self._stats[KIND_PROCESS].to_dict(),
+            'owners': len(self._owner_futures),
+        }
+
+    def shutdown(self):
+        """关闭工作池"""
+        with self._lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=False, cancel_futures=True)
+                self._thread_pool = None
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
+
+
+_worker_pool: Optional[WorkerPool] = None
+
+
+def get_worker_pool() -> WorkerPool:
+    """获取工作池单例
+
+    配置项（WebRPAConfig.json 的 backend.workerPool）：
+        maxThreads: 线程池大小
+        maxProcesses: 进程池大小
+    """
+    global _worker_pool
+    if _worker_pool is None:
+        pool_config = get_backend_config().get('workerPool', {}) or {}
+        _worker_pool = WorkerPool(
+            max_threads=pool_config.get('maxThreads'),
+            max_processes=pool_config.get('maxProcesses'),
+        )
+    return _worker_pool
+
+
+async def run_in_worker(func: Callable, *args, kind: str = KIND_THREAD, **kwargs) -> Any:
+    """在共享工作池中执行同步函数"""
+    return await get_worker_pool().run(func, *args, kind=kind, **kwargs)
+
+
+def offload(kind: str = KIND_THREAD):
+    """装饰器：让同步函数/方法在工作池中执行，调用后返回可等待对象
+
+    进程池模式下通过模块路径在子进程中定位原始函数，因此被装饰的函数必须定义在模块顶层
+    （或顶层类的方法），参数需要可以被 pickle。
+    """
+    def decorator(func: Callable) -> Callable:
+        ref = FunctionRef(func.__module__, func.__qualname__)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            target = ref if kind == KIND_PROCESS else func
+            return await get_worker_pool().run(target, *args, kind=kind, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def _run_coroutine(coro_func: Callable, *args) -> Any:
+    """在工作线程中用独立的事件循环运行协程"""
+    return asyncio.run(coro_func(*args))
+
+
+async def run_executor_in_thread(executor, config: dict, context) -> Any:
+    """在线程池中运行执行器的 execute（用于声明了 offload = 'thread' 的执行器）
+
+    这类执行器只做同步的CPU/IO工作，不访问 Playwright 对象，也不操作鼠标键盘等真实输入
+    （节点超时或工作流停止只会取消等待它的协程，线程中的 execute 会继续运行到结束）；
+    变量赋值、数据行修改和进度日志会通过 ExecutionContext 转发回主事件循环执行。
+    """
+    return await get_worker_pool().run(_run_coroutine, executor.execute, config, context, kind=KIND_THREAD)
@@ -0,0 +1,284 @@
+"""本地工作流目录缓存 - 列出工作流文件时只重新读取有变化的文件
+
+原先每次列出工作流都要完整 json.load 文件夹中的每个工作流文件，只为读取其中的 name，
+文件夹中有大量画布较大的工作流时打开工作流列表很慢。目录缓存：
+- 按 文件名 -> (修改时间, 大小, 名称) 缓存，每次列出只 stat 文件（os.scandir），修改时间或大小变化的才重新读取
+- 读取名称时只解析文件开头一段（name 通常是工作流 JSON 的第二个键），
+  在开头找不到完整的 name 时才回退为完整解析
+- 缓存保存到工作流文件夹中的 .webrpa_catalog 索引文件（不以 .json 结尾，不会被当作工作流列出），
+  重启后无需重新读取未变化的文件
+- 可选使用文件监控服务：文件夹没有变化时连 stat 也省掉，直接返回缓存
+- 提供排序、搜索、分页，适合工作流很多的文件夹
+"""
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.utils.config import get_backend_config
+
+
+CATALOG_FILENAME = '.webrpa_catalog'
+CATALOG_VERSION = 1
+# 读取名称时解析的文件开头字符数
+NAME_PREFIX_CHARS = 64 * 1024
+
+# 排序字段 -> 排序键
+SORT_KEYS = {
+    'modifiedTime': lambda entry: entry.mtime_ns,
+    'name': lambda entry: (entry.name.lower(), entry.filename),
+    'filename': lambda entry: entry.filename.lower(),
+    'size': lambda entry: entry.size,
+}
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+def _scan_top_level_name(text: str, complete: bool) -> tuple[bool, object]:
+    """在 JSON 文本中逐个解析顶层对象的键值，找到 name 后立即返回 (是否找到, 值)
+
+    text 只是文件开头一段（complete=False）时，值被截断会抛出 ValueError
+    """
+    idx = _WHITESPACE.match(text, 0).end()
+    if text[idx:idx + 1] != '{':
+        raise ValueError("不是 JSON 对象")
+    idx = _WHITESPACE.match(text, idx + 1).end()
+    if text[idx:idx + 1] == '}':
+        return True, None
+    while True:
+        key, idx = _decoder.raw_decode(text, idx)
+        idx = _WHITESPACE.match(text, idx).end()
+        if text[idx:idx + 1] != ':':
+            raise ValueError("缺少冒号")
+        idx = _WHITESPACE.match(text, idx + 1).end()
+        value, idx = _decoder.raw_decode(text, idx)
+        if not complete and idx >= len(text):
+            # 值恰好在截断处结束（例如被截断的数字），不能确定是完整的
+            raise ValueError("值被截断")
+        if key == 'name':
+            return True, value
+        idx = _WHITESPACE.match(text, idx).end()
+        char = text[idx:idx + 1]
+        if char == '}':
+            return True, None
+        if char != ',':
+            raise ValueError("缺少逗号")
+        idx = _WHITESPACE.match(text, idx + 1).end()
+
+
+def read_workflow_name(filepath: str) -> Optional[str]:
+    """读取工作流文件中的名称，读取失败或没有名称时返回 None"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            text = f.read(NAME_PREFIX_CHARS)
+            complete = len(text) < NAME_PREFIX_CHARS
+            try:
+                found, value = _scan_top_level_name(text, complete)
+            except ValueError:
+                if complete:
+                    return None
+                # 开头一段中没有完整的 name，回退为完整解析
+                text += f.read()
+                found, value = True, json.loads(text).get('name')
+    except Exception:
+        return None
+    return value if found and isinstance(value, str) else None
+
+
+@dataclass
+class CatalogEntry:
+    """一个工作流文件的目录信息"""
+    filename: str
+    name: str
+    mtime_ns: int
+    size: int
+
+    def to_info(self) -> dict:
+        return {
+            'filename': self.filename,
+            'name': self.name,
+            'modifiedTime': datetime.fromtimestamp(self.mtime_ns / 1e9).strftime('%Y-%m-%d %H:%M:%S'),
+            'size': self.size,
+        }
+
+
+class _FolderCatalog:
+    """单个文件夹的目录缓存"""
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.entries: dict[str, CatalogEntry] = {}
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.watched = False
+        # 启用文件监控时，没有收到变化事件就不需要重新扫描
+        self.dirty = True
+
+
+class WorkflowCatalog:
+    """本地工作流目录缓存（scan 在工作线程中调用）"""
+
+    def __init__(self, watch: bool = False, sidecar: bool = True):
+        self.watch = watch
+        self.sidecar = sidecar
+        self._folders: dict[str, _FolderCatalog] = {}
+        self._lock = threading.Lock()
+
+        self.files_parsed = 0
+        self.scans = 0
+
+    def _get_folder(self, folder: str) -> _FolderCatalog:
+        key = os.path.normcase(os.path.abspath(folder))
+        with self._lock:
+            catalog = self._folders.get(key)
+            if catalog is None:
+                catalog = self._folders[key] = _FolderCatalog(folder)
+            return catalog
+
+    def ensure_watch(self, folder: str):
+        """为文件夹订阅文件监控（需要在事件循环线程中调用）"""
+        if not self.watch:
+            return
+        catalog = self._get_folder(folder)
+        if catalog.watched:
+            return
+        from app.services.file_watch_service import get_file_watch_service
+        subscription_id = f"workflow_catalog:{os.path.normcase(os.path.abspath(folder))}"
+
+        def on_change(event_type: str, path: str):
+            catalog.dirty = True
+            # 文件监控的订阅触发一次后失效，重新订阅以持续监控
+            subscribe()
+
+        def subscribe():
+            get_file_watch_service().subscribe(subscription_id, folder, 'any', '*.json', on_change)
+
+        try:
+            subscribe()
+            catalog.watched = True
+        except Exception as e:
+            print(f"[WorkflowCatalog] 监控工作流文件夹失败: {folder} ({e})")
+
+    def mark_dirty(self, folder: str):
+        """保存/删除工作流后调用，下一次列出时重新扫描文件夹"""
+        self._get_folder(folder).dirty = True
+
+    def scan(self, folder: str) -> list[CatalogEntry]:
+        """列出文件夹中的工作流（只重新读取修改时间或大小变化的文件）"""
+        catalog = self._get_folder(folder)
+        with catalog.lock:
+            if not catalog.loaded:
+                self._load_sidecar(catalog)
+                catalog.loaded = True
+            if catalog.watched and not catalog.dirty:
+                return list(catalog.entries.values())
+
+            catalog.dirty = False
+            self.scans += 1
+            entries: dict[str, CatalogEntry] = {}
+            changed = False
+            with os.scandir(folder) as it:
+                for dir_entry in it:
+                    if not dir_entry.name.endswith('.json'):
+                        continue
+                    try:
+                        if not dir_entry.is_file():
+                            continue
+                        stat = dir_entry.stat()
+                    except OSError as e:
+                        print(f"Error reading file {dir_entry.name}: {e}")
+                        continue
+                    cached = catalog.entries.get(dir_entry.name)
+                    if cached and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+                        entries[dir_entry.name] = cached
+                        continue
+                    self.files_parsed += 1
+                    name = read_workflow_name(dir_entry.path)
+                    if name is None:
+                        name = dir_entry.name[:-5]  # 默认使用文件名
+                    entries[dir_entry.name] = CatalogEntry(dir_entry.name, name, stat.st_mtime_ns, stat.st_size)
+                    changed = True
+
+            if changed or len(entries) != len(catalog.entries):
+                catalog.entries = entries
+                self._save_sidecar(catalog)
+            return list(entries.values())
+
+    def list(self, folder: str, sort_by: str = 'modifiedTime', descending: bool = True,
+             search: str = '', offset: int = 0, limit: Optional[int] = None) -> tuple[list[dict], int]:
+        """排序、搜索（名称或文件名包含关键字）并分页，返回 (当前页, 总数)"""
+        entries = self.scan(folder)
+        if search:
+            keyword = search.lower()
+            entries = [e for e in entries if keyword in e.name.lower() or keyword in e.filename.lower()]
+        entries.sort(key=SORT_KEYS.get(sort_by, SORT_KEYS['modifiedTime']), reverse=descending)
+        total = len(entries)
+        offset = max(0, offset)
+        page = entries[offset:offset + limit] if limit is not None else entries[offset:]
+        return [entry.to_info() for entry in page], total
+
+    def _load_sidecar(self, catalog: _FolderCatalog):
+        if not self.sidecar:
+            return
+        path = os.path.join(catalog.folder, CATALOG_FILENAME)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CATALOG_VERSION:
+                return
+            catalog.entries = {
+                filename: CatalogEntry(filename, name, mtime_ns, size)
+                for filename, (mtime_ns, size, name) in data.get('files', {}).items()
+            }
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[WorkflowCatalog] 读取目录索引失败，将重新建立: {path} ({e})")
+
+    def _save_sidecar(self, catalog: _FolderCatalog):
+        if not self.sidecar:
+            return
+        path = os.path.join(catalog.folder, CATALOG_FILENAME)
+        data = {
+            'version': CATALOG_VERSION,
+            'files': {e.filename: [e.mtime_ns, e.size, e.name] for e in catalog.entries.values()},
+        }
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, path)
+        except Exception as e:
+            # 文件夹只读等情况下只使用内存缓存
+            print(f"[WorkflowCatalog] 保存目录索引失败: {path} ({e})")
+
+    def get_stats(self) -> dict:
+        return {
+            'folders': len(self._folders),
+            'scans': self.scans,
+            'filesParsed': self.files_parsed,
+        }
+
+
+_workflow_catalog: Optional[WorkflowCatalog] = None
+
+
+def get_workflow_catalog() -> WorkflowCatalog:
+    """获取本地工作流目录缓存单例
+
+    配置项（WebRPAConfig.json 的 backend.workflowCatalog）：
+        watch: 是否使用文件监控刷新目录（默认关闭，每次列出时按修改时间和大小检查变化）
+        sidecar: 是否把目录索引保存到工作流文件夹中的 .webrpa_catalog 文件（默认开启）
+    """
+    global _workflow_catalog
+    if _workflow_catalog is None:
+        catalog_config = get_backend_config().get('workflowCatalog', {}) or {}
+        _workflow_catalog = WorkflowCatalog(
+            watch=catalog_config.get('watch', False),
+            sidecar=catalog_config.get('sidecar', True),
+        )
+    return _workflow_catalog
@@ -1,8 +1,10 @@
 """工作流执行器 - 异步版本，支持真正的并行执行"""
 import asyncio
+import inspect
+import sys
 import time
 from datetime import datetime
-from typing import Optional, Callable, Awaitable
+from typing import Optional, Callable, Awaitable, Union
 from uuid import uuid4
 
 from app.models.workflow import (
@@ -14,226 +16,22 @@ from app.models.workflow import (
     LogEntry,
 )
 from app.executors import ExecutionContext, ModuleResult, registry
-from app.services.workflow_parser import WorkflowParser, ExecutionGraph
+from app.services.workflow_parser import WorkflowParser, ExecutionGraph, build_node_plan
+from app.services.workflow_scheduler import get_resource_scheduler
+from app.services.worker_pool import get_worker_pool, set_worker_owner, run_executor_in_thread
+from app.services.data_row_store import DataRowStore
+from app.services.browser_pool import get_browser_pool
 
 
-# 模块默认超时时间配置（毫秒）
-# 根据模块实际使用场景设置合理的默认超时
-# 超时为0表示不限制超时（非阻塞或需要用户交互的模块）
-MODULE_DEFAULT_TIMEOUTS = {
-    # 浏览器操作 - 网页加载可能较慢
-    'open_page': 60000,        # 60秒
-    'click_element': 60000,    # 60秒
-    'hover_element': 60000,    # 60秒
-    'input_text': 60000,       # 60秒
-    'get_element_info': 60000, # 60秒
-    'wait': 0,                 # 固定等待不需要超时（由模块内部控制）
-    'wait_element': 60000,     # 60秒
-    'close_page': 10000,       # 10秒
-    'refresh_page': 60000,     # 60秒
-    'go_back': 60000,          # 60秒
-    'go_forward': 60000,       # 60秒
-    'handle_dialog': 60000,    # 60秒
-    # 表单操作
-    'select_dropdown': 60000,  # 60秒
-    'set_checkbox': 60000,     # 60秒
-    'drag_element': 60000,     # 60秒
-    'scroll_page': 60000,      # 60秒
-    'upload_file': 120000,     # 2分钟
-    # 数据处理 - 通常很快
-    'set_variable': 5000,      # 5秒
-    'json_parse': 5000,        # 5秒
-    'base64': 10000,           # 10秒
-    'random_number': 5000,     # 5秒
-    'get_time': 5000,          # 5秒
-    'download_file': 300000,   # 5分钟
-    'save_image': 60000,       # 1分钟
-    'screenshot': 60000,       # 60秒
-    'read_excel': 60000,       # 1分钟
-    # 字符串操作 - 很快
-    'regex_extract': 10000,    # 10秒
-    'string_replace': 5000,    # 5秒
-    'string_split': 5000,      # 5秒
-    'string_join': 5000,       # 5秒
-    'string_concat': 5000,     # 5秒
-    'string_trim': 5000,       # 5秒
-    'string_case': 5000,       # 5秒
-    'string_substring': 5000,  # 5秒
-    # 列表/字典操作 - 很快
-    'list_operation': 10000,   # 10秒
-    'list_get': 5000,          # 5秒
-    'list_length': 5000,       # 5秒
-    'list_export': 60000,      # 1分钟（导出可能较慢）
-    'dict_operation': 10000,   # 10秒
-    'dict_get': 5000,          # 5秒
-    'dict_keys': 5000,         # 5秒
-    # 数据表格操作
-    'table_add_row': 5000,     # 5秒
-    'table_add_column': 5000,  # 5秒
-    'table_set_cell': 5000,    # 5秒
-    'table_get_cell': 5000,    # 5秒
-    'table_delete_row': 5000,  # 5秒
-    'table_clear': 5000,       # 5秒
-    'table_export': 60000,     # 1分钟
-    # 数据库操作
-    'db_connect': 60000,       # 60秒
-    'db_query': 120000,        # 2分钟
-    'db_execute': 120000,      # 2分钟
-    'db_insert': 60000,        # 1分钟
-    'db_update': 60000,        # 1分钟
-    'db_delete': 60000,        # 1分钟
-    'db_close': 10000,         # 10秒
-    # 网络请求
-    'api_request': 120000,     # 2分钟
-    'send_email': 60000,       # 1分钟
-    # AI能力 - 需要较长时间
-    'ai_chat': 180000,         # 3分钟
-    'ai_vision': 180000,       # 3分钟
-    # 验证码
-    'ocr_captcha': 60000,      # 1分钟
-    'slider_captcha': 60000,   # 1分钟
-    # 流程控制 - 不超时（由内部逻辑控制）
-    'condition': 5000,         # 5秒
-    'loop': 0,                 # 循环本身不超时
-    'foreach': 0,              # 遍历本身不超时
-    'break_loop': 5000,        # 5秒
-    'continue_loop': 5000,     # 5秒
-    'scheduled_task': 0,       # 定时任务不超时
-    'subflow': 0,              # 子流程不超时
-    # 辅助工具
-    'print_log': 5000,         # 5秒
-    'play_sound': 10000,       # 10秒
-    'system_notification': 5000, # 5秒
-    'play_music': 0,           # 不超时（阻塞型，等待用户关闭）
-    'play_video': 0,           # 不超时（阻塞型，等待用户关闭）
-    'view_image': 0,           # 不超时（阻塞型，等待用户关闭）
-    'input_prompt': 0,         # 不超时（阻塞型，等待用户输入）
-    'text_to_speech': 120000,  # 2分钟
-    'js_script': 60000,        # 1分钟
-    'set_clipboard': 5000,     # 5秒
-    'get_clipboard': 5000,     # 5秒
-    'keyboard_action': 10000,  # 10秒
-    'real_mouse_scroll': 10000,# 10秒
-    # 系统操作
-    'shutdown_system': 60000,  # 60秒
-    'lock_screen': 10000,      # 10秒
-    'window_focus': 10000,     # 10秒
-    'real_mouse_click': 10000, # 10秒
-    'real_mouse_move': 10000,  # 10秒
-    'real_mouse_drag': 10000,  # 10秒
-    'real_keyboard': 60000,    # 60秒
-    'run_command': 300000,     # 5分钟
-    'click_image': 60000,      # 1分钟
-    'click_text': 120000,      # 2分钟（OCR识别较慢，首次需要下载模型）
-    'hover_image': 60000,      # 1分钟
-    'hover_text': 120000,      # 2分钟（OCR识别较慢）
-    'drag_image': 60000,       # 1分钟
-    'get_mouse_position': 5000,# 5秒
-    'screenshot_screen': 10000,# 10秒
-    'rename_file': 10000,      # 10秒
-    'network_capture': 0,      # 不超时（非阻塞，后台运行）
-    'macro_recorder': 0,       # 不超时（宏播放时间由用户录制内容决定）
-    # 网络共享 - 非阻塞（启动服务后立即返回）
-    'share_folder': 10000,     # 10秒（启动服务）
-    'share_file': 10000,       # 10秒（启动服务）
-    'stop_share': 5000,        # 5秒
-    # 屏幕共享 - 非阻塞（启动服务后立即返回）
-    'start_screen_share': 10000,  # 10秒（启动服务）
-    'stop_screen_share': 5000,    # 5秒
-    # 文件操作
-    'list_files': 60000,       # 60秒
-    'copy_file': 300000,       # 5分钟
-    'move_file': 300000,       # 5分钟
-    'delete_file': 60000,      # 60秒
-    'create_folder': 10000,    # 10秒
-    'file_exists': 5000,       # 5秒
-    'get_file_info': 10000,    # 10秒
-    'read_text_file': 60000,   # 1分钟
-    'write_text_file': 60000,  # 1分钟
-    'rename_folder': 10000,    # 10秒
-    # 媒体处理 - FFmpeg操作耗时
-    'format_convert': 600000,  # 10分钟
-    'compress_image': 120000,  # 2分钟
-    'compress_video': 1800000, # 30分钟
-    'extract_audio': 300000,   # 5分钟
-    'trim_video': 600000,      # 10分钟
-    'merge_media': 1800000,    # 30分钟
-    'add_watermark': 600000,   # 10分钟
-    'download_m3u8': 1800000,  # 30分钟（下载可能很慢）
-    'rotate_video': 600000,    # 10分钟
-    'video_speed': 600000,     # 10分钟
-    'extract_frame': 60000,    # 1分钟
-    'add_subtitle': 600000,    # 10分钟
-    'adjust_volume': 300000,   # 5分钟
-    'resize_video': 600000,    # 10分钟
-    # 图像处理
-    'image_grayscale': 60000,  # 1分钟
-    'image_round_corners': 60000, # 1分钟
-    # 音频处理
-    'audio_to_text': 300000,   # 5分钟（语音识别可能较慢）
-    # 二维码
-    'qr_generate': 10000,      # 10秒
-    'qr_decode': 60000,        # 60秒
-    # 录屏 - 非阻塞（启动后立即返回，后台录制）
-    'screen_record': 10000,    # 10秒（启动录屏）
-    # AI识别
-    'face_recognition': 60000, # 1分钟
-    'image_ocr': 60000,        # 1分钟
-    # PDF处理
-    'pdf_to_images': 300000,   # 5分钟
-    'images_to_pdf': 300000,   # 5分钟
-    'pdf_merge': 300000,       # 5分钟
-    'pdf_split': 300000,       # 5分钟
-    'pdf_extract_text': 120000,# 2分钟
-    'pdf_extract_images': 300000, # 5分钟
-    'pdf_encrypt': 60000,      # 1分钟
-    'pdf_decrypt': 60000,      # 1分钟
-    'pdf_add_watermark': 300000, # 5分钟
-    'pdf_rotate': 120000,      # 2分钟
-    'pdf_delete_pages': 120000,# 2分钟
-    'pdf_get_info': 60000,     # 60秒
-    'pdf_compress': 600000,    # 10分钟
-    'pdf_insert_pages': 300000,# 5分钟
-    'pdf_reorder_pages': 120000, # 2分钟
-    'pdf_to_word': 600000,     # 10分钟
-    # 其他
-    'export_log': 60000,       # 60秒
-    # 触发器模块 - 不超时（等待事件触发）
-    'webhook_trigger': 0,      # 不超时（等待webhook请求）
-    'hotkey_trigger': 0,       # 不超时（等待热键触发）
-    'file_watcher_trigger': 0, # 不超时（等待文件变化）
-    'email_trigger': 0,        # 不超时（等待邮件）
-    'api_trigger': 0,          # 不超时（等待API请求）
-    'mouse_trigger': 0,        # 不超时（等待鼠标事件）
-    'image_trigger': 0,        # 不超时（等待图像出现）
-    'sound_trigger': 0,        # 不超时（等待声音）
-    'face_trigger': 0,         # 不超时（等待人脸）
-    'element_change_trigger': 0, # 不超时（等待元素变化）
-    # QQ自动化
-    'qq_wait_message': 0,      # 不超时（阻塞型，等待消息）
-    'qq_send_message': 60000,  # 60秒
-    'qq_send_image': 60000,    # 1分钟
-    'qq_send_file': 120000,    # 2分钟
-    'qq_get_friends': 60000,   # 60秒
-    'qq_get_groups': 60000,    # 60秒
-    'qq_get_group_members': 60000, # 60秒
-    'qq_get_login_info': 10000,# 10秒
-    # 微信自动化
-    'wechat_wait_message': 0,  # 不超时（阻塞型，等待消息）
-    'wechat_send_message': 60000,  # 60秒
-    'wechat_send_file': 120000,    # 2分钟
-    'wechat_get_messages': 60000,  # 60秒
-    'wechat_get_sessions': 60000,  # 60秒
-    'wechat_get_login_info': 10000,# 10秒
-    # 分组/备注 - 不执行
-    'group': 0,
-    'note': 0,
-}
+# 执行过程中发送到前端预览的最大数据行数
+MAX_PREVIEW_ROWS = 20
 
 
-def get_module_default_timeout(module_type: str) -> int:
-    """获取模块默认超时时间（毫秒）"""
-    return MODULE_DEFAULT_TIMEOUTS.get(module_type, 60000)  # 默认60秒，避免30秒超时过短
+async def _invoke_callback(callback: Callable, *args):
+    """调用事件回调，兼容同步回调（如遥测事件总线）和异步回调"""
+    result = callback(*args)
+    if inspect.isawaitable(result):
+        await result
 
 
 class WorkflowExecutor:
@@ -242,11 +40,11 @@ class WorkflowExecutor:
     def __init__(
         self,
         workflow: Workflow,
-        on_log: Optional[Callable[[LogEntry], Awaitable[None]]] = None,
-        on_node_start: Optional[Callable[[str], Awaitable[None]]] = None,
-        on_node_complete: Optional[Callable[[str, ModuleResult], Awaitable[None]]] = None,
-        on_variable_update: Optional[Callable[[str, any], Awaitable[None]]] = None,
-        on_data_row: Optional[Callable[[dict], Awaitable[None]]] = None,
+        on_log: Optional[Callable[[LogEntry], Union[Awaitable[None], None]]] = None,
+        on_node_start: Optional[Callable[[str], Union[Awaitable[None], None]]] = None,
+        on_node_complete: Optional[Callable[[str, ModuleResult], Union[Awaitable[None], None]]] = None,
+        on_variable_update: Optional[Callable[[str, any], Union[Awaitable[None], None]]] = None,
+        on_data_row: Optional[Callable[[dict], Union[Awaitable[None], None]]] = None,
         headless: bool = False,
         browser_config: Optional[dict] = None,
     ):
@@ -279,6 +77,8 @@ class WorkflowExecutor:
         self._last_data_rows_count = 0
         self._sent_data_rows_count = 0
         self._running_tasks: set[asyncio.Task] = set()  # 跟踪所有运行中的任务
+        self._scheduler = get_resource_scheduler()  # 资源调度器（按资源类别限制并发）
+        self._worker_owner = str(uuid4())  # 工作池任务归属标识（停止时取消该执行提交的任务）
 
     def _setup_progress_callback(self):
         """设置进度回调，让模块执行器可以发送进度日志"""
@@ -295,9 +95,17 @@ class WorkflowExecutor:
         
         self.context._progress_callback = progress_callback
         
-        # 设置变量更新回调
-        async def variable_update_callback(name: str, value: any):
-            await self._notify_variable_update(name, value)
+        # 设置变量更新回调：同步回调直接调用，异步回调返回协程由 ExecutionContext 调度
+        def variable_update_callback(name: str, value: any):
+            if not self.on_variable_update:
+                return None
+            if inspect.iscoroutinefunction(self.on_variable_update):
+                return self._notify_variable_update(name, value)
+            try:
+                self.on_variable_update(name, value)
+            except Exception as e:
+                print(f"通知变量更新失败: {e}")
+            return None
         
         self.context._variable_update_callback = variable_update_callback
 
@@ -332,27 +140,36 @@ class WorkflowExecutor:
         
         if self.on_log:
             try:
-                await self.on_log(entry)
+                await _invoke_callback(self.on_log, entry)
             except Exception as e:
                 print(f"发送日志失败: {e}")
     
     async def _send_data_row(self, row_data: dict):
         """发送数据行到前端"""
-        MAX_PREVIEW_ROWS = 20
         if self._sent_data_rows_count >= MAX_PREVIEW_ROWS:
             return
         if self.on_data_row:
             try:
-                await self.on_data_row(row_data)
+                await _invoke_callback(self.on_data_row, row_data)
             except Exception as e:
                 print(f"发送数据行失败: {e}")
         self._sent_data_rows_count += 1
     
+    async def _send_new_data_rows(self):
+        """发送新增的数据行预览（预览行数已满时不再逐行读取数据存储）"""
+        current_rows_count = len(self.context.data_rows)
+        if current_rows_count > self._last_data_rows_count:
+            remaining = max(0, MAX_PREVIEW_ROWS - self._sent_data_rows_count)
+            end = min(current_rows_count, self._last_data_rows_count + remaining)
+            for i in range(self._last_data_rows_count, end):
+                await self._send_data_row(self.context.data_rows[i])
+            self._last_data_rows_count = current_rows_count
+    
     async def _notify_node_start(self, node_id: str):
         """通知节点开始执行"""
         if self.on_node_start:
             try:
-                await self.on_node_start(node_id)
+                await _invoke_callback(self.on_node_start, node_id)
             except Exception as e:
                 print(f"通知节点开始失败: {e}")
     
@@ -360,7 +177,7 @@ class WorkflowExecutor:
         """通知节点执行完成"""
         if self.on_node_complete:
             try:
-                await self.on_node_complete(node_id, result)
+                await _invoke_callback(self.on_node_complete, node_id, result)
             except Exception as e:
                 print(f"通知节点完成失败: {e}")
     
@@ -368,7 +185,7 @@ class WorkflowExecutor:
         """通知变量更新"""
         if self.on_variable_update:
             try:
-                await self.on_variable_update(name, value)
+                await _invoke_callback(self.on_variable_update, name, value)
             except Exception as e:
                 print(f"通知变量更新失败: {e}")
 
@@ -485,7 +302,8 @@ class WorkflowExecutor:
                 return
             else:
                 # 没有异常处理分支，对于关键节点停止执行
-                if node.type in ('open_page', 'click_element', 'input_text', 'wait_element', 'select_dropdown'):
+                plan = self.graph.get_node_plan(node_id)
+                if plan and plan.is_critical:
                     print(f"[DEBUG] 关键节点 {node.type} 失败，停止后续执行")
                     return
         
@@ -509,15 +327,13 @@ class WorkflowExecutor:
                 if next_id in self._executed_node_ids or next_id in self._executing_node_ids:
                     continue
                 
-                prev_nodes = self.graph.get_prev_nodes(next_id)
-                
-                if len(prev_nodes) <= 1:
+                if self.graph.plan.get_join_count(next_id) <= 1:
                     nodes_ready_to_execute.append(next_id)
                     continue
                 
                 if next_id not in self._pending_nodes:
                     self._pending_nodes[next_id] = set(
-                        pid for pid in prev_nodes if pid not in self._executed_node_ids
+                        pid for pid in self.graph.get_prev_nodes(next_id) if pid not in self._executed_node_ids
                     )
                 
                 self._pending_nodes[next_id].discard(completed_node_id)
@@ -537,56 +353,40 @@ class WorkflowExecutor:
         if self.should_stop:
             return None
         
+        # 使用解析时预编译的节点执行计划
+        plan = self.graph.get_node_plan(node.id) if self.graph else None
+        if plan is None:
+            plan = build_node_plan(node)
+        
         # 跳过分组、便签和子流程头节点
-        if node.type in ('group', 'note', 'subflow_header'):
+        if plan.skipped:
             return ModuleResult(success=True, message="跳过")
         
         # 检查节点是否被禁用
-        if node.data.get('disabled', False):
-            label = node.data.get('label', node.type)
+        if plan.disabled:
             return ModuleResult(success=True, message=f"已跳过（禁用）")
         
-        label = node.data.get('label', node.type)
+        label = plan.label
         print(f"[DEBUG] 开始执行节点: {node.id} ({node.type}: {label})")
         
         await self._notify_node_start(node.id)
         
-        executor = registry.get(node.type)
+        executor = plan.executor
         if not executor:
+            load_error = registry.get_load_error(node.type)
+            if load_error:
+                await self._log(LogLevel.ERROR, f"模块加载失败: {node.type} - {load_error}", node_id=node.id)
+                return ModuleResult(success=False, error=f"模块加载失败: {load_error}")
             print(f"[DEBUG] 未找到执行器: {node.type}")
             await self._log(LogLevel.WARNING, f"未知的模块类型: {node.type}", node_id=node.id)
             return ModuleResult(success=True, message=f"跳过未知模块: {node.type}")
         
-        config = node.data.get('config', None)
-        if config is None:
-            # 配置直接在 node.data 中，而不是在 config 子字段
-            config = node.data
+        config = plan.config
         print(f"[DEBUG] 节点配置: {config}")
         
-        # 获取超时配置（毫秒）
-        # 对于某些模块（如 qq_wait_message），强制使用模块默认超时，忽略节点配置中的 timeout 字段
-        # 因为这些模块有自己内部的超时逻辑（如 waitTimeout）
-        modules_with_internal_timeout = {'qq_wait_message', 'wechat_wait_message', 'wait', 'loop', 'foreach', 'scheduled_task', 'subflow', 
-                                          'play_music', 'play_video', 'view_image', 'input_prompt'}
-        
-        if node.type in modules_with_internal_timeout:
-            # 这些模块强制使用模块默认超时（通常是0，表示无超时限制）
-            timeout_ms = get_module_default_timeout(node.type)
-        else:
-            # 优先使用节点配置的超时，否则使用模块默认超时
-            timeout_ms = config.get('timeout')
-            if timeout_ms is None:
-                timeout_ms = get_module_default_timeout(node.type)
-            try:
-                timeout_ms = int(timeout_ms)
-            except (ValueError, TypeError):
-                timeout_ms = get_module_default_timeout(node.type)
-        
-        # 超时为0表示不限制超时
-        if timeout_ms <= 0:
-            timeout_seconds = None  # 无超时限制
-        else:
-            timeout_seconds = timeout_ms / 1000.0
+        # 超时在解析时已计算好（毫秒），None 表示不限制超时
+        timeout_ms = plan.timeout_ms
+        timeout_seconds = plan.timeout_seconds
         
         start_time = time.time()
         
@@ -594,21 +394,25 @@ class WorkflowExecutor:
             timeout_display = f"{timeout_seconds}秒" if timeout_seconds else "无限制"
             print(f"[DEBUG] 调用执行器: {node.type}, 超时: {timeout_display}")
             
-            # 使用 asyncio.wait_for 来控制超时（如果有超时限制）
-            try:
-                if timeout_seconds is not None:
-                    result = await asyncio.wait_for(
-                        executor.execute(config, self.context),
-                        timeout=timeout_seconds
-                    )
-                else:
-                    # 无超时限制，直接执行
-                    result = await executor.execute(config, self.context)
-            except asyncio.TimeoutError:
-                duration = (time.time() - start_time) * 1000
-                error_msg = f"执行超时 ({timeout_ms}ms)"
-                print(f"[ERROR] 节点 {node.id} ({label}) {error_msg}")
-                return ModuleResult(success=False, error=error_msg, duration=duration)
+            # 按资源类别获取执行槽位，限制并行分支同时占用的浏览器/手机/CPU/网络资源
+            async with self._scheduler.slot(plan.resource_class, self.context.phone_device_id):
+                # 使用 asyncio.wait_for 来控制超时（如果有超时限制）
+                try:
+                    if plan.offload == 'thread':
+                        # CPU密集型模块在工作线程池中执行，避免阻塞事件循环
+                        execution = run_executor_in_thread(executor, config, self.context)
+                    else:
+                        execution = executor.execute(config, self.context)
+                    if timeout_seconds is not None:
+                        result = await asyncio.wait_for(execution, timeout=timeout_seconds)
+                    else:
+                        # 无超时限制，直接执行
+                        result = await execution
+                except asyncio.TimeoutError:
+                    duration = (time.time() - start_time) * 1000
+                    error_msg = f"执行超时 ({timeout_ms}ms)"
+                    print(f"[ERROR] 节点 {node.id} ({label}) {error_msg}")
+                    return ModuleResult(success=False, error=error_msg, duration=duration)
             
             print(f"[DEBUG] 执行器返回: success={result.success}, message={result.message}, error={result.error}")
             
@@ -627,102 +431,9 @@ class WorkflowExecutor:
             self.executed_nodes += 1
             
             if result.success:
-                # 重要模块列表 - 这些模块的日志在简洁模式下也会显示
-                # 包括：用户交互、网络请求、文件共享、AI、数据库、邮件、命令执行等
-                important_modules = {
-                    # 用户交互/输出
-                    'print_log',           # 用户打印日志
-                    'input_prompt',        # 输入提示 - 显示用户输入
-                    'system_notification', # 系统通知
-                    'text_to_speech',      # 文字转语音
-                    
-                    # 网络共享
-                    'share_folder',        # 文件夹共享 - 显示访问地址
-                    'share_file',          # 文件共享 - 显示访问地址
-                    'stop_share',          # 停止共享
-                    
-                    # 屏幕共享
-                    'start_screen_share',  # 开始屏幕共享 - 显示访问地址
-                    'stop_screen_share',   # 停止屏幕共享
-                    
-                    # 网络请求
-                    'api_request',         # API请求 - 显示请求结果
-                    'send_email',          # 发送邮件 - 显示发送结果
-                    
-                    # 数据库操作
-                    'db_connect',          # 数据库连接 - 显示连接状态
-                    'db_query',            # 数据库查询 - 显示查询结果
-                    'db_execute',          # 数据库执行 - 显示执行结果
-                    'db_insert',           # 数据库插入
-                    'db_update',           # 数据库更新
-                    'db_delete',           # 数据库删除
-                    'db_close',            # 数据库关闭
-                    
-                    # AI能力
-                    'ai_chat',             # AI对话 - 显示AI回复
-                    'ai_vision',           # AI视觉 - 显示识别结果
-                    
-                    # 图像/文本识别点击
-                    'click_image',         # 点击图像 - 显示点击结果
-                    'click_text',          # 点击文本 - 显示点击结果
-                    'hover_image',         # 悬停图像
-                    'hover_text',          # 悬停文本
-                    'image_ocr',           # OCR识别 - 显示识别结果
-                    
-                    # 命令/脚本执行
-                    'run_command',         # 运行命令 - 显示执行结果
-                    'js_script',           # 运行JS脚本
-                    
-                    # 文件操作
-                    'download_file',       # 下载文件 - 显示下载结果
-                    'upload_file',         # 上传文件 - 显示上传结果
-                    'read_text_file',      # 读取文件 - 显示读取结果
-                    'write_text_file',     # 写入文件 - 显示写入结果
-                    'copy_file',           # 复制文件
-                    'move_file',           # 移动文件
-                    'delete_file',         # 删除文件
-                    'rename_file',         # 重命名文件
-                    
-                    # QQ自动化
-                    'qq_send_message',     # QQ发送消息
-                    'qq_send_image',       # QQ发送图片
-                    'qq_send_file',        # QQ发送文件
-                    'qq_wait_message',     # QQ等待消息
-                    
-                    # 微信自动化
-                    'wechat_send_message', # 微信发送消息
-                    'wechat_send_file',    # 微信发送文件
-                    
-                    # 子流程
-                    'subflow',             # 子流程调用
-                    
-                    # 录屏
-                    'screen_record',       # 录屏
-                    
-                    # 音频处理
-                    'audio_to_text',       # 音频转文字
-                    
-                    # 导出
-                    'export_log',          # 导出日志
-                    'table_export',        # 导出表格
-                    'list_export',         # 导出列表
-                }
-                is_user_log = node.type in important_modules
-                
-                # 触发器模块标记为系统日志
-                trigger_modules = {
-                    'webhook_trigger',
-                    'hotkey_trigger',
-                    'file_watcher_trigger',
-                    'email_trigger',
-                    'api_trigger',
-                    'mouse_trigger',
-                    'image_trigger',
-                    'sound_trigger',
-                    'face_trigger',
-                    'element_change_trigger',
-                }
-                is_system_log = node.type in trigger_modules
+                # 重要模块的日志在简洁模式下也会显示，触发器模块标记为系统日志
+                is_user_log = plan.is_user_log
+                is_system_log = plan.is_system_log
                 
                 log_level = LogLevel.INFO
                 if node.type == 'print_log' and result.log_level:
@@ -738,11 +449,7 @@ class WorkflowExecutor:
                 await self._log(LogLevel.ERROR, f"[{label}] {result.error}", 
                                node_id=node.id, duration=duration)
             
-            current_rows_count = len(self.context.data_rows)
-            if current_rows_count > self._last_data_rows_count:
-                for i in range(self._last_data_rows_count, current_rows_count):
-                    await self._send_data_row(self.context.data_rows[i])
-                self._last_data_rows_count = current_rows_count
+            await self._send_new_data_rows()
             
             await self._notify_node_complete(node.id, result)
             return result
@@ -759,239 +466,35 @@ class WorkflowExecutor:
             await self._notify_node_complete(node.id, result)
             return result
 
-    def _parse_dimension(self, value, default: int = 300) -> int:
-        """解析尺寸值，支持数字和字符串（如 '300px'）"""
-        if value is None:
-            return default
-        if isinstance(value, (int, float)):
-            return int(value)
-        if isinstance(value, str):
-            # 移除 'px' 后缀并转换为数字
-            try:
-                return int(value.replace('px', '').strip())
-            except ValueError:
-                return default
-        return default
-
     def _get_subflow_node_ids(self) -> set[str]:
-        """获取所有子流程分组内的节点ID"""
-        subflow_node_ids = set()
-        
-        # 找出所有子流程分组和子流程头
-        subflow_groups = []
-        subflow_headers = []
-        for node in self.workflow.nodes:
-            if node.type == 'group' and node.data.get('isSubflow', False):
-                subflow_groups.append(node)
-            elif node.type == 'subflow_header':
-                subflow_headers.append(node)
-        
-        # 对于每个子流程分组，找出其范围内的所有节点
-        for group in subflow_groups:
-            group_x = group.position.x
-            group_y = group.position.y
-            # 优先从 data 属性获取宽高（前端 NodeResizer 保存的），其次从 style 属性获取
-            group_width = group.data.get('width')
-            group_height = group.data.get('height')
-            if group_width is None or group_height is None:
-                style = group.style or {}
-                group_width = group_width or style.get('width', 300)
-                group_height = group_height or style.get('height', 200)
-            # 确保宽高是数字类型
-            group_width = self._parse_dimension(group_width, 300)
-            group_height = self._parse_dimension(group_height, 200)
-            
-            for node in self.workflow.nodes:
-                if node.id == group.id:
-                    continue
-                if node.type in ('group', 'note'):
-                    continue
-                # 检查节点是否在分组范围内
-                node_x = node.position.x
-                node_y = node.position.y
-                if (group_x <= node_x <= group_x + group_width and
-                    group_y <= node_y <= group_y + group_height):
-                    subflow_node_ids.add(node.id)
-        
-        # 对于子流程头节点，找出从它开始的所有连接的节点
-        for header in subflow_headers:
-            # 子流程头节点本身也要排除
-            subflow_node_ids.add(header.id)
-            header_label = header.data.get('label', header.data.get('subflowName', '未命名'))
-            print(f"[DEBUG] 处理子流程头: {header.id}, 名称: {header_label}")
-            
-            # 从子流程头开始，沿着连接找到所有节点（使用BFS遍历整个子流程图）
-            visited = set()
-            queue = [header.id]
-            
-            while queue:
-                current_id = queue.pop(0)
-                if current_id in visited:
-                    continue
-                visited.add(current_id)
-                
-                # 获取当前节点信息用于调试
-                current_node = next((n for n in self.workflow.nodes if n.id == current_id), None)
-                current_label = current_node.data.get('label', current_node.type) if current_node else 'unknown'
-                
-                # 找到从当前节点出发的所有边
-                outgoing_edges = [e for e in self.workflow.edges if e.source == current_id]
-                print(f"[DEBUG]   节点 {current_id} ({current_label}) 有 {len(outgoing_edges)} 条出边")
-                
-                for edge in outgoing_edges:
-                    if edge.target not in visited:
-                        target_node = next((n for n in self.workflow.nodes if n.id == edge.target), None)
-                        if target_node:
-                            target_label = target_node.data.get('label', target_node.type)
-                            print(f"[DEBUG]     -> 边: {edge.source} -> {edge.target} (类型: {target_node.type}, 标签: {target_label})")
-                            if target_node.type not in ('group', 'note', 'subflow_header'):
-                                queue.append(edge.target)
-                                subflow_node_ids.add(edge.target)
-                                print(f"[DEBUG]       ✓ 添加到子流程节点列表")
-                            else:
-                                print(f"[DEBUG]       ✗ 跳过 (类型: {target_node.type})")
-            
-            print(f"[DEBUG] 子流程头 {header.id} ({header_label}) 收集到 {len(visited)-1} 个节点")
-        
-        print(f"[DEBUG] ========================================")
-        print(f"[DEBUG] 总共收集到 {len(subflow_node_ids)} 个子流程节点")
-        for node_id in subflow_node_ids:
-            node = next((n for n in self.workflow.nodes if n.id == node_id), None)
-            if node:
-                label = node.data.get('label', node.type)
-                print(f"[DEBUG]   - {node_id}: {node.type} ({label})")
-        print(f"[DEBUG] ========================================")
-        return subflow_node_ids
+        """获取所有子流程分组内的节点ID（解析时已在子流程索引中计算好）"""
+        return set(self.graph.subflows.member_ids)
 
     async def _execute_subflow_group(self, group_id: str, subflow_name: str = None) -> ModuleResult:
         """执行子流程分组内的模块"""
         # 找到子流程分组或子流程头 - 优先通过名称查找（因为导入后 ID 会变），ID 作为备用
-        group_node = None
-        is_header_mode = False
-        
-        # 优先通过名称查找
-        if subflow_name:
-            for node in self.workflow.nodes:
-                # 查找分组形式的子流程
-                if (node.type == 'group' and 
-                    node.data.get('isSubflow') == True and 
-                    node.data.get('subflowName') == subflow_name):
-                    group_node = node
-                    break
-                # 查找函数头形式的子流程
-                elif (node.type == 'subflow_header' and 
-                      node.data.get('subflowName') == subflow_name):
-                    group_node = node
-                    is_header_mode = True
-                    break
-        
-        # 如果通过名称找不到，尝试通过 ID 查找
-        if not group_node and group_id:
-            for node in self.workflow.nodes:
-                if node.id == group_id:
-                    if node.type == 'group':
-                        group_node = node
-                        break
-                    elif node.type == 'subflow_header':
-                        group_node = node
-                        is_header_mode = True
-                        break
-        
-        if not group_node:
+        subflow = self.graph.subflows.resolve(subflow_name, group_id)
+        if not subflow:
             error_msg = f"找不到子流程: {subflow_name or group_id}"
             return ModuleResult(success=False, error=error_msg)
         
-        subflow_name = group_node.data.get('subflowName', '子流程')
+        subflow_name = subflow.name
         await self._log(LogLevel.INFO, f"📦 开始执行子流程 [{subflow_name}]", is_system_log=True)
         
-        # 根据模式获取子流程内的节点
-        if is_header_mode:
-            # 函数头模式：从头节点开始，沿着连接找到所有节点
-            nodes_in_group = []
-            visited = set()
-            queue = [group_node.id]
-            
-            while queue:
-                current_id = queue.pop(0)
-                if current_id in visited:
-                    continue
-                visited.add(current_id)
-                
-                # 找到从当前节点出发的所有边
-                for edge in self.workflow.edges:
-                    if edge.source == current_id and edge.target not in visited:
-                        target_node = next((n for n in self.workflow.nodes if n.id == edge.target), None)
-                        if target_node and target_node.type not in ('group', 'note', 'subflow_header'):
-                            nodes_in_group.append(target_node)
-                            queue.append(edge.target)
-        else:
-            # 分组模式：获取分组范围内的所有节点
-            # 获取分组的位置和大小
-            # 优先从 data 属性获取宽高（前端 NodeResizer 保存的），其次从 style 属性获取
-            group_x = group_node.position.x
-            group_y = group_node.position.y
-            group_width = group_node.data.get('width')
-            group_height = group_node.data.get('height')
-            if group_width is None or group_height is None:
-                style = group_node.style or {}
-                group_width = group_width or style.get('width', 300)
-                group_height = group_height or style.get('height', 200)
-            # 确保宽高是数字类型
-            group_width = self._parse_dimension(group_width, 300)
-            group_height = self._parse_dimension(group_height, 200)
-            
-            # 调试：打印分组范围
-            print(f"[DEBUG] 子流程分组范围: x={group_x}, y={group_y}, width={group_width}, height={group_height}")
-            print(f"[DEBUG] 分组 data.width={group_node.data.get('width')}, data.height={group_node.data.get('height')}")
-            
-            # 找出在分组范围内的所有节点
-            nodes_in_group = []
-            for node in self.workflow.nodes:
-                if node.id == group_node.id:
-                    continue
-                if node.type in ('group', 'note'):
-                    continue
-                # 检查节点是否在分组范围内
-                node_x = node.position.x
-                node_y = node.position.y
-                # 节点在分组范围内的判断：节点左上角在分组内
-                if (group_x <= node_x <= group_x + group_width and
-                    group_y <= node_y <= group_y + group_height):
-                    nodes_in_group.append(node)
-                    print(f"[DEBUG] 节点在分组内: {node.id} ({node.type}) at ({node_x}, {node_y})")
-                else:
-                    print(f"[DEBUG] 节点不在分组内: {node.id} ({node.type}) at ({node_x}, {node_y})")
-        
-        if not nodes_in_group:
+        if not subflow.node_ids:
             await self._log(LogLevel.WARNING, f"📦 子流程 [{subflow_name}] 为空", is_system_log=True)
             return ModuleResult(success=True, message=f"子流程 [{subflow_name}] 为空")
         
-        # 找出子流程内的起始节点（没有入边的节点）
-        node_ids_in_group = {n.id for n in nodes_in_group}
-        nodes_with_incoming = set()
-        for edge in self.workflow.edges:
-            if edge.target in node_ids_in_group and edge.source in node_ids_in_group:
-                nodes_with_incoming.add(edge.target)
-        
-        start_nodes = [n for n in nodes_in_group if n.id not in nodes_with_incoming]
-        
-        if not start_nodes:
-            # 如果没有明确的起始节点，按位置排序取第一个
-            start_nodes = sorted(nodes_in_group, key=lambda n: (n.position.y, n.position.x))[:1]
+        node_ids_in_group = set(subflow.node_ids)
         
         # 使用主流程的执行逻辑来执行子流程
-        # 保存当前执行状态
-        original_executed_ids = self._executed_node_ids.copy()
-        original_executing_ids = self._executing_node_ids.copy()
-        original_pending_nodes = self._pending_nodes.copy()
-        
         # 重置执行状态（仅针对子流程内的节点）
         # 注意：不清空全局状态，只是标记子流程内的节点为未执行
         subflow_executed_ids = set()
         
         try:
             # 执行子流程的起始节点
-            start_node_ids = [n.id for n in start_nodes]
+            start_node_ids = list(subflow.start_node_ids)
             
             # 使用主流程的并行执行逻辑
             await self._execute_parallel_subflow(start_node_ids, node_ids_in_group, subflow_executed_ids)
@@ -1275,6 +778,16 @@ class WorkflowExecutor:
         loop_state = self.context.loop_stack[-1]
         loop_type = loop_state['type']
         
+        # 循环体闭包和错误处理分支闭包在解析时已预先计算
+        loop_plan = self.graph.plan.get_loop_plan(loop_node.id)
+        if loop_plan is not None:
+            all_body_nodes = loop_plan.body_nodes
+            error_branch_nodes = loop_plan.error_branch_nodes
+        else:
+            all_body_nodes = self.graph.collect_loop_body_nodes(body_nodes)
+            error_branch_nodes = self.graph.collect_error_branch_nodes(all_body_nodes)
+        reset_nodes = all_body_nodes | error_branch_nodes
+        
         while not self.should_stop:
             should_continue = False
             
@@ -1332,31 +845,14 @@ class WorkflowExecutor:
             
             if body_nodes:
                 async with self._node_lock:
-                    for nid in body_nodes:
-                        self._executed_node_ids.discard(nid)
-                        self._executing_node_ids.discard(nid)
-                
-                # 收集循环体内的所有节点
-                all_body_nodes = await self._collect_loop_body_nodes(body_nodes)
-                
-                # 收集错误处理分支的节点
-                error_branch_nodes = self._collect_error_branch_nodes(all_body_nodes)
-                
-                async with self._node_lock:
-                    # 清除循环体节点的执行状态
-                    for nid in all_body_nodes:
-                        self._executed_node_ids.discard(nid)
-                        self._executing_node_ids.discard(nid)
-                        # 清除待处理节点的前驱等待状态
-                        if nid in self._pending_nodes:
-                            del self._pending_nodes[nid]
-                    
-                    # 清除错误处理分支节点的执行状态（这样下次循环如果再报错，错误处理流程可以再次执行）
-                    for nid in error_branch_nodes:
-                        self._executed_node_ids.discard(nid)
-                        self._executing_node_ids.discard(nid)
-                        if nid in self._pending_nodes:
-                            del self._pending_nodes[nid]
+                    # 清除循环体节点的执行状态，以及错误处理分支节点的执行状态
+                    # （这样下次循环如果再报错，错误处理流程可以再次执行）
+                    self._executed_node_ids -= reset_nodes
+                    self._executing_node_ids -= reset_nodes
+                    # 清除待处理节点的前驱等待状态
+                    if self._pending_nodes:
+                        for nid in reset_nodes:
+                            self._pending_nodes.pop(nid, None)
                 
                 await self._execute_parallel(body_nodes)
             
@@ -1383,125 +879,17 @@ class WorkflowExecutor:
         if done_nodes and not self.should_stop:
             await self._execute_parallel(done_nodes)
 
-    async def _collect_loop_body_nodes(self, start_nodes: list[str]) -> set[str]:
-        """收集循环体内的所有节点（包括条件分支的所有路径）
-        
-        注意：不收集错误处理分支的节点，因为错误处理分支只在节点失败时才执行。
-        错误处理分支的节点会在 _collect_error_branch_nodes 中单独收集。
-        """
-        collected = set()
-        to_visit = list(start_nodes)
-        
-        while to_visit:
-            node_id = to_visit.pop(0)
-            if node_id in collected:
-                continue
-            collected.add(node_id)
-            
-            node = self.graph.get_node(node_id)
-            if not node:
-                continue
-            
-            # 获取所有后继节点
-            next_nodes = []
-            
-            # 如果是条件节点，获取所有分支
-            if node.type == 'condition':
-                if node_id in self.graph.condition_branches:
-                    for branch_target in self.graph.condition_branches[node_id].values():
-                        if branch_target:
-                            next_nodes.append(branch_target)
-            # 如果是循环节点，获取循环体和完成分支
-            elif node.type in ('loop', 'foreach'):
-                if node_id in self.graph.loop_branches:
-                    for branch_targets in self.graph.loop_branches[node_id].values():
-                        next_nodes.extend(branch_targets)
-            else:
-                # 普通节点，获取默认后继
-                next_nodes = self.graph.get_next_nodes(node_id)
-            
-            for next_id in next_nodes:
-                if next_id not in collected:
-                    to_visit.append(next_id)
-        
-        return collected
-
-    def _collect_error_branch_nodes(self, body_nodes: set[str]) -> set[str]:
-        """收集循环体内所有节点的错误处理分支节点"""
-        error_nodes = set()
-        to_visit = []
-        
-        # 首先收集循环体内所有节点的直接错误处理分支
-        for node_id in body_nodes:
-            error_branch_nodes = self.graph.get_error_nodes(node_id)
-            for error_node_id in error_branch_nodes:
-                if error_node_id not in body_nodes and error_node_id not in error_nodes:
-                    to_visit.append(error_node_id)
-        
-        # 然后递归收集错误处理分支的后继节点
-        while to_visit:
-            node_id = to_visit.pop(0)
-            if node_id in error_nodes or node_id in body_nodes:
-                continue
-            error_nodes.add(node_id)
-            
-            node = self.graph.get_node(node_id)
-            if not node:
-                continue
-            
-            # 获取后继节点
-            next_nodes = self.graph.get_next_nodes(node_id)
-            for next_id in next_nodes:
-                if next_id not in error_nodes and next_id not in body_nodes:
-                    to_visit.append(next_id)
-            
-            # 错误处理分支的节点也可能有自己的错误处理分支
-            error_branch_nodes = self.graph.get_error_nodes(node_id)
-            for error_node_id in error_branch_nodes:
-                if error_node_id not in error_nodes and error_node_id not in body_nodes:
-                    to_visit.append(error_node_id)
-        
-        return error_nodes
-        
-        return collected
-
     async def _cleanup(self):
         """清理资源（内部方法，清理所有资源包括浏览器）"""
         try:
             # 终止所有正在运行的 FFmpeg 进程
             try:
-                from app.executors.media import ffmpeg_manager
+                from app.executors.media_utils import ffmpeg_manager
                 await ffmpeg_manager.terminate_all()
             except Exception as e:
                 print(f"清理 FFmpeg 进程时出错: {e}")
             
-            if self.context.page:
-                try:
-                    await self.context.page.close()
-                except:
-                    pass
-                self.context.page = None
-            
-            if self.context.browser_context:
-                try:
-                    await self.context.browser_context.close()
-                except:
-                    pass
-                self.context.browser_context = None
-            
-            if self.context.browser:
-                try:
-                    await self.context.browser.close()
-                except:
-                    pass
-                self.context.browser = None
-            
-            if self.context._playwright:
-                try:
-                    await self.context._playwright.stop()
-                except:
-                    pass
-                self.context._playwright = None
+            await self._close_browser()
             
             # 清理上下文中的数据，防止内存泄漏
             self.context.variables.clear()
@@ -1522,35 +910,50 @@ class WorkflowExecutor:
     async def cleanup(self):
         """清理浏览器资源（公共方法，仅清理浏览器）"""
         try:
+            await self._close_browser()
+        except Exception as e:
+            print(f"关闭浏览器时出错: {e}")
+
+    async def _close_browser(self):
+        """关闭浏览器
+
+        来自浏览器池的浏览器从池中移除后关闭（已被之后的执行重新租用的不关闭），
+        共享的 Playwright 实例由浏览器池管理，不在这里停止
+        """
+        browser_pool = get_browser_pool()
+        lease = self.context._browser_lease
+        if lease is not None:
+            self.context._browser_lease = None
+            await browser_pool.discard(lease)
+        else:
             if self.context.page:
                 try:
                     await self.context.page.close()
                 except:
                     pass
-                self.context.page = None
             
             if self.context.browser_context:
                 try:
                     await self.context.browser_context.close()
                 except:
                     pass
-                self.context.browser_context = None
             
             if self.context.browser:
                 try:
                     await self.context.browser.close()
                 except:
                     pass
-                self.context.browser = None
-            
-            if self.context._playwright:
+        self.context.page = None
+        self.context.browser_context = None
+        self.context.browser = None
+        
+        if self.context._playwright:
+            if not browser_pool.is_shared_playwright(self.context._playwright):
                 try:
                     await self.context._playwright.stop()
                 except:
                     pass
-                self.context._playwright = None
-        except Exception as e:
-            print(f"关闭浏览器时出错: {e}")
+            self.context._playwright = None
 
 
     async def execute(self) -> ExecutionResult:
@@ -1580,14 +983,24 @@ class WorkflowExecutor:
         for var in self.workflow.variables:
             self.context.set_variable(var.name, var.value)
         
+        # 记录主事件循环，并把之后提交到工作池的任务归属到当前执行
+        self.context._loop = asyncio.get_running_loop()
+        set_worker_owner(self._worker_owner)
+        
         await self._log(LogLevel.INFO, "🚀 工作流开始执行", is_system_log=True)
         
         try:
+            # 在工作线程中导入本工作流用到的执行器模块，解析时不再阻塞事件循环
+            await registry.preload_async({node.type for node in self.workflow.nodes})
             parser = WorkflowParser(self.workflow)
             self.graph = parser.parse()
             
-            playwright = await async_playwright().start()
-            self.context._playwright = playwright
+            # 启用浏览器池时使用常驻的共享 Playwright 实例，不再每次执行都启动驱动进程
+            browser_pool = get_browser_pool()
+            if browser_pool.enabled:
+                self.context._playwright = await browser_pool.get_playwright()
+            else:
+                self.context._playwright = await async_playwright().start()
             
             # 获取浏览器数据目录：优先使用全局配置，否则使用默认目录
             if self.browser_config and self.browser_config.get('userDataDir'):
@@ -1638,9 +1051,7 @@ class WorkflowExecutor:
             
             if self.context.current_row:
                 self.context.commit_row()
-                if len(self.context.data_rows) > self._last_data_rows_count:
-                    for i in range(self._last_data_rows_count, len(self.context.data_rows)):
-                        await self._send_data_row(self.context.data_rows[i])
+                await self._send_new_data_rows()
             
             if self.should_stop:
                 status = ExecutionStatus.STOPPED
@@ -1681,6 +1092,13 @@ class WorkflowExecutor:
             # 注意：不在这里自动清理浏览器，由调用方根据 autoCloseBrowser 配置决定是否关闭
             # 但需要清理其他资源
             try:
+                # 浏览器租约归还浏览器池（浏览器保持打开，下一次执行直接复用）
+                if self.context._browser_lease is not None:
+                    try:
+                        await get_browser_pool().release(self.context._browser_lease)
+                    except Exception as e:
+                        print(f"归还浏览器时出错: {e}")
+                
                 # 恢复手机输入法（如果之前切换过）
                 try:
                     original_ime = self.context.variables.get('original_ime')
@@ -1700,11 +1118,19 @@ class WorkflowExecutor:
                 
                 # 终止所有正在运行的 FFmpeg 进程
                 try:
-                    from app.executors.media import ffmpeg_manager
+                    from app.executors.media_utils import ffmpeg_manager
                     await ffmpeg_manager.terminate_all()
                 except Exception as e:
                     print(f"清理 FFmpeg 进程时出错: {e}")
                 
+                # 数据库命名连接归还连接池（供后续执行复用），未使用过数据库模块时不导入
+                try:
+                    if 'app.executors.database' in sys.modules:
+                        from app.executors.database import release_db_connections
+                        await release_db_connections(self.context)
+                except Exception as e:
+                    print(f"归还数据库连接时出错: {e}")
+                
                 # 清理上下文中的数据，防止内存泄漏
                 # ⚠️ 注意：不要清空 variables，因为外部需要保存全局变量
                 # self.context.variables.clear()  # ❌ 不要清空！
@@ -1732,12 +1158,20 @@ class WorkflowExecutor:
         
         # 1. 终止所有正在运行的 FFmpeg 进程
         try:
-            from app.executors.media import ffmpeg_manager
+            from app.executors.media_utils import ffmpeg_manager
             await ffmpeg_manager.terminate_all()
         except Exception as e:
             print(f"终止 FFmpeg 进程时出错: {e}")
         
-        # 2. 取消所有正在运行的任务
+        # 2. 取消提交到工作池中尚未完成的任务
+        try:
+            cancelled = get_worker_pool().cancel_owner(self._worker_owner)
+            if cancelled:
+                print(f"[WorkflowExecutor] 已取消 {cancelled} 个工作池任务")
+        except Exception as e:
+            print(f"取消工作池任务时出错: {e}")
+        
+        # 3. 取消所有正在运行的任务
         for task in list(self._running_tasks):
             if not task.done():
                 task.cancel()
@@ -1750,35 +1184,9 @@ class WorkflowExecutor:
                 pass
         self._running_tasks.clear()
         
-        # 3. 强制关闭浏览器以中断正在进行的操作
+        # 4. 强制关闭浏览器以中断正在进行的操作
         try:
-            if self.context.page:
-                try:
-                    await self.context.page.close()
-                except:
-                    pass
-                self.context.page = None
-            
-            if self.context.browser_context:
-                try:
-                    await self.context.browser_context.close()
-                except:
-                    pass
-                self.context.browser_context = None
-            
-            if self.context.browser:
-                try:
-                    await self.context.browser.close()
-                except:
-                    pass
-                self.context.browser = None
-            
-            if self.context._playwright:
-                try:
-                    await self.context._playwright.stop()
-                except:
-                    pass
-                self.context._playwright = None
+            await self._close_browser()
         except Exception as e:
             print(f"停止时关闭浏览器出错: {e}")
         
@@ -1789,3 +1197,9 @@ class WorkflowExecutor:
         if self.context.current_row:
             self.context.commit_row()
         return self.context.data_rows.copy()
+    
+    def get_collected_rows(self) -> DataRowStore:
+        """获取收集的数据存储（数据量大时避免复制为 list[dict]）"""
+        if self.context.current_row:
+            self.context.commit_row()
+        return self.context.data_rows
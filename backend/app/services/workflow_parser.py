@@ -1,8 +1,259 @@
 """工作流解析器 - 将工作流JSON解析为可执行结构"""
-from typing import Optional
-from collections import defaultdict
+from typing import Any, Optional
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from types import MappingProxyType
 
 from app.models.workflow import Workflow, WorkflowNode, WorkflowEdge
+from app.services.workflow_timeout import (
+    CRITICAL_MODULES,
+    get_effective_timeout,
+    is_important_module,
+    is_trigger_module,
+)
+
+
+# 不执行的节点类型（分组、便签、子流程头）
+SKIPPED_NODE_TYPES = ('group', 'note', 'subflow_header')
+
+# 子流程分组空间索引的网格大小（画布坐标）
+SUBFLOW_GRID_SIZE = 512
+# 覆盖的网格数超过该值的超大分组不放入网格，对每个节点单独检查
+SUBFLOW_GRID_MAX_CELLS = 4096
+
+
+@dataclass(frozen=True)
+class NodePlan:
+    """节点执行计划 - 解析时预先计算好的节点执行信息"""
+    node_id: str
+    node_type: str
+    label: str
+    config: dict[str, Any]
+    executor: Any  # Optional[ModuleExecutor]
+    resource_class: Optional[str]  # 资源类别，用于调度器限制并发
+    offload: Optional[str]  # 'thread' 表示在工作线程池中执行
+    timeout_ms: int
+    timeout_seconds: Optional[float]  # None 表示不限制超时
+    is_user_log: bool  # 重要模块，简洁模式下也显示日志
+    is_system_log: bool  # 触发器模块，标记为系统日志
+    is_critical: bool  # 失败且没有异常处理分支时停止后续执行
+    skipped: bool  # 分组/便签/子流程头，不执行
+    disabled: bool
+
+
+@dataclass(frozen=True)
+class LoopPlan:
+    """循环执行计划 - 循环体闭包和错误处理分支闭包"""
+    body_nodes: frozenset[str]
+    error_branch_nodes: frozenset[str]
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """预编译的执行计划（只读）"""
+    nodes: MappingProxyType  # node_id -> NodePlan
+    loops: MappingProxyType  # loop_node_id -> LoopPlan
+    join_counts: MappingProxyType  # node_id -> 前驱数量
+    
+    def get_node_plan(self, node_id: str) -> Optional[NodePlan]:
+        return self.nodes.get(node_id)
+    
+    def get_loop_plan(self, node_id: str) -> Optional[LoopPlan]:
+        return self.loops.get(node_id)
+    
+    def get_join_count(self, node_id: str) -> int:
+        return self.join_counts.get(node_id, 0)
+
+
+def build_node_plan(node: WorkflowNode) -> NodePlan:
+    """为单个节点构建执行计划"""
+    from app.executors import registry
+    
+    config = node.data.get('config', None)
+    if config is None:
+        # 配置直接在 node.data 中，而不是在 config 子字段
+        config = node.data
+    
+    skipped = node.type in SKIPPED_NODE_TYPES
+    executor = None if skipped else registry.get(node.type)
+    timeout_ms = get_effective_timeout(node.type, config)
+    
+    return NodePlan(
+        node_id=node.id,
+        node_type=node.type,
+        label=node.data.get('label', node.type),
+        config=config,
+        executor=executor,
+        resource_class=None if skipped else registry.get_resource_class(node.type),
+        offload=executor.offload if executor is not None else None,
+        timeout_ms=timeout_ms,
+        # 超时为0表示不限制超时
+        timeout_seconds=timeout_ms / 1000.0 if timeout_ms > 0 else None,
+        is_user_log=is_important_module(node.type),
+        is_system_log=is_trigger_module(node.type),
+        is_critical=node.type in CRITICAL_MODULES,
+        skipped=skipped,
+        disabled=bool(node.data.get('disabled', False)),
+    )
+
+
+def parse_dimension(value, default: int = 300) -> int:
+    """解析尺寸值，支持数字和字符串（如 '300px'）"""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        # 移除 'px' 后缀并转换为数字
+        try:
+            return int(value.replace('px', '').strip())
+        except ValueError:
+            return default
+    return default
+
+
+def get_group_rect(group: WorkflowNode) -> tuple[float, float, int, int]:
+    """获取分组的范围 (x, y, width, height)"""
+    # 优先从 data 属性获取宽高（前端 NodeResizer 保存的），其次从 style 属性获取
+    width = group.data.get('width')
+    height = group.data.get('height')
+    if width is None or height is None:
+        style = group.style or {}
+        width = width or style.get('width', 300)
+        height = height or style.get('height', 200)
+    return group.position.x, group.position.y, parse_dimension(width, 300), parse_dimension(height, 200)
+
+
+@dataclass(frozen=True)
+class SubflowPlan:
+    """子流程执行计划"""
+    node_id: str  # 子流程分组或子流程头节点ID
+    name: str
+    is_header: bool  # 函数头形式（从子流程头沿连接收集节点）
+    node_ids: tuple[str, ...]  # 子流程内的节点（分组按画布顺序，函数头按连接的遍历顺序）
+    start_node_ids: tuple[str, ...]  # 子流程内没有入边的节点
+
+
+class SubflowIndex:
+    """子流程索引 - 解析时一次构建
+    
+    - 节点ID映射和出边/入边邻接表（包含分组、便签、子流程头）
+    - 按网格划分的分组空间索引，每个节点只和所在网格内的分组比较范围
+    - 子流程名称映射，调用子流程（包括循环中的调用）按名称或ID直接查找预先计算好的执行计划
+    """
+    
+    def __init__(self, workflow: Workflow):
+        self.nodes: dict[str, WorkflowNode] = {node.id: node for node in workflow.nodes}
+        self.outgoing: dict[str, list[str]] = defaultdict(list)
+        self.incoming: dict[str, list[str]] = defaultdict(list)
+        for edge in workflow.edges:
+            self.outgoing[edge.source].append(edge.target)
+            self.incoming[edge.target].append(edge.source)
+        
+        self.plans: dict[str, SubflowPlan] = {}  # 分组/子流程头ID -> SubflowPlan
+        self.by_name: dict[str, str] = {}  # 子流程名称 -> 分组/子流程头ID（同名时画布上靠前的优先）
+        
+        groups = [node for node in workflow.nodes if node.type == 'group']
+        group_members = self._collect_group_members(workflow.nodes, groups)
+        
+        member_ids = set()
+        for node in workflow.nodes:
+            if node.type == 'group':
+                plan = self._build_plan(node, group_members[node.id], is_header=False)
+                is_subflow = bool(node.data.get('isSubflow', False))
+                if is_subflow:
+                    member_ids.update(plan.node_ids)
+            elif node.type == 'subflow_header':
+                plan = self._build_plan(node, self._collect_header_members(node.id), is_header=True)
+                is_subflow = True
+                member_ids.add(node.id)
+                member_ids.update(plan.node_ids)
+            else:
+                continue
+            self.plans[node.id] = plan
+            subflow_name = node.data.get('subflowName')
+            if is_subflow and subflow_name:
+                self.by_name.setdefault(subflow_name, node.id)
+        
+        # 子流程内的节点（不由主流程直接执行）
+        self.member_ids: frozenset[str] = frozenset(member_ids)
+    
+    def _collect_group_members(self, nodes: list[WorkflowNode], groups: list[WorkflowNode]) -> dict[str, list[str]]:
+        """按节点左上角是否在分组范围内收集每个分组的节点（保持画布顺序）"""
+        members: dict[str, list[str]] = {group.id: [] for group in groups}
+        if not groups:
+            return members
+        
+        grid: dict[tuple[int, int], list[tuple]] = defaultdict(list)
+        oversized = []
+        for group in groups:
+            x, y, width, height = rect = get_group_rect(group)
+            entry = (group.id, rect)
+            cells_x = range(int(x // SUBFLOW_GRID_SIZE), int((x + width) // SUBFLOW_GRID_SIZE) + 1)
+            cells_y = range(int(y // SUBFLOW_GRID_SIZE), int((y + height) // SUBFLOW_GRID_SIZE) + 1)
+            if len(cells_x) * len(cells_y) > SUBFLOW_GRID_MAX_CELLS:
+                oversized.append(entry)
+                continue
+            for cell_x in cells_x:
+                for cell_y in cells_y:
+                    grid[(cell_x, cell_y)].append(entry)
+        
+        for node in nodes:
+            if node.type in ('group', 'note'):
+                continue
+            node_x = node.position.x
+            node_y = node.position.y
+            cell = (int(node_x // SUBFLOW_GRID_SIZE), int(node_y // SUBFLOW_GRID_SIZE))
+            candidates = grid.get(cell, [])
+            if oversized:
+                candidates = candidates + oversized
+            for group_id, (x, y, width, height) in candidates:
+                if x <= node_x <= x + width and y <= node_y <= y + height:
+                    members[group_id].append(node.id)
+        return members
+    
+    def _collect_header_members(self, header_id: str) -> list[str]:
+        """从子流程头开始沿连接广度优先收集节点"""
+        members = []
+        seen = {header_id}
+        queue = deque([header_id])
+        while queue:
+            current_id = queue.popleft()
+            for target_id in self.outgoing.get(current_id, ()):
+                if target_id in seen:
+                    continue
+                target_node = self.nodes.get(target_id)
+                if target_node and target_node.type not in SKIPPED_NODE_TYPES:
+                    seen.add(target_id)
+                    members.append(target_id)
+                    queue.append(target_id)
+        return members
+    
+    def _build_plan(self, node: WorkflowNode, member_ids: list[str], is_header: bool) -> SubflowPlan:
+        member_set = set(member_ids)
+        start_node_ids = [
+            node_id for node_id in member_ids
+            if not any(source in member_set for source in self.incoming.get(node_id, ()))
+        ]
+        if not start_node_ids and member_ids:
+            # 如果没有明确的起始节点，按位置排序取第一个
+            first = min(member_ids, key=lambda node_id: (self.nodes[node_id].position.y, self.nodes[node_id].position.x))
+            start_node_ids = [first]
+        return SubflowPlan(
+            node_id=node.id,
+            name=node.data.get('subflowName', '子流程'),
+            is_header=is_header,
+            node_ids=tuple(member_ids),
+            start_node_ids=tuple(start_node_ids),
+        )
+    
+    def resolve(self, subflow_name: Optional[str] = None, node_id: Optional[str] = None) -> Optional[SubflowPlan]:
+        """查找子流程 - 优先通过名称查找（因为导入后 ID 会变），ID 作为备用"""
+        if subflow_name and subflow_name in self.by_name:
+            return self.plans[self.by_name[subflow_name]]
+        if node_id:
+            return self.plans.get(node_id)
+        return None
 
 
 class ExecutionGraph:
@@ -17,6 +268,8 @@ class ExecutionGraph:
         self.condition_branches: dict[str, dict[str, str]] = {}  # condition_node_id -> {handle: target_node_id}
         self.loop_branches: dict[str, dict[str, list[str]]] = {}  # loop_node_id -> {handle: [target_node_ids]}
         self.error_branches: dict[str, list[str]] = {}  # node_id -> [error_handler_node_ids]
+        self.plan: Optional[ExecutionPlan] = None  # 预编译的执行计划
+        self.subflows: Optional[SubflowIndex] = None  # 子流程索引
     
     def get_node(self, node_id: str) -> Optional[WorkflowNode]:
         return self.nodes.get(node_id)
@@ -55,6 +308,75 @@ class ExecutionGraph:
     def get_start_nodes(self) -> list[str]:
         """获取起始节点ID列表"""
         return self.start_nodes.copy()
+    
+    def get_node_plan(self, node_id: str) -> Optional[NodePlan]:
+        """获取节点执行计划"""
+        if self.plan is None:
+            return None
+        return self.plan.get_node_plan(node_id)
+    
+    def collect_loop_body_nodes(self, start_nodes: list[str]) -> set[str]:
+        """收集循环体内的所有节点（包括条件分支的所有路径）
+        
+        注意：不收集错误处理分支的节点，因为错误处理分支只在节点失败时才执行。
+        错误处理分支的节点会在 collect_error_branch_nodes 中单独收集。
+        """
+        collected = set()
+        to_visit = deque(start_nodes)
+        
+        while to_visit:
+            node_id = to_visit.popleft()
+            if node_id in collected:
+                continue
+            collected.add(node_id)
+            
+            node = self.nodes.get(node_id)
+            if not node:
+                continue
+            
+            # 如果是条件节点，获取所有分支
+            if node.type == 'condition':
+                next_nodes = [t for t in self.condition_branches.get(node_id, {}).values() if t]
+            # 如果是循环节点，获取循环体和完成分支
+            elif node.type in ('loop', 'foreach'):
+                next_nodes = [t for targets in self.loop_branches.get(node_id, {}).values() for t in targets]
+            else:
+                # 普通节点，获取默认后继
+                next_nodes = self.get_next_nodes(node_id)
+            
+            for next_id in next_nodes:
+                if next_id not in collected:
+                    to_visit.append(next_id)
+        
+        return collected
+    
+    def collect_error_branch_nodes(self, body_nodes: set[str]) -> set[str]:
+        """收集循环体内所有节点的错误处理分支节点（包括其后继和嵌套的错误处理分支）"""
+        error_nodes = set()
+        to_visit = deque()
+        
+        # 首先收集循环体内所有节点的直接错误处理分支
+        for node_id in body_nodes:
+            for error_node_id in self.get_error_nodes(node_id):
+                if error_node_id not in body_nodes:
+                    to_visit.append(error_node_id)
+        
+        # 然后递归收集错误处理分支的后继节点
+        while to_visit:
+            node_id = to_visit.popleft()
+            if node_id in error_nodes or node_id in body_nodes:
+                continue
+            error_nodes.add(node_id)
+            
+            if node_id not in self.nodes:
+                continue
+            
+            # 获取后继节点，错误处理分支的节点也可能有自己的错误处理分支
+            for next_id in self.get_next_nodes(node_id) + self.get_error_nodes(node_id):
+                if next_id not in error_nodes and next_id not in body_nodes:
+                    to_visit.append(next_id)
+        
+        return error_nodes
 
 
 class WorkflowParser:
@@ -120,8 +442,30 @@ class WorkflowParser:
             if node_id not in nodes_with_incoming:
                 graph.start_nodes.append(node_id)
         
+        graph.plan = self._build_plan(graph)
+        graph.subflows = SubflowIndex(wf)
         return graph
     
+    def _build_plan(self, graph: ExecutionGraph) -> ExecutionPlan:
+        """预编译执行计划：节点执行器、超时、日志分类、循环体闭包、汇合计数"""
+        node_plans = {node_id: build_node_plan(node) for node_id, node in graph.nodes.items()}
+        
+        loop_plans = {}
+        for loop_id in graph.loop_branches:
+            body_nodes = graph.collect_loop_body_nodes(graph.get_loop_body_nodes(loop_id))
+            loop_plans[loop_id] = LoopPlan(
+                body_nodes=frozenset(body_nodes),
+                error_branch_nodes=frozenset(graph.collect_error_branch_nodes(body_nodes)),
+            )
+        
+        join_counts = {node_id: len(prev) for node_id, prev in graph.reverse_adjacency.items()}
+        
+        return ExecutionPlan(
+            nodes=MappingProxyType(node_plans),
+            loops=MappingProxyType(loop_plans),
+            join_counts=MappingProxyType(join_counts),
+        )
+    
     def validate(self, workflow: Workflow) -> tuple[bool, list[str]]:
         """验证工作流的有效性"""
         errors = []
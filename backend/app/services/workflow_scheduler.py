@@ -0,0 +1,141 @@
+"""工作流资源调度器 - 限制并行分支同时占用的资源
+
+并行分支中的节点在调用执行器前需要先获取执行槽位：
+- 全局槽位：限制同时执行的资源型模块总数
+- 资源类别槽位：按 browser/phone/media/network 分别限制，手机按设备ID分别计数
+
+不声明资源类别的模块（变量、流程控制、等待类模块等）不占用槽位，
+这样阻塞等待型模块不会把槽位长期占满。
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from app.executors.resources import (
+    RESOURCE_BROWSER,
+    RESOURCE_PHONE,
+    RESOURCE_MEDIA,
+    RESOURCE_NETWORK,
+)
+from app.utils.config import get_backend_config
+
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+DEFAULT_RESOURCE_LIMITS = {
+    RESOURCE_BROWSER: 4,                       # 同时操作的浏览器页面
+    RESOURCE_PHONE: 1,                         # 每台手机同时执行的操作
+    RESOURCE_MEDIA: max(1, os.cpu_count() or 1),  # CPU密集型处理按核数限制
+    RESOURCE_NETWORK: 8,                       # 同时进行的网络请求
+}
+
+
+class ResourceScheduler:
+    """资源调度器 - 全局并发上限 + 按资源类别的信号量"""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 resource_limits: Optional[dict[str, int]] = None):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.resource_limits = dict(DEFAULT_RESOURCE_LIMITS)
+        if resource_limits:
+            for resource_class, limit in resource_limits.items():
+                self.resource_limits[resource_class] = max(1, int(limit))
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global: Optional[asyncio.Semaphore] = None
+        self._semaphores: dict[tuple[str, Optional[str]], asyncio.Semaphore] = {}
+
+        # 统计信息
+        self._active: dict[str, int] = {}
+        self._waiting: dict[str, int] = {}
+        self._total_wait_time = 0.0
+        self._acquired_count = 0
+
+    def _ensure_loop(self):
+        """信号量绑定事件循环，事件循环变化时重新创建"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores.clear()
+
+    def _get_semaphore(self, resource_class: str, key: Optional[str]) -> asyncio.Semaphore:
+        # 只有手机按设备分别限制，其他资源类别共享同一个信号量
+        sem_key = (resource_class, key if resource_class == RESOURCE_PHONE else None)
+        semaphore = self._semaphores.get(sem_key)
+        if semaphore is None:
+            limit = self.resource_limits.get(resource_class, self.max_concurrency)
+            semaphore = asyncio.Semaphore(limit)
+            self._semaphores[sem_key] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, resource_class: Optional[str], key: Optional[str] = None):
+        """获取执行槽位
+
+        Args:
+            resource_class: 资源类别，None 表示不受限制
+            key: 资源实例标识（手机设备ID）
+        """
+        if not resource_class:
+            yield
+            return
+
+        self._ensure_loop()
+        semaphore = self._get_semaphore(resource_class, key)
+
+        start = time.perf_counter()
+        self._waiting[resource_class] = self._waiting.get(resource_class, 0) + 1
+        try:
+            # 先获取资源类别槽位再获取全局槽位，避免等待某类资源时占着全局槽位
+            await semaphore.acquire()
+            try:
+                await self._global.acquire()
+            except BaseException:
+                semaphore.release()
+                raise
+        finally:
+            self._waiting[resource_class] -= 1
+
+        self._total_wait_time += time.perf_counter() - start
+        self._acquired_count += 1
+        self._active[resource_class] = self._active.get(resource_class, 0) + 1
+        try:
+            yield
+        finally:
+            self._active[resource_class] -= 1
+            self._global.release()
+            semaphore.release()
+
+    def get_stats(self) -> dict:
+        """获取调度统计信息"""
+        return {
+            'maxConcurrency': self.max_concurrency,
+            'resourceLimits': dict(self.resource_limits),
+            'active': dict(self._active),
+            'waiting': dict(self._waiting),
+            'acquiredCount': self._acquired_count,
+            'avgWaitMs': (self._total_wait_time / self._acquired_count * 1000) if self._acquired_count else 0,
+        }
+
+
+_resource_scheduler: Optional[ResourceScheduler] = None
+
+
+def get_resource_scheduler() -> ResourceScheduler:
+    """获取资源调度器单例
+
+    配置项（WebRPAConfig.json 的 backend.scheduler）：
+        maxConcurrency: 全局并发上限
+        resourceLimits: {browser, phone, media, network} 各资源类别的并发上限
+    """
+    global _resource_scheduler
+    if _resource_scheduler is None:
+        scheduler_config = get_backend_config().get('scheduler', {}) or {}
+        _resource_scheduler = ResourceScheduler(
+            max_concurrency=scheduler_config.get('maxConcurrency', DEFAULT_MAX_CONCURRENCY),
+            resource_limits=scheduler_config.get('resourceLimits'),
+        )
+    return _resource_scheduler
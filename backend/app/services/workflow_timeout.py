@@ -12,6 +12,7 @@ MODULE_DEFAULT_TIMEOUTS = {
     'hover_element': 60000,    # 60秒
     'input_text': 60000,       # 60秒
     'get_element_info': 60000, # 60秒
+    'extract_records': 60000,  # 60秒
     'wait': 0,                 # 固定等待不需要超时（由模块内部控制）
     'wait_element': 60000,     # 60秒
     'close_page': 10000,       # 10秒
@@ -183,6 +184,17 @@ MODULE_DEFAULT_TIMEOUTS = {
     'pdf_to_word': 600000,     # 10分钟
     # 其他
     'export_log': 60000,       # 60秒
+    # 触发器模块 - 不超时（等待事件触发）
+    'webhook_trigger': 0,      # 不超时（等待webhook请求）
+    'hotkey_trigger': 0,       # 不超时（等待热键触发）
+    'file_watcher_trigger': 0, # 不超时（等待文件变化）
+    'email_trigger': 0,        # 不超时（等待邮件）
+    'api_trigger': 0,          # 不超时（等待API请求）
+    'mouse_trigger': 0,        # 不超时（等待鼠标事件）
+    'image_trigger': 0,        # 不超时（等待图像出现）
+    'sound_trigger': 0,        # 不超时（等待声音）
+    'face_trigger': 0,         # 不超时（等待人脸）
+    'element_change_trigger': 0, # 不超时（等待元素变化）
     # QQ自动化
     'qq_wait_message': 0,      # 不超时（阻塞型，等待消息）
     'qq_send_message': 60000,  # 60秒
@@ -248,6 +260,19 @@ IMPORTANT_MODULES = {
 }
 
 
+# 触发器模块 - 日志标记为系统日志
+TRIGGER_MODULES = {
+    'webhook_trigger', 'hotkey_trigger', 'file_watcher_trigger', 'email_trigger', 'api_trigger',
+    'mouse_trigger', 'image_trigger', 'sound_trigger', 'face_trigger', 'element_change_trigger',
+}
+
+
+# 关键模块 - 失败且没有异常处理分支时停止后续执行
+CRITICAL_MODULES = {
+    'open_page', 'click_element', 'input_text', 'wait_element', 'select_dropdown',
+}
+
+
 def get_module_default_timeout(module_type: str) -> int:
     """获取模块默认超时时间（毫秒）"""
     return MODULE_DEFAULT_TIMEOUTS.get(module_type, 60000)  # 默认60秒，避免30秒超时过短
@@ -261,3 +286,25 @@ def is_module_with_internal_timeout(module_type: str) -> bool:
 def is_important_module(module_type: str) -> bool:
     """检查模块是否为重要模块"""
     return module_type in IMPORTANT_MODULES
+
+
+def is_trigger_module(module_type: str) -> bool:
+    """检查模块是否为触发器模块"""
+    return module_type in TRIGGER_MODULES
+
+
+def get_effective_timeout(module_type: str, config: dict) -> int:
+    """获取节点实际生效的超时时间（毫秒），0 表示不限制
+    
+    使用内部超时逻辑的模块强制使用模块默认超时，其他模块优先使用节点配置的 timeout
+    """
+    if is_module_with_internal_timeout(module_type):
+        return get_module_default_timeout(module_type)
+    
+    timeout_ms = config.get('timeout')
+    if timeout_ms is None:
+        return get_module_default_timeout(module_type)
+    try:
+        return int(timeout_ms)
+    except (ValueError, TypeError):
+        return get_module_default_timeout(module_type)
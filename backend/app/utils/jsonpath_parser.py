@@ -1,4 +1,5 @@
 """自定义JSONPath解析器 - 支持中文字段名"""
+from functools import lru_cache
 
 
 def parse_jsonpath(data, path: str):
@@ -9,63 +10,93 @@ def parse_jsonpath(data, path: str):
     - $.data.result.records[0].fields.文本
     - $.data.result.records[0].fields.name
     - $.items[*]
+    
+    路径只解析一次（见 compile_jsonpath），重复使用同一路径时直接取值
     """
-    if path.startswith('$'):
-        path = path[1:]
-    if path.startswith('.'):
-        path = path[1:]
+    return compile_jsonpath(path)(data)
+
+
+# 路径步骤类型
+_KEY = 0          # 属性名
+_INDEX = 1        # 数组下标 [0]
+_BRACKET_KEY = 2  # 括号中的非数字键名 [name]
+_WILDCARD = 3     # [*]，返回整个数组后继续
+_WILDCARD_END = 4  # 路径中单独的 [*]，直接返回整个数组
+_NESTED = 5       # 未闭合的括号，按原有递归方式解析
+
+
+class CompiledJsonPath:
+    """预先解析好的 JSONPath，调用时只做取值"""
     
-    if not path:
-        return data
+    __slots__ = ('path', 'steps')
     
-    current = data
-    parts = _split_path(path)
+    def __init__(self, path: str, steps: tuple):
+        self.path = path
+        self.steps = steps
     
-    for part in parts:
-        if current is None:
-            return None
-        
-        # 处理数组索引 [0], [*]
-        if part.startswith('[') and part.endswith(']'):
-            index_str = part[1:-1]
-            if index_str == '*':
-                # 返回整个数组
-                if isinstance(current, list):
-                    return current
+    def __call__(self, data):
+        current = data
+        for kind, arg in self.steps:
+            if current is None:
+                return None
+            if kind == _KEY or kind == _BRACKET_KEY:
+                if isinstance(current, dict) and arg in current:
+                    current = current[arg]
                 else:
                     return None
-            else:
-                try:
-                    index = int(index_str)
-                    if isinstance(current, list) and -len(current) <= index < len(current):
-                        current = current[index]
-                    else:
-                        return None
-                except ValueError:
-                    # 不是数字索引，可能是字典键名
-                    if isinstance(current, dict) and index_str in current:
-                        current = current[index_str]
-                    else:
-                        return None
-        else:
-            # 处理属性名，可能带数组索引 如: records[0]
-            if '[' in part:
-                prop_name = part[:part.index('[')]
-                array_part = part[part.index('['):]
-                
-                if isinstance(current, dict) and prop_name in current:
-                    current = current[prop_name]
-                    current = parse_jsonpath(current, array_part)
-                else:
-                    return None
-            else:
-                # 普通属性访问，支持中文
-                if isinstance(current, dict) and part in current:
-                    current = current[part]
+            elif kind == _INDEX:
+                if isinstance(current, list) and -len(current) <= arg < len(current):
+                    current = current[arg]
                 else:
                     return None
+            elif kind == _WILDCARD_END:
+                return current if isinstance(current, list) else None
+            elif kind == _NESTED:
+                current = parse_jsonpath(current, arg)
+            elif not isinstance(current, list):
+                return None
+        return current
     
-    return current
+    def __repr__(self):
+        return f"CompiledJsonPath({self.path!r})"
+
+
+def _bracket_step(index_str: str, standalone: bool) -> tuple:
+    if index_str == '*':
+        return (_WILDCARD_END if standalone else _WILDCARD, None)
+    try:
+        return (_INDEX, int(index_str))
+    except ValueError:
+        # 不是数字索引，可能是字典键名
+        return (_BRACKET_KEY, index_str)
+
+
+@lru_cache(maxsize=512)
+def compile_jsonpath(path: str) -> CompiledJsonPath:
+    """解析 JSONPath 为取值步骤（结果缓存），语义与 parse_jsonpath 相同"""
+    raw_path = path
+    if path.startswith('$'):
+        path = path[1:]
+    if path.startswith('.'):
+        path = path[1:]
+    
+    steps = []
+    for part in (_split_path(path) if path else []):
+        if part.startswith('[') and part.endswith(']'):
+            # 处理数组索引 [0], [*]
+            steps.append(_bracket_step(part[1:-1], standalone=True))
+        elif '[' in part:
+            # 属性名带数组索引 如: records[0]
+            bracket = part.index('[')
+            steps.append((_KEY, part[:bracket]))
+            if part.endswith(']'):
+                steps.append(_bracket_step(part[bracket + 1:-1], standalone=False))
+            else:
+                steps.append((_NESTED, part[bracket:]))
+        else:
+            # 普通属性访问，支持中文
+            steps.append((_KEY, part))
+    return CompiledJsonPath(raw_path, tuple(steps))
 
 
 def _split_path(path: str) -> list:
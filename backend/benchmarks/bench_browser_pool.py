@@ -0,0 +1,85 @@
+"""浏览器池基准测试
+
+模拟计划任务连续执行 N 次“打开网页”（无头 Chromium），对比：
+- 旧实现：每次执行启动 Playwright、启动浏览器、新建上下文和页面，执行结束后关闭
+- 新实现：BrowserPool（共享 Playwright，执行结束归还浏览器，下一次执行租用并重置状态）
+
+输出每次执行从开始到页面可用的耗时（第一次执行包含冷启动，单独列出）。
+需要安装 playwright 和 Chromium（playwright install chromium）。
+
+运行方式（在 backend 目录下）：
+    python benchmarks/bench_browser_pool.py [执行次数]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from playwright.async_api import async_playwright  # noqa: E402
+
+from app.services.browser_pool import BrowserKey, BrowserPool  # noqa: E402
+
+
+PAGE_URL = "data:text/html,<title>bench</title><p>hello</p>"
+ARGS = ('--disable-blink-features=AutomationControlled',)
+
+
+async def run_legacy(runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        playwright = await async_playwright().start()
+        browser = await playwright.chromium.launch(headless=True, args=list(ARGS))
+        context = await browser.new_context()
+        page = await context.new_page()
+        await page.goto(PAGE_URL)
+        timings.append(time.perf_counter() - start)
+        await browser.close()
+        await playwright.stop()
+    return timings
+
+
+async def run_pool(runs: int) -> list:
+    pool = BrowserPool(max_idle=2)
+    key = BrowserKey(browser_type='chromium', headless=True, args=ARGS)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        playwright = await pool.get_playwright()
+        lease = await pool.checkout(key)
+        if lease is None:
+            browser = await playwright.chromium.launch(headless=True, args=list(ARGS))
+            context = await browser.new_context()
+            page = await context.new_page()
+            lease = pool.adopt(key, browser, context)
+        else:
+            page = lease.page
+        await page.goto(PAGE_URL)
+        timings.append(time.perf_counter() - start)
+        await pool.release(lease)
+    print(f"浏览器池统计: {pool.get_stats()}")
+    await pool.close_all()
+    return timings
+
+
+def describe(label: str, timings: list):
+    rest = timings[1:] or timings
+    print(f"{label}: 首次 {timings[0] * 1000:8.1f} ms, 之后中位数 {statistics.median(rest) * 1000:8.1f} ms, "
+          f"合计 {sum(timings) * 1000:9.1f} ms")
+
+
+async def main(runs: int):
+    legacy = await run_legacy(runs)
+    pooled = await run_pool(runs)
+    print(f"连续执行 {runs} 次打开网页")
+    describe("旧实现（每次启动浏览器）", legacy)
+    describe("新实现（浏览器池）      ", pooled)
+    print(f"非首次执行加速比: {statistics.median(legacy[1:] or legacy) / statistics.median(pooled[1:] or pooled):.0f}x")
+
+
+if __name__ == '__main__':
+    run_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    asyncio.run(main(run_arg))
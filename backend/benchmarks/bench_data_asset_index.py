@@ -0,0 +1,107 @@
+"""Excel 数据资源索引基准测试
+
+在临时上传目录中生成 N 个 .xlsx 文件（分布在若干文件夹中），对比：
+- 旧实现：导入模块时遍历目录并打开每个工作簿读取工作表名称；按原始文件名查找为线性扫描
+- 新实现首次访问：DataAssetIndex 建立索引（只 stat 文件），之后第一次列出时读取工作表名称并写入索引
+- 新实现重启后：新的 DataAssetIndex 从 SQLite 索引恢复，只 stat 文件，不再打开工作簿
+- 按原始文件名查找：字典查找
+
+运行方式（在 backend 目录下）：
+    python benchmarks/bench_data_asset_index.py [文件数]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import openpyxl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.data_asset_index import DataAssetIndex  # noqa: E402
+
+
+FOLDERS = 10
+ROWS_PER_FILE = 2000
+LOOKUPS = 1000
+
+
+def make_files(root: str, count: int):
+    for i in range(count):
+        folder = os.path.join(root, f'folder{i % FOLDERS}')
+        os.makedirs(folder, exist_ok=True)
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = '数据'
+        for row in range(ROWS_PER_FILE):
+            ws.append([row, f'名称{row}', row * 1.5, '备注'])
+        wb.create_sheet('汇总')
+        wb.save(os.path.join(folder, f'file{i}.xlsx'))
+
+
+def legacy_load(root: str) -> dict:
+    """旧版 _load_existing_files 的读取部分"""
+    assets = {}
+    for dirpath, dirs, files in os.walk(root):
+        for filename in files:
+            if not filename.lower().endswith(('.xlsx', '.xls')):
+                continue
+            file_path = os.path.join(dirpath, filename)
+            wb = openpyxl.load_workbook(file_path, read_only=True)
+            sheet_names = wb.sheetnames
+            wb.close()
+            assets[file_path] = {'originalName': filename, 'sheetNames': sheet_names, 'path': file_path}
+    return assets
+
+
+def legacy_lookup(assets: dict, name: str):
+    for asset in assets.values():
+        if asset['originalName'] == name:
+            return asset
+    return None
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(count: int):
+    names = [f'file{i}.xlsx' for i in range(count)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = os.path.join(temp_dir, 'excel')
+        db_path = os.path.join(temp_dir, 'data_assets.db')
+        make_files(root, count)
+
+        start = time.perf_counter()
+        legacy_assets = legacy_load(root)
+        legacy_startup = time.perf_counter() - start
+        legacy_lookups = timed(lambda: [legacy_lookup(legacy_assets, names[i % count]) for i in range(LOOKUPS)])
+
+        index = DataAssetIndex(root, db_path)
+        cold_load = timed(index.list_folders)
+        cold_list = timed(index.list_assets)
+        index.close()
+
+        index = DataAssetIndex(root, db_path)
+        restart_load = timed(index.list_folders)
+        restart_list = timed(index.list_assets)
+        lookups = timed(lambda: [index.get_by_name(names[i % count]) for i in range(LOOKUPS)])
+
+        assert {a.name: a.sheet_names for a in index.list_assets()} == \
+            {a['originalName']: a['sheetNames'] for a in legacy_assets.values()}
+        assert index.workbooks_opened == 0
+        index.close()
+
+    print(f"{count} 个 Excel 文件，{FOLDERS} 个文件夹")
+    print(f"旧实现导入模块（打开全部工作簿）: {legacy_startup * 1000:9.1f} ms")
+    print(f"新实现首次访问（只 stat）       : {cold_load * 1000:9.1f} ms，首次列出（读取工作表名称）{cold_list * 1000:9.1f} ms")
+    print(f"新实现重启后（读取索引）        : {restart_load * 1000:9.1f} ms，列出 {restart_list * 1000:9.2f} ms")
+    print(f"按名称查找 {LOOKUPS} 次: 旧 {legacy_lookups * 1000:8.2f} ms, 新 {lookups * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    count_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    main(count_arg)
@@ -0,0 +1,77 @@
+"""执行器按需导入基准测试
+
+每种情况在新的 Python 进程中测量（避免模块缓存影响），对比：
+- 按需导入：import app.main（执行器模块在第一次使用时才导入）
+- 全部导入：import app.main 后导入清单中的全部执行器（等同于原先 __init__.py 的启动行为）
+- 典型工作流：import app.main 后只导入一个“打开网页 + 点击 + 提取 + 导出”工作流用到的执行器
+
+输出启动耗时、进程内存（RSS）以及加载的重量级依赖。
+
+运行方式（在 backend 目录下）：
+    python benchmarks/bench_executor_import.py [重复次数]
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ['cv2', 'numpy', 'polars', 'pandas', 'pymysql', 'pypdf', 'PIL', 'ddddocr', 'bs4', 'html2text']
+
+TYPICAL_WORKFLOW = ['open_page', 'click_element', 'extract_records', 'set_variable', 'table_export']
+
+_CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import app.main  # noqa: F401
+from app.executors import registry
+mode = sys.argv[1]
+if mode == 'all':
+    registry.preload()
+elif mode == 'typical':
+    registry.preload(json.loads(sys.argv[2]))
+elapsed = time.perf_counter() - start
+import psutil
+print(json.dumps({
+    'seconds': elapsed,
+    'rss': psutil.Process().memory_info().rss,
+    'loaded': len(registry.get_loaded_types()),
+    'heavy': [name for name in json.loads(sys.argv[3]) if name in sys.modules],
+}))
+"""
+
+
+def measure(mode: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', _CHILD_SCRIPT, mode, json.dumps(TYPICAL_WORKFLOW), json.dumps(HEAVY_MODULES)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(repeat: int):
+    labels = {'lazy': '按需导入', 'typical': '典型工作流', 'all': '全部导入'}
+    results = {}
+    for mode in labels:
+        runs = [measure(mode) for _ in range(repeat)]
+        results[mode] = {
+            'seconds': min(run['seconds'] for run in runs),
+            'rss': min(run['rss'] for run in runs),
+            'loaded': runs[0]['loaded'],
+            'heavy': runs[0]['heavy'],
+        }
+
+    print(f"import app.main（{repeat} 次取最小值）")
+    for mode, label in labels.items():
+        result = results[mode]
+        print(f"{label:<6}: {result['seconds'] * 1000:8.0f} ms, RSS {result['rss'] / 1024 / 1024:7.1f} MB, "
+              f"已导入执行器 {result['loaded']:3d} 个, 重量级依赖: {', '.join(result['heavy']) or '无'}")
+    lazy, eager = results['lazy'], results['all']
+    print(f"启动耗时减少 {(1 - lazy['seconds'] / eager['seconds']) * 100:.0f}%，"
+          f"内存减少 {(eager['rss'] - lazy['rss']) / 1024 / 1024:.1f} MB")
+
+
+if __name__ == '__main__':
+    repeat_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    main(repeat_arg)
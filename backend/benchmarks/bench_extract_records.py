@@ -0,0 +1,88 @@
+"""批量提取记录基准测试
+
+在本地页面中生成一个商品列表（默认 50 条 x 8 个字段），对比：
+- 旧写法：遍历列表项，每个字段执行一次获取元素信息的逻辑
+  （locator.wait_for + count() + 读取，每个字段多次浏览器往返）
+- 新模块：extract_records 的页面脚本，一次 evaluate_all 提取全部记录
+
+需要安装 Playwright 及 Chromium（playwright install chromium）。
+
+运行方式（在 backend 目录下）：
+    python benchmarks/bench_extract_records.py [记录数] [字段数]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from playwright.async_api import async_playwright  # noqa: E402
+
+from app.executors.record_extract import _EXTRACT_SCRIPT, parse_fields  # noqa: E402
+
+
+def build_html(records: int, fields: int) -> str:
+    items = ''.join(
+        '<li class="item">' + ''.join(
+            f'<span class="f{f}" data-id="{r}-{f}">记录{r}字段{f}</span>' for f in range(fields)
+        ) + '</li>'
+        for r in range(records)
+    )
+    return f'<html><body><ul class="list">{items}</ul></body></html>'
+
+
+async def legacy_extract(page, records: int, fields: int) -> list:
+    """循环 + 每个字段一次获取元素信息"""
+    rows = []
+    for r in range(records):
+        row = {}
+        for f in range(fields):
+            selector = f'.list .item:nth-child({r + 1}) .f{f}'
+            element = page.locator(selector).first
+            await element.wait_for(state='attached', timeout=30000)
+            if await element.count() == 0:
+                continue
+            row[f'字段{f}'] = await element.text_content()
+        rows.append(row)
+    return rows
+
+
+async def new_extract(page, fields: int) -> list:
+    field_config = {f'字段{f}': f'.f{f}' for f in range(fields)}
+    result = await page.locator('.list .item').evaluate_all(_EXTRACT_SCRIPT, {
+        'fields': [list(field) for field in parse_fields(field_config)],
+        'limit': 0,
+    })
+    return result['records']
+
+
+async def main(records: int, fields: int):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(build_html(records, fields))
+
+        start = time.perf_counter()
+        legacy = await legacy_extract(page, records, fields)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        extracted = await new_extract(page, fields)
+        new_time = time.perf_counter() - start
+
+        await browser.close()
+
+    print(f"列表: {records} 条记录 x {fields} 个字段")
+    print(f"旧写法（逐字段获取元素信息）: {legacy_time * 1000:9.1f} ms, "
+          f"{legacy_time / records * 1000:7.2f} ms/条")
+    print(f"新模块（一次 evaluate_all）  : {new_time * 1000:9.1f} ms, "
+          f"{new_time / records * 1000:7.3f} ms/条")
+    print(f"加速比: {legacy_time / new_time:.0f}x")
+    assert legacy == extracted, "两种方式提取结果不一致"
+
+
+if __name__ == '__main__':
+    record_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    field_arg = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    asyncio.run(main(record_arg, field_arg))
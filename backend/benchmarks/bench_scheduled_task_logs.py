@@ -0,0 +1,124 @@
+"""计划任务执行日志持久化基准测试
+
+模拟已有 1000 条日志时连续执行 N 次任务（每次执行写日志两次：开始、结束），对比：
+- 旧实现：每次写入都排序全部日志并以 indent=2 整体重写 scheduled_task_logs.json
+- 新实现：TaskLogStore（SQLite，开始时插入一行，结束时更新这一行，超出保留条数时 DELETE 清理）
+
+运行方式（在 backend 目录下）：
+    python benchmarks/bench_scheduled_task_logs.py [执行次数]
+"""
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.scheduled_task import ScheduledTaskExecutionLog  # noqa: E402
+from app.services.task_log_store import TaskLogStore  # noqa: E402
+
+
+RETAINED = 1000
+
+
+def make_log(index: int) -> ScheduledTaskExecutionLog:
+    start = datetime(2025, 1, 1) + timedelta(seconds=index)
+    return ScheduledTaskExecutionLog(
+        task_id=f"task{index % 200}",
+        task_name=f"任务{index % 200}",
+        workflow_id="workflow",
+        workflow_name="示例工作流",
+        trigger_type='time',
+        trigger_time=start.isoformat(),
+        start_time=start.isoformat(),
+        status='running',
+    )
+
+
+def finish(log: ScheduledTaskExecutionLog):
+    log.end_time = log.start_time
+    log.duration = 1.5
+    log.status = 'success'
+    log.executed_nodes = 12
+
+
+def legacy_save(logs: list, path: Path):
+    """旧版 ScheduledTaskManager._save_logs"""
+    logs_to_save = sorted(logs, key=lambda x: x.start_time, reverse=True)[:RETAINED]
+    data = [log.dict() for log in logs_to_save]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def bench_legacy(runs: int, directory: Path) -> float:
+    path = directory / "scheduled_task_logs.json"
+    logs = [make_log(i) for i in range(RETAINED)]
+    for log in logs:
+        finish(log)
+    start = time.perf_counter()
+    for i in range(runs):
+        log = make_log(RETAINED + i)
+        logs.append(log)
+        legacy_save(logs, path)
+        finish(log)
+        legacy_save(logs, path)
+    return time.perf_counter() - start
+
+
+def bench_store(runs: int, directory: Path) -> float:
+    store = TaskLogStore(directory / "scheduled_task_logs.db", max_logs=RETAINED)
+    existing = [make_log(i) for i in range(RETAINED)]
+    for log in existing:
+        finish(log)
+    store.save_many(existing)
+    start = time.perf_counter()
+    for i in range(runs):
+        log = make_log(RETAINED + i)
+        store.add(log)
+        finish(log)
+        store.update(log)
+    elapsed = time.perf_counter() - start
+    assert store.count() <= RETAINED + 100
+    store.close()
+    return elapsed
+
+
+def bench_query(directory: Path) -> tuple:
+    """按任务查询最近 20 条：旧实现过滤+排序全部日志，新实现走索引"""
+    logs = [make_log(i) for i in range(RETAINED)]
+    start = time.perf_counter()
+    for _ in range(200):
+        task_logs = [log for log in logs if log.task_id == 'task7']
+        task_logs.sort(key=lambda x: x.start_time, reverse=True)
+        task_logs[:20]
+    legacy = (time.perf_counter() - start) / 200
+
+    store = TaskLogStore(directory / "query.db", max_logs=RETAINED)
+    store.save_many(logs)
+    start = time.perf_counter()
+    for _ in range(200):
+        store.query(task_id='task7', limit=20)
+    new = (time.perf_counter() - start) / 200
+    store.close()
+    return legacy, new
+
+
+def main(runs: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = Path(temp_dir)
+        legacy = bench_legacy(runs, directory)
+        new = bench_store(runs, directory)
+        legacy_query, new_query = bench_query(directory)
+
+    print(f"已有 {RETAINED} 条日志，执行 {runs} 次任务（每次写入 2 次）")
+    print(f"旧实现（整体重写JSON）: {legacy * 1000:9.1f} ms, {legacy / runs * 1000:7.2f} ms/次执行")
+    print(f"新实现（SQLite 行写入）: {new * 1000:9.1f} ms, {new / runs * 1000:7.3f} ms/次执行")
+    print(f"加速比: {legacy / new:.0f}x")
+    print(f"按任务查询最近20条: 旧 {legacy_query * 1000:.2f} ms, 新 {new_query * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    run_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    main(run_arg)
@@ -0,0 +1,124 @@
+"""子流程索引基准测试
+
+构造一个 N 个节点的画布（若干子流程分组和子流程头），对比：
+- 旧实现：逐个节点检查每个分组范围，子流程头用 list.pop(0) 的 BFS，每个节点线性查找节点和出边；
+  每次调用子流程再按名称扫描全部节点、重新收集子流程内的节点和起始节点
+- 新实现：解析时构建 SubflowIndex（节点映射、出边邻接表、分组网格索引、名称映射），调用子流程直接查找
+
+运行方式（在 backend 目录下）：
+    python benchmarks/bench_subflow_index.py [节点数]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.workflow import Workflow  # noqa: E402
+from app.services.workflow_parser import SubflowIndex, get_group_rect  # noqa: E402
+
+
+GROUPS = 20
+HEADERS = 20
+CALLS = 200
+
+
+def make_workflow(node_count: int) -> Workflow:
+    rng = random.Random(0)
+    nodes, edges = [], []
+    for i in range(GROUPS):
+        nodes.append({'id': f'group{i}', 'type': 'group', 'position': {'x': i * 1200, 'y': 0},
+                      'data': {'isSubflow': True, 'subflowName': f'分组{i}', 'width': 800, 'height': 800}})
+    for i in range(HEADERS):
+        nodes.append({'id': f'header{i}', 'type': 'subflow_header', 'position': {'x': i * 1200, 'y': 5000},
+                      'data': {'subflowName': f'函数{i}'}})
+    previous = {}
+    for i in range(node_count - GROUPS - HEADERS):
+        node_id = f'node{i}'
+        nodes.append({'id': node_id, 'type': 'set_variable',
+                      'position': {'x': rng.uniform(0, GROUPS * 1200), 'y': rng.uniform(0, 8000)},
+                      'data': {'label': node_id}})
+        chain = i % (HEADERS * 2)
+        source = previous.get(chain, f'header{chain}' if chain < HEADERS else None)
+        if source:
+            edges.append({'id': f'edge{i}', 'source': source, 'target': node_id})
+        previous[chain] = node_id
+    return Workflow(id='bench', name='bench', nodes=nodes, edges=edges)
+
+
+def legacy_group_members(workflow: Workflow, group) -> list:
+    x, y, width, height = get_group_rect(group)
+    return [node for node in workflow.nodes
+            if node.id != group.id and node.type not in ('group', 'note')
+            and x <= node.position.x <= x + width and y <= node.position.y <= y + height]
+
+
+def legacy_header_members(workflow: Workflow, header_id: str) -> list:
+    members, visited, queue = [], set(), [header_id]
+    while queue:
+        current_id = queue.pop(0)
+        if current_id in visited:
+            continue
+        visited.add(current_id)
+        for edge in [e for e in workflow.edges if e.source == current_id]:
+            if edge.target not in visited:
+                target = next((n for n in workflow.nodes if n.id == edge.target), None)
+                if target and target.type not in ('group', 'note', 'subflow_header'):
+                    members.append(target)
+                    queue.append(edge.target)
+    return members
+
+
+def legacy_subflow_node_ids(workflow: Workflow) -> set:
+    node_ids = set()
+    for node in workflow.nodes:
+        if node.type == 'group' and node.data.get('isSubflow'):
+            node_ids.update(n.id for n in legacy_group_members(workflow, node))
+        elif node.type == 'subflow_header':
+            node_ids.add(node.id)
+            node_ids.update(n.id for n in legacy_header_members(workflow, node.id))
+    return node_ids
+
+
+def legacy_call(workflow: Workflow, subflow_name: str) -> list:
+    group = next(n for n in workflow.nodes if n.type in ('group', 'subflow_header')
+                 and n.data.get('subflowName') == subflow_name)
+    if group.type == 'subflow_header':
+        members = legacy_header_members(workflow, group.id)
+    else:
+        members = legacy_group_members(workflow, group)
+    member_ids = {n.id for n in members}
+    incoming = {e.target for e in workflow.edges if e.target in member_ids and e.source in member_ids}
+    return [n.id for n in members if n.id not in incoming]
+
+
+def main(node_count: int):
+    workflow = make_workflow(node_count)
+    names = [f'分组{i}' for i in range(GROUPS)] + [f'函数{i}' for i in range(HEADERS)]
+
+    start = time.perf_counter()
+    legacy_ids = legacy_subflow_node_ids(workflow)
+    legacy_parse = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(CALLS):
+        legacy_call(workflow, names[i % len(names)])
+    legacy_calls = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SubflowIndex(workflow)
+    index_build = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(CALLS):
+        index.resolve(names[i % len(names)])
+    index_calls = time.perf_counter() - start
+
+    assert set(index.member_ids) == legacy_ids
+    print(f"{node_count} 个节点，{len(workflow.edges)} 条边，{GROUPS} 个子流程分组，{HEADERS} 个子流程头")
+    print(f"收集子流程节点: 旧 {legacy_parse * 1000:9.1f} ms, 新（构建索引） {index_build * 1000:7.1f} ms")
+    print(f"调用子流程 {CALLS} 次: 旧 {legacy_calls * 1000:9.1f} ms, 新 {index_calls * 1000:7.3f} ms")
+
+
+if __name__ == '__main__':
+    node_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    main(node_arg)
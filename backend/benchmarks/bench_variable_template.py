@@ -0,0 +1,111 @@
+"""变量模板解析微基准测试
+
+模拟循环密集型工作流：遍历 5000 行数据的列表，每次迭代解析若干引用循环变量的配置字符串。
+对比旧实现（每次跑正则 + 深拷贝基础变量）与编译缓存后的 resolve_value。
+
+运行方式（在 backend 目录下）：
+    python benchmarks/bench_variable_template.py
+"""
+import copy
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.executors.base import ExecutionContext  # noqa: E402
+from app.executors.variable_template import get_cache_stats  # noqa: E402
+
+
+def legacy_resolve(variables: dict, value: str) -> str:
+    """旧版 resolve_value 的核心逻辑（正则逐次解析 + 深拷贝）"""
+    pattern = r'(?<!\$)\{([^{}]+)\}'
+
+    def resolve_access_path(var_name: str):
+        base_match = re.match(r'^([a-zA-Z_\u4e00-\u9fa5][a-zA-Z0-9_\u4e00-\u9fa5]*)((?:\[[^\]]+\])*)', var_name.strip())
+        if not base_match or base_match.group(1) not in variables:
+            return None
+        result = variables[base_match.group(1)]
+        if isinstance(result, (list, dict)):
+            result = copy.deepcopy(result)
+        for accessor in re.findall(r'\[([^\]]+)\]', base_match.group(2)):
+            accessor = accessor.strip().strip('"\'')
+            try:
+                if isinstance(result, list):
+                    result = result[int(accessor)]
+                elif isinstance(result, dict):
+                    result = result[accessor]
+                else:
+                    return None
+            except (ValueError, IndexError, KeyError):
+                return None
+        return result
+
+    def resolve_nested(text: str, max_depth: int = 5) -> str:
+        if max_depth <= 0:
+            return text
+        matches = list(re.finditer(pattern, text))
+        if not matches:
+            return text
+        for match in reversed(matches):
+            resolved = resolve_access_path(match.group(1))
+            if resolved is not None:
+                replacement = json.dumps(resolved, ensure_ascii=False) if isinstance(resolved, (list, dict)) else str(resolved)
+                text = text[:match.start()] + replacement + text[match.end():]
+        if re.search(pattern, text):
+            return resolve_nested(text, max_depth - 1)
+        return text
+
+    result = value
+    for match in reversed(list(re.finditer(r'\$\{([^}]+)\}', result))):
+        resolved = resolve_access_path(match.group(1))
+        if resolved is not None:
+            replacement = json.dumps(resolved, ensure_ascii=False) if isinstance(resolved, (list, dict)) else str(resolved)
+            result = result[:match.start()] + replacement + result[match.end():]
+    return resolve_nested(result)
+
+
+TEMPLATES = [
+    '{rows[{i}][name]}',
+    'https://example.com/item/{rows[{i}][id]}?page=${page}',
+    '第{i}行: {item}',
+    '#list > li:nth-child({i})',
+]
+
+
+def run(resolve, iterations: int) -> float:
+    variables = {
+        'rows': [{'id': n, 'name': f'name_{n}', 'tags': ['a', 'b', 'c']} for n in range(5000)],
+        'page': 3,
+    }
+    start = time.perf_counter()
+    for i in range(iterations):
+        variables['i'] = i % 5000
+        variables['item'] = variables['rows'][i % 5000]['name']
+        for template in TEMPLATES:
+            resolve(variables, template)
+    return time.perf_counter() - start
+
+
+def main():
+    iterations = 2000
+    context = ExecutionContext()
+
+    def compiled_resolve(variables, value):
+        context.variables = variables
+        return context.resolve_value(value)
+
+    legacy = run(legacy_resolve, iterations)
+    compiled = run(compiled_resolve, iterations)
+    calls = iterations * len(TEMPLATES)
+    print(f"解析次数: {calls}")
+    print(f"旧实现:   {legacy:.3f}s ({legacy / calls * 1e6:.1f} us/次)")
+    print(f"编译缓存: {compiled:.3f}s ({compiled / calls * 1e6:.1f} us/次)")
+    print(f"加速比:   {legacy / compiled:.1f}x")
+    print(f"缓存统计: {get_cache_stats()}")
+
+
+if __name__ == '__main__':
+    main()
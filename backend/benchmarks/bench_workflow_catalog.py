@@ -0,0 +1,86 @@
+"""本地工作流列表基准测试
+
+在临时文件夹中生成 N 个较大的工作流文件（每个约 0.5 MB），对比列出工作流的耗时：
+- 旧实现：每次完整 json.load 每个文件读取 name
+- 新实现冷启动：WorkflowCatalog 首次列出（只解析每个文件开头一段读取 name，并写入 .webrpa_catalog）
+- 新实现重启后：新的 WorkflowCatalog 从 .webrpa_catalog 恢复，只 stat 文件
+- 新实现热缓存：同一个 WorkflowCatalog 再次列出
+
+运行方式（在 backend 目录下）：
+    python benchmarks/bench_workflow_catalog.py [文件数]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.workflow_catalog import WorkflowCatalog  # noqa: E402
+
+
+NODES_PER_FILE = 1500
+
+
+def make_files(folder: str, count: int):
+    nodes = [{
+        'id': f'node{i}', 'type': 'click_element', 'position': {'x': i * 10, 'y': i * 5},
+        'data': {'label': '点击元素', 'selector': f'#app > div:nth-child({i}) > button.submit', 'timeout': 30000},
+    } for i in range(NODES_PER_FILE)]
+    for i in range(count):
+        workflow = {'id': f'wf{i}', 'name': f'工作流{i}', 'nodes': nodes, 'edges': [], 'variables': []}
+        with open(os.path.join(folder, f'workflow_{i}.json'), 'w', encoding='utf-8') as f:
+            json.dump(workflow, f, ensure_ascii=False, indent=2)
+
+
+def legacy_list(folder: str) -> list:
+    """旧版 list_workflows 的读取部分"""
+    workflows = []
+    for filename in os.listdir(folder):
+        if filename.endswith('.json'):
+            filepath = os.path.join(folder, filename)
+            stat = os.stat(filepath)
+            workflow_name = filename[:-5]
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    if 'name' in data:
+                        workflow_name = data['name']
+            except Exception:
+                pass
+            workflows.append((filename, workflow_name, stat.st_mtime, stat.st_size))
+    return workflows
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(count: int):
+    with tempfile.TemporaryDirectory() as folder:
+        make_files(folder, count)
+        total_size = sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+
+        legacy = timed(legacy_list, folder)
+        catalog = WorkflowCatalog()
+        cold = timed(catalog.list, folder)
+        warm = timed(catalog.list, folder)
+        restarted = timed(WorkflowCatalog().list, folder)
+
+        names = {name for _, name, _, _ in legacy_list(folder)}
+        assert names == {item['name'] for item in catalog.list(folder)[0]}
+
+    print(f"{count} 个工作流文件，共 {total_size / 1024 / 1024:.1f} MB")
+    print(f"旧实现（完整解析全部文件）: {legacy * 1000:8.1f} ms")
+    print(f"新实现冷启动（解析文件开头）: {cold * 1000:8.1f} ms")
+    print(f"新实现重启后（读取索引文件）: {restarted * 1000:8.1f} ms")
+    print(f"新实现热缓存（只 stat）     : {warm * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    count_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    main(count_arg)
@@ -0,0 +1,74 @@
+"""api_request 执行器测试 - 通过注册表获取的执行器使用共享的HTTP客户端池
+
+运行方式（在 backend 目录下）：
+    python -m pytest tests
+"""
+import asyncio
+
+import httpx
+import pytest
+
+pytest.importorskip("playwright")
+
+from app.executors import ExecutionContext, registry  # noqa: E402
+from app.services import http_client_pool  # noqa: E402
+
+
+class _RecordingPool:
+    """记录请求的假客户端池"""
+
+    def __init__(self):
+        self.requests = []
+        self.batches = []
+
+    async def request(self, spec, proxy=None, verify=True, http2=None):
+        self.requests.append(spec)
+        return httpx.Response(200, json={'ok': True, 'url': spec.url})
+
+    async def request_batch(self, specs, **kwargs):
+        self.batches.append(specs)
+        return [{'success': True, 'status_code': 200, 'response': spec.url, 'error': None} for spec in specs]
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    recording = _RecordingPool()
+    monkeypatch.setattr(http_client_pool, 'get_http_client_pool', lambda: recording)
+    return recording
+
+
+def test_api_request_resolves_to_pooled_executor():
+    executor = registry.get('api_request')
+    assert executor is not None
+    assert type(executor).__module__ == 'app.executors.advanced'
+
+
+def test_api_request_sends_through_client_pool(pool):
+    executor = registry.get('api_request')
+    context = ExecutionContext()
+    config = {'requestUrl': 'http://example.test/items', 'variableName': 'resp'}
+
+    result = asyncio.run(executor.execute(config, context))
+
+    assert result.success, result.error
+    assert [spec.url for spec in pool.requests] == ['http://example.test/items']
+    assert pool.requests[0].follow_redirects is False
+    assert context.variables['resp'] == {'ok': True, 'url': 'http://example.test/items'}
+
+
+def test_api_request_batch_mode_uses_client_pool(pool):
+    executor = registry.get('api_request')
+    context = ExecutionContext()
+    config = {
+        'requestMode': 'batch',
+        'batchItems': 'http://example.test/a\nhttp://example.test/b',
+        'variableName': 'results',
+    }
+
+    result = asyncio.run(executor.execute(config, context))
+
+    assert result.success, result.error
+    assert [spec.url for spec in pool.batches[0]] == ['http://example.test/a', 'http://example.test/b']
+    assert [item['response'] for item in context.variables['results']] == [
+        'http://example.test/a', 'http://example.test/b',
+    ]
@@ -37,6 +37,7 @@ import {
   JsScriptConfig,
   PythonScriptConfig,
   ExtractTableDataConfig,
+  ExtractRecordsConfig,
   SwitchTabConfig,
   GroupConfig,
   SubflowHeaderConfig,
@@ -663,6 +664,8 @@ export function ConfigPanel({ selectedNodeId: propSelectedNodeId }: ConfigPanelP
         return <PythonScriptConfig data={nodeData} onChange={handleChange} />
       case 'extract_table_data':
         return <ExtractTableDataConfig {...props} />
+      case 'extract_records':
+        return <ExtractRecordsConfig {...props} />
       case 'switch_tab':
         return <SwitchTabConfig data={nodeData} onChange={handleChange} />
       case 'select_dropdown':
@@ -158,6 +158,7 @@ import {
   Printer,
   FlipHorizontal,
   Play,
+  LayoutList,
 } from 'lucide-react'
 import { TestReportIcon } from './icons/TestReportIcon'
 
@@ -456,6 +457,7 @@ const moduleIcons: Record<ModuleType, React.ElementType> = {
   js_script: Code2,
   python_script: Code,
   extract_table_data: Table2,
+  extract_records: LayoutList,
   // 画布工具
   group: Square,
   subflow_header: Workflow,
@@ -520,6 +522,7 @@ const moduleKeywords: Record<ModuleType, string[]> = {
   js_script: ['执行', '脚本', 'js', 'javascript', 'script', '代码', 'code', '自定义', '函数'],
   python_script: ['执行', '脚本', 'python', 'py', 'script', '代码', 'code', '自定义', '函数', 'Python3.13'],
   extract_table_data: ['表格', '数据', '提取', '爬取', '采集', 'table', 'extract', '批量', '列表', 'excel', '导出', '二维'],
+  extract_records: ['批量', '提取', '记录', '列表', '字段', '爬取', '采集', '商品', 'records', 'extract', 'list', 'scrape'],
   set_clipboard: ['剪贴板', '写入', '复制', '粘贴', 'clipboard', 'copy', 'paste', '图片', '文本'],
   get_clipboard: ['剪贴板', '读取', '获取', '粘贴', 'clipboard', 'paste', '内容'],
   keyboard_action: ['模拟', '按键', '键盘', '快捷键', 'keyboard', 'key', 'ctrl', 'alt', 'shift', '热键'],
@@ -813,7 +816,7 @@ const moduleCategories = [
   {
     name: '📥 数据采集',
     color: 'bg-emerald-500',
-    modules: ['get_element_info', 'screenshot', 'save_image', 'download_file', 'extract_table_data'] as ModuleType[],
+    modules: ['get_element_info', 'screenshot', 'save_image', 'download_file', 'extract_table_data', 'extract_records'] as ModuleType[],
   },
   {
     name: '⏱️ 等待控制',
@@ -225,16 +225,92 @@ export function AIVisionConfig({
 
 // API请求配置
 export function ApiRequestConfig({ data, onChange }: { data: NodeData; onChange: (key: string, value: unknown) => void }) {
+  const isBatch = data.requestMode === 'batch'
+  
   return (
     <>
       <div className="space-y-2">
-        <Label htmlFor="requestUrl">请求地址</Label>
-        <VariableInput
-          value={(data.requestUrl as string) || ''}
-          onChange={(v) => onChange('requestUrl', v)}
-          placeholder="https://api.example.com/data，支持 {变量名}"
-        />
+        <Label htmlFor="requestMode">请求模式</Label>
+        <Select
+          id="requestMode"
+          value={(data.requestMode as string) || 'single'}
+          onChange={(e) => onChange('requestMode', e.target.value)}
+        >
+          <option value="single">单个请求</option>
+          <option value="batch">批量请求</option>
+        </Select>
       </div>
+      {isBatch ? (
+        <>
+          <div className="space-y-2">
+            <Label htmlFor="batchItems">请求列表</Label>
+            <VariableInput
+              value={(data.batchItems as string) || ''}
+              onChange={(v) => onChange('batchItems', v)}
+              placeholder='{urlList} 或 ["https://a.com/1", {"url": "https://a.com/2", "method": "POST", "body": {...}}]'
+              multiline
+              rows={4}
+            />
+            <p className="text-xs text-muted-foreground">
+              列表变量、JSON数组或每行一个URL；对象中未填写的请求方法/请求头/请求体使用下方配置
+            </p>
+          </div>
+          <div className="grid grid-cols-2 gap-2">
+            <div className="space-y-2">
+              <Label htmlFor="batchConcurrency">并发数</Label>
+              <NumberInput
+                id="batchConcurrency"
+                value={(data.batchConcurrency as number) ?? 5}
+                onChange={(v) => onChange('batchConcurrency', v)}
+                defaultValue={5}
+                min={1}
+              />
+            </div>
+            <div className="space-y-2">
+              <Label htmlFor="batchRateLimit">每秒最多请求数</Label>
+              <NumberInput
+                id="batchRateLimit"
+                value={(data.batchRateLimit as number) ?? 0}
+                onChange={(v) => onChange('batchRateLimit', v)}
+                defaultValue={0}
+                min={0}
+              />
+            </div>
+            <div className="space-y-2">
+              <Label htmlFor="batchRetries">失败重试次数</Label>
+              <NumberInput
+                id="batchRetries"
+                value={(data.batchRetries as number) ?? 2}
+                onChange={(v) => onChange('batchRetries', v)}
+                defaultValue={2}
+                min={0}
+              />
+            </div>
+            <div className="space-y-2">
+              <Label htmlFor="batchRetryDelay">重试间隔 (秒)</Label>
+              <NumberInput
+                id="batchRetryDelay"
+                value={(data.batchRetryDelay as number) ?? 1}
+                onChange={(v) => onChange('batchRetryDelay', v)}
+                defaultValue={1}
+                min={0}
+              />
+            </div>
+          </div>
+          <p className="text-xs text-muted-foreground">
+            每秒最多请求数为 0 表示不限速；重试间隔每次翻倍
+          </p>
+        </>
+      ) : (
+        <div className="space-y-2">
+          <Label htmlFor="requestUrl">请求地址</Label>
+          <VariableInput
+            value={(data.requestUrl as string) || ''}
+            onChange={(v) => onChange('requestUrl', v)}
+            placeholder="https://api.example.com/data，支持 {变量名}"
+          />
+        </div>
+      )}
       <div className="space-y-2">
         <Label htmlFor="requestMethod">请求方法</Label>
         <Select
@@ -275,7 +351,7 @@ export function ApiRequestConfig({ data, onChange }: { data: NodeData; onChange:
           id="variableName"
           value={(data.variableName as string) || ''}
           onChange={(v) => onChange('variableName', v)}
-          placeholder="变量名（存储完整响应JSON）"
+          placeholder={isBatch ? '变量名（按顺序存储每个请求的结果列表）' : '变量名（存储完整响应JSON）'}
         />
       </div>
       <div className="space-y-2">
@@ -288,6 +364,34 @@ export function ApiRequestConfig({ data, onChange }: { data: NodeData; onChange:
           min={1}
         />
       </div>
+      <div className="space-y-2">
+        <Label htmlFor="requestProxy">代理地址 (可选)</Label>
+        <VariableInput
+          value={(data.requestProxy as string) || ''}
+          onChange={(v) => onChange('requestProxy', v)}
+          placeholder="http://127.0.0.1:7890"
+        />
+      </div>
+      <div className="flex items-center gap-2">
+        <input
+          type="checkbox"
+          id="verifySsl"
+          checked={(data.verifySsl as boolean) ?? true}
+          onChange={(e) => onChange('verifySsl', e.target.checked)}
+          className="rounded"
+        />
+        <Label htmlFor="verifySsl" className="cursor-pointer">校验SSL证书</Label>
+      </div>
+      <div className="flex items-center gap-2">
+        <input
+          type="checkbox"
+          id="followRedirects"
+          checked={(data.followRedirects as boolean) ?? false}
+          onChange={(e) => onChange('followRedirects', e.target.checked)}
+          className="rounded"
+        />
+        <Label htmlFor="followRedirects" className="cursor-pointer">跟随重定向</Label>
+      </div>
       <p className="text-xs text-muted-foreground">
         发送HTTP请求并将响应存储到变量，可配合JSON解析模块提取数据
       </p>
@@ -1016,11 +1120,71 @@ export function FirecrawlCrawlConfig({ data, onChange }: { data: NodeData; onCha
         </Select>
       </div>
       
+      <div className="space-y-2">
+        <Label htmlFor="concurrency">并发页面数</Label>
+        <NumberInput
+          id="concurrency"
+          value={(data.concurrency as number) ?? 4}
+          onChange={(v) => onChange('concurrency', v)}
+          defaultValue={4}
+          min={1}
+          max={32}
+        />
+      </div>
+      
+      <div className="space-y-2">
+        <Label htmlFor="perHostLimit">同一站点最大并发</Label>
+        <NumberInput
+          id="perHostLimit"
+          value={(data.perHostLimit as number) ?? 4}
+          onChange={(v) => onChange('perHostLimit', v)}
+          defaultValue={4}
+          min={0}
+        />
+        <p className="text-xs text-muted-foreground">
+          0 表示不限制，降低该值可以减轻目标网站的压力
+        </p>
+      </div>
+      
+      <div className="space-y-2">
+        <Label htmlFor="perHostDelay">同一站点请求间隔 (毫秒)</Label>
+        <NumberInput
+          id="perHostDelay"
+          value={(data.perHostDelay as number) ?? 0}
+          onChange={(v) => onChange('perHostDelay', v)}
+          defaultValue={0}
+          min={0}
+        />
+      </div>
+      
+      <div className="flex items-center gap-2">
+        <input
+          type="checkbox"
+          id="blockResources"
+          checked={(data.blockResources as boolean) ?? false}
+          onChange={(e) => onChange('blockResources', e.target.checked)}
+          className="rounded"
+        />
+        <Label htmlFor="blockResources" className="cursor-pointer">不加载图片/字体/媒体</Label>
+      </div>
+      
+      <div className="flex items-center gap-2">
+        <input
+          type="checkbox"
+          id="saveToTable"
+          checked={(data.saveToTable as boolean) ?? false}
+          onChange={(e) => onChange('saveToTable', e.target.checked)}
+          className="rounded"
+        />
+        <Label htmlFor="saveToTable" className="cursor-pointer">同时写入数据表</Label>
+      </div>
+      
       <div className="p-3 bg-gradient-to-r from-purple-50 to-pink-50 border border-purple-200 rounded-lg">
         <p className="text-xs text-purple-900">
           <strong>🕷️ Firecrawl AI 全站数据抓取</strong><br/>
           • 智能爬取整个网站的数据<br />
           • 支持深度爬取和智能过滤<br />
+          • 多个页面并发爬取，结果边爬边写入变量<br />
           • 自动处理分页和动态加载<br />
           • ⚠️ 注意：全站爬取可能需要几分钟
         </p>
@@ -1389,6 +1389,52 @@ export function ExtractTableDataConfig({
         </div>
       )}
       
+      <div className="space-y-2">
+        <div className="flex items-center space-x-2">
+          <Checkbox
+            id="expandMergedCells"
+            checked={(data.expandMergedCells as boolean) ?? false}
+            onCheckedChange={(checked) => onChange('expandMergedCells', checked)}
+          />
+          <Label htmlFor="expandMergedCells" className="cursor-pointer">展开合并单元格</Label>
+        </div>
+        <p className="text-xs text-muted-foreground">
+          按跨行/跨列把合并单元格的内容填入每个格子，保证各行列对齐
+        </p>
+      </div>
+      
+      {renderSelectorInput('nextPageSelector', '下一页按钮选择器（可选）', '例如: .pagination .next')}
+      
+      {!!(data.nextPageSelector as string) && (
+        <div className="space-y-2">
+          <Label htmlFor="maxPages">最多提取页数</Label>
+          <NumberInput
+            id="maxPages"
+            value={(data.maxPages as number) ?? 10}
+            onChange={(v) => onChange('maxPages', v)}
+            defaultValue={10}
+            min={1}
+          />
+          <p className="text-xs text-muted-foreground">
+            每页提取完后点击下一页按钮，等待表格刷新后继续提取
+          </p>
+        </div>
+      )}
+      
+      <div className="space-y-2">
+        <div className="flex items-center space-x-2">
+          <Checkbox
+            id="saveToTable"
+            checked={(data.saveToTable as boolean) ?? false}
+            onCheckedChange={(checked) => onChange('saveToTable', checked)}
+          />
+          <Label htmlFor="saveToTable" className="cursor-pointer">同时写入数据表</Label>
+        </div>
+        <p className="text-xs text-muted-foreground">
+          以表头作为列名，把每一行写入数据表
+        </p>
+      </div>
+      
       <div className="space-y-2">
         <div className="flex items-center space-x-2">
           <Checkbox
@@ -1425,6 +1471,108 @@ export function ExtractTableDataConfig({
           <li>可以选择table标签内的任意元素，会自动向上查找table</li>
           <li>提取的数据为二维列表，按行列索引访问</li>
           <li>支持直接导出为格式化的Excel文件</li>
+          <li>整张表格在页面内一次性读取，大表格也能快速提取</li>
+        </ul>
+      </div>
+    </>
+  )
+}
+
+// 批量提取记录配置
+export function ExtractRecordsConfig({ 
+  data, 
+  onChange, 
+  renderSelectorInput 
+}: { 
+  data: NodeData
+  onChange: (key: string, value: unknown) => void
+  renderSelectorInput: RenderSelectorInput
+}) {
+  
+  return (
+    <>
+      {renderSelectorInput('containerSelector', '记录容器选择器', '例如: .product-list .item')}
+      
+      <div className="space-y-2">
+        <Label htmlFor="fields">字段配置 (JSON格式)</Label>
+        <VariableInput
+          value={(data.fields as string) || ''}
+          onChange={(v) => onChange('fields', v)}
+          placeholder='{"标题": ".title", "链接": {"selector": "a", "attribute": "href"}}'
+          multiline
+          rows={5}
+        />
+        <p className="text-xs text-muted-foreground">
+          键为字段名（即数据表列名），值为相对于记录容器的选择器，或包含 selector 和 attribute 的对象
+        </p>
+        <p className="text-xs text-muted-foreground">
+          属性可选 text、innerText、innerHTML、outerHTML、value、attributes 或任意HTML属性名，选择器留空表示记录容器本身
+        </p>
+      </div>
+      
+      <div className="space-y-2">
+        <Label htmlFor="limit">最多提取条数</Label>
+        <NumberInput
+          id="limit"
+          value={(data.limit as number) ?? 0}
+          onChange={(v) => onChange('limit', v)}
+          defaultValue={0}
+          min={0}
+        />
+        <p className="text-xs text-muted-foreground">
+          0 表示提取全部匹配的记录
+        </p>
+      </div>
+      
+      <div className="space-y-2">
+        <Label htmlFor="timeout">等待超时(毫秒)</Label>
+        <NumberInput
+          id="timeout"
+          value={(data.timeout as number) ?? 30000}
+          onChange={(v) => onChange('timeout', v)}
+          defaultValue={30000}
+          min={0}
+        />
+        <p className="text-xs text-muted-foreground">
+          等待第一条记录出现的时间
+        </p>
+      </div>
+      
+      <div className="space-y-2">
+        <div className="flex items-center space-x-2">
+          <Checkbox
+            id="saveToTable"
+            checked={(data.saveToTable as boolean) ?? true}
+            onCheckedChange={(checked) => onChange('saveToTable', checked)}
+          />
+          <Label htmlFor="saveToTable" className="cursor-pointer">写入数据表</Label>
+        </div>
+        <p className="text-xs text-muted-foreground">
+          每条记录写入数据表的一行，字段名作为列名
+        </p>
+      </div>
+      
+      <div className="space-y-2">
+        <Label htmlFor="variableName">存储到变量（可选）</Label>
+        <VariableNameInput
+          id="variableName"
+          value={(data.variableName as string) || ''}
+          onChange={(v) => onChange('variableName', v)}
+          placeholder="变量名"
+          isStorageVariable={true}
+        />
+        <p className="text-xs text-muted-foreground">
+          变量中保存记录列表，每条记录是一个字典
+        </p>
+      </div>
+      
+      <div className="p-3 bg-green-50 border border-green-200 rounded-lg space-y-2">
+        <p className="text-xs font-medium text-green-800">使用说明：</p>
+        <ul className="text-xs text-green-700 space-y-1 list-disc list-inside">
+          <li>容器选择器匹配列表中的每一条记录（如每个商品卡片）</li>
+          <li>所有记录的所有字段在页面内一次读取，无需再用循环 + 提取数据逐个字段获取</li>
+          <li>字段选择器支持CSS和XPath（以 / 或 xpath= 开头），在记录容器内查找</li>
+          <li>找不到的字段值为空</li>
         </ul>
       </div>
     </>
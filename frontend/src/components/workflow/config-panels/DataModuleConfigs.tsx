@@ -798,6 +798,36 @@ export function ListExportConfig({ data, onChange }: { data: NodeData; onChange:
           title="选择保存位置"
         />
       </div>
+      <div className="space-y-2">
+        <Label htmlFor="exportFormat">导出格式</Label>
+        <Select
+          id="exportFormat"
+          value={(data.exportFormat as string) || 'txt'}
+          onChange={(e) => onChange('exportFormat', e.target.value)}
+        >
+          <option value="txt">文本 (.txt)</option>
+          <option value="excel">Excel (.xlsx)</option>
+          <option value="csv">CSV (.csv)</option>
+          <option value="parquet">Parquet (.parquet)</option>
+          <option value="ipc">Arrow (.arrow)</option>
+        </Select>
+        {((data.exportFormat as string) || 'txt') !== 'txt' && (
+          <p className="text-xs text-muted-foreground">
+            表格格式下，字典元素的键作为列名，其他元素写入“值”列
+          </p>
+        )}
+      </div>
+      {((data.exportFormat as string) || 'txt') === 'excel' && (
+        <div className="space-y-2">
+          <Label htmlFor="sheetName">Sheet名称</Label>
+          <VariableInput
+            id="sheetName"
+            value={(data.sheetName as string) || '数据'}
+            onChange={(v) => onChange('sheetName', v)}
+            placeholder="数据，支持 {变量名}"
+          />
+        </div>
+      )}
       <div className="space-y-2">
         <Label htmlFor="separator">分隔符</Label>
         <Select
@@ -1158,6 +1188,8 @@ export function TableExportConfig({ data, onChange }: { data: NodeData; onChange
         >
           <option value="excel">Excel (.xlsx)</option>
           <option value="csv">CSV (.csv)</option>
+          <option value="parquet">Parquet (.parquet)</option>
+          <option value="ipc">Arrow (.arrow)</option>
         </Select>
       </div>
       
@@ -155,6 +155,33 @@ export function DbQueryConfig({ data, onChange }: ConfigProps) {
         />
         <Label htmlFor="singleRow" className="cursor-pointer">仅返回单行数据</Label>
       </div>
+      
+      {!data.singleRow && (
+        <div className="space-y-2">
+          <Label>结果读取方式</Label>
+          <select
+            value={(data.resultMode as string) || 'all'}
+            onChange={(e) => onChange('resultMode', e.target.value)}
+            className="w-full h-9 px-3 rounded-md border border-input bg-background text-sm"
+          >
+            <option value="all">一次性读取到变量</option>
+            <option value="rows">流式读取到变量（大结果集，可直接用于遍历列表）</option>
+            <option value="table">流式追加到数据表格</option>
+          </select>
+          {((data.resultMode as string) || 'all') !== 'all' && (
+            <>
+              <Label>每批读取行数</Label>
+              <NumberInput
+                value={(data.fetchSize as number) || 1000}
+                onChange={(v) => onChange('fetchSize', v)}
+                defaultValue={1000}
+                min={1}
+              />
+              <p className="text-xs text-muted-foreground">使用服务端游标分批读取，不会一次性把全部结果加载到内存</p>
+            </>
+          )}
+        </div>
+      )}
     </div>
   )
 }
@@ -235,7 +262,28 @@ export function DbInsertConfig({ data, onChange }: ConfigProps) {
           multiline
           rows={4}
         />
-        <p className="text-xs text-muted-foreground">JSON格式的键值对，键名对应表字段名</p>
+        <p className="text-xs text-muted-foreground">JSON格式的键值对，键名对应表字段名；填写对象数组或列表变量（如 {'{rows}'}）时批量插入</p>
+      </div>
+      
+      <div className="flex items-center gap-2">
+        <input
+          type="checkbox"
+          id="useTableData"
+          checked={(data.useTableData as boolean) || false}
+          onChange={(e) => onChange('useTableData', e.target.checked)}
+          className="rounded"
+        />
+        <Label htmlFor="useTableData" className="cursor-pointer">插入数据表格中的全部行</Label>
+      </div>
+      
+      <div className="space-y-2">
+        <Label>批量插入每批行数</Label>
+        <NumberInput
+          value={(data.batchSize as number) || 1000}
+          onChange={(v) => onChange('batchSize', v)}
+          defaultValue={1000}
+          min={1}
+        />
       </div>
       
       <div className="space-y-2">
@@ -563,6 +563,7 @@ export function ApiTriggerConfig({
   const { config } = useGlobalConfigStore()
   const method = (data.method as string) || 'GET'
   const conditionOperator = (data.conditionOperator as string) || '=='
+  const pollMode = (data.pollMode as string) || 'poll'
 
   // 使用全局配置的默认值初始化
   useEffect(() => {
@@ -623,6 +624,22 @@ export function ApiTriggerConfig({
         </div>
       )}
 
+      <div className="space-y-2">
+        <Label htmlFor="pollMode">监听方式</Label>
+        <Select
+          id="pollMode"
+          value={pollMode}
+          onChange={(e: React.ChangeEvent<HTMLSelectElement>) => onChange('pollMode', e.target.value)}
+        >
+          <option value="poll">定时轮询</option>
+          <option value="longpoll">长轮询</option>
+          <option value="sse">SSE事件流</option>
+        </Select>
+        <p className="text-xs text-muted-foreground">
+          长轮询：服务端挂起请求直到有新数据；SSE：接口返回 text/event-stream，每个事件判断一次条件
+        </p>
+      </div>
+
       <div className="space-y-2">
         <Label htmlFor="conditionPath">条件判断路径（JSONPath）</Label>
         <VariableInput
@@ -674,10 +691,26 @@ export function ApiTriggerConfig({
           min={1}
         />
         <p className="text-xs text-muted-foreground">
-          每隔多少秒请求一次API
+          {pollMode === 'sse' ? '事件流断开后重新连接的间隔' : '每隔多少秒请求一次API'}
         </p>
       </div>
 
+      {pollMode === 'poll' && (
+        <div className="space-y-2">
+          <Label htmlFor="maxInterval">最大检查间隔（秒）</Label>
+          <NumberInput
+            id="maxInterval"
+            value={(data.maxInterval as number) ?? 0}
+            onChange={(v) => onChange('maxInterval', v)}
+            defaultValue={0}
+            min={0}
+          />
+          <p className="text-xs text-muted-foreground">
+            数据未变化时逐步放慢检查，最长不超过此间隔；0表示固定按检查间隔轮询
+          </p>
+        </div>
+      )}
+
       <div className="space-y-2">
         <Label htmlFor="timeout">超时时间（秒）</Label>
         <NumberInput
@@ -709,6 +742,7 @@ export function ApiTriggerConfig({
           • 工作流执行到此模块时会暂停，定期轮询API接口<br />
           • 当API响应满足指定条件时，工作流会继续执行<br />
           • 适用于等待任务完成、监控状态变化等场景<br />
+          • 请求会携带 ETag/Last-Modified 条件头，接口返回304或数据未变化时不重复判断<br />
           • 示例：轮询任务状态API，直到status为"completed"
         </p>
       </div>
@@ -775,10 +775,10 @@ export const scheduledTaskApi = {
   }),
 
   // 获取任务执行日志
-  getTaskLogs: (taskId: string, limit = 100) => request<any[]>(`/scheduled-tasks/${taskId}/logs?limit=${limit}`),
+  getTaskLogs: (taskId: string, limit = 100, offset = 0) => request<any[]>(`/scheduled-tasks/${taskId}/logs?limit=${limit}&offset=${offset}`),
 
   // 获取所有执行日志
-  getAllLogs: (limit = 100) => request<any[]>(`/scheduled-tasks/logs/all?limit=${limit}`),
+  getAllLogs: (limit = 100, offset = 0) => request<any[]>(`/scheduled-tasks/logs/all?limit=${limit}&offset=${offset}`),
 
   // 清空任务执行日志
   clearTaskLogs: (taskId: string) => request<{ success: boolean; message: string }>(`/scheduled-tasks/${taskId}/logs`, {
@@ -815,6 +815,24 @@ export const localWorkflowApi = {
     body: JSON.stringify({ folder: folder || '' }),
   }),
 
+  // 分页列出工作流文件（支持排序和搜索）
+  catalog: (params: {
+    folder?: string
+    offset?: number
+    limit?: number
+    sortBy?: 'modifiedTime' | 'name' | 'filename' | 'size'
+    order?: 'asc' | 'desc'
+    search?: string
+  }) => request<{ workflows: Array<{
+    filename: string
+    name: string
+    modifiedTime: string
+    size: number
+  }>; total: number; offset: number; limit: number; error?: string }>('/local-workflows/catalog', {
+    method: 'POST',
+    body: JSON.stringify({ ...params, folder: params.folder || '' }),
+  }),
+
   // 加载工作流
   load: (filename: string, folder?: string) => request<{ success: boolean; content?: any; error?: string }>(`/local-workflows/load/${encodeURIComponent(filename)}${folder ? `?folder=${encodeURIComponent(folder)}` : ''}`),
 
@@ -367,7 +367,7 @@ class SocketService {
     })
 
     // 日志消息 - 🔥 完全实时显示，立即添加，不使用任何批处理！
-    this.socket.on('execution:log', (data: {
+    const handleLog = (data: {
       workflowId: string
       log: {
         id: string
@@ -440,7 +440,8 @@ class SocketService {
       })
       
       console.log('[Socket] ✅ 日志已添加到 store')
-    })
+    }
+    this.socket.on('execution:log', handleLog)
 
     // 输入弹窗请求
     this.socket.on('execution:input_prompt', (data: {
@@ -555,7 +556,7 @@ class SocketService {
     })
 
     // 数据行收集 - 实时显示
-    this.socket.on('execution:data_row', (data: {
+    const handleDataRow = (data: {
       workflowId: string
       row: Record<string, unknown>
     }) => {
@@ -564,6 +565,21 @@ class SocketService {
       console.log('[Socket] 收到数据行:', data.row)
       const store = useWorkflowStore.getState()
       store.addDataRow(data.row)
+    }
+    this.socket.on('execution:data_row', handleDataRow)
+    
+    // 批量遥测事件 - 后端每次刷新把缓冲的日志、数据行、节点状态等合并为一个事件，按原事件名逐条分发
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    const batchHandlers: Record<string, (data: any) => void> = {
+      'execution:log': handleLog,
+      'execution:data_row': handleDataRow,
+    }
+    this.socket.on('execution:batch', (data: {
+      events: { event: string; data: unknown }[]
+    }) => {
+      for (const item of data.events) {
+        batchHandlers[item.event]?.(item.data)
+      }
     })
 
     // 执行停止
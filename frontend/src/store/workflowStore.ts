@@ -331,6 +331,7 @@ export const moduleTypeLabels: Record<ModuleType, string> = {
   js_script: 'JS脚本',
   python_script: 'Python脚本',
   extract_table_data: '表格数据提取',
+  extract_records: '批量提取记录',
   set_clipboard: '写入剪贴板',
   get_clipboard: '读取剪贴板',
   keyboard_action: '模拟按键',
@@ -615,6 +616,7 @@ export const moduleDefaultTimeouts: Partial<Record<ModuleType, number>> = {
   js_script: 60000,        // 1分钟
   python_script: 60000,    // 1分钟
   extract_table_data: 60000, // 60秒
+  extract_records: 60000,  // 60秒
   switch_tab: 10000,       // 10秒
   set_clipboard: 5000,     // 5秒
   get_clipboard: 5000,     // 5秒
@@ -137,6 +137,7 @@ export type ModuleType =
   | 'js_script'
   | 'python_script'
   | 'extract_table_data'
+  | 'extract_records'
   | 'set_clipboard'
   | 'get_clipboard'
   | 'keyboard_action'